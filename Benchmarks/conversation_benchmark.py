@@ -0,0 +1,129 @@
+import argparse
+import random
+import textwrap
+import time
+import tracemalloc
+from typing import List, Dict
+
+from Frontend.conversation_view import ConversationWindow
+
+WORDS: List[str] = ["the", "knight", "rode", "through", "a", "dark", "forest", "towards", "castle", "where", "dragon",
+                    "slept", "on", "its", "gold", "while", "villagers", "whispered", "of", "ancient", "curse"]
+
+
+class MessageControl:
+    def __init__(self, sender: str, text: str, width: int = 120):
+        """Initialises a MessageControl object, which stands in for the container of a message. It keeps the text
+        and its laid out lines, like the controls of the UI do.
+
+        :param sender: The sender of the message.
+        :param text: The text of the message.
+        :param width: The number of characters in each line.
+        """
+        self.sender = sender
+        self.value = text
+        self.width = width
+        self.lines: List[str] = self.layout()
+
+    def layout(self) -> List[str]:
+        """Lays out the text of the message, as the UI does for every control in the column on each frame.
+
+        :return: The lines of the message.
+        """
+        return textwrap.wrap(self.value, self.width)
+
+
+def create_story(rng: random.Random, words: int) -> str:
+    """Creates a paragraph of random words.
+
+    :param rng: The random number generator.
+    :param words: The number of words.
+    :return: The paragraph.
+    """
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def measure(controls: List[MessageControl], frames: int) -> float:
+    """Measures how long a frame takes to lay out the rendered messages.
+
+    :param controls: The rendered messages.
+    :param frames: The number of frames measured.
+    :return: The median frame time in seconds.
+    """
+    times: List[float] = []
+    for _ in range(frames):
+        start: float = time.perf_counter()
+        for control in controls:
+            control.layout()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+def play(turns: int, window: int | None) -> tuple[List[MessageControl], int]:
+    """Plays a game, adding the messages of each turn to the conversation.
+
+    :param turns: The number of turns.
+    :param window: The number of messages with controls, or None to keep a control for every message.
+    :return: A tuple containing the rendered controls and the memory they use in bytes.
+    """
+    rng = random.Random(0)
+    tracemalloc.start()
+    if window is None:
+        controls: List[MessageControl] = []
+        for _ in range(turns):
+            controls.append(MessageControl("User", create_story(rng, 15)))
+            controls.append(MessageControl("AI", create_story(rng, 250)))
+    else:
+        messages: ConversationWindow[MessageControl] = ConversationWindow(MessageControl, window)
+        for _ in range(turns):
+            messages.append("User", create_story(rng, 15))
+            messages.append("AI", create_story(rng, 250))
+        controls = messages.controls
+    memory: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return controls, memory
+
+
+def run_benchmark(turns: int = 500, window: int = 40, frames: int = 20) -> Dict[str, float]:
+    """Compares the memory and frame time of a conversation that keeps every control with a windowed one.
+
+    :param turns: The number of turns played.
+    :param window: The number of messages with controls in the windowed conversation.
+    :param frames: The number of frames measured.
+    :return: A dictionary containing the memory in megabytes and the frame time in milliseconds of both
+             conversations, and the ratios between them.
+    """
+    full_controls, full_memory = play(turns, None)
+    windowed_controls, windowed_memory = play(turns, window)
+    full_time: float = measure(full_controls, frames)
+    windowed_time: float = measure(windowed_controls, frames)
+    return {
+        "rendered_messages_full": float(len(full_controls)),
+        "rendered_messages_windowed": float(len(windowed_controls)),
+        "memory_full_mb": full_memory / 1e6,
+        "memory_windowed_mb": windowed_memory / 1e6,
+        "memory_ratio": full_memory / windowed_memory,
+        "frame_full_ms": full_time * 1000,
+        "frame_windowed_ms": windowed_time * 1000,
+        "frame_ratio": full_time / windowed_time
+    }
+
+
+def main() -> None:
+    """Runs the conversation benchmark and prints the results.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the windowed conversation against keeping every "
+                                                 "message control.")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--window", type=int, default=40)
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, value in run_benchmark(args.turns, args.window, args.frames).items():
+        print(f"{name}: {value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import time
+from io import BytesIO
+from typing import List, Dict
+
+import numpy as np
+from PIL import Image
+
+from Frontend import pixel_art
+
+
+def create_generated_image(cells: int = 32, size: int = 1024, colours: int = 12, noise: float = 6.0,
+                           seed: int = 0) -> bytes:
+    """Creates an image resembling the pixel art returned by the image model: a grid of flat colours upscaled to the
+    full resolution, with noise added to every pixel.
+
+    :param cells: The number of art pixels along each side.
+    :param size: The width and height of the image.
+    :param colours: The number of colours in the art.
+    :param noise: The standard deviation of the noise added to each channel.
+    :param seed: The seed of the random number generator.
+    :return: The PNG data.
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    palette: np.ndarray = rng.integers(0, 256, (colours, 3))
+    art: np.ndarray = palette[rng.integers(0, colours, (cells, cells))]
+    cell_size: int = size // cells
+    pixels: np.ndarray = np.kron(art, np.ones((cell_size, cell_size, 1), dtype=np.int64))
+    pixels = np.clip(pixels + rng.normal(0, noise, pixels.shape), 0, 255).astype(np.uint8)
+    data = BytesIO()
+    Image.fromarray(pixels, "RGB").save(data, format="PNG")
+    return data.getvalue()
+
+
+def get_decode_time(data: bytes, repeats: int) -> float:
+    """Measures how long an image takes to decode.
+
+    :param data: The image data.
+    :param repeats: The number of times the image is decoded.
+    :return: The median decode time in seconds.
+    """
+    times: List[float] = []
+    for _ in range(repeats):
+        start: float = time.perf_counter()
+        with Image.open(BytesIO(data)) as image:
+            image.load()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+def run_benchmark(images: int = 5, repeats: int = 20) -> Dict[str, float]:
+    """Compares the size and decode time of generated images before and after post-processing.
+
+    :param images: The number of generated images.
+    :param repeats: The number of times each image is decoded.
+    :return: A dictionary containing the mean sizes in bytes, the mean decode times in milliseconds and the ratios
+             between the original image and the pre-scaled variant shown in the popups.
+    """
+    original_sizes: List[int] = []
+    processed_sizes: List[int] = []
+    variant_sizes: List[int] = []
+    original_times: List[float] = []
+    variant_times: List[float] = []
+    processing_times: List[float] = []
+    for seed in range(images):
+        data: bytes = create_generated_image(seed=seed)
+        start: float = time.perf_counter()
+        processed: pixel_art.ProcessedImage = pixel_art.process_image(data)
+        processing_times.append(time.perf_counter() - start)
+        variant: bytes = processed.variants[100]
+
+        original_sizes.append(len(data))
+        processed_sizes.append(len(processed.data))
+        variant_sizes.append(len(variant))
+        original_times.append(get_decode_time(data, repeats))
+        variant_times.append(get_decode_time(variant, repeats))
+
+    return {
+        "original_bytes": float(np.mean(original_sizes)),
+        "processed_bytes": float(np.mean(processed_sizes)),
+        "variant_100_bytes": float(np.mean(variant_sizes)),
+        "size_ratio": float(np.mean(original_sizes) / np.mean(variant_sizes)),
+        "original_decode_ms": float(np.mean(original_times)) * 1000,
+        "variant_100_decode_ms": float(np.mean(variant_times)) * 1000,
+        "decode_ratio": float(np.mean(original_times) / np.mean(variant_times)),
+        "processing_ms": float(np.mean(processing_times)) * 1000
+    }
+
+
+def main() -> None:
+    """Runs the pixel art benchmark and prints the results.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the pixel art post-processing of generated images.")
+    parser.add_argument("--images", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, value in run_benchmark(args.images, args.repeats).items():
+        print(f"{name}: {value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
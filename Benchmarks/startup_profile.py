@@ -0,0 +1,76 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import List, Dict
+
+PROJECT_DIRECTORY: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_import_times(output: str) -> List[tuple[str, int, int]]:
+    """Parses the report printed by ``python -X importtime``.
+
+    :param output: The standard error of the Python process.
+    :return: A list of tuples containing the name of each imported module, and the time spent importing the module
+             itself and including its imports, in microseconds.
+    """
+    entries: List[tuple[str, int, int]] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields: List[str] = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # the header of the report
+            continue
+        entries.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return entries
+
+
+def get_package_costs(entries: List[tuple[str, int, int]]) -> Dict[str, float]:
+    """Adds up the import time of the modules in each top-level package.
+
+    :param entries: The entries returned by ``parse_import_times``.
+    :return: A dictionary mapping each package to its import time in milliseconds, from the slowest to the fastest.
+    """
+    costs: Dict[str, float] = {}
+    for name, own_time, _ in entries:
+        package: str = name.split(".")[0]
+        costs[package] = costs.get(package, 0) + own_time / 1000
+    return dict(sorted(costs.items(), key=lambda item: item[1], reverse=True))
+
+
+def profile_imports(module: str, python: str = sys.executable) -> tuple[float, Dict[str, float]]:
+    """Imports a module in a new Python process and measures the import time of each package it loads.
+
+    :param module: The module imported, e.g. "main".
+    :param python: The Python executable.
+    :return: A tuple containing the wall time of the import in milliseconds, and the import time of each package.
+    """
+    start: float = time.perf_counter()
+    process = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"], cwd=PROJECT_DIRECTORY,
+                             capture_output=True, text=True)
+    wall_time: float = (time.perf_counter() - start) * 1000
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr.splitlines()[-1]}")
+    return wall_time, get_package_costs(parse_import_times(process.stderr))
+
+
+def main() -> None:
+    """Profiles the import of a module and prints the slowest packages.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Reports the import time of each package loaded at startup.")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    wall_time, costs = profile_imports(args.module)
+    print(f"import {args.module}: {wall_time:.2f} ms (including interpreter start)")
+    for package, cost in list(costs.items())[:args.top]:
+        print(f"{package}: {cost:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import random
+import time
+from typing import List, Dict, Any
+
+from Utilities import openai_api, story_index
+from Utilities.story_index import StoryIndex
+
+PLACES: List[str] = ["mill", "harbour", "chapel", "market", "forest", "cellar", "tower", "bridge"]
+NAMES: List[str] = ["Alice", "Brom", "Cedric", "Dara", "Elric", "Fen"]
+# roughly the size of the character, world and timeline JSON sent in every continuation prompt
+STATE_CHARACTERS: int = 2500
+
+
+def create_turn(turn: int, rng: random.Random) -> tuple[str, str]:
+    """Creates the prompt and the story of a turn.
+
+    :param turn: The number of the turn.
+    :param rng: The random number generator.
+    :return: A tuple containing the prompt and the story.
+    """
+    place: str = rng.choice(PLACES)
+    name: str = rng.choice(NAMES)
+    prompt: str = (f'This is what the user wants to do next: "I ask {name} about the {place}".\n'
+                   f'{story_index.CHARACTER_JSON_HEADER}\n' + "x" * STATE_CHARACTERS)
+    story: str = "\n\n".join([
+        f"You walk to the {place}, where {name} is waiting for you on day {turn}.",
+        f"{name} tells you a story about the {place} and a stranger seen there {rng.randint(1, 9)} nights ago.",
+        f"The wind picks up and the lanterns of the {place} flicker as you part ways."
+    ])
+    return prompt, story
+
+
+def count_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Estimates the number of tokens taken up by a list of messages.
+
+    :param messages: The message dictionaries.
+    :return: The estimated number of tokens.
+    """
+    return sum(story_index.estimate_tokens(story_index.get_text(message)) for message in messages)
+
+
+def run_benchmark(turns: int = 500, budget: int = story_index.DEFAULT_CONTEXT_TOKENS,
+                  seed: int = 0) -> Dict[str, float]:
+    """Plays a game turn by turn and compares the prompt tokens of sending the whole story history with sending the
+    most relevant passages within a token budget, along with the time spent selecting them.
+
+    :param turns: The number of turns played.
+    :param budget: The most tokens of earlier story sent with each request.
+    :param seed: The seed of the random number generator.
+    :return: A dictionary containing the tokens sent on the last turn and over the whole game with each approach,
+             and the time spent selecting the messages in milliseconds.
+    """
+    rng = random.Random(seed)
+    history: List[Dict[str, Any]] = [{
+        "role": "system",
+        "content": [{"type": "text", "text": "The story should feel like a window into an already existing world."}]
+    }]
+    key_events: List[str] = []
+    index = StoryIndex()
+
+    full_tokens: int = 0
+    selected_tokens: int = 0
+    selection_time: float = 0.0
+    last_full: int = 0
+    last_selected: int = 0
+    for turn in range(turns):
+        prompt, story = create_turn(turn, rng)
+        openai_api.append_user_msg(prompt, history)
+        start: float = time.perf_counter()
+        messages: List[Dict[str, Any]] = story_index.select_story_messages(history, key_events, index, budget)
+        selection_time += time.perf_counter() - start
+        last_full = count_tokens(history)
+        last_selected = count_tokens(messages)
+        full_tokens += last_full
+        selected_tokens += last_selected
+        openai_api.append_assistant_msg(story, history)
+        key_events.append(story.split("\n\n")[1])
+
+    return {
+        "last_turn_full_history_tokens": last_full,
+        "last_turn_selected_tokens": last_selected,
+        "total_full_history_tokens": full_tokens,
+        "total_selected_tokens": selected_tokens,
+        "selection_ms_per_turn": selection_time / turns * 1000,
+    }
+
+
+def main() -> None:
+    """Runs the story context benchmark and prints the results.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the prompt tokens of the story context.")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--budget", type=int, default=story_index.DEFAULT_CONTEXT_TOKENS)
+    args = parser.parse_args()
+
+    for name, value in run_benchmark(args.turns, args.budget).items():
+        print(f"{name}: {value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import List, Dict, Iterator, Callable, Any
+
+from Utilities import story_exporter
+
+SENTENCES: List[str] = [
+    "Mr. Hale lowered his lantern and the shadows of the forest crept closer.",
+    "The merchant counted 2.5 gold coins into your palm, frowning at the dent in one.",
+    "\"You shouldn't be here,\" she whispered. \"Not after what happened at St. Agnes.\"",
+    "Somewhere beyond the ridge a wolf howled, and the horses stamped nervously.",
+    "Dr. Voss adjusted her spectacles, e.g. the ones with the cracked lens, and studied the map.",
+    "Is this really the way to the capital? Nobody in the village seemed sure.",
+]
+
+
+def create_story(turns: int, sentences: int = 12, seed: int = 0) -> Iterator[str]:
+    """Creates a story one paragraph at a time, alternating the player's inputs and the story.
+
+    :param turns: The number of turns.
+    :param sentences: The number of sentences in each paragraph of the story.
+    :param seed: The seed of the random number generator.
+    :return: An iterator over the paragraphs.
+    """
+    rng = random.Random(seed)
+    for turn in range(turns):
+        yield f"{story_exporter.PLAYER_PREFIX}I follow the path north, turn {turn}."
+        yield " ".join(rng.choice(SENTENCES) for _ in range(sentences))
+
+
+def export_in_memory(story: List[str], directory: str) -> None:
+    """Exports a story the way the game did before the exporter, splitting every paragraph on each full stop.
+
+    :param story: The paragraphs of the story.
+    :param directory: The directory the story is written to.
+    :return: None
+    """
+    with open(os.path.join(directory, "story.txt"), "w") as fp:
+        for i in range(len(story)):
+            for line in story[i].split("\n"):
+                for sentence in line.split("."):
+                    sentence = sentence.strip()
+                    if sentence != "":
+                        fp.write(sentence + ".\n")
+            fp.write("\n")
+
+
+def measure(export: Callable[[], Any]) -> tuple[float, float, Any]:
+    """Measures the time and the peak memory of an export. The export is run twice, as tracing the memory slows
+    it down.
+
+    :param export: The function running the export.
+    :return: A tuple containing the time in seconds, the peak memory in megabytes and the result of the export.
+    """
+    start: float = time.perf_counter()
+    export()
+    seconds: float = time.perf_counter() - start
+    tracemalloc.start()
+    result: Any = export()
+    peak: float = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def run_benchmark(turns: int = 10000) -> Dict[str, float]:
+    """Compares exporting a story held in memory to plain text with streaming it to every format.
+
+    :param turns: The number of turns in the story.
+    :return: A dictionary containing the time in seconds, the peak memory in megabytes and the size of the output
+             in megabytes of each export.
+    """
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        seconds, peak, _ = measure(lambda: export_in_memory(list(create_story(turns)), directory))
+        results["in_memory_txt_s"] = seconds
+        results["in_memory_txt_peak_mb"] = peak
+
+        stream: str = os.path.join(directory, "stream")
+        seconds, peak, paths = measure(lambda: story_exporter.export_story(create_story(turns), stream,
+                                                                           "Benchmark Story"))
+        results["stream_all_formats_s"] = seconds
+        results["stream_all_formats_peak_mb"] = peak
+        for extension, path in paths.items():
+            results[f"{extension}_mb"] = os.path.getsize(path) / 1e6
+
+        start: float = time.perf_counter()
+        archive: str = story_exporter.create_archive(stream)
+        results["archive_s"] = time.perf_counter() - start
+        results["archive_mb"] = os.path.getsize(archive) / 1e6
+    return results
+
+
+def main() -> None:
+    """Runs the story export benchmark and prints the results.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks exporting a long story to every format.")
+    parser.add_argument("--turns", type=int, default=10000)
+    args = parser.parse_args()
+
+    for name, value in run_benchmark(args.turns).items():
+        print(f"{name}: {value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
-from typing import List, Dict, TypeVar
+from typing import List, Dict, Set, TypeVar, Callable
 
 from typing_extensions import override
 
+from Utilities.near_duplicate import NearDuplicateIndex
+
 V = TypeVar("V")
 
 
@@ -42,6 +44,11 @@ class Character:
         self._stats = stats
         self._current_location = current_location
         self._appearance = appearance
+        # called with the character and the item every time an item is added to the inventory
+        self.on_item_added: Callable[["Character", str], None] | None = None
+        # the items in the inventory, used to find items named slightly differently, e.g. "a rusty sword"
+        self._item_index: NearDuplicateIndex[str] | None = None
+        self._indexed_items: Set[str] = set()
 
     # Id
     @property
@@ -174,20 +181,54 @@ class Character:
         """
         self._occupation = new_occupation
     
+    @property
+    def item_index(self) -> NearDuplicateIndex[str]:
+        """Fetches the index of the items in the inventory, which keeps the stats of the item names that were resolved.
+
+        :return: The NearDuplicateIndex object.
+        """
+        if self._item_index is None:
+            # item names are short, so each word is a shingle
+            self._item_index = NearDuplicateIndex(shingle_size=1)
+        items: Set[str] = set(self._inventory)
+        if items != self._indexed_items:
+            self._item_index.clear()
+            for item in items:
+                self._item_index.add(item, item)
+            self._indexed_items = items
+        return self._item_index
+
+    def resolve_item(self, item: str) -> str:
+        """Finds the item in the inventory a name refers to, if it is a near-duplicate of one.
+
+        :param item: The name of the item.
+        :return: The name of the item in the inventory, or the name in lowercase if it isn't in the inventory.
+        """
+        item = item.lower()
+        if item in self._inventory or not self._inventory:
+            return item
+        match: str | None = self.item_index.check(item)
+        return match if match is not None else item
+
     def add_inventory(self, new_item: str) -> None:
-        """Adds an item to the Character's inventory.
+        """Adds an item to the Character's inventory. An item named like an item already in the inventory is added
+        under the same name.
 
         :param new_item: The new item to be added into the character's inventory.
         :return: None
         """
-        self._inventory.append(new_item.lower())
+        new_item = self.resolve_item(new_item)
+        self._inventory.append(new_item)
+        if self.on_item_added is not None:
+            self.on_item_added(self, new_item)
     
     def remove_inventory(self, item: str) -> None:
         """Removes an item from the Character's inventory.
 
-        :param item: The item to be removed from the Character's inventory.
+        :param item: The item to be removed from the Character's inventory, or a near-duplicate of its name.
         :return: None
         """
+        item = self.resolve_item(item)
         # if item not in inventory, ignore the removal of the item
         if item in self._inventory:
             index: int = self._inventory.index(item)
@@ -310,3 +351,23 @@ class Character:
             "current_location": self._current_location,
             "appearance": self._appearance
         }
+
+    def restore(self, fields: Dict[str, V]) -> None:
+        """Restores attributes of the Character from values in the format of ``to_dict``, e.g. when the game is rewound
+        to a checkpoint. A list that is restored to one of its prefixes is truncated in place, so other references to
+        it stay valid.
+
+        :param fields: A dictionary mapping ``to_dict`` keys to their restored values.
+        :return: None
+        :raises KeyError: If a key isn't a field of the Character.
+        """
+        attributes: Dict[str, str] = {"id": "_id", "name": "_name", "physical_condition": "_physical_condition",
+                                      "occupation": "_occupation", "money": "_money", "relationship": "_relationship",
+                                      "personality": "_personality", "inventory": "_inventory", "stats": "_stats",
+                                      "current_location": "_current_location", "appearance": "_appearance"}
+        for field, value in fields.items():
+            current: V = getattr(self, attributes[field])
+            if isinstance(current, list) and isinstance(value, list) and current[:len(value)] == value:
+                del current[len(value):]
+            else:
+                setattr(self, attributes[field], value)
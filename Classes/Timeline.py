@@ -1,17 +1,79 @@
-from typing import List, TypeVar
+import re
+from datetime import datetime
+from typing import List, Dict, Set, TypeVar
 
 from typing_extensions import override
 
+from Utilities.near_duplicate import NearDuplicateIndex, DEFAULT_THRESHOLD
+
 V = TypeVar("V")
 
+DEFAULT_PAGE_SIZE: int = 20
+# the number of latest events a new event is compared to when looking for near-duplicates, which are the same
+# event summarised again on the next turns
+DUPLICATE_WINDOW: int = 3
+# the number of key events summarised into a chapter, and of chapters summarised into an arc
+CHAPTER_SIZE: int = 10
+ARC_SIZE: int = 5
+CHAPTER: str = "chapter"
+ARC: str = "arc"
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def get_words(text: str) -> Set[str]:
+    """Splits a text into the lowercase words it is indexed by.
+
+    :param text: The text.
+    :return: A set containing the words.
+    """
+    return set(_WORD.findall(text.lower()))
+
 
 class Timeline:
-    def __init__(self, event: List[str] = []):
+    def __init__(self, event: List[str] | None = None, turns: List[int] | None = None,
+                 timestamps: List[str] | None = None, chapters: List[str] | None = None,
+                 arcs: List[str] | None = None, chapter_size: int = CHAPTER_SIZE, arc_size: int = ARC_SIZE,
+                 duplicate_threshold: float = DEFAULT_THRESHOLD, duplicate_window: int = DUPLICATE_WINDOW):
         """Initialise a Timeline object.
 
+        The events are kept in order in a list, together with a dictionary mapping each event to its position, so
+        duplicates are found in constant time, and an inverted index mapping each word to the events containing it.
+        Events that are near-duplicates of one of the latest events, e.g. the same summary reworded on the next turn,
+        aren't added.
+
+        Every ``chapter_size`` events are summarised into a chapter, and every ``arc_size`` chapters into an arc, so the
+        timeline sent in the prompts stays short while every event is kept for the UI.
+
         :param event: The timeline.
+        :param turns: The turn each event happened in. Defaults to one event per turn.
+        :param timestamps: The time each event was added, in ISO format. Defaults to empty strings.
+        :param chapters: The summaries of the events, in order.
+        :param arcs: The summaries of the chapters, in order.
+        :param chapter_size: The number of events in a chapter.
+        :param arc_size: The number of chapters in an arc.
+        :param duplicate_threshold: The similarity from 0 to 1 above which an event is a near-duplicate.
+        :param duplicate_window: The number of latest events a new event is compared to for near-duplicates.
         """
-        self._key_events = event
+        self._key_events: List[str] = event if event is not None else []
+        self._turns: List[int] = list(turns) if turns is not None else []
+        self._timestamps: List[str] = list(timestamps) if timestamps is not None else []
+        self._chapters: List[str] = chapters if chapters is not None else []
+        self._arcs: List[str] = arcs if arcs is not None else []
+        self.chapter_size = chapter_size
+        self.arc_size = arc_size
+        self.duplicate_window = duplicate_window
+        # events saved before turns and timestamps were recorded happened one turn after another
+        self._turns.extend(range(len(self._turns) + 1, len(self._key_events) + 1))
+        self._timestamps.extend([""] * (len(self._key_events) - len(self._timestamps)))
+        # event -> position, and word -> positions of the events containing it
+        self._positions: Dict[str, int] = {}
+        self._index: Dict[str, Set[int]] = {}
+        # position -> event, used to find near-duplicate events
+        self._near_duplicates: NearDuplicateIndex[int] = NearDuplicateIndex(duplicate_threshold)
+        # the events in the index, which are compared to the events to notice when a checkpoint was restored
+        self._indexed: List[str] = []
+        self._indexed_events: List[str] = self._key_events
+        self._sync_index()
 
     @property
     def get_event(self) -> List[str]:
@@ -21,31 +83,218 @@ class Timeline:
         """
         return self._key_events
 
-    def add_event(self, new_event: str) -> None:
-        """Adds an event to the timeline.
+    @property
+    def chapters(self) -> List[str]:
+        """Fetches the summaries of the chapters.
+
+        :return: The list of chapter summaries.
+        """
+        return self._chapters
+
+    @property
+    def arcs(self) -> List[str]:
+        """Fetches the summaries of the arcs.
+
+        :return: The list of arc summaries.
+        """
+        return self._arcs
+
+    @property
+    def near_duplicates(self) -> NearDuplicateIndex[int]:
+        """Fetches the index of near-duplicate events, which keeps the stats of the events that weren't added.
+
+        :return: The NearDuplicateIndex object.
+        """
+        return self._near_duplicates
+
+    def __len__(self) -> int:
+        return len(self._key_events)
+
+    def _index_event(self, position: int, event: str) -> None:
+        self._positions.setdefault(event, position)
+        for word in get_words(event):
+            self._index.setdefault(word, set()).add(position)
+        self._near_duplicates.add(position, event)
+        self._indexed.append(event)
+
+    def _unindex_event(self, position: int, event: str) -> None:
+        if self._positions.get(event) == position:
+            del self._positions[event]
+        self._near_duplicates.remove(position)
+        for word in get_words(event):
+            positions: Set[int] = self._index.get(word, set())
+            positions.discard(position)
+            if not positions:
+                self._index.pop(word, None)
+
+    def _sync_index(self) -> None:
+        """Brings the index up to date with the events, which may have been truncated or replaced when the game was
+        rewound to a checkpoint.
 
-        :param new_event: The new event.
         :return: None
         """
-        if new_event not in self._key_events:
-            self._key_events.append(new_event)
+        length: int = min(len(self._indexed), len(self._key_events))
+        if self._indexed_events is not self._key_events or \
+                (length > 0 and self._indexed[length - 1] is not self._key_events[length - 1]):
+            # the events were replaced, so the index is rebuilt
+            self._positions.clear()
+            self._index.clear()
+            self._near_duplicates.clear()
+            self._indexed.clear()
+            self._indexed_events = self._key_events
+        else:
+            # drop the events that are no longer in the timeline
+            for position in range(len(self._indexed) - 1, length - 1, -1):
+                self._unindex_event(position, self._indexed.pop())
+        for position in range(len(self._indexed), len(self._key_events)):
+            self._index_event(position, self._key_events[position])
+        # turns and timestamps are truncated with the events
+        del self._turns[len(self._key_events):]
+        del self._timestamps[len(self._key_events):]
+        self._turns.extend(range(len(self._turns) + 1, len(self._key_events) + 1))
+        self._timestamps.extend([""] * (len(self._key_events) - len(self._timestamps)))
+        # summaries of events that are no longer in the timeline are dropped
+        del self._chapters[len(self._key_events) // self.chapter_size:]
+        del self._arcs[len(self._chapters) // self.arc_size:]
+
+    def add_event(self, new_event: str, turn: int | None = None) -> bool:
+        """Adds an event to the timeline, unless it is a duplicate of an earlier event or a near-duplicate of one of
+        the latest events.
+
+        :param new_event: The new event.
+        :param turn: The turn the event happened in. Defaults to the turn after the last event.
+        :return: True if the event was added, otherwise False.
+        """
+        self._sync_index()
+        latest: range = range(max(0, len(self._key_events) - self.duplicate_window), len(self._key_events))
+        if new_event in self._positions or self._near_duplicates.check(new_event, latest) is not None:
+            return False
+        self._turns.append(turn if turn is not None else (self._turns[-1] + 1 if self._turns else 1))
+        self._timestamps.append(datetime.now().isoformat(timespec="seconds"))
+        self._key_events.append(new_event)
+        self._index_event(len(self._key_events) - 1, new_event)
+        return True
+
+    def get_entry(self, position: int) -> Dict[str, V]:
+        """Fetches an event together with the turn and time it happened.
+
+        :param position: The position of the event in the timeline.
+        :return: A dictionary containing the position, turn, timestamp and text of the event.
+        """
+        self._sync_index()
+        return {"position": position, "turn": self._turns[position], "timestamp": self._timestamps[position],
+                "event": self._key_events[position]}
+
+    def search(self, query: str, limit: int | None = None) -> List[Dict[str, V]]:
+        """Finds the events containing every word in a query.
+
+        :param query: The words searched for.
+        :param limit: The most events returned, or None to return every match.
+        :return: A list containing the matching entries (see ``get_entry``) from the newest to the oldest.
+        """
+        self._sync_index()
+        words: List[Set[int]] = sorted((self._index.get(word, set()) for word in get_words(query)), key=len)
+        if not words:
+            return []
+        matches: Set[int] = set(words[0]).intersection(*words[1:])
+        positions: List[int] = sorted(matches, reverse=True)[:limit]
+        return [self.get_entry(position) for position in positions]
+
+    def get_page_count(self, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+        """Fetches the number of pages of events.
+
+        :param page_size: The number of events on each page.
+        :return: The number of pages, which is at least 1.
+        """
+        return max(1, -(-len(self._key_events) // page_size))
+
+    def get_page(self, page: int, page_size: int = DEFAULT_PAGE_SIZE) -> List[Dict[str, V]]:
+        """Fetches a page of events, without building the whole timeline.
+
+        :param page: The page number, starting at 0 for the oldest events.
+        :param page_size: The number of events on each page.
+        :return: A list containing the entries (see ``get_entry``) on the page, from the oldest to the newest.
+        """
+        self._sync_index()
+        start: int = max(0, page) * page_size
+        return [self.get_entry(position) for position in range(start, min(start + page_size, len(self._key_events)))]
+
+    def get_pending_summary(self) -> tuple[str, List[str]] | None:
+        """Fetches the next events or chapters that need summarising.
+
+        :return: A tuple containing the level of the summary (``CHAPTER`` or ``ARC``) and the events or chapters
+                 summarised, or None if the timeline is compacted.
+        """
+        self._sync_index()
+        chapter_end: int = (len(self._chapters) + 1) * self.chapter_size
+        if len(self._key_events) >= chapter_end:
+            return CHAPTER, self._key_events[chapter_end - self.chapter_size:chapter_end]
+        arc_end: int = (len(self._arcs) + 1) * self.arc_size
+        if len(self._chapters) >= arc_end:
+            return ARC, self._chapters[arc_end - self.arc_size:arc_end]
+        return None
+
+    def add_summary(self, level: str, items: List[str], summary: str) -> bool:
+        """Adds the summary of a chapter or an arc, unless the timeline changed while it was being written, e.g.
+        because the game was rewound.
+
+        :param level: The level of the summary, ``CHAPTER`` or ``ARC``.
+        :param items: The events or chapters summarised, as returned by ``get_pending_summary``.
+        :param summary: The summary.
+        :return: True if the summary was added, otherwise False.
+        """
+        if self.get_pending_summary() != (level, items):
+            return False
+        (self._chapters if level == CHAPTER else self._arcs).append(summary)
+        return True
 
     @override
     def __str__(self) -> str:
         """Creates a string representation of the timeline.
         This also includes the typing of each attribute.
 
+        Only the arcs, the chapters that aren't part of an arc and the events that aren't part of a chapter are
+        included, as the string is sent in the prompts.
+
         :return: String representation of the timeline.
         """
+        self._sync_index()
+        chapters: List[str] = self._chapters[len(self._arcs) * self.arc_size:]
+        key_events: List[str] = self._key_events[len(self._chapters) * self.chapter_size:]
         return (f'{{\n'
-                f'"key_events": list[str] {self._key_events}\n'
+                f'"arcs": list[str] {self._arcs}\n'
+                f'"chapters": list[str] {chapters}\n'
+                f'"key_events": list[str] {key_events}\n'
                 f'}}')
 
-    def to_dict(self) -> dict[str, list[str]]:
+    def to_dict(self) -> dict[str, list[str] | list[int]]:
         """Creates a dictionary representation of the timeline.
 
         :return: Dictionary object of the timeline.
         """
+        self._sync_index()
         return {
-            "key_events": self._key_events
+            "key_events": self._key_events,
+            "turns": self._turns,
+            "timestamps": self._timestamps,
+            "chapters": self._chapters,
+            "arcs": self._arcs
         }
+
+    def restore(self, fields: Dict[str, V]) -> None:
+        """Restores the timeline from values in the format of ``to_dict``, e.g. when the game is rewound to a
+        checkpoint. A list that is restored to one of its prefixes is truncated in place, so the index only drops the
+        removed events instead of being rebuilt.
+
+        :param fields: A dictionary mapping ``to_dict`` keys to their restored values.
+        :return: None
+        :raises KeyError: If a key isn't a field of the timeline.
+        """
+        attributes: Dict[str, str] = {"key_events": "_key_events", "turns": "_turns", "timestamps": "_timestamps",
+                                      "chapters": "_chapters", "arcs": "_arcs"}
+        for field, value in fields.items():
+            current: List[V] = getattr(self, attributes[field])
+            if current[:len(value)] == value:
+                del current[len(value):]
+            else:
+                setattr(self, attributes[field], value)
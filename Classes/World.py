@@ -2,22 +2,57 @@ from typing import List, Dict, TypeVar
 
 from typing_extensions import override
 
+from Utilities.near_duplicate import NearDuplicateIndex
+
 V = TypeVar("V")
 
+# location names are short, so each word is a shingle and a name has to share most of its words with another
+LOCATION_DUPLICATE_THRESHOLD: float = 0.75
+
+
+def get_location_key(location: str) -> str:
+    """Normalises the name of a location, so the same place written differently is found in the location graph.
+
+    :param location: The name of the location.
+    :return: The name in lowercase, with its whitespace collapsed.
+    """
+    return " ".join(location.lower().split())
+
 
 class World:
-    def __init__(self, rules: List[str] = [], genre: str = "", environment: str = "", locations: List[str] = []):
+    def __init__(self, rules: List[str] | None = None, genre: str = "", environment: str = "",
+                 locations: List[str] | None = None, location_environments: Dict[str, str] | None = None,
+                 routes: Dict[str, Dict[str, int]] | None = None):
         """Initialises a World object.
 
+        The locations form a graph: each location stores the description of its environment, so it is reused when
+        the main character returns, and the routes between them count how often the main character travelled them.
+        Names that are near-duplicates of a previous location, e.g. "the old mill" and "Old Mill", are the same place.
+
         :param rules: Rules of the world.
         :param genre: The genre of the world.
         :param environment: A description of the current location of the main character.
         :param locations: Previous locations the main character has been to.
+        :param location_environments: A dictionary mapping each location key (see ``get_location_key``) to the
+                                      description of its environment.
+        :param routes: A dictionary mapping each location key to the location keys travelled to from it and how many
+                       times.
         """
-        self._rules = rules
+        self._rules = rules if rules is not None else []
         self._genre = genre
         self._environment = environment
-        self._locations = locations
+        self._locations = locations if locations is not None else []
+        self._location_environments = location_environments if location_environments is not None else {}
+        self._routes = routes if routes is not None else {}
+        # location key -> location, and the near-duplicate index of the locations, which are rebuilt when a
+        # checkpoint truncates or replaces the locations
+        self._location_keys: Dict[str, str] = {}
+        self._near_duplicates: NearDuplicateIndex[str] = NearDuplicateIndex(LOCATION_DUPLICATE_THRESHOLD,
+                                                                            shingle_size=1)
+        self._indexed_locations: List[str] | None = None
+        self._indexed_count: int = 0
+        # the number of environment requests avoided by reusing the environment of a location
+        self.environment_reuses: int = 0
 
     @property
     def rules(self) -> List[str]:
@@ -64,14 +99,120 @@ class World:
         """
         return self._locations
 
+    def _sync_locations(self) -> None:
+        """Brings the location keys up to date with the locations, which may have been truncated or replaced when the
+        game was rewound to a checkpoint.
+
+        :return: None
+        """
+        if self._indexed_locations is not self._locations or self._indexed_count != len(self._locations):
+            self._location_keys = {}
+            self._near_duplicates.clear()
+            for location in self._locations:
+                self._index_location(location)
+            self._indexed_locations = self._locations
+            self._indexed_count = len(self._locations)
+
+    def _index_location(self, location: str) -> None:
+        key: str = get_location_key(location)
+        if key not in self._location_keys:
+            self._location_keys[key] = location
+            self._near_duplicates.add(key, location)
+
+    def has_location(self, location: str) -> bool:
+        """Checks whether the main character has been to a location.
+
+        :param location: The name of the location.
+        :return: True if the location is a previous location, otherwise False.
+        """
+        self._sync_locations()
+        return get_location_key(location) in self._location_keys
+
     def add_locations(self, value: str) -> None:
         """Adds a previous location.
 
         :param value: The previous location to add as a string.
         :return: None
         """
-        if value not in self._locations:
+        if not self.has_location(value):
             self._locations.append(value)
+            self._indexed_count += 1
+            self._index_location(value)
+
+    @property
+    def near_duplicates(self) -> NearDuplicateIndex[str]:
+        """Fetches the index of near-duplicate locations, which keeps the stats of the names that were resolved.
+
+        :return: The NearDuplicateIndex object.
+        """
+        return self._near_duplicates
+
+    def resolve_location(self, location: str) -> str:
+        """Finds the previous location a name refers to, if it is a near-duplicate of one.
+
+        :param location: The name of the location.
+        :return: The name of the previous location, or the name itself if it is a new location.
+        """
+        if self.has_location(location):
+            return location
+        key: str | None = self._near_duplicates.check(location)
+        return self._location_keys[key] if key is not None else location
+
+    @property
+    def routes(self) -> Dict[str, Dict[str, int]]:
+        """Fetches the routes the main character travelled.
+
+        :return: A dictionary mapping each location key to the location keys travelled to from it and how many times.
+        """
+        return self._routes
+
+    def add_route(self, origin: str, destination: str) -> None:
+        """Records the main character travelling from one location to another.
+
+        :param origin: The location travelled from. Nothing is recorded if it is empty.
+        :param destination: The location travelled to.
+        :return: None
+        """
+        origin_key: str = get_location_key(origin)
+        destination_key: str = get_location_key(destination)
+        if origin_key == "" or origin_key == destination_key:
+            return
+        destinations: Dict[str, int] = self._routes.setdefault(origin_key, {})
+        destinations[destination_key] = destinations.get(destination_key, 0) + 1
+
+    def get_location_environment(self, location: str) -> str | None:
+        """Fetches the stored description of a location's environment.
+
+        :param location: The name of the location.
+        :return: The description, or None if the location hasn't been described yet.
+        """
+        return self._location_environments.get(get_location_key(location))
+
+    def set_location_environment(self, location: str, environment: str) -> None:
+        """Stores the description of a location's environment.
+
+        :param location: The name of the location.
+        :param environment: The description of the environment.
+        :return: None
+        """
+        self._location_environments[get_location_key(location)] = environment
+
+    def move_to(self, location: str, origin: str = "") -> str | None:
+        """Moves the main character to a location, adding it to the previous locations and recording the route.
+        If the location was described before, its environment becomes the current environment.
+
+        :param location: The location moved to, resolved with ``resolve_location``.
+        :param origin: The location moved from.
+        :return: The stored environment of the location, or None if it needs describing.
+        """
+        location = self.resolve_location(location)
+        self.add_locations(location)
+        self.add_route(origin, location)
+        environment: str | None = self.get_location_environment(location)
+        if environment is not None:
+            self._environment = environment
+            self.environment_reuses += 1
+        return environment
 
     @override
     def __str__(self) -> str:
@@ -96,5 +237,26 @@ class World:
             "rules": self.rules,
             "genre": self.genre,
             "environment": self.environment,
-            "locations": self.locations
+            "locations": self.locations,
+            "location_environments": self._location_environments,
+            "routes": self._routes
         }
+
+    def restore(self, fields: Dict[str, V]) -> None:
+        """Restores attributes of the world from values in the format of ``to_dict``, e.g. when the game is rewound to a
+        checkpoint. A list that is restored to one of its prefixes is truncated in place, so other references to it
+        stay valid.
+
+        :param fields: A dictionary mapping ``to_dict`` keys to their restored values.
+        :return: None
+        :raises KeyError: If a key isn't a field of the world.
+        """
+        attributes: Dict[str, str] = {"rules": "_rules", "genre": "_genre", "environment": "_environment",
+                                      "locations": "_locations", "location_environments": "_location_environments",
+                                      "routes": "_routes"}
+        for field, value in fields.items():
+            current: V = getattr(self, attributes[field])
+            if isinstance(current, list) and isinstance(value, list) and current[:len(value)] == value:
+                del current[len(value):]
+            else:
+                setattr(self, attributes[field], value)
@@ -0,0 +1,171 @@
+import copy
+from typing import List, Dict, TypeVar, Any
+
+from Utilities.session import Session, STORY_MESSAGES, UPDATE_ATTR_MESSAGES
+
+V = TypeVar("V")
+
+
+def get_message_offsets(session: Session) -> Dict[str, int]:
+    """Fetches the current length of every conversation array in a session.
+
+    :param session: The session of the game.
+    :return: A dictionary mapping each conversation array name to its length.
+    """
+    session.load_pending_history()
+    return {name: len(getattr(session, name)) for name in STORY_MESSAGES + UPDATE_ATTR_MESSAGES}
+
+
+def truncate_messages(session: Session, offsets: Dict[str, int], chat_generation: int) -> None:
+    """Truncates every conversation array of a session back to the lengths recorded at a checkpoint.
+    If the attribute update conversations were cleared by ``Session.reset_chat`` since the checkpoint, their
+    offsets point into an older chat, so they are cleared again instead of keeping messages from the new chat.
+
+    :param session: The session of the game.
+    :param offsets: A dictionary mapping each conversation array name to its length at the checkpoint.
+    :param chat_generation: The chat generation of the session at the checkpoint.
+    :return: None
+    """
+    for name in STORY_MESSAGES:
+        del getattr(session, name)[offsets[name]:]
+    if session.chat_generation != chat_generation:
+        session.clear_update_chats()
+        return
+    for name in UPDATE_ATTR_MESSAGES:
+        del getattr(session, name)[offsets[name]:]
+
+
+def _is_appended(old_value: V, new_value: V) -> bool:
+    """Checks whether a list only had items appended to it since the last checkpoint.
+
+    :param old_value: The value at the last checkpoint.
+    :param new_value: The current value.
+    :return: True if ``new_value`` is ``old_value`` with items appended, False otherwise.
+    """
+    return (isinstance(old_value, list) and isinstance(new_value, list) and len(new_value) > len(old_value)
+            and new_value[:len(old_value)] == old_value)
+
+
+class CheckpointStore:
+    def __init__(self, max_checkpoints: int = 100):
+        """Initialises a CheckpointStore object.
+
+        The store keeps a single copy of the state at the latest checkpoint, and for every turn only the fields
+        that changed (their previous values), the NPCs that were added and the message history offsets. Lists that
+        only had items appended (e.g. key events, locations, inventory) only store their previous length.
+
+        :param max_checkpoints: The maximum number of turns that can be rewound.
+        """
+        self._max_checkpoints = max_checkpoints
+        self._shadow: Dict[str, Dict[str, V]] = {}
+        self._deltas: List[Dict[str, Any]] = []
+        self._offsets: List[Dict[str, Any]] = []
+
+    @property
+    def turns_available(self) -> int:
+        """Fetches the number of turns that can currently be rewound.
+
+        :return: The number of turns that can be rewound.
+        """
+        return len(self._deltas)
+
+    @staticmethod
+    def _get_entities(engine) -> Dict[str, V]:
+        """Fetches every object in the engine that is tracked by the checkpoints.
+
+        :param engine: The Engine object.
+        :return: A dictionary mapping an entity key to the Character, World or Timeline object.
+        """
+        entities: Dict[str, V] = {}
+        if engine.mainCharacter is not None:
+            entities["main_character"] = engine.mainCharacter
+        for char in engine.characters:
+            entities[f"npc:{char.id}"] = char
+        if engine.world is not None:
+            entities["world"] = engine.world
+        if engine.timeline is not None:
+            entities["timeline"] = engine.timeline
+        return entities
+
+    def commit(self, engine, **extras) -> None:
+        """Records a checkpoint of the current turn.
+
+        :param engine: The Engine object.
+        :param extras: Additional values to restore when rewinding to this checkpoint (e.g. the length of the
+                       story messages displayed by the UI).
+        :return: None
+        """
+        entities: Dict[str, V] = self._get_entities(engine)
+        delta: Dict[str, Any] = {"changed": {}, "appended": {}, "added": []}
+
+        for key, entity in entities.items():
+            current: Dict[str, V] = entity.to_dict()
+            if key not in self._shadow:
+                # a new NPC has been added since the last checkpoint
+                if self._offsets and key.startswith("npc:"):
+                    delta["added"].append(key)
+                self._shadow[key] = copy.deepcopy(current)
+                continue
+
+            shadow: Dict[str, V] = self._shadow[key]
+            for field, value in current.items():
+                if shadow[field] == value:
+                    continue
+                if _is_appended(shadow[field], value):
+                    delta["appended"].setdefault(key, {})[field] = len(shadow[field])
+                    shadow[field].extend(copy.deepcopy(value[len(shadow[field]):]))
+                else:
+                    delta["changed"].setdefault(key, {})[field] = shadow[field]
+                    shadow[field] = copy.deepcopy(value)
+
+        session: Session = engine.session
+        offsets: Dict[str, Any] = {"messages": get_message_offsets(session), "chat_generation": session.chat_generation,
+                                   "counters": {"new_char_count": session.new_char_count,
+                                                "reset_count": session.reset_count},
+                                   "dice": session.dice.get_state(), "extras": extras}
+        if self._offsets:
+            self._deltas.append(delta)
+        self._offsets.append(offsets)
+
+        # forget the oldest turn once the limit has been reached
+        if len(self._deltas) > self._max_checkpoints:
+            self._deltas.pop(0)
+            self._offsets.pop(0)
+
+    def rewind(self, engine, turns: int = 1) -> Dict[str, Any] | None:
+        """Rewinds the game state by a number of turns.
+        Only the fields that changed during those turns are restored. The counters and dice of the engine's session
+        are restored, and its conversation arrays are truncated to the lengths they had at that checkpoint.
+
+        :param engine: The Engine object.
+        :param turns: The number of turns to rewind.
+        :return: The extras recorded at the checkpoint that was rewound to, or None if there are no turns to rewind.
+        """
+        turns = min(turns, len(self._deltas))
+        if turns <= 0:
+            return None
+
+        for _ in range(turns):
+            delta: Dict[str, Any] = self._deltas.pop()
+            self._offsets.pop()
+            entities: Dict[str, V] = self._get_entities(engine)
+
+            for key in delta["added"]:
+                engine.remove_character(int(key.split(":")[1]))
+                self._shadow.pop(key, None)
+            for key, fields in delta["appended"].items():
+                current: Dict[str, V] = entities[key].to_dict()
+                entities[key].restore({field: current[field][:length] for field, length in fields.items()})
+                for field, length in fields.items():
+                    del self._shadow[key][field][length:]
+            for key, fields in delta["changed"].items():
+                entities[key].restore(copy.deepcopy(fields))
+                self._shadow[key].update(fields)
+
+        offsets: Dict[str, Any] = self._offsets[-1]
+        session: Session = engine.session
+        session.new_char_count = offsets["counters"]["new_char_count"]
+        session.reset_count = offsets["counters"]["reset_count"]
+        session.dice.set_state(offsets["dice"])
+        truncate_messages(session, offsets["messages"], offsets["chat_generation"])
+        return offsets["extras"]
@@ -1,28 +1,48 @@
 import ast
+import asyncio
 import random
-from typing import List, Dict, TypeVar, Any
+from typing import List, Dict, TypeVar, Any, Iterable
 from Classes.Character import Character
 from Classes.World import World
 from Classes.Timeline import Timeline
+from Engine.checkpoint import CheckpointStore
 import json
 import os
 import textwrap
 from datetime import datetime
 from Utilities import openai_api
 from Utilities import update_attr
-import subprocess
+from Utilities import save_codec
+from Utilities import save_manifest
+from Utilities import story_exporter
+from Utilities.session import Session, get_default_session, CHARACTER_ADDED, ITEM_ADDED
 
 V = TypeVar("V")
 
 
 class Engine:
-    def __init__(self):
+    def __init__(self, session: Session | None = None):
         """Initialise an Engine object.
+
+        :param session: The session of the game, which owns the conversations with ChatGPT.
+                        Defaults to the default session.
         """
+        self._session: Session = session if session is not None else get_default_session()
         self._world: World | None = None
         self._characters: List[Character] = []
         self._timeline: Timeline | None = None
         self._mainCharacter: Character | None = None
+        self._checkpoints: CheckpointStore = CheckpointStore()
+        # summarises the timeline into chapters and arcs in the background
+        self._compaction_task: asyncio.Task | None = None
+
+    @property
+    def session(self) -> Session:
+        """Fetches the session of the game.
+
+        :return: The Session object.
+        """
+        return self._session
 
     @property
     def characters(self) -> List[Character]:
@@ -73,23 +93,47 @@ class Engine:
             character.relationship[int(key)] = character.relationship.pop(key)
 
         self._characters.append(character)
+        self._watch_character(character)
+        self._session.emit(CHARACTER_ADDED, character)
+
+    def _watch_character(self, character: Character) -> None:
+        """Emits an event on the session every time an item is added to a character's inventory.
+
+        :param character: The Character object.
+        :return: None
+        """
+        character.on_item_added = lambda char, item: self._session.emit(ITEM_ADDED, char, item)
+
+    def remove_character(self, char_id: int) -> None:
+        """Removes an NPC from the characters list.
+        This is only used when rewinding to a turn before the NPC was created.
+
+        :param char_id: The ID of the NPC to remove.
+        :return: None
+        """
+        self._characters = [char for char in self._characters if char.id != char_id]
 
     def add_world(self, world_attributes: Dict[str, V]) -> None:
         """Initialises and sets a World class using the provided dictionary.
 
-        :param world_attributes: A dictionary containing the world attributes.
+        :param world_attributes: A dictionary containing the world attributes. The location environments and routes
+                                 are optional, as older saves don't have them.
         :return: None
         """
         world: World = World(world_attributes["rules"], world_attributes["genre"],
-                             world_attributes["environment"], world_attributes["locations"])
+                             world_attributes["environment"], world_attributes["locations"],
+                             world_attributes.get("location_environments"), world_attributes.get("routes"))
         self._world = world
 
-    def add_timeline(self, timeline_attributes: Dict[str, List[str]]) -> None:
+    def add_timeline(self, timeline_attributes: Dict[str, List[V]]) -> None:
         """Initialises and sets a Timeline class using the provided dictionary.
 
-        :param timeline_attributes: A dictionary containing the timeline attributes.
+        :param timeline_attributes: A dictionary containing the timeline attributes. The turns, timestamps, chapters
+                                    and arcs are optional, as older saves don't have them.
         """
-        timeline: Timeline = Timeline(timeline_attributes["key_events"])
+        timeline: Timeline = Timeline(timeline_attributes["key_events"], timeline_attributes.get("turns"),
+                                      timeline_attributes.get("timestamps"), timeline_attributes.get("chapters"),
+                                      timeline_attributes.get("arcs"))
         self._timeline = timeline
 
     @property
@@ -118,6 +162,7 @@ class Engine:
                                               character["current_location"],
                                               character["appearance"])
         self._mainCharacter = main_character
+        self._watch_character(main_character)
 
     def get_formatted_string_array(self) -> List[str]:
         """Fetches the string representation of the Character, World and Timeline classes.
@@ -335,7 +380,8 @@ class Engine:
         """Updates the characters' current location based on the provided list of updates.
 
         This function also updates the location and environment attributes of the World object according to
-        the main character's new location. The environment is fetched asynchronously based on the story context.
+        the main character's new location. The environment is fetched asynchronously based on the story context,
+        unless the main character has been to the location before, in which case its stored environment is reused.
 
         :param story: A string representing the current story context.
         :param updates: A list of tuples, where each tuple contains the character's ID and their updated location.
@@ -346,10 +392,15 @@ class Engine:
             char_id: int = update[0]
             new_location: str = update[1]
             if char_id == self._mainCharacter.id:
+                previous_location: str = self._mainCharacter.current_location
+                # the same place is often named slightly differently, e.g. "the old mill" and "Old Mill"
+                new_location = self._world.resolve_location(new_location)
                 self._mainCharacter.current_location = new_location
-                self._world.add_locations(new_location)
-                new_environment = await update_attr.get_environment(story)
-                self._world.environment = new_environment
+                # only describe the environment of locations the main character hasn't been to yet
+                if self._world.move_to(new_location, previous_location) is None:
+                    new_environment = await update_attr.get_environment(story, self._session)
+                    self._world.environment = new_environment
+                    self._world.set_location_environment(new_location, new_environment)
             else:
                 index = id_list.index(char_id)
                 self._characters[index].current_location = new_location
@@ -360,8 +411,38 @@ class Engine:
         :param story: A string representing the current story context.
         :return: None
         """
-        summarised_key_event: str = await update_attr.get_key_events(story)
+        summarised_key_event: str = await update_attr.get_key_events(story, self._session)
         self._timeline.add_event(summarised_key_event)
+        self.start_timeline_compaction()
+
+    def start_timeline_compaction(self) -> asyncio.Task | None:
+        """Starts summarising the timeline into chapters and arcs in the background, so the turn doesn't wait for it.
+
+        :return: The task compacting the timeline, or None if there's nothing to summarise.
+        """
+        if self._timeline is None or self._timeline.get_pending_summary() is None:
+            return None
+        if self._compaction_task is None or self._compaction_task.done():
+            self._compaction_task = asyncio.get_running_loop().create_task(self.compact_timeline())
+        return self._compaction_task
+
+    async def compact_timeline(self) -> int:
+        """Summarises every full chapter of key events, and every full arc of chapters, that isn't summarised yet.
+
+        :return: The number of summaries added.
+        """
+        added: int = 0
+        while (pending := self._timeline.get_pending_summary()) is not None:
+            level, items = pending
+            try:
+                summary: str = await update_attr.get_timeline_summary(items, level, self._session)
+            except Exception as error:
+                print(f"Error summarising the timeline: {error!r}")
+                break
+            # the timeline may have been rewound while the summary was written, in which case the next one is tried
+            if self._timeline.add_summary(level, items, summary):
+                added += 1
+        return added
 
     async def check_inventory(self, user_input: str) -> tuple[bool, str]:
         """Checks whether the main character is attempting to use items that are not in their inventory.
@@ -375,7 +456,7 @@ class Engine:
                  - A boolean flag (True if all items are in the inventory, False otherwise),
                  - A string message indicating the result of the check.
         """
-        response = await update_attr.check_char_inventory(user_input)
+        response = await update_attr.check_char_inventory(user_input, self._session)
         if response.used_item:
             items_used = response.items_list
             not_in_inventory = []
@@ -468,7 +549,7 @@ class Engine:
         """
 
         # Get response from OpenAI using the existing openai_api module
-        response = openai_api.get_rules(genre)
+        response = openai_api.get_rules(genre, self._session)
 
         # Extract rules from the response
         rules: list[str] = [rule.strip('-').strip() for rule in response.split('\n') if rule.strip()]
@@ -488,29 +569,39 @@ class Engine:
         :param genre: The genre of the world as a string, which will influence the environment generated.
         :return: None
         """
-        response: str = openai_api.get_environment(genre)
+        response: str = openai_api.get_environment(genre, self._session)
 
         if self._world:
             self._world.environment = response
         print("updated environment:", response)
 
-    def save_game(self) -> None:
-        """Saves the current game data to a JSON file in the "saved_games" directory.
+    def save_game(self, save_format: str = "json", directory: str = "saved_games") -> None:
+        """Saves the current game data to a file in the "saved_games" directory.
         If the "saved_games" directory does not exist, it will be created.
         The saved data includes the world, characters, timeline, main character, and the conversation history.
+        A summary of the save is also recorded in the saved games manifest.
 
+        :param save_format: The format of the save file:
+                            - "json": A JSON file (``.json``).
+                            - "compact": The compact binary save format from ``save_codec`` (``.sav``), which is
+                              compressed and allows the conversation history to be loaded lazily.
+        :param directory: The directory the save file is written to.
         :return: None
+        :raises ValueError: If the save format is not supported.
         """
+        if save_format not in ("json", "compact"):
+            raise ValueError(f"Unsupported save format: {save_format}")
+
         # Create the directory if it doesn't exist
-        if not os.path.exists("saved_games"):
-            os.makedirs("saved_games")
+        if not os.path.exists(directory):
+            os.makedirs(directory)
 
         # Convert objects to dictionaries using to_dict()
         world = self._world.to_dict() if self._world else {}
         characters = [char.to_dict() for char in self._characters]
         timeline = self._timeline.to_dict() if self._timeline else {}
         main_char = self._mainCharacter.to_dict() if self._mainCharacter else {}
-        history = openai_api.get_history()
+        history = openai_api.get_history(self._session)
 
         data = {
             "world": world,
@@ -520,28 +611,46 @@ class Engine:
             "history": history
         }
 
-        # Save the data to a JSON file
-        with open(f"saved_games/{self._mainCharacter.name}_save_data.json", "w") as file:
-            json.dump(data, file, indent=4)
+        if save_format == "compact":
+            filename = f"{self._mainCharacter.name}_save_data.sav"
+            save_codec.write_save(f"{directory}/{filename}", data)
+        else:
+            # Save the data to a JSON file
+            filename = f"{self._mainCharacter.name}_save_data.json"
+            with open(f"{directory}/{filename}", "w") as file:
+                json.dump(data, file, indent=4)
+
+        # update the manifest so the load screen can list the save without opening it
+        size = os.path.getsize(f"{directory}/{filename}")
+        save_manifest.update_manifest(save_manifest.create_entry(filename, data, size), directory)
 
         print(f'Game saved at {datetime.now().strftime("%Y%m%d_%H%M%S")}')
 
-    def load_save(self, filename: str) -> None:
-        """Loads a saved game state from a specified JSON file, restoring the game world, characters,
+    def load_save(self, filename: str, directory: str = "saved_games") -> None:
+        """Loads a saved game state from a specified save file, restoring the game world, characters,
         timeline, main character, and chat history.
 
-        :param filename: The name of the JSON file (with a .json extension) located in the "saved_games" directory.
-                         Only JSON files are accepted for loading the saved game data.
+        For compact save files (.sav), only the world, characters, timeline and main character are decoded here.
+        The chat history is decoded the first time it is accessed through ``openai_api.get_history``.
+
+        :param filename: The name of the JSON file (with a .json extension) or the compact save file
+                         (with a .sav extension) located in the save directory.
+        :param directory: The directory the save file is located in.
         :return: None
-        :raises: FileNotFoundError: If the specified JSON file does not exist in the "saved_games" directory.
+        :raises: FileNotFoundError: If the specified save file does not exist in the save directory.
         """
-        path = f"saved_games/{filename}"
+        path = f"{directory}/{filename}"
 
         if not os.path.exists(path):
             raise FileNotFoundError(f"'{filename}' is not found.")
 
-        with open(path, 'r') as file:
-            data = json.load(file)
+        reader: save_codec.SaveReader | None = None
+        if filename.endswith(".sav"):
+            reader = save_codec.SaveReader(path)
+            data = {section: reader.read_section(section) for section in reader.sections if section != "history"}
+        else:
+            with open(path, 'r') as file:
+                data = json.load(file)
 
         self.add_world(data["world"])
 
@@ -550,24 +659,31 @@ class Engine:
 
         self.add_timeline(data["timeline"])
         self._mainCharacter = Character(**data["main_character"])
+        self._watch_character(self._mainCharacter)
 
         # fix relationship dictionary by changing the key types from str to int
         relationship_keys_list = list(self._mainCharacter.relationship.keys())
         for key in relationship_keys_list:
             self._mainCharacter.relationship[int(key)] = self._mainCharacter.relationship.pop(key)
 
-        openai_api.set_history(data["history"])
+        if reader is not None:
+            openai_api.set_history_loader(reader.history_loader(), self._session)
+        else:
+            openai_api.set_history(data["history"], self._session)
 
         print(f'"{filename}" has been loaded.')
 
-    def export_final_story(self, story_arr: List[str]) -> None:
+    def export_final_story(self, story_arr: Iterable[str] | None = None,
+                           formats: Iterable[str] = story_exporter.FORMATS, archive: bool = False) -> str:
         """Exports the final game data into separate files within the "exported_games" directory.
         If the "exported_games" directory does not already exist, it will be created.
         The exported data includes the world, timeline, main character and characters as JSON files,
-        while the complete story will be saved as a txt file.
+        while the complete story is streamed into each of the story formats.
 
-        :param story_arr: A list of strings representing the story.
-        :return: None
+        :param story_arr: The paragraphs of the story. Defaults to the story written in the session's history.
+        :param formats: The formats the story is exported to, from "txt", "md", "html" and "epub".
+        :param archive: Whether the exported files are compressed into a single ZIP archive.
+        :return: The path of the exported directory, or of the archive.
         """
         if not os.path.exists("exported_games"):
             os.makedirs("exported_games")
@@ -589,19 +705,14 @@ class Engine:
         with open(path + "/timeline.json", "w") as fp:
             json.dump(timeline, fp, indent=4)
 
-        with open(path + "/story.txt", "w") as fp:
-            for i in range(len(story_arr)):
-                separated_story = story_arr[i].split("\n")
-                for story in separated_story:
-                    sentences = story.split(".")
-                    for sentence in sentences:
-                        sentence = sentence.strip()
-                        if sentence == "":
-                            continue
-                        fp.write(sentence + ".\n")
-                fp.write("\n")
-
-    def random_event(self, luck_stat: int) -> list[str | int | tuple[str, str]]:
+        if story_arr is None:
+            story_arr = story_exporter.iter_history(self._session.get_history())
+        story_exporter.export_story(story_arr, path, f"{main_char['name']}'s {world['genre']} Story", formats)
+        if archive:
+            return story_exporter.create_archive(path)
+        return path
+
+    def random_event(self, luck_stat: int, dice_total: int | None = None) -> list[str | int | tuple[str, str]]:
         """Triggers a random event that affects the main character based on the threshold value.
             Depending on whether the random number generated is higher or lower than the threshold,
             the event will have either positive or negative effects on the character.
@@ -616,17 +727,17 @@ class Engine:
             :param luck_stat: The main character's luck stat (integer) is used to determine whether the effects will be positive or negative.
                               If the added dice roll amount is greater than 13 - luck_stat, a positive effect occurs.
                               Otherwise, a negative effect occurs (added dice roll is less than or equal to 13 - luck_stat).
+            :param dice_total: The total of the two dice, if they were already rolled, e.g. shown to the player.
+                               Otherwise, the dice of the session are rolled.
             :return: A list where:
                      - The first element is a string describing the event that occurred.
                      - The second element is a string indicating the type of effect.
                      - The third element is the new value resulting from the effect.
         """
         loop_count: int = 0
-        random_num = subprocess.run(["python", "Frontend/dice_roll.py"], capture_output=True, text=True).stdout.split()
-        try:
-            random_num = int(random_num[-1])
-        except IndexError:
-            random_num = random.randint(2, 12)
+        # the effects are picked from the same stream as the dice, so seeded games are reproducible
+        rng: random.Random = self._session.dice.random
+        random_num: int = dice_total if dice_total is not None else sum(self._session.dice.roll())
 
         # list of effects that might occur
         effects: list[str] = ["physical_condition", "money", "relationship", "inventory"]
@@ -640,14 +751,15 @@ class Engine:
         elif random_num <= threshold:
             status = "negative"
 
-        random_effect: str = random.choice(effects)
+        random_effect: str = rng.choice(effects)
         while True:
             loop_count += 1
             if loop_count >= 15:
                 break
             if random_effect == "physical_condition":
                 # checks the current condition of the main character and sets a new condition.
-                new_condition: str = openai_api.check_condition(self._mainCharacter.physical_condition, status)
+                new_condition: str = openai_api.check_condition(self._mainCharacter.physical_condition, status,
+                                                                self._session)
                 if new_condition != "False":
                     prev_condition: str = self._mainCharacter.physical_condition
                     self._mainCharacter.physical_condition = new_condition
@@ -655,29 +767,30 @@ class Engine:
                             "condition", new_condition]
                 else:
                     # the main character's condition is already positive/negative, so we should pick another effect
-                    random_effect = random.choice([effect for effect in effects if effect != "physical_condition"])
+                    random_effect = rng.choice([effect for effect in effects if effect != "physical_condition"])
                     continue
 
             if random_effect == "relationship":
                 # checks if there are at least one established relationship.
                 if len(self._mainCharacter.relationship) > 0:
-                    random_relationship: tuple[int, str] = random.choice(list(self._mainCharacter.relationship.items()))
-                    new_relationship: str = openai_api.get_new_relationship(random_relationship[1], status)
+                    random_relationship: tuple[int, str] = rng.choice(list(self._mainCharacter.relationship.items()))
+                    new_relationship: str = openai_api.get_new_relationship(random_relationship[1], status,
+                                                                            self._session)
                     self._mainCharacter.add_relationship(random_relationship[0], new_relationship)
                     return [
                         f"The main character's relationship's with ID {random_relationship[0]} went from {random_relationship[1]} to {new_relationship}.",
                         "relationship", (random_relationship[0], new_relationship)]
                 else:
                     # the main character has not established any relationships yet, so we should pick a new effect
-                    random_effect = random.choice(
+                    random_effect = rng.choice(
                         [effect for effect in effects if effect not in ["relationship"]])
                     continue
 
             if random_effect == "money":
                 # generates a random amount of money to be added
                 if self._mainCharacter.money > 0:
-                    random_money: int = random.randint(int(self._mainCharacter.money) // 2 + 1,
-                                                       int(self._mainCharacter.money) + 1)
+                    random_money: int = rng.randint(int(self._mainCharacter.money) // 2 + 1,
+                                                    int(self._mainCharacter.money) + 1)
                     if status == "positive":
                         return [f"The main character's money has been increased by {random_money}.", "increase money",
                                 random_money]
@@ -685,7 +798,7 @@ class Engine:
                         return [f"The main character's money has been decreased by {random_money}.", "decrease money",
                                 random_money]
                 else:
-                    random_effect = random.choice(
+                    random_effect = rng.choice(
                         [effect for effect in effects if effect not in ["money"]])
                     continue
 
@@ -693,16 +806,16 @@ class Engine:
                 # ChatGPT will generate an item based on the world that can be added to a character's inventory
                 if len(self._mainCharacter.inventory) > 0:
                     world_dict: str = str(self._world)
-                    random_item: str = openai_api.get_new_item(world_dict)
+                    random_item: str = openai_api.get_new_item(world_dict, self._session)
                     if status == "positive":
                         return [f"The main character gained a new item called {random_item}", "gain item", random_item]
                     elif status == "negative":
                         # a random item will be removed from the main character's inventory
-                        item_from_inv: str = random.choice(self._mainCharacter.inventory)
+                        item_from_inv: str = rng.choice(self._mainCharacter.inventory)
                         self._mainCharacter.remove_inventory(item_from_inv)
                         return [f"The main character has lost an item called {item_from_inv}", "lose item", item_from_inv]
                 else:
-                    random_effect = random.choice(
+                    random_effect = rng.choice(
                         [effect for effect in effects if effect not in ["inventory"]])
                     continue
 
@@ -739,6 +852,31 @@ class Engine:
             if new_value.lower() in [item.lower() for item in self._mainCharacter.inventory]:
                 self._mainCharacter.remove_inventory(new_value)
 
+    def checkpoint(self, **extras) -> None:
+        """Records a checkpoint of the current turn, so the game can later be rewound to it.
+        Only the changes made since the previous checkpoint are stored.
+
+        :param extras: Additional values to return when rewinding to this checkpoint.
+        :return: None
+        """
+        self._checkpoints.commit(self, **extras)
+
+    def rewind(self, turns: int = 1) -> Dict[str, V] | None:
+        """Rewinds the characters, world, timeline and conversation histories by a number of turns.
+
+        :param turns: The number of turns to rewind.
+        :return: The extras recorded at the checkpoint that was rewound to, or None if there are no turns to rewind.
+        """
+        return self._checkpoints.rewind(self, turns)
+
+    @property
+    def rewindable_turns(self) -> int:
+        """Fetches the number of turns that can currently be rewound.
+
+        :return: The number of turns that can be rewound.
+        """
+        return self._checkpoints.turns_available
+
     def get_char_id(self) -> int:
         """Fetches the next available character ID for a new NPC.
         This function finds the highest character ID currently in use by the existing characters
@@ -0,0 +1,145 @@
+import asyncio
+from typing import List, TypeVar
+
+from Engine.engine import Engine
+from Utilities import utils, openai_api, update_attr
+from Utilities.session import Session
+
+V = TypeVar("V")
+
+
+def get_char_lists(engine: Engine) -> tuple[List[int], List[str]]:
+    """Fetches the IDs and names of every character, with the main character first.
+
+    :param engine: The Engine object.
+    :return: A tuple containing the list of character IDs and the list of character names.
+    """
+    char_id_list: List[int] = [char.id for char in engine.characters]
+    char_id_list.insert(0, engine.mainCharacter.id)
+    char_name_list: List[str] = [char.name for char in engine.characters]
+    char_name_list.insert(0, engine.mainCharacter.name)
+    return char_id_list, char_name_list
+
+
+async def get_gated_updates(attribute: str, story: str, char_dicts: str, id_list: List[int], name_list: List[str],
+                            session: Session, context: str | None = None) -> List[V]:
+    """Retrieves the updates of an attribute, unless the session's update gate finds that the story can't have
+    changed it, in which case ChatGPT isn't asked at all.
+
+    :param attribute: The attribute to retrieve updates for, e.g. 'money'.
+    :param story: The latest story generated by ChatGPT, which the gate checks.
+    :param char_dicts: A JSON-like string representation, containing each character's ID, name and the attribute.
+    :param id_list: A list containing the IDs of all characters, with the main character first.
+    :param name_list: A list containing the names of all characters, with the main character first.
+    :param session: The session of the game.
+    :param context: The story sent to ChatGPT if the update isn't skipped. Defaults to ``story``.
+    :return: A list of updates for the affected characters (see ``utils.get_updates``), which is empty if the update
+             was skipped.
+    """
+    if session.update_gate is not None and not session.update_gate.should_update(attribute, story, name_list[1:]):
+        return []
+    return await utils.get_updates(attribute, context if context is not None else story, char_dicts, id_list,
+                                   name_list, session=session)
+
+
+async def validate_money(engine: Engine, story: str, recent_stories: List[str], session: Session) -> \
+        tuple[str, List[tuple[int, str, str]]]:
+    """Checks whether the characters have enough money for the transactions in a story.
+    If they don't, ChatGPT is asked to regenerate the story until every transaction is valid.
+    Stories that the session's update gate finds don't involve money, including regenerated stories, aren't checked.
+
+    :param engine: The Engine object.
+    :param story: The story generated by ChatGPT.
+    :param recent_stories: The most recent stories, where the last one is ``story``. It is replaced by the
+                           regenerated story if the story had to be regenerated.
+    :param session: The session of the game.
+    :return: A tuple containing the valid story and its money updates.
+    """
+    char_id_list, char_name_list = get_char_lists(engine)
+    money_char_dicts: str = engine.prepare_char_dictionaries("money")
+    char_money_list: List[float] = [char.money for char in engine.characters]
+    char_money_list.insert(0, engine.mainCharacter.money)
+
+    money_updates: List[tuple[int, str, str]] = await get_gated_updates("money", story, money_char_dicts,
+                                                                        char_id_list, char_name_list, session)
+    check_valid_transaction: tuple[bool, List[tuple[int, str]]] = utils.check_money(money_updates, char_id_list,
+                                                                                    char_name_list, char_money_list)
+    while not check_valid_transaction[0]:
+        money_message: str = utils.get_money_message(check_valid_transaction[1])
+
+        # send a prompt to ChatGPT to ask it to regenerate the story
+        story = await asyncio.to_thread(openai_api.get_story, money_message, session)
+        recent_stories[-1] = story
+
+        # the regenerated story is gated again, as it replaces the story
+        money_updates = await get_gated_updates("money", story, money_char_dicts, char_id_list, char_name_list,
+                                                session)
+        check_valid_transaction = utils.check_money(money_updates, char_id_list, char_name_list, char_money_list)
+
+    return story, money_updates
+
+
+async def create_npcs(engine: Engine, story: str, genre: str, session: Session) -> None:
+    """Checks whether a story introduced any new characters, and creates an NPC for each of them.
+
+    :param engine: The Engine object.
+    :param story: The story generated by ChatGPT.
+    :param genre: The genre of the story.
+    :param session: The session of the game.
+    :return: None
+    """
+    char_name_list: List[str] = [char.name for char in engine.characters]
+    npc_bool, new_char_list = await asyncio.to_thread(openai_api.npc_creation_check, story, char_name_list, session)
+
+    if npc_bool:
+        new_char_id: int = engine.get_char_id()
+        char_str: str = await asyncio.to_thread(openai_api.create_npc, new_char_list, story, genre, new_char_id,
+                                                session)
+        char_dicts = utils.convert_to_json(char_str)
+        for char in char_dicts:
+            engine.add_character(char)
+
+
+async def apply_story_updates(engine: Engine, story: str, full_story: str, money_updates: List[tuple[int, str, str]],
+                              session: Session) -> None:
+    """Updates the attributes of every character and the timeline based on a story.
+    The physical condition, relationship, HP and location updates use the most recent stories for context, while
+    the inventory updates and key events only use the latest story.
+    Updates that the session's update gate finds the latest story can't trigger are skipped.
+
+    :param engine: The Engine object.
+    :param story: The latest story generated by ChatGPT.
+    :param full_story: The most recent stories joined together, including the latest story.
+    :param money_updates: The money updates returned by ``validate_money``.
+    :param session: The session of the game.
+    :return: None
+    """
+    char_id_list, char_name_list = get_char_lists(engine)
+
+    physical_condition_char_dicts: str = engine.prepare_char_dictionaries("physical_condition")
+    relationship_char_dicts: str = engine.prepare_char_dictionaries("relationship")
+    inventory_char_dicts: str = engine.prepare_char_dictionaries("inventory")
+    hp_char_dicts: str = engine.prepare_char_dictionaries("hp")
+    current_location_char_dicts: str = engine.prepare_char_dictionaries("current_location")
+
+    await asyncio.gather(
+        engine.update_char_physical_condition(
+            await get_gated_updates("physical_condition", story, physical_condition_char_dicts, char_id_list,
+                                    char_name_list, session, full_story)),
+        engine.update_char_money(money_updates),
+        engine.update_char_relationship(
+            await get_gated_updates("relationship", story, relationship_char_dicts, char_id_list, char_name_list,
+                                    session, full_story)),
+        engine.update_char_inventory(
+            await get_gated_updates("inventory", story, inventory_char_dicts, char_id_list, char_name_list,
+                                    session)),
+        engine.update_char_hp(
+            await get_gated_updates("hp", story, hp_char_dicts, char_id_list, char_name_list, session, full_story)),
+        engine.update_char_current_location(full_story,
+                                            await get_gated_updates("current_location", story,
+                                                                    current_location_char_dicts, char_id_list,
+                                                                    char_name_list, session, full_story)),
+        engine.update_key_events(story)
+    )
+    session.reset_count += 1
+    update_attr.reset_chat(session.reset_count, session)
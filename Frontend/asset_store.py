@@ -0,0 +1,274 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Dict, TypeVar, Any, Iterable
+
+V = TypeVar("V")
+
+INDEX_FILE: str = "index.json"
+DEFAULT_QUOTA: int = 256 * 1024 * 1024
+
+
+def get_prompt_key(kind: str, prompt: str) -> str:
+    """Fetches the key of a generated image, which is the hash of the prompt used to generate it.
+
+    :param kind: The type of image ("Character", "NPC" or "Item").
+    :param prompt: The prompt sent to the image backend.
+    :return: The SHA-256 hash of the kind and prompt.
+    """
+    return hashlib.sha256(f"{kind}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+def get_variant_key(prompt_key: str, size: int | None) -> str:
+    """Fetches the key of an image pre-scaled to a display size.
+
+    :param prompt_key: The key of the image, see ``get_prompt_key``.
+    :param size: The width the image was scaled to, or None for the image itself.
+    :return: The key of the variant.
+    """
+    return f"{prompt_key}@{size}" if size is not None else prompt_key
+
+
+def get_name_key(kind: str, name: str, genre: str = "") -> str:
+    """Fetches the key of the name index for a character or item.
+
+    :param kind: The type of image ("Character", "NPC" or "Item").
+    :param name: The name of the character or item.
+    :param genre: The genre of the world the image is used in.
+    :return: The key of the name index.
+    """
+    return f"{kind}/{genre}/{name}"
+
+
+class AssetStore:
+    def __init__(self, directory: str = os.path.join("assets", "generated"), quota: int = DEFAULT_QUOTA,
+                 assets_directory: str = "assets"):
+        """Initialises an AssetStore object, which stores the generated images by the hash of their prompt.
+
+        Images with the same content are only stored once, as a file named by the hash of its content. The index
+        mapping names to prompts and prompts to files is loaded once, so looking up an image never touches the disk.
+        Once the stored files go over the disk quota, the least recently used files are deleted.
+
+        :param directory: The directory the images and the index are stored in.
+        :param quota: The maximum size of the stored images in bytes.
+        :param assets_directory: The assets directory of the app, used to get the paths the UI loads images from.
+        """
+        self.directory = directory
+        self.quota = quota
+        self.assets_directory = assets_directory
+        self._names: Dict[str, str] = {}
+        self._prompts: Dict[str, str] = {}
+        # content hash -> size in bytes, in least-recently-used order
+        self._blobs: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_index()
+
+    @property
+    def index_path(self) -> str:
+        """Fetches the path of the index file.
+
+        :return: The path of the index file.
+        """
+        return os.path.join(self.directory, INDEX_FILE)
+
+    @property
+    def total_size(self) -> int:
+        """Fetches the total size of the stored images.
+
+        :return: The size in bytes.
+        """
+        with self._lock:
+            return sum(self._blobs.values())
+
+    def get_blob_path(self, content_hash: str) -> str:
+        """Fetches the path of a stored file.
+
+        :param content_hash: The hash of the content of the file.
+        :return: The path of the file.
+        """
+        return os.path.join(self.directory, content_hash[:2], f"{content_hash}.png")
+
+    def _find(self, kind: str, name: str, genre: str = "", prompt: str | None = None, size: int | None = None) -> \
+            str | None:
+        """Finds the stored file of an image, marking it as the most recently used. The lock must be held.
+
+        :param kind: The type of image ("Character", "NPC" or "Item").
+        :param name: The name of the character or item.
+        :param genre: The genre of the world the image is used in.
+        :param prompt: The prompt the image was generated with. If it isn't provided, the image most recently
+                       stored for the name is used.
+        :param size: The width of the pre-scaled variant to find. If the variant isn't stored, the image itself is used.
+        :return: The hash of the content of the file, or None if the image isn't stored.
+        """
+        prompt_key: str | None = get_prompt_key(kind, prompt) if prompt is not None else \
+            self._names.get(get_name_key(kind, name, genre))
+        if prompt_key is None:
+            return None
+        content_hash: str | None = self._prompts.get(get_variant_key(prompt_key, size))
+        if content_hash is None or content_hash not in self._blobs:
+            content_hash = self._prompts.get(prompt_key)
+        if content_hash is None or content_hash not in self._blobs:
+            return None
+        self._blobs.move_to_end(content_hash)
+        return content_hash
+
+    def contains(self, kind: str, name: str, genre: str = "", prompt: str | None = None) -> bool:
+        """Checks whether an image is stored.
+
+        :param kind: The type of image ("Character", "NPC" or "Item").
+        :param name: The name of the character or item.
+        :param genre: The genre of the world the image is used in.
+        :param prompt: The prompt the image was generated with. If it isn't provided, any image stored for the name
+                       is used.
+        :return: True if the image is stored, otherwise False.
+        """
+        with self._lock:
+            return self._find(kind, name, genre, prompt) is not None
+
+    def get_path(self, kind: str, name: str, genre: str = "", prompt: str | None = None, size: int | None = None) -> \
+            str | None:
+        """Fetches the path of a stored image.
+
+        :param kind: The type of image ("Character", "NPC" or "Item").
+        :param name: The name of the character or item.
+        :param genre: The genre of the world the image is used in.
+        :param prompt: The prompt the image was generated with. If it isn't provided, the image most recently
+                       stored for the name is used.
+        :param size: The width of the pre-scaled variant to fetch. If the variant isn't stored, the image itself is
+                     used.
+        :return: The path of the image, or None if it isn't stored.
+        """
+        with self._lock:
+            content_hash: str | None = self._find(kind, name, genre, prompt, size)
+        return self.get_blob_path(content_hash) if content_hash is not None else None
+
+    def get_src(self, kind: str, name: str, genre: str = "", prompt: str | None = None, size: int | None = None) -> \
+            str | None:
+        """Fetches the path of a stored image relative to the assets directory, which is used by Flet images.
+
+        :param kind: The type of image ("Character", "NPC" or "Item").
+        :param name: The name of the character or item.
+        :param genre: The genre of the world the image is used in.
+        :param prompt: The prompt the image was generated with. If it isn't provided, the image most recently
+                       stored for the name is used.
+        :param size: The width of the pre-scaled variant to fetch. If the variant isn't stored, the image itself is
+                     used.
+        :return: The relative path of the image, or None if it isn't stored.
+        """
+        path: str | None = self.get_path(kind, name, genre, prompt, size)
+        return os.path.relpath(path, self.assets_directory).replace(os.sep, "/") if path is not None else None
+
+    def put(self, kind: str, name: str, genre: str, prompt: str, data: bytes,
+            variants: Dict[int, bytes] | None = None) -> str:
+        """Stores a generated image, evicting the least recently used images if the quota is exceeded.
+
+        :param kind: The type of image ("Character", "NPC" or "Item").
+        :param name: The name of the character or item.
+        :param genre: The genre of the world the image is used in.
+        :param prompt: The prompt the image was generated with.
+        :param data: The PNG data of the image.
+        :param variants: A dictionary mapping display widths to the PNG data of the image pre-scaled to them.
+        :return: The path of the stored image.
+        """
+        prompt_key: str = get_prompt_key(kind, prompt)
+        with self._lock:
+            stored: List[str] = []
+            for size, variant_data in list((variants or {}).items()) + [(None, data)]:
+                content_hash: str = self._write_blob(variant_data)
+                self._prompts[get_variant_key(prompt_key, size)] = content_hash
+                stored.append(content_hash)
+            self._names[get_name_key(kind, name, genre)] = prompt_key
+            self._evict(stored)
+            self.save_index()
+        return self.get_blob_path(stored[-1])
+
+    def _write_blob(self, data: bytes) -> str:
+        """Writes a file unless a file with the same content is already stored, and marks it as the most recently
+        used. The lock must be held.
+
+        :param data: The content of the file.
+        :return: The hash of the content.
+        """
+        content_hash: str = hashlib.sha256(data).hexdigest()
+        if content_hash not in self._blobs:
+            path: str = self.get_blob_path(content_hash)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path: str = path + ".tmp"
+            with open(temp_path, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, path)
+            self._blobs[content_hash] = len(data)
+        self._blobs.move_to_end(content_hash)
+        return content_hash
+
+    def _evict(self, keep: Iterable[str] = ()) -> None:
+        """Deletes the least recently used files until the stored images fit in the quota. The lock must be held.
+
+        :param keep: The hashes of the files that are never deleted, i.e. the image that was just stored.
+        :return: None
+        """
+        kept: set[str] = set(keep)
+        total: int = sum(self._blobs.values())
+        evicted: List[str] = []
+        for content_hash in list(self._blobs):
+            if total <= self.quota:
+                break
+            if content_hash in kept:
+                continue
+            total -= self._blobs.pop(content_hash)
+            evicted.append(content_hash)
+            try:
+                os.remove(self.get_blob_path(content_hash))
+            except FileNotFoundError:
+                pass
+        if not evicted:
+            return
+
+        evicted_set: set[str] = set(evicted)
+        removed_prompts: set[str] = {key for key, content_hash in self._prompts.items() if content_hash in evicted_set}
+        for key in removed_prompts:
+            del self._prompts[key]
+        # the name index only refers to the images themselves, not their pre-scaled variants
+        for name_key in [key for key, prompt_key in self._names.items() if prompt_key in removed_prompts]:
+            del self._names[name_key]
+
+    def save_index(self) -> None:
+        """Saves the index, including the order the images were last used in.
+
+        :return: None
+        """
+        with self._lock:
+            index: Dict[str, V] = {"names": self._names, "prompts": self._prompts,
+                                   "blobs": [[content_hash, size] for content_hash, size in self._blobs.items()]}
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                temp_path: str = self.index_path + ".tmp"
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    json.dump(index, file)
+                os.replace(temp_path, self.index_path)
+            except OSError as error:
+                print(f"Error saving the asset index: {error!r}")
+
+    def _load_index(self) -> None:
+        """Loads the index, dropping the entries of files that were deleted.
+
+        :return: None
+        """
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                index: Dict[str, Any] = json.load(file)
+        except (OSError, json.JSONDecodeError) as error:
+            print(f"Error reading the asset index: {error!r}")
+            return
+
+        for content_hash, size in index.get("blobs", []):
+            if os.path.isfile(self.get_blob_path(content_hash)):
+                self._blobs[content_hash] = size
+        self._prompts = {key: content_hash for key, content_hash in index.get("prompts", {}).items()
+                         if content_hash in self._blobs}
+        self._names = {key: prompt_key for key, prompt_key in index.get("names", {}).items()
+                       if prompt_key in self._prompts}
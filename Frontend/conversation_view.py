@@ -0,0 +1,145 @@
+from typing import Callable, Generic, List, TypeVar
+
+C = TypeVar("C")
+
+# the most messages that have controls at once
+DEFAULT_WINDOW: int = 40
+# the number of messages rendered or released when the player scrolls past the end of the window
+DEFAULT_PAGE_SIZE: int = 10
+
+
+class ConversationWindow(Generic[C]):
+    def __init__(self, create_control: Callable[[str, str], C], window: int = DEFAULT_WINDOW,
+                 page_size: int = DEFAULT_PAGE_SIZE):
+        """Initialises a ConversationWindow object, which keeps controls for only a window of the messages in the
+        story, so the memory and layout cost of the conversation doesn't grow with the length of the game.
+
+        Every message is kept as text, and messages that leave the window are released and rendered again when the
+        player scrolls back to them. ``controls`` is updated in place, so it can be used as the controls of the
+        column showing the conversation.
+
+        :param create_control: The function creating the control for a message from its sender and text.
+        :param window: The most messages that have controls at once.
+        :param page_size: The number of messages rendered when the player scrolls past either end of the window.
+        """
+        self.create_control = create_control
+        self.window = max(1, window)
+        self.page_size = max(1, min(page_size, self.window))
+        # (sender, text) of every message in the story
+        self.messages: List[tuple[str, str]] = []
+        # the controls of messages[start:start + len(controls)]
+        self.controls: List[C] = []
+        self.start: int = 0
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    @property
+    def end(self) -> int:
+        """Fetches the index after the last rendered message.
+
+        :return: The index.
+        """
+        return self.start + len(self.controls)
+
+    @property
+    def has_older(self) -> bool:
+        """Checks whether there are messages before the window.
+
+        :return: True if there are older messages, otherwise False.
+        """
+        return self.start > 0
+
+    @property
+    def has_newer(self) -> bool:
+        """Checks whether there are messages after the window.
+
+        :return: True if there are newer messages, otherwise False.
+        """
+        return self.end < len(self.messages)
+
+    def _render(self, start: int, end: int) -> List[C]:
+        return [self.create_control(sender, text) for sender, text in self.messages[start:end]]
+
+    def _trim_front(self) -> None:
+        excess: int = len(self.controls) - self.window
+        if excess > 0:
+            del self.controls[:excess]
+            self.start += excess
+
+    def _trim_back(self) -> None:
+        excess: int = len(self.controls) - self.window
+        if excess > 0:
+            del self.controls[-excess:]
+
+    def show_latest(self) -> None:
+        """Moves the window to the newest messages.
+
+        :return: None
+        """
+        if not self.has_newer:
+            return
+        start: int = max(0, len(self.messages) - self.window)
+        self.controls[:] = self._render(start, len(self.messages))
+        self.start = start
+
+    def append(self, sender: str, text: str) -> C:
+        """Adds a message to the end of the conversation, moving the window to it.
+
+        :param sender: The sender of the message ("User", "Event" or "AI").
+        :param text: The text of the message.
+        :return: The control of the message.
+        """
+        self.show_latest()
+        self.messages.append((sender, text))
+        control: C = self.create_control(sender, text)
+        self.controls.append(control)
+        self._trim_front()
+        return control
+
+    def pop(self) -> tuple[str, str]:
+        """Removes the last message, e.g. a placeholder shown while a response is generated.
+
+        :return: The sender and text of the message.
+        """
+        message: tuple[str, str] = self.messages[-1]
+        self.truncate(len(self.messages) - 1)
+        return message
+
+    def truncate(self, count: int) -> None:
+        """Removes every message after the first ones, e.g. when the game is rewound.
+
+        :param count: The number of messages to keep.
+        :return: None
+        """
+        count = max(0, count)
+        del self.messages[count:]
+        if self.end > count:
+            del self.controls[max(0, count - self.start):]
+        if not self.controls:
+            # render the end of what is left, so the conversation isn't shown empty
+            self.start = max(0, count - self.window)
+            self.controls[:] = self._render(self.start, count)
+
+    def page_older(self) -> int:
+        """Renders the messages before the window, releasing the newest ones if the window is full.
+
+        :return: The number of messages rendered.
+        """
+        start: int = max(0, self.start - self.page_size)
+        added: List[C] = self._render(start, self.start)
+        self.controls[:0] = added
+        self.start = start
+        self._trim_back()
+        return len(added)
+
+    def page_newer(self) -> int:
+        """Renders the messages after the window, releasing the oldest ones if the window is full.
+
+        :return: The number of messages rendered.
+        """
+        end: int = min(len(self.messages), self.end + self.page_size)
+        added: List[C] = self._render(self.end, end)
+        self.controls.extend(added)
+        self._trim_front()
+        return len(added)
@@ -1,127 +1,120 @@
-import flet as ft
+import asyncio
 import random
-import time
-import pygame
-
-"""Initialise pygame mixer and load sound effects for dice rolling.
-Sets up sound effects for dice roll and button click events.
-"""
-pygame.mixer.init()
-roll_sound = pygame.mixer.Sound("assets/Sounds/dice_roll.mp3")
-button_sound = pygame.mixer.Sound("assets/Sounds/fate_sealed.mp3")
-
-
-def dice_roll(page):
-    """Creates and manages a dice rolling interface with animation.
-    Displays two dice with rolling animation and calculates total score.
-    Includes sound effects and result display.
-    
-    :param page: The Flet page object to display the dice interface
-    :return: None
+from typing import List
+
+import flet as ft
+
+from Frontend import sound_bank
+from Utilities.dice import Dice
+
+DICE_FACES: List[str] = ["⚀", "⚁", "⚂", "⚃", "⚄", "⚅"]
+DICE_COLOURS: List[str] = [ft.colors.BLUE, ft.colors.RED]
+
+
+def get_face(value: int) -> str:
+    """Fetches the face of a dice showing a value.
+
+    :param value: The value of the dice.
+    :return: The dice face character, or the value itself if the dice has more than six sides.
     """
-    page.title = "Two Dice Rolling Animation"
-    page.vertical_alignment = ft.MainAxisAlignment.CENTER
-    page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
-
-    dice_faces = ["⚀", "⚁", "⚂", "⚃", "⚄", "⚅"]
-    dice_values = {
-        "⚀": 1, "⚁": 2, "⚂": 3,
-        "⚃": 4, "⚄": 5, "⚅": 6
-    }
-
-    dice1 = ft.Text(
-        value="⚄",
-        size=200,
-        color=ft.colors.BLUE,
-        weight=ft.FontWeight.BOLD,
-    )
-
-    dice2 = ft.Text(
-        value="⚄",
-        size=200,
-        color=ft.colors.RED,
-        weight=ft.FontWeight.BOLD,
-    )
-
-    result_text = ft.Text(
-        value="Roll the dice!",
-        size=20,
-        color=ft.colors.RED_400,
-    )
-
-    event_text = ft.Text(
-        value="A random event is occurring! Roll the dice to decide your fate.",
-        size=40,
-        color=ft.colors.RED_400,
-        weight=ft.FontWeight.BOLD,
-    )
-
-    def roll_dice(e):
-        """Handles dice rolling animation and result calculation.
-        Manages button state, plays sound effects, animates dice faces,
-        and calculates final result.
-    
-        :param e: The click event that triggered the roll
-        :return: int: The total sum of both dice values
+    return DICE_FACES[value - 1] if 1 <= value <= len(DICE_FACES) else str(value)
+
+
+class OverlayDice(Dice):
+    def __init__(self, page: ft.Page, seed: int | str | None = None, animation_steps: int = 10,
+                 result_delay: float = 4):
+        """Initialises an OverlayDice object, which shows the dice rolling animation over the game before
+        returning the roll. The values are rolled in-process, so the animation only decides when the roll is revealed.
+
+        :param page: The Flet page the dice are shown on.
+        :param seed: The seed of the random number stream. If it isn't provided, the stream is seeded randomly.
+        :param animation_steps: The number of random faces shown before the result.
+        :param result_delay: The number of seconds the result is shown before the dice are closed.
         """
-        roll_button.disabled = True
-        page.update()
-
-        button_sound.play()
-        time.sleep(3)
-        roll_sound.play()
-
-        for _ in range(10):  # Simulate 10 rolls for animation
-            dice1.value = random.choice(dice_faces)
-            dice2.value = random.choice(dice_faces)
-            page.update()
-            time.sleep(0.1)
-
-        # Final result
-        final_dice1 = random.choice(dice_faces)
-        final_dice2 = random.choice(dice_faces)
-        dice1.value = final_dice1
-        dice2.value = final_dice2
-
-        # Calculate and display the result
-        value1 = dice_values[final_dice1]
-        value2 = dice_values[final_dice2]
-        total = value1 + value2
-        print(total)
-
-        result_text.value = f"Dice 1: {value1}, Dice 2: {value2}, Total: {total}"
-        page.update()
-        time.sleep(4)
-        page.window_close()
-        return total
-
-    roll_button = ft.ElevatedButton("Roll Dice", on_click=roll_dice)
-
-    page.add(
-        ft.Column(
-            [
-                event_text,
-                ft.Row(
-                    [dice1, dice2],
-                    alignment=ft.MainAxisAlignment.CENTER,
-                ),
-                roll_button,
-                result_text,
-            ],
-            alignment=ft.MainAxisAlignment.CENTER,
-            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-        )
-    )
+        super().__init__(seed)
+        self.page = page
+        self.animation_steps = animation_steps
+        self.result_delay = result_delay
 
+    async def roll_async(self, count: int = 2, sides: int = 6) -> List[int]:
+        """Shows the dice, waits for the player to roll them and animates the roll.
 
-def main(page):
+        :param count: The number of dice rolled.
+        :param sides: The number of sides of each dice.
+        :return: A list containing the value of each dice.
+        """
+        values: List[int] = self.roll(count, sides)
+        rolled: asyncio.Event = asyncio.Event()
+
+        dice: List[ft.Text] = [ft.Text(value=get_face(5), size=200, weight=ft.FontWeight.BOLD,
+                                       color=DICE_COLOURS[index % len(DICE_COLOURS)]) for index in range(count)]
+        result_text = ft.Text(value="Roll the dice!", size=20, color=ft.colors.RED_400)
+
+        async def roll_dice(e):
+            """Starts the roll animation once the player clicks the button.
+
+            :param e: The click event that triggered the roll
+            :return: None
+            """
+            roll_button.disabled = True
+            self.page.update()
+            rolled.set()
+
+        roll_button = ft.ElevatedButton("Roll Dice", on_click=roll_dice)
+        popup = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("A random event is occurring! Roll the dice to decide your fate.", size=40,
+                          color=ft.colors.RED_400, weight=ft.FontWeight.BOLD, text_align=ft.TextAlign.CENTER),
+            content=ft.Column(
+                [
+                    ft.Row(dice, alignment=ft.MainAxisAlignment.CENTER),
+                    roll_button,
+                    result_text,
+                ],
+                tight=True,
+                alignment=ft.MainAxisAlignment.CENTER,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            ),
+        )
+        self.page.dialog = popup
+        popup.open = True
+        self.page.update()
+
+        await rolled.wait()
+        sound_bank.get_default_bank().play("fate_sealed")
+        await asyncio.sleep(3)
+        sound_bank.get_default_bank().play("dice_roll")
+
+        for _ in range(self.animation_steps):
+            for die in dice:
+                # the animated faces don't use the stream of the dice, so they don't change later rolls
+                die.value = get_face(random.randint(1, sides))
+            self.page.update()
+            await asyncio.sleep(0.1)
+
+        for die, value in zip(dice, values):
+            die.value = get_face(value)
+        result_text.value = ", ".join(f"Dice {index + 1}: {value}" for index, value in enumerate(values)) + \
+            f", Total: {sum(values)}"
+        self.page.update()
+
+        await asyncio.sleep(self.result_delay)
+        popup.open = False
+        self.page.update()
+        return values
+
+
+async def main(page):
     """Initialises the dice rolling application.
-    Sets up the main dice rolling interface as a standalone application.
-    
+    Shows the dice rolling overlay as a standalone application.
+
     :param page: The Flet page object for the application window
     :return: None
     """
-    dice_roll(page)
+    page.title = "Two Dice Rolling Animation"
+    values: List[int] = await OverlayDice(page).roll_async()
+    print(sum(values))
+    page.window_close()
 
 
 if __name__ == "__main__":
@@ -1,60 +1,27 @@
-from PIL import Image
-from io import BytesIO
-from dotenv import load_dotenv
-import requests
-import os
-import time
 import flet as ft
 from screeninfo import Monitor
+from Frontend import image_jobs
+from Frontend.image_jobs import VISIBLE_PRIORITY
+from Frontend.sprite_atlas import SpriteAtlas
 
-load_dotenv()
-HF_TOKEN = os.getenv('HF_TOKEN')
 
-
-def generate_image(prompt, character, thing,genre=""):
-    """Generates pixel art images using Hugging Face's API.
+def generate_image(prompt, character, thing, genre="", priority=VISIBLE_PRIORITY):
+    """Generates pixel art images using Hugging Face's API and waits for them to be saved.
     Creates and saves character portraits, NPC images, or item images based on provided prompts.
+    The image is generated by the shared image job queue, so requests for an image that is already being
+    generated wait for the same job.
     
     :param prompt: The text prompt describing the image to generate
     :param character: The name of the character or item
     :param thing: The type of image to generate ("Character", "NPC", or "Item")
     :param genre: the genre of the NPC
-    :return: None
-    :raises requests.RequestException: If API request fails
-    :raises IOError: If image saving fails
+    :param priority: The priority of the image. Lower numbers are generated first
+    :return: bool: True if the image was saved, otherwise False
     """
-    if HF_TOKEN and len(prompt) >= 5:
-        # API_URL = "https://api-inference.huggingface.co/models/black-forest-labs/FLUX.1-dev" #Slower but generates bettter detailed images
-        API_URL = "https://api-inference.huggingface.co/models/black-forest-labs/FLUX.1-schnell"  # Faster but generates less detailed images
-        headers = {"Authorization": f"Bearer {HF_TOKEN}"}
-        max_retries = 5
-        retries = 0
-        if thing == "NPC":
-            save_path = f"assets/{thing}_portraits/{genre}/{character}.png"
-            print(save_path)
-        else:
-            save_path = f"assets/{thing}_portraits/{character}.png"
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        while retries < max_retries:
-            response = requests.post(API_URL, headers=headers, json={"inputs": str(prompt)})
-
-            if response.status_code == 200:
-                try:
-                    i = Image.open(BytesIO(response.content))
-                    i.save(save_path)
-                    print("Image saved successfully.")
-                    break
-                except Exception as e:
-                    print(f"Error opening image: {e}")
-                    break
-            else:
-                print(f"Failed to get image. Status code: {response.status_code}")
-                print(f"Response: {response.text}")
-                retries += 1
-                time.sleep(1)  # Optional: wait for a second before retrying
-
-        if retries == max_retries:
-            print("Failed to get image after 5 attempts.")
+    queue = image_jobs.get_default_queue()
+    if queue.available and len(prompt) >= 5:
+        return queue.submit(thing, character, prompt, genre, priority).wait()
+    return False
 
 
 def process__value(value):
@@ -183,6 +150,35 @@ def create_text(content, size, left, top, color=ft.colors.WHITE, weight=ft.FontW
         ),
     )
 
+def create_sprite(atlas: SpriteAtlas, key: str, width: float) -> ft.Container:
+    """Creates an image showing one portrait of a sprite atlas.
+    The whole atlas is scaled so its cells match the width, and offset so only the portrait's cell is visible.
+
+    :param atlas: The saved sprite atlas containing the portrait
+    :param key: The key of the portrait in the atlas
+    :param width: The width and height the portrait is shown at
+    :return: ft.Container: A container clipped to the portrait
+    """
+    left, top, cell_width, cell_height = atlas.coordinates[key]
+    scale: float = width / cell_width
+    return ft.Container(
+        width=width,
+        height=cell_height * scale,
+        clip_behavior=ft.ClipBehavior.HARD_EDGE,
+        content=ft.Stack([
+            ft.Image(
+                src=atlas.src,
+                left=-left * scale,
+                top=-top * scale,
+                width=atlas.width * scale,
+                height=atlas.height * scale,
+                fit=ft.ImageFit.FILL,
+                filter_quality=ft.FilterQuality.NONE,
+            )
+        ]),
+    )
+
+
 def create_tooltip(message, left, top, text_size, padding, margin_left, monitor):
     """Creates a tooltip widget with help text.
     Generates a question mark icon with hover tooltip containing help text.
@@ -0,0 +1,415 @@
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from io import BytesIO
+from typing import List, Dict, TypeVar, Any, Callable
+
+from Frontend import pixel_art
+from Frontend.asset_store import AssetStore
+from Utilities.environment import load_environment
+
+V = TypeVar("V")
+
+API_URL: str = "https://api-inference.huggingface.co/models/black-forest-labs/FLUX.1-schnell"
+STATE_FILE: str = "image_jobs.json"
+
+# lower numbers are generated first
+VISIBLE_PRIORITY: int = 0
+PREFETCH_PRIORITY: int = 10
+
+PENDING: str = "pending"
+RUNNING: str = "running"
+DONE: str = "done"
+FAILED: str = "failed"
+
+
+class ImageJob:
+    def __init__(self, kind: str, name: str, prompt: str, genre: str = "", priority: int = PREFETCH_PRIORITY,
+                 status: str = PENDING, attempts: int = 0):
+        """Initialises an ImageJob object, which tracks the generation of a single image.
+
+        :param kind: The type of image ("Character", "NPC" or "Item").
+        :param name: The name of the character or item.
+        :param prompt: The prompt sent to the image backend.
+        :param genre: The genre of the world the image is used in.
+        :param priority: The priority of the job. Lower numbers are generated first.
+        :param status: The status of the job (pending, running, done or failed).
+        :param attempts: The number of times the image backend was called.
+        """
+        self.kind = kind
+        self.name = name
+        self.prompt = prompt
+        self.genre = genre
+        self.priority = priority
+        self.status = status
+        self.attempts = attempts
+        # the path of the image once it is stored
+        self.path: str = ""
+        self._finished = threading.Event()
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        """Fetches the key used to deduplicate jobs for the same image.
+
+        :return: A tuple containing the kind, name and genre of the image.
+        """
+        return self.kind, self.name, self.genre
+
+    def finish(self, status: str) -> None:
+        """Marks the job as finished, waking up everything waiting for it.
+
+        :param status: The final status of the job (done or failed).
+        :return: None
+        """
+        self.status = status
+        self._finished.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Waits for the job to finish.
+
+        :param timeout: The maximum number of seconds to wait. If it isn't provided, waits until the job finishes.
+        :return: True if the image was generated, otherwise False.
+        """
+        self._finished.wait(timeout)
+        return self.status == DONE
+
+    def to_dict(self) -> Dict[str, V]:
+        """Converts the job into a dictionary, so it can be persisted.
+
+        :return: A dictionary containing the attributes of the job.
+        """
+        return {"kind": self.kind, "name": self.name, "prompt": self.prompt, "genre": self.genre,
+                "priority": self.priority, "status": self.status, "attempts": self.attempts}
+
+
+class HuggingFaceBackend:
+    def __init__(self, token: str | None, url: str = API_URL, max_retries: int = 5, retry_delay: float = 1,
+                 pool_size: int = 4):
+        """Initialises a HuggingFaceBackend object, which generates images using Hugging Face's API.
+        Every request reuses the connections of a single HTTP session.
+
+        :param token: The Hugging Face token.
+        :param url: The URL of the model.
+        :param max_retries: The maximum number of requests sent for a single image.
+        :param retry_delay: The number of seconds waited before retrying a failed request.
+        :param pool_size: The maximum number of connections kept open, which should be at least the number of workers.
+        """
+        # requests is only imported here, so importing this module doesn't slow down the start of the game
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.token = token
+        self.url = url
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.http = requests.Session()
+        self.http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.http.headers["Authorization"] = f"Bearer {token}"
+
+    @property
+    def available(self) -> bool:
+        """Checks whether images can be generated, which needs a Hugging Face token.
+
+        :return: True if there is a token, otherwise False.
+        """
+        return bool(self.token)
+
+    def generate(self, prompt: str) -> bytes:
+        """Generates an image.
+
+        :param prompt: The text prompt describing the image.
+        :return: The image data.
+        :raises RuntimeError: If there is no token, or the image couldn't be generated after every retry.
+        """
+        if not self.token:
+            raise RuntimeError("HF_TOKEN is not set.")
+        import requests
+        for retry in range(self.max_retries):
+            try:
+                response: requests.Response = self.http.post(self.url, json={"inputs": str(prompt)}, timeout=120)
+            except requests.RequestException as error:
+                print(f"Failed to get image: {error!r}")
+            else:
+                if response.status_code == 200:
+                    return response.content
+                print(f"Failed to get image. Status code: {response.status_code}")
+                print(f"Response: {response.text}")
+            if retry < self.max_retries - 1:
+                time.sleep(self.retry_delay)
+        raise RuntimeError(f"Failed to get image after {self.max_retries} attempts.")
+
+
+class StandInImageBackend:
+    def __init__(self, latency: float = 0.0, size: int = 16, scale: int = 8):
+        """Initialises a StandInImageBackend object, which generates images locally for testing.
+        Each prompt always produces the same image, a grid of coloured pixels upscaled like the pixel art returned by
+        the image model.
+
+        :param latency: The number of seconds each image takes to generate.
+        :param size: The number of art pixels along each side of the images.
+        :param scale: The width of each art pixel in image pixels.
+        """
+        self.latency = latency
+        self.size = size
+        self.scale = scale
+        self.prompts: List[str] = []
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str) -> bytes:
+        """Generates an image with a pattern and colours picked from the prompt.
+
+        :param prompt: The text prompt describing the image.
+        :return: The PNG data.
+        """
+        with self._lock:
+            self.prompts.append(prompt)
+        if self.latency > 0:
+            time.sleep(self.latency)
+        from PIL import Image
+        digest: bytes = hashlib.sha256(prompt.encode("utf-8")).digest()
+        palette: List[tuple[int, ...]] = [tuple(digest[index:index + 3]) for index in range(0, 12, 3)]
+        image: Image.Image = Image.new("RGB", (self.size, self.size))
+        image.putdata([palette[(digest[(x * self.size + y) % len(digest)] >> (x % 4)) % len(palette)]
+                       for y in range(self.size) for x in range(self.size)])
+        image = image.resize((self.size * self.scale, self.size * self.scale), Image.Resampling.NEAREST)
+        data = BytesIO()
+        image.save(data, format="PNG")
+        return data.getvalue()
+
+
+class ImageJobQueue:
+    def __init__(self, backend, workers: int = 2, directory: str = "assets",
+                 on_complete: Callable[[ImageJob], None] | None = None, store: AssetStore | None = None):
+        """Initialises an ImageJobQueue object, which generates images in the background with a fixed number of
+        workers.
+
+        Jobs for an image that is already queued or being generated are merged, and the images visible to the player
+        are generated before the prefetched ones. The images are kept in an asset store, and unfinished jobs are saved
+        in the assets directory, so they are resumed when the game is restarted.
+
+        :param backend: The backend generating the images, e.g. a ``HuggingFaceBackend``.
+        :param workers: The number of images generated at the same time.
+        :param directory: The assets directory the job state is saved in.
+        :param on_complete: A function called with each job once it finishes.
+        :param store: The store the images are saved in. Defaults to a store in the ``generated`` subdirectory of
+                      the assets directory.
+        """
+        self.backend = backend
+        self.directory = directory
+        self.store = store if store is not None else AssetStore(os.path.join(directory, "generated"),
+                                                                assets_directory=directory)
+        self.on_complete = on_complete
+        self.jobs: Dict[tuple[str, str, str], ImageJob] = {}
+        self._heap: List[tuple[int, int, tuple[str, str, str]]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._closed: bool = False
+
+        self._load_state()
+        self._workers: List[threading.Thread] = [threading.Thread(target=self._work, daemon=True)
+                                                 for _ in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def available(self) -> bool:
+        """Checks whether the backend can generate images. Backends without an ``available`` attribute always can.
+
+        :return: True if images can be generated, otherwise False.
+        """
+        return getattr(self.backend, "available", True)
+
+    @property
+    def state_path(self) -> str:
+        """Fetches the path of the file the unfinished jobs are saved to.
+
+        :return: The path of the file.
+        """
+        return os.path.join(self.directory, STATE_FILE)
+
+    def submit(self, kind: str, name: str, prompt: str, genre: str = "", priority: int = PREFETCH_PRIORITY) -> \
+            ImageJob:
+        """Queues the generation of an image, unless it already exists or is already queued.
+        If the image is already queued with a lower priority, the job is moved up the queue. If the backend can't
+        generate images, e.g. without a Hugging Face token, the job fails straight away and nothing is queued.
+
+        :param kind: The type of image ("Character", "NPC" or "Item").
+        :param name: The name of the character or item.
+        :param prompt: The prompt sent to the image backend.
+        :param genre: The genre of the world the image is used in.
+        :param priority: The priority of the job. Lower numbers are generated first.
+        :return: The ImageJob object, which can be waited on.
+        """
+        key: tuple[str, str, str] = (kind, name, genre)
+        with self._condition:
+            job: ImageJob | None = self.jobs.get(key)
+            if job is not None and job.status in (PENDING, RUNNING):
+                if priority < job.priority and job.status == PENDING:
+                    job.priority = priority
+                    self._push(job)
+                return job
+
+            job = ImageJob(kind, name, prompt, genre, priority)
+            stored_path: str | None = self.store.get_path(kind, name, genre, prompt)
+            if stored_path is not None:
+                self.jobs[key] = job
+                job.path = stored_path
+                job.finish(DONE)
+                return job
+            if not self.available:
+                job.finish(FAILED)
+                return job
+            self.jobs[key] = job
+            self._push(job)
+            self._save_state()
+        return job
+
+    def has_image(self, kind: str, name: str, genre: str = "") -> bool:
+        """Checks whether an image is already stored or is already queued.
+
+        :param kind: The type of image ("Character", "NPC" or "Item").
+        :param name: The name of the character or item.
+        :param genre: The genre of the world the image is used in.
+        :return: True if the image is stored or a job for it is pending or running, otherwise False.
+        """
+        with self._condition:
+            job: ImageJob | None = self.jobs.get((kind, name, genre))
+            if job is not None and job.status in (PENDING, RUNNING):
+                return True
+        return self.store.contains(kind, name, genre)
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Waits for every queued job to finish.
+
+        :param timeout: The maximum number of seconds to wait. If it isn't provided, waits until the queue is idle.
+        :return: True if every job finished, otherwise False.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not any(job.status in (PENDING, RUNNING)
+                                                            for job in self.jobs.values()), timeout)
+
+    def close(self) -> None:
+        """Stops the workers once the images being generated are finished. Queued jobs stay saved.
+
+        :return: None
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join()
+
+    def _push(self, job: ImageJob) -> None:
+        """Adds a job to the queue. The condition must be held.
+
+        :param job: The job.
+        :return: None
+        """
+        heapq.heappush(self._heap, (job.priority, next(self._counter), job.key))
+        self._condition.notify()
+
+    def _next_job(self) -> ImageJob | None:
+        """Waits for the next job with the highest priority and marks it as running.
+
+        :return: The job, or None if the queue was closed.
+        """
+        with self._condition:
+            while not self._closed:
+                while self._heap:
+                    priority, _, key = heapq.heappop(self._heap)
+                    job: ImageJob | None = self.jobs.get(key)
+                    # skip the entries left behind when a job was moved up the queue
+                    if job is not None and job.status == PENDING and job.priority == priority:
+                        job.status = RUNNING
+                        return job
+                self._condition.wait()
+            return None
+
+    def _work(self) -> None:
+        """Generates the queued images until the queue is closed.
+
+        :return: None
+        """
+        while (job := self._next_job()) is not None:
+            job.attempts += 1
+            try:
+                data: bytes = self.backend.generate(job.prompt)
+                # the backend returns a full resolution image, which is reduced to its pixel grid before it is stored
+                processed: pixel_art.ProcessedImage = pixel_art.process_image(data)
+                job.path = self.store.put(job.kind, job.name, job.genre, job.prompt, processed.data,
+                                          processed.variants)
+                status: str = DONE
+            except Exception as error:
+                print(f"Error generating image for {job.name}: {error!r}")
+                status = FAILED
+
+            with self._condition:
+                job.finish(status)
+                self._save_state()
+                self._condition.notify_all()
+            if self.on_complete is not None:
+                self.on_complete(job)
+
+    def _load_state(self) -> None:
+        """Queues the jobs that were unfinished when the game was closed.
+        They are left in the file if the backend can't generate images, so they are resumed once it can.
+
+        :return: None
+        """
+        if not self.available or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as file:
+                saved_jobs: List[Dict[str, Any]] = json.load(file)
+        except (OSError, json.JSONDecodeError) as error:
+            print(f"Error reading the image jobs: {error!r}")
+            return
+
+        with self._condition:
+            for saved_job in saved_jobs:
+                job = ImageJob(saved_job["kind"], saved_job["name"], saved_job["prompt"], saved_job["genre"],
+                               saved_job["priority"], PENDING, saved_job["attempts"])
+                self.jobs[job.key] = job
+                stored_path: str | None = self.store.get_path(job.kind, job.name, job.genre, job.prompt)
+                if stored_path is not None:
+                    job.path = stored_path
+                    job.finish(DONE)
+                else:
+                    self._push(job)
+
+    def _save_state(self) -> None:
+        """Saves the unfinished jobs. The condition must be held.
+
+        :return: None
+        """
+        unfinished: List[Dict[str, V]] = [job.to_dict() for job in self.jobs.values()
+                                          if job.status in (PENDING, RUNNING)]
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path: str = self.state_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(unfinished, file)
+            os.replace(temp_path, self.state_path)
+        except OSError as error:
+            print(f"Error saving the image jobs: {error!r}")
+
+
+_default_queue: ImageJobQueue | None = None
+_default_queue_lock = threading.Lock()
+
+
+def get_default_queue() -> ImageJobQueue:
+    """Fetches the job queue used by the game, creating it if it doesn't exist yet.
+    The Hugging Face token is read from the environment, after loading the .env file.
+
+    :return: The ImageJobQueue object using Hugging Face's API.
+    """
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            load_environment()
+            _default_queue = ImageJobQueue(HuggingFaceBackend(os.getenv("HF_TOKEN")))
+    return _default_queue
@@ -0,0 +1,159 @@
+from io import BytesIO
+from typing import List, Dict, TYPE_CHECKING
+
+# numpy and PIL are only imported by the functions that use them, so importing this module doesn't slow down the
+# start of the game
+if TYPE_CHECKING:
+    import numpy as np
+    from PIL import Image
+DEFAULT_COLOURS: int = 16
+# the sizes the portraits are shown at in the popups and the stats panel
+DEFAULT_VARIANT_SIZES: tuple[int, ...] = (48, 64, 100, 128)
+# the most and fewest cells a generated image is assumed to have along each side
+MAX_CELLS: int = 128
+MIN_CELLS: int = 8
+# the share of the colour changes between neighbouring pixels that must fall on the cell borders
+GRID_THRESHOLD: float = 0.7
+# the smallest difference between neighbouring pixels (summed over the RGB channels) counted as a colour change
+EDGE_THRESHOLD: int = 96
+
+
+def get_edge_profile(pixels: "np.ndarray", axis: int) -> "np.ndarray":
+    """Measures how much the colour changes between each pair of neighbouring columns or rows.
+
+    :param pixels: The RGB pixels of the image as an array of shape (height, width, 3).
+    :param axis: 1 to compare neighbouring columns, or 0 to compare neighbouring rows.
+    :return: An array containing the number of pixels whose colour changes across each border, where index ``i``
+             is the border between column (or row) ``i`` and ``i + 1``.
+    """
+    import numpy as np
+    differences: np.ndarray = np.abs(np.diff(pixels.astype(np.int16), axis=axis)).sum(axis=2)
+    # small changes are noise and compression artefacts inside a cell, not borders between colours
+    return (differences >= EDGE_THRESHOLD).sum(axis=1 - axis, dtype=np.int64)
+
+
+def find_grid_offset(profile: "np.ndarray", cell_size: int) -> tuple[float, int]:
+    """Finds where a grid of cells starts, by finding the offset whose borders have the most colour change.
+
+    :param profile: The colour change across each border, see ``get_edge_profile``.
+    :param cell_size: The width of each cell in pixels.
+    :return: A tuple containing the share of the colour change that falls on the borders of the grid, and the
+             position of the first cell border.
+    """
+    import numpy as np
+    total: int = int(profile.sum())
+    if total == 0:
+        return 1.0, 0
+    padded: np.ndarray = np.zeros(-(-len(profile) // cell_size) * cell_size, dtype=np.int64)
+    padded[:len(profile)] = profile
+    energy: np.ndarray = padded.reshape(-1, cell_size).sum(axis=0)
+    best: int = int(np.argmax(energy))
+    # border i lies between pixel i and pixel i + 1, so the cell starts at i + 1
+    return float(energy[best]) / total, (best + 1) % cell_size
+
+
+def detect_grid(pixels: "np.ndarray", threshold: float = GRID_THRESHOLD) -> tuple[int, int, int]:
+    """Detects the pixel grid of upscaled pixel art. The largest cell size whose borders contain most of the colour
+    changes in both directions is picked, as every divisor of the true cell size fits the grid as well.
+
+    :param pixels: The RGB pixels of the image as an array of shape (height, width, 3).
+    :param threshold: The share of the colour change that must fall on the cell borders.
+    :return: A tuple containing the width of each art pixel in image pixels, and the horizontal and vertical offset
+             of the grid.
+    """
+    side: int = min(pixels.shape[0], pixels.shape[1])
+    columns: np.ndarray = get_edge_profile(pixels, 1)
+    rows: np.ndarray = get_edge_profile(pixels, 0)
+    for cell_size in range(side // MIN_CELLS, 1, -1):
+        column_share, offset_x = find_grid_offset(columns, cell_size)
+        if column_share < threshold:
+            continue
+        row_share, offset_y = find_grid_offset(rows, cell_size)
+        if row_share >= threshold:
+            return cell_size, offset_x, offset_y
+    return max(1, side // MAX_CELLS), 0, 0
+
+
+def downsample(pixels: "np.ndarray", cell_size: int, offset_x: int = 0, offset_y: int = 0) -> "np.ndarray":
+    """Reduces upscaled pixel art to one pixel per art pixel, using the median colour of each cell so that
+    anti-aliased edges and noise don't blend the colours. Partial cells at the edges are cropped.
+
+    :param pixels: The RGB pixels of the image as an array of shape (height, width, 3).
+    :param cell_size: The width and height of each art pixel in image pixels.
+    :param offset_x: The position of the first column border of the grid.
+    :param offset_y: The position of the first row border of the grid.
+    :return: The downsampled pixels as an array of shape (rows, columns, 3).
+    """
+    import numpy as np
+    if cell_size <= 1:
+        return pixels
+    cropped: np.ndarray = pixels[offset_y:, offset_x:]
+    rows: int = cropped.shape[0] // cell_size
+    columns: int = cropped.shape[1] // cell_size
+    blocks: np.ndarray = cropped[:rows * cell_size, :columns * cell_size] \
+        .reshape(rows, cell_size, columns, cell_size, -1).transpose(0, 2, 1, 3, 4) \
+        .reshape(rows, columns, cell_size * cell_size, -1)
+    return np.median(blocks, axis=2).astype(np.uint8)
+
+
+def encode_png(image: "Image.Image") -> bytes:
+    """Encodes an image as an optimised PNG.
+
+    :param image: The image.
+    :return: The PNG data.
+    """
+    data = BytesIO()
+    image.save(data, format="PNG", optimize=True)
+    return data.getvalue()
+
+
+class ProcessedImage:
+    def __init__(self, data: bytes, variants: Dict[int, bytes], cell_size: int, colours: int):
+        """Initialises a ProcessedImage object, which holds the output of ``process_image``.
+
+        :param data: The PNG data of the image at one pixel per art pixel.
+        :param variants: A dictionary mapping each display size to the PNG data of the image scaled to it.
+        :param cell_size: The size of the art pixels that was detected in the original image.
+        :param colours: The number of colours in the palette.
+        """
+        self.data = data
+        self.variants = variants
+        self.cell_size = cell_size
+        self.colours = colours
+
+
+def process_image(data: bytes, colours: int = DEFAULT_COLOURS, sizes: tuple[int, ...] = DEFAULT_VARIANT_SIZES) -> \
+        ProcessedImage:
+    """Converts a generated image into small indexed PNGs.
+    The image is downsampled to its pixel grid, quantised to a small palette, and scaled back up to each display size
+    without smoothing, so the UI never has to resample it.
+
+    :param data: The image data returned by the image backend.
+    :param colours: The maximum number of colours in the palette.
+    :param sizes: The widths the image is pre-scaled to.
+    :return: The ProcessedImage object.
+    """
+    import numpy as np
+    from PIL import Image
+    with Image.open(BytesIO(data)) as original:
+        pixels: np.ndarray = np.asarray(original.convert("RGB"))
+    cell_size, offset_x, offset_y = detect_grid(pixels)
+    small: Image.Image = Image.fromarray(downsample(pixels, cell_size, offset_x, offset_y), "RGB")
+    indexed: Image.Image = small.quantize(colours, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+
+    variants: Dict[int, bytes] = {}
+    for size in sizes:
+        height: int = max(1, round(size * indexed.height / indexed.width))
+        variants[size] = encode_png(indexed.resize((size, height), Image.Resampling.NEAREST))
+    return ProcessedImage(encode_png(indexed), variants, cell_size, len(indexed.getpalette() or []) // 3)
+
+
+def get_variant_size(sizes: List[int], width: float) -> int | None:
+    """Fetches the smallest pre-scaled size that is at least as wide as the displayed image.
+
+    :param sizes: The pre-scaled sizes.
+    :param width: The width the image is displayed at.
+    :return: The size, or None if the image is displayed larger than every size.
+    """
+    larger: List[int] = [size for size in sizes if size >= width]
+    return min(larger) if larger else None
@@ -0,0 +1,105 @@
+from Classes.Character import Character
+from Frontend.image_jobs import ImageJobQueue, PREFETCH_PRIORITY
+from Utilities.session import Session, CHARACTER_ADDED, ITEM_ADDED
+
+DEFAULT_TURN_BUDGET: int = 3
+
+
+def get_npc_prompt(character: Character, genre: str) -> str:
+    """Creates the prompt used to generate the portrait of an NPC.
+
+    :param character: The NPC Character object.
+    :param genre: The genre of the world.
+    :return: The prompt.
+    """
+    return f'''Style: Pixel art.
+                Dimensions: 16 x 16 pixels.
+                Character: {character.appearance} with the occupation {character.occupation}.
+                Personality: {character.personality}.
+                Background: Use a white background.
+                Lighting: Simulate natural lighting to enhance colours and details.
+                Pose: Front-facing portrait, close-up.
+                Genre: {genre}'''
+
+
+def get_item_prompt(item: str, genre: str) -> str:
+    """Creates the prompt used to generate the image of an item.
+
+    :param item: The name of the item.
+    :param genre: The genre of the world.
+    :return: The prompt.
+    """
+    return f"Generate a 16 bit pixel art image for a game item called {item} that will be used in a game with the " \
+           f"genre{genre},"
+
+
+class PortraitPrefetcher:
+    def __init__(self, queue: ImageJobQueue, session: Session, turn_budget: int = DEFAULT_TURN_BUDGET):
+        """Initialises a PortraitPrefetcher object, which queues the portraits of new NPCs and the images of the
+        main character's new items as soon as they are added, so they are ready when the player opens the popups.
+
+        The images are queued with a low priority, and at most ``turn_budget`` images are queued each turn so a turn
+        introducing many characters or items doesn't flood the image backend. Images over the budget are generated
+        when their popup is opened instead.
+
+        :param queue: The queue generating the images.
+        :param session: The session of the game.
+        :param turn_budget: The maximum number of images queued each turn.
+        """
+        self.queue = queue
+        self.session = session
+        self.turn_budget = turn_budget
+        self._turn: int = session.reset_count
+        self._queued_this_turn: int = 0
+        session.subscribe(CHARACTER_ADDED, self.on_character_added)
+        session.subscribe(ITEM_ADDED, self.on_item_added)
+
+    @property
+    def genre(self) -> str:
+        """Fetches the genre of the world of the game.
+
+        :return: The genre, or an empty string if the world hasn't been created yet.
+        """
+        world = self.session.engine.world
+        return world.genre if world is not None else ""
+
+    def on_character_added(self, character: Character) -> None:
+        """Queues the portrait of a new NPC.
+
+        :param character: The new NPC Character object.
+        :return: None
+        """
+        self.prefetch("NPC", character.name, get_npc_prompt(character, self.genre), self.genre)
+
+    def on_item_added(self, character: Character, item: str) -> None:
+        """Queues the image of an item added to the main character's inventory.
+
+        :param character: The Character object the item was added to.
+        :param item: The name of the item.
+        :return: None
+        """
+        if character is self.session.engine.mainCharacter:
+            self.prefetch("Item", item, get_item_prompt(item, self.genre))
+
+    def prefetch(self, kind: str, name: str, prompt: str, genre: str = "") -> bool:
+        """Queues an image with a low priority if it doesn't exist yet and the budget of the turn isn't used up.
+
+        :param kind: The type of image ("NPC" or "Item").
+        :param name: The name of the character or item.
+        :param prompt: The prompt sent to the image backend.
+        :param genre: The genre of the NPC.
+        :return: True if the image was queued, otherwise False.
+        """
+        if self.queue.has_image(kind, name, genre):
+            return False
+
+        # the attribute updates run once per turn, so their count identifies the turn
+        if self.session.reset_count != self._turn:
+            self._turn = self.session.reset_count
+            self._queued_this_turn = 0
+        if self._queued_this_turn >= self.turn_budget:
+            return False
+
+        self._queued_this_turn += 1
+        self.queue.submit(kind, name, prompt, genre, PREFETCH_PRIORITY)
+        return True
@@ -0,0 +1,156 @@
+import threading
+from types import ModuleType
+from typing import Dict, Any, Callable, List
+
+from Utilities import utils
+
+# name -> (path, volume) of every sound effect in the game
+DEFAULT_SOUNDS: Dict[str, tuple[str, float]] = {
+    "button_click": ("assets/Sounds/button_click.mp3", 1.0),
+    "typing": ("assets/Sounds/typing_sound.mp3", 0.5),
+    "effect": ("assets/Sounds/effect_triggered.mp3", 1.0),
+    "heal": ("assets/Sounds/Please_heal.mp3", 1.0),
+    "dice_roll": ("assets/Sounds/dice_roll.mp3", 1.0),
+    "fate_sealed": ("assets/Sounds/fate_sealed.mp3", 1.0),
+}
+DEFAULT_CHANNELS: int = 8
+# the channels kept for looping sounds, so one-shot sounds never cut them off
+DEFAULT_RESERVED: int = 1
+
+_default_bank: "SoundBank | None" = None
+_default_bank_lock = threading.Lock()
+
+
+class SoundBank:
+    def __init__(self, sounds: Dict[str, tuple[str, float]] | None = None, channels: int = DEFAULT_CHANNELS,
+                 reserved: int = DEFAULT_RESERVED, get_mixer: Callable[[], ModuleType] = utils.get_mixer):
+        """Initialises a SoundBank object, which decodes every sound effect once and plays them on shared channels.
+
+        The sounds are decoded by ``load``, normally in the background at startup, and ``play`` never touches the disk,
+        so playing a sound during a turn doesn't block the UI. Sounds that aren't loaded yet are skipped.
+
+        :param sounds: A dictionary mapping the name of each sound to its path and volume. Defaults to the sound
+                       effects of the game.
+        :param channels: The number of channels sounds are mixed on.
+        :param reserved: The number of channels kept for looping sounds.
+        :param get_mixer: The function fetching the initialised pygame mixer.
+        """
+        self.sounds = dict(DEFAULT_SOUNDS if sounds is None else sounds)
+        self.channels = channels
+        self.reserved = reserved
+        self.get_mixer = get_mixer
+        self._loaded: Dict[str, Any] = {}
+        # name -> the channel the sound was last played on, so stopping a sound doesn't stop other sounds
+        self._playing: Dict[str, Any] = {}
+        self._mixer: ModuleType | None = None
+        self._channels: List[Any] = []
+        # the order the channels last started playing in, used to cut off the oldest sound when every channel is busy
+        self._started: List[int] = [0] * channels
+        self._plays: int = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Checks whether every sound has been decoded.
+
+        :return: True if the sounds are loaded, otherwise False.
+        """
+        return self._ready.is_set()
+
+    def load(self) -> None:
+        """Initialises the mixer channels and decodes every sound that isn't loaded yet.
+
+        :return: None
+        """
+        mixer: ModuleType = self.get_mixer()
+        with self._lock:
+            if self._mixer is None:
+                mixer.set_num_channels(self.channels)
+                mixer.set_reserved(self.reserved)
+                self._channels = [mixer.Channel(index) for index in range(self.channels)]
+                self._mixer = mixer
+        for name, (path, volume) in self.sounds.items():
+            if name in self._loaded:
+                continue
+            try:
+                sound = mixer.Sound(path)
+                sound.set_volume(volume)
+            except Exception as error:
+                print(f"Error loading the sound {name}: {error!r}")
+                continue
+            with self._lock:
+                self._loaded[name] = sound
+        self._ready.set()
+
+    def start(self) -> threading.Thread:
+        """Loads the sounds in a background thread, once.
+
+        :return: The loading thread.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.load, daemon=True)
+                self._thread.start()
+            return self._thread
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Waits for the sounds to be loaded.
+
+        :param timeout: The most seconds waited, or None to wait until they are loaded.
+        :return: True if the sounds are loaded, otherwise False.
+        """
+        return self._ready.wait(timeout)
+
+    def play(self, name: str, loops: int = 0) -> Any:
+        """Plays a sound without blocking. Looping sounds are played on the reserved channels, and other sounds on
+        a free channel, or the channel that has been playing the longest if every channel is busy.
+
+        :param name: The name of the sound.
+        :param loops: The number of times the sound is repeated, or -1 to repeat it until it is stopped.
+        :return: The channel the sound is played on, or None if the sound isn't loaded.
+        """
+        with self._lock:
+            sound = self._loaded.get(name)
+            if sound is None or self._mixer is None:
+                return None
+            indexes: List[int] = list(range(self.reserved, self.channels))
+            if loops < 0:
+                indexes = list(range(self.reserved)) + indexes
+            if not indexes:
+                return None
+            free: List[int] = [index for index in indexes if not self._channels[index].get_busy()]
+            index: int = free[0] if free else min(indexes, key=lambda busy: self._started[busy])
+            channel = self._channels[index]
+            self._plays += 1
+            self._started[index] = self._plays
+            channel.play(sound, loops)
+            # the sound that was playing on the channel has been cut off
+            for playing in [playing for playing, used in self._playing.items() if used is channel]:
+                del self._playing[playing]
+            self._playing[name] = channel
+            return channel
+
+    def stop(self, name: str) -> None:
+        """Stops a sound on the channel it was last played on.
+
+        :param name: The name of the sound.
+        :return: None
+        """
+        with self._lock:
+            channel = self._playing.pop(name, None)
+            if channel is not None:
+                channel.stop()
+
+
+def get_default_bank() -> SoundBank:
+    """Fetches the sound bank shared by the game, creating it on first use.
+
+    :return: The SoundBank object.
+    """
+    global _default_bank
+    with _default_bank_lock:
+        if _default_bank is None:
+            _default_bank = SoundBank()
+        return _default_bank
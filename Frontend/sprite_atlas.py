@@ -0,0 +1,126 @@
+import itertools
+import os
+from typing import Dict, TYPE_CHECKING
+
+# PIL is only imported once a portrait is added, so creating the atlases doesn't slow down the start of the game
+if TYPE_CHECKING:
+    from PIL import Image
+
+DEFAULT_COLUMNS: int = 8
+# shared by every atlas, so an atlas never reuses the path of an image the UI has already cached
+_versions = itertools.count(1)
+
+
+class SpriteAtlas:
+    def __init__(self, name: str, cell_size: int = 100, columns: int = DEFAULT_COLUMNS,
+                 directory: str = os.path.join("assets", "generated", "atlas"), assets_directory: str = "assets"):
+        """Initialises a SpriteAtlas object, which packs the portraits shown in a popup into a single image, so the
+        popup loads and decodes one file instead of one file per portrait.
+
+        Portraits are added to the next free cell when they are first shown, so the atlas is only extended with the
+        portraits that arrived since it was last saved. Each save writes a new version of the atlas file, as the UI
+        caches images by their path. Atlas files left over from a previous game with the same name are deleted.
+
+        :param name: The name of the atlas, used in the name of its file.
+        :param cell_size: The width and height of each portrait in the atlas.
+        :param columns: The number of portraits in each row of the atlas.
+        :param directory: The directory the atlas is saved in.
+        :param assets_directory: The assets directory of the app, used to get the path the UI loads the atlas from.
+        """
+        self.name = name
+        self.cell_size = cell_size
+        self.columns = columns
+        self.directory = directory
+        self.assets_directory = assets_directory
+        # key -> (left, top, width, height) of the portrait in the atlas
+        self.coordinates: Dict[str, tuple[int, int, int, int]] = {}
+        # created when the first portrait is added
+        self._image: "Image.Image | None" = None
+        self._path: str | None = None
+        self._changed: bool = False
+
+        if os.path.isdir(directory):
+            for file in os.listdir(directory):
+                if file.startswith(f"{name}_") and file.endswith(".png"):
+                    os.remove(os.path.join(directory, file))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.coordinates
+
+    @property
+    def width(self) -> int:
+        """Fetches the width of the atlas image.
+
+        :return: The width in pixels.
+        """
+        return self._image.width if self._image is not None else self.cell_size * self.columns
+
+    @property
+    def height(self) -> int:
+        """Fetches the height of the atlas image.
+
+        :return: The height in pixels.
+        """
+        return self._image.height if self._image is not None else self.cell_size
+
+    @property
+    def src(self) -> str | None:
+        """Fetches the path of the latest saved atlas relative to the assets directory, which is used by Flet images.
+
+        :return: The relative path of the atlas, or None if it hasn't been saved yet.
+        """
+        if self._path is None:
+            return None
+        return os.path.relpath(self._path, self.assets_directory).replace(os.sep, "/")
+
+    def add(self, key: str, path: str) -> bool:
+        """Adds a portrait to the next free cell of the atlas, growing the atlas if it is full.
+
+        :param key: The key the portrait is looked up by, e.g. the name of the character.
+        :param path: The path of the portrait.
+        :return: True if the portrait was added, or False if it was already in the atlas or couldn't be read.
+        """
+        if key in self.coordinates:
+            return False
+        from PIL import Image
+        try:
+            with Image.open(path) as portrait:
+                sprite: Image.Image = portrait.convert("RGBA")
+        except OSError as error:
+            print(f"Error adding {key} to the atlas: {error!r}")
+            return False
+        if sprite.size != (self.cell_size, self.cell_size):
+            sprite = sprite.resize((self.cell_size, self.cell_size), Image.Resampling.NEAREST)
+
+        index: int = len(self.coordinates)
+        left: int = (index % self.columns) * self.cell_size
+        top: int = (index // self.columns) * self.cell_size
+        if self._image is None:
+            self._image = Image.new("RGBA", (self.cell_size * self.columns, self.cell_size), (0, 0, 0, 0))
+        if top + self.cell_size > self._image.height:
+            # double the number of rows, so the atlas is only copied a few times as it grows
+            grown: Image.Image = Image.new("RGBA", (self._image.width, self._image.height * 2), (0, 0, 0, 0))
+            grown.paste(self._image, (0, 0))
+            self._image = grown
+
+        self._image.paste(sprite, (left, top))
+        self.coordinates[key] = (left, top, self.cell_size, self.cell_size)
+        self._changed = True
+        return True
+
+    def save(self) -> str | None:
+        """Saves the atlas if portraits were added since it was last saved, deleting the previous version.
+
+        :return: The path of the atlas relative to the assets directory, or None if the atlas is empty.
+        """
+        if not self._changed:
+            return self.src
+
+        path: str = os.path.join(self.directory, f"{self.name}_{next(_versions)}.png")
+        os.makedirs(self.directory, exist_ok=True)
+        self._image.save(path, format="PNG", optimize=True)
+        if self._path is not None and os.path.exists(self._path):
+            os.remove(self._path)
+        self._path = path
+        self._changed = False
+        return self.src
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from typing import Callable, Awaitable
+
+# the time between two frames of the typewriter effect, in seconds
+FRAME_TIME: float = 1 / 60
+# the speed of the typewriter effect in characters per second
+DEFAULT_CHARACTERS_PER_SECOND: float = 50
+
+
+class Typewriter:
+    def __init__(self, characters_per_second: float = DEFAULT_CHARACTERS_PER_SECOND, frame_time: float = FRAME_TIME,
+                 clock: Callable[[], float] = time.perf_counter,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        """Initialises a Typewriter object, which reveals messages a few characters at a time.
+
+        The text shown is worked out from the time since the message started, once per frame, so the UI is updated at
+        most once per frame however fast the text is typed, and slow frames catch up instead of slowing the text down.
+
+        :param characters_per_second: The number of characters revealed each second. If it isn't positive, messages
+                                      are shown at once.
+        :param frame_time: The time between two updates of the UI, in seconds.
+        :param clock: The function returning the current time in seconds.
+        :param sleep: The coroutine function used to wait for the next frame.
+        """
+        self.characters_per_second = characters_per_second
+        self.frame_time = frame_time
+        self.last_update_count: int = 0
+        self._clock = clock
+        self._sleep = sleep
+        # incremented by skip, so every message being typed when it was called finishes at once
+        self._generation: int = 0
+        self._typing: int = 0
+
+    @property
+    def is_typing(self) -> bool:
+        """Checks whether a message is being typed.
+
+        :return: True if a message is being typed, otherwise False.
+        """
+        return self._typing > 0
+
+    def skip(self) -> None:
+        """Shows the rest of every message that is being typed on the next frame.
+
+        :return: None
+        """
+        self._generation += 1
+
+    async def type(self, text: str, render: Callable[[str], None]) -> int:
+        """Types a message, calling the render function with the text revealed so far whenever it changes.
+
+        :param text: The message.
+        :param render: The function that shows the text in the UI.
+        :return: The number of times the UI was updated.
+        """
+        generation: int = self._generation
+        start: float = self._clock()
+        shown: int = 0
+        updates: int = 0
+        self._typing += 1
+        try:
+            while shown < len(text):
+                if generation != self._generation or self.characters_per_second <= 0:
+                    count: int = len(text)
+                else:
+                    count = min(len(text), int((self._clock() - start) * self.characters_per_second))
+                if count > shown:
+                    shown = count
+                    render(text[:shown])
+                    updates += 1
+                if shown < len(text):
+                    await self._sleep(self.frame_time)
+        finally:
+            self._typing -= 1
+        self.last_update_count = updates
+        return updates
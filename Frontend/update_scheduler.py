@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from typing import Callable, List
+
+from Frontend.typewriter import FRAME_TIME
+
+
+class UpdateScheduler:
+    def __init__(self, update: Callable[..., None], loop: asyncio.AbstractEventLoop, frame_time: float = FRAME_TIME,
+                 clock: Callable[[], float] = time.perf_counter):
+        """Initialises an UpdateScheduler object, which merges the UI updates requested within a frame into one.
+
+        Handlers mark the controls they changed as dirty instead of updating the page, and the dirty controls are sent
+        at most once per frame, so a burst of changes, e.g. validating a text field on every key press, costs one
+        update instead of one per change.
+
+        :param update: The function updating the UI, e.g. ``page.update``. It is called with the dirty controls, or
+                       without arguments to update the whole page.
+        :param loop: The event loop the updates are sent from.
+        :param frame_time: The shortest time between two updates, in seconds.
+        :param clock: The function returning the current time in seconds.
+        """
+        self.update = update
+        self.loop = loop
+        self.frame_time = frame_time
+        self.requests: int = 0
+        self.flushes: int = 0
+        # the requests that were merged into an update that was already scheduled
+        self.suppressed: int = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._dirty: List = []
+        self._whole_page: bool = False
+        self._scheduled: bool = False
+        self._handle: asyncio.TimerHandle | None = None
+        self._last_flush: float = float("-inf")
+
+    @property
+    def pending(self) -> bool:
+        """Checks whether an update is waiting to be sent.
+
+        :return: True if controls are dirty, otherwise False.
+        """
+        return self._scheduled
+
+    def request(self, *controls) -> None:
+        """Marks controls as dirty, so they are updated on the next frame. This can be called from any thread.
+
+        :param controls: The controls that changed. If none are given, the whole page is updated.
+        :return: None
+        """
+        with self._lock:
+            self.requests += 1
+            if self._scheduled:
+                self.suppressed += 1
+            if not controls:
+                self._whole_page = True
+            elif not self._whole_page:
+                for control in controls:
+                    if not any(control is dirty for dirty in self._dirty):
+                        self._dirty.append(control)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            running: bool = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            running = False
+        if running:
+            self._schedule()
+        else:
+            self.loop.call_soon_threadsafe(self._schedule)
+
+    def _schedule(self) -> None:
+        delay: float = max(0.0, self._last_flush + self.frame_time - self._clock())
+        self._handle = self.loop.call_later(delay, self.flush)
+
+    def flush(self) -> None:
+        """Sends the dirty controls now, e.g. before the event loop is blocked.
+
+        :return: None
+        """
+        with self._lock:
+            if self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+            if not self._scheduled:
+                return
+            controls: List = [] if self._whole_page else self._dirty
+            self._dirty = []
+            self._whole_page = False
+            self._scheduled = False
+            self.flushes += 1
+            self._last_flush = self._clock()
+        try:
+            self.update(*controls)
+        except Exception as error:
+            print(f"Error updating the page: {error!r}")
@@ -0,0 +1,685 @@
+import argparse
+import asyncio
+import json
+import os
+import uuid
+from typing import List, Dict, TypeVar, Any, AsyncIterator, Iterator
+from urllib.parse import parse_qs, urlsplit
+
+from Classes.Timeline import DEFAULT_PAGE_SIZE
+from Engine import turn_pipeline
+from Server.session_manager import SessionManager, DEFAULT_MEMORY_BUDGET, DEFAULT_LATENCY_TARGET
+from Utilities import utils, openai_api, update_attr
+from Utilities.dice import Dice
+from Utilities.session import Session
+
+V = TypeVar("V")
+
+MAX_BODY_SIZE: int = 1024 * 1024
+GAME_STATE_FILE: str = "game_state.json"
+STATUS_TEXT: Dict[int, str] = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+                               405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+                               500: "Internal Server Error"}
+_STREAM_END = object()
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        """Initialises an HTTPError object, raised when a request can't be handled.
+
+        :param status: The HTTP status code of the response.
+        :param message: The error message returned to the client.
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ServerGame:
+    def __init__(self, game_id: str, session: Session):
+        """Initialises a ServerGame object, which holds the state of a game hosted by the server.
+        The story state kept by ``GameApp`` in the desktop app (the recent stories, the random event countdown and
+        the deceased characters) is kept here for every game.
+
+        :param game_id: The ID of the game.
+        :param session: The session of the game, which owns its Engine and conversations.
+        """
+        self.game_id = game_id
+        self.session = session
+        self.recent_stories: List[str] = []
+        # the countdown is drawn from the game's dice, so a seeded game is reproducible
+        self.event_count: int = session.dice.random.randint(1, 10)
+        self.deceased_character_line: str = ""
+        self.is_dead: bool = False
+        # only one action of a game is processed at a time
+        self.lock = asyncio.Lock()
+
+    @property
+    def engine(self):
+        """Fetches the Engine of the game.
+
+        :return: The Engine object.
+        """
+        return self.session.engine
+
+    def get_stats(self) -> Dict[str, V]:
+        """Fetches the stats of the main character.
+
+        :return: A dictionary containing the HP, luck, charisma, money and physical condition of the main character.
+        """
+        main_char = self.engine.mainCharacter
+        return {"hp": main_char.hp, "luck": main_char.luck, "cha": main_char.cha, "money": main_char.money,
+                "physical_condition": main_char.physical_condition, "is_dead": self.is_dead}
+
+    def to_state(self) -> Dict[str, V]:
+        """Fetches the state of the game that isn't included in its save file.
+
+        :return: A dictionary containing the recent stories, the random event countdown, the deceased characters,
+                 whether the main character is dead, the counters of the session and the state of its dice.
+        """
+        return {"recent_stories": self.recent_stories, "event_count": self.event_count,
+                "deceased_character_line": self.deceased_character_line, "is_dead": self.is_dead,
+                "new_char_count": self.session.new_char_count, "reset_count": self.session.reset_count,
+                "dice": self.session.dice.get_state()}
+
+    def restore_state(self, state: Dict[str, V]) -> None:
+        """Restores the state of the game returned by ``to_state``.
+
+        :param state: A dictionary containing the state of the game.
+        :return: None
+        """
+        self.recent_stories = state["recent_stories"]
+        self.event_count = state["event_count"]
+        self.deceased_character_line = state["deceased_character_line"]
+        self.is_dead = state["is_dead"]
+        self.session.new_char_count = state["new_char_count"]
+        self.session.reset_count = state["reset_count"]
+        if "dice" in state:
+            self.session.dice.set_state(state["dice"])
+
+    def add_recent_story(self, story: str) -> None:
+        """Adds a story to the three most recent stories.
+
+        :param story: The story generated by ChatGPT.
+        :return: None
+        """
+        if len(self.recent_stories) >= 3:
+            self.recent_stories.pop(0)
+        self.recent_stories.append(story)
+
+
+async def iterate_in_thread(iterator: Iterator[V]) -> AsyncIterator[V]:
+    """Consumes a blocking iterator in a worker thread, yielding its items without blocking the event loop.
+
+    :param iterator: The blocking iterator, e.g. the chunks from ``openai_api.stream_story``.
+    :return: An asynchronous iterator of the items.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def produce() -> None:
+        try:
+            for item in iterator:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except Exception as error:
+            loop.call_soon_threadsafe(queue.put_nowait, error)
+        loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
+
+    producer = asyncio.create_task(asyncio.to_thread(produce))
+    while True:
+        item = await queue.get()
+        if item is _STREAM_END:
+            break
+        if isinstance(item, Exception):
+            raise item
+        yield item
+    await producer
+
+
+class GameServer:
+    def __init__(self, client=None, async_client=None, save_directory: str = "server_saves",
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET, latency_target: float = DEFAULT_LATENCY_TARGET,
+                 dice_seed: int | None = None, checkpoints: bool = False, recall_target: float | None = None):
+        """Initialises a GameServer object, a headless HTTP server hosting many games at once.
+
+        Every game has its own Session, so the games don't share any conversations or counters. Actions are
+        answered with a Server-Sent Events stream, so the narration reaches the player while it is being generated.
+
+        Endpoints:
+            - ``POST /games``: Creates a game from the main character and world details, and returns the opening story.
+            - ``POST /games/<id>/actions``: Submits an action, streaming the events of the turn.
+            - ``GET /games/<id>``: Fetches the stats of the main character.
+            - ``GET /games/<id>/inventory``, ``/relationships`` and ``/timeline``: Fetches the game state. The timeline
+              can be searched with ``?q=<words>`` or paginated with ``?page=<number>&page_size=<size>``.
+            - ``POST /games/<id>/save``: Saves the game.
+            - ``POST /games/load``: Loads a saved game.
+            - ``GET /games``: Lists the IDs of the games hosted by the server.
+            - ``POST /games/<id>/unload``: Saves the game and stops hosting it, so another server can load it.
+            - ``GET /sessions``: Fetches the number and size of the resident and evicted games.
+
+        Idle games are evicted to their save files once the games go over the memory budget, and are rehydrated
+        the next time they are accessed.
+
+        :param client: The client used by every session for the story, NPC and world requests, e.g. a
+                       ``StandInClient``. Defaults to the OpenAI client.
+        :param async_client: The asynchronous client used by every session for the attribute updates.
+                             Defaults to the AsyncOpenAI client.
+        :param save_directory: The directory the games are saved to. Each game is saved in its own subdirectory.
+        :param memory_budget: The maximum estimated size of the resident games in bytes.
+        :param latency_target: The maximum number of seconds rehydrating an evicted game should take.
+        :param dice_seed: The seed the dice of every game are derived from, so the random events are reproducible.
+                          If it isn't provided, the dice are seeded randomly.
+        :param checkpoints: Whether to record a checkpoint of every game after each turn, so it can be rewound by
+                            code embedding the server. Each game's checkpoints keep a copy of its whole state in
+                            memory, so they are off by default.
+        :param recall_target: The share of the attribute changes from 0 to 1 that every game's update gate must not
+                              skip. If it isn't provided, the games request every attribute update.
+        """
+        self.client = client
+        self.async_client = async_client
+        self.save_directory = save_directory
+        self.dice_seed = dice_seed
+        self.checkpoints = checkpoints
+        self.recall_target = recall_target
+        self.sessions = SessionManager(self._evict, self.restore, memory_budget, latency_target)
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> tuple[str, int]:
+        """Starts listening for requests.
+
+        :param host: The host to listen on.
+        :param port: The port to listen on. If it is 0, a free port is picked.
+        :return: A tuple containing the host and port the server is listening on.
+        """
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self) -> None:
+        """Stops listening for requests.
+
+        :return: None
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def create_session(self, game_id: str) -> Session:
+        """Creates a session using the clients of the server, with its own dice.
+
+        :param game_id: The ID of the game, used to derive the seed of its dice.
+        :return: The Session object.
+        """
+        dice = Dice(f"{self.dice_seed}:{game_id}" if self.dice_seed is not None else None)
+        return Session(client=self.client, async_client=self.async_client, dice=dice,
+                       recall_target=self.recall_target)
+
+    async def get_game(self, game_id: str) -> ServerGame:
+        """Fetches a game hosted by the server, rehydrating it if it was evicted.
+
+        :param game_id: The ID of the game.
+        :return: The ServerGame object.
+        :raises HTTPError: If the game doesn't exist.
+        """
+        game: ServerGame | None = await self.sessions.get(game_id)
+        if game is None:
+            raise HTTPError(404, f"Game '{game_id}' is not found.")
+        return game
+
+    async def create_game(self, details: Dict[str, V]) -> Dict[str, V]:
+        """Creates a game and generates its opening story.
+
+        :param details: The main character and world details. Only the name and genre are required:
+                        - name, physical_condition, occupation, inventory, personality, money, hp, luck, cha and
+                          appearance of the main character (inventory and personality are comma-separated).
+                        - genre, rules (comma-separated) and environment of the world.
+                        - game_id, the ID of the game if it was picked by a router. Otherwise, a new ID is generated.
+        :return: A dictionary containing the ID of the game, the opening story and the stats of the main character.
+        :raises HTTPError: If the name or genre is missing, or the game ID is invalid or already in use.
+        """
+        if not details.get("name") or not details.get("genre"):
+            raise HTTPError(400, "The name and genre are required.")
+        game_id: str = str(details.get("game_id") or uuid.uuid4().hex)
+        self.get_game_directory(game_id)
+        if game_id in self.sessions:
+            raise HTTPError(409, f"Game '{game_id}' already exists.")
+
+        game = ServerGame(game_id, self.create_session(game_id))
+        session: Session = game.session
+        engine = game.engine
+
+        char_details = [details["name"], details.get("physical_condition", "Healthy"),
+                        details.get("occupation", "Adventurer"), details.get("inventory", ""),
+                        details.get("personality", ""), details.get("money", 50), details.get("hp", 100),
+                        details.get("luck", 10), details.get("cha", 10), details.get("appearance", "")]
+        world_details = [details["genre"], details.get("rules", ""), details.get("environment", "")]
+        engine.mainCharacter = utils.get_character_details(char_details)
+        engine.add_world(utils.get_world_details(world_details))
+        engine.add_timeline({"key_events": []})
+
+        if not engine.world.rules:
+            await asyncio.to_thread(engine.update_world_rules, engine.world.genre)
+        if engine.world.environment == "":
+            await asyncio.to_thread(engine.update_world_environment, engine.world.genre)
+
+        openai_api.begin_story(session)
+        openai_api.begin_char_creation(engine.mainCharacter.name, session)
+        update_attr.begin_update_attr(session)
+
+        starting_prompt: str = utils.get_prompt(engine.world.genre, engine.mainCharacter.name,
+                                                engine.mainCharacter.cha, True,
+                                                json_dict_str=engine.get_formatted_string_array(), session=session)
+        start_message: str = await asyncio.to_thread(openai_api.get_story, starting_prompt, session)
+        game.add_recent_story(start_message)
+        start_message, money_updates = await turn_pipeline.validate_money(engine, start_message,
+                                                                          game.recent_stories, session)
+        await turn_pipeline.apply_story_updates(engine, start_message, start_message, money_updates, session)
+
+        await self.sessions.add(game)
+        return {"game_id": game.game_id, "story": start_message, "stats": game.get_stats()}
+
+    async def play_turn(self, game: ServerGame, user_input: str) -> AsyncIterator[Dict[str, V]]:
+        """Plays a turn of a game, following the same steps as the story screen of the desktop app.
+
+        The events yielded are:
+            - ``inventory``: The action uses items that aren't in the inventory, so the turn ends without a story.
+            - ``event``: A random event has occurred.
+            - ``narration``: A chunk of the story, as it is being generated.
+            - ``replace``: The story had to be regenerated because a character couldn't afford a transaction.
+            - ``ending``: The main character died, and this is the end of the story.
+            - ``done``: The turn has finished, containing the stats of the main character.
+
+        :param game: The game.
+        :param user_input: The action of the player.
+        :return: An asynchronous iterator of the events of the turn.
+        """
+        session: Session = game.session
+        engine = game.engine
+        genre: str = engine.world.genre
+
+        # perform the inventory check before any updates
+        check_responses: tuple[bool, str] = await engine.check_inventory(user_input)
+        if check_responses[0]:
+            yield {"type": "inventory", "text": f"{check_responses[1]}\nPlease use an item in your inventory: "
+                                                f"{engine.mainCharacter.inventory}"}
+            return
+
+        prev_money: float = engine.mainCharacter.money
+        char_id_list, char_name_list = turn_pipeline.get_char_lists(engine)
+        alive_characters: List[int] = [char.id for char in engine.characters if char.hp != 0]
+
+        event = None
+        random_event = None
+        if game.event_count == 1:
+            event = await asyncio.to_thread(engine.random_event, engine.mainCharacter.luck)
+            random_event = event[0]
+            yield {"type": "event", "text": utils.replace_id_with_name(event[0], char_id_list, char_name_list)}
+
+        char_deceased = game.deceased_character_line if game.deceased_character_line != "" else None
+        continuation_prompt: str = utils.get_prompt(genre, engine.mainCharacter.name, engine.mainCharacter.cha,
+                                                    False, user_input=user_input,
+                                                    char_str=engine.get_formatted_string_array()[0],
+                                                    new_char=len(alive_characters) < 10, random_event=random_event,
+                                                    char_deceased=char_deceased, session=session)
+
+        chunks: List[str] = []
+        async for chunk in iterate_in_thread(openai_api.stream_story(continuation_prompt, session)):
+            chunks.append(chunk)
+            yield {"type": "narration", "text": chunk}
+        streamed_story: str = "".join(chunks)
+        game.add_recent_story(streamed_story)
+
+        story, money_updates = await turn_pipeline.validate_money(engine, streamed_story, game.recent_stories,
+                                                                  session)
+        if story != streamed_story:
+            yield {"type": "replace", "text": story}
+
+        await turn_pipeline.create_npcs(engine, story, genre, session)
+        await turn_pipeline.apply_story_updates(engine, story, "\n".join(game.recent_stories), money_updates,
+                                                session)
+
+        if event is not None:
+            # make sure the random event doesn't double update
+            engine.double_update_check(event[1], event[2], prev_money)
+            game.event_count = session.dice.random.randint(2, 10)
+        game.event_count -= 1
+
+        mc_deceased_check, game.deceased_character_line = engine.check_characters_deceased(genre)
+        if mc_deceased_check:
+            game.is_dead = True
+            if game.deceased_character_line != "":
+                ending_story: str = await asyncio.to_thread(openai_api.get_story, game.deceased_character_line,
+                                                            session)
+                await engine.update_key_events(ending_story)
+                yield {"type": "ending", "text": ending_story}
+
+        if self.checkpoints:
+            engine.checkpoint()
+        yield {"type": "done", "stats": game.get_stats()}
+
+    def get_inventory(self, game: ServerGame) -> Dict[str, V]:
+        """Fetches the inventory of the main character.
+
+        :param game: The game.
+        :return: A dictionary containing the inventory of the main character.
+        """
+        return {"inventory": game.engine.mainCharacter.inventory}
+
+    def get_relationships(self, game: ServerGame) -> Dict[str, V]:
+        """Fetches the relationships of the main character, using the names of the other characters.
+
+        :param game: The game.
+        :return: A dictionary containing a dictionary mapping each character name to their relationship.
+        """
+        char_id_list, char_name_list = turn_pipeline.get_char_lists(game.engine)
+        relationships: Dict[str, str] = {}
+        for char_id, relationship in game.engine.mainCharacter.relationship.items():
+            name: str = char_name_list[char_id_list.index(int(char_id))] if int(char_id) in char_id_list \
+                else str(char_id)
+            relationships[name] = relationship
+        return {"relationships": relationships}
+
+    def get_timeline(self, game: ServerGame, query: Dict[str, str] | None = None) -> Dict[str, V]:
+        """Fetches the key events of the story, every event at once, a page of events, or the events matching a search.
+
+        :param game: The game.
+        :param query: The query parameters of the request: ``q`` to search the events, or ``page`` and ``page_size``
+                      to fetch a page of events.
+        :return: A dictionary containing the list of key events, or the matching entries with their turns and
+                 timestamps.
+        :raises HTTPError: If the page or page size isn't a number.
+        """
+        query = query or {}
+        timeline = game.engine.timeline
+        if "q" in query:
+            return {"query": query["q"], "entries": timeline.search(query["q"])}
+        if "page" in query:
+            try:
+                page: int = int(query["page"])
+                page_size: int = int(query.get("page_size", DEFAULT_PAGE_SIZE))
+            except ValueError:
+                raise HTTPError(400, "The page and page size must be numbers.")
+            if page_size < 1:
+                raise HTTPError(400, "The page size must be at least 1.")
+            return {"page": page, "pages": timeline.get_page_count(page_size),
+                    "entries": timeline.get_page(page, page_size)}
+        return {"key_events": timeline.get_event}
+
+    def get_game_directory(self, game_id: str) -> str:
+        """Fetches the directory a game is saved in.
+
+        :param game_id: The ID of the game.
+        :return: The path of the directory.
+        :raises HTTPError: If the game ID isn't valid.
+        """
+        if not game_id.isalnum():
+            raise HTTPError(400, f"'{game_id}' is not a valid game ID.")
+        return os.path.join(self.save_directory, game_id)
+
+    def _write_save(self, game: ServerGame) -> int:
+        """Writes the compact save file of a game and the state that isn't included in it.
+
+        :param game: The game.
+        :return: The size of the saved files in bytes.
+        """
+        directory: str = self.get_game_directory(game.game_id)
+        game.engine.save_game("compact", directory)
+        with open(os.path.join(directory, GAME_STATE_FILE), "w") as file:
+            json.dump(game.to_state(), file)
+        return sum(os.path.getsize(os.path.join(directory, file)) for file in os.listdir(directory))
+
+    async def save(self, game: ServerGame) -> Dict[str, V]:
+        """Saves a game in the compact save format.
+
+        :param game: The game.
+        :return: A dictionary containing the ID of the game and the name of the save file.
+        """
+        await asyncio.to_thread(self._write_save, game)
+        return {"game_id": game.game_id, "file": f"{game.engine.mainCharacter.name}_save_data.sav"}
+
+    async def _evict(self, game: ServerGame) -> int:
+        """Saves a game so it can be evicted from memory.
+
+        :param game: The game.
+        :return: The size of the saved files in bytes.
+        """
+        return await asyncio.to_thread(self._write_save, game)
+
+    async def unload(self, game_id: str) -> Dict[str, V]:
+        """Saves a game and stops hosting it, so it can be loaded by another server.
+        Evicted games are already saved, so they are not rehydrated.
+
+        :param game_id: The ID of the game.
+        :return: A dictionary containing the ID of the game.
+        :raises HTTPError: If the game doesn't exist.
+        """
+        if game_id in self.sessions.evicted:
+            self.sessions.remove(game_id)
+            return {"game_id": game_id}
+
+        game: ServerGame = await self.get_game(game_id)
+        async with game.lock:
+            saved: Dict[str, V] = await self.save(game)
+            self.sessions.remove(game_id)
+        return saved
+
+    async def restore(self, game_id: str) -> ServerGame:
+        """Restores a game from its save files into a new session.
+        The story history is only decoded from the compact save once it is needed.
+
+        :param game_id: The ID of the game.
+        :return: The ServerGame object.
+        :raises HTTPError: If the game has never been saved.
+        """
+        directory: str = self.get_game_directory(game_id)
+        files: List[str] = [file for file in os.listdir(directory) if file.endswith(("_save_data.sav",
+                                                                                         "_save_data.json"))] \
+            if os.path.isdir(directory) else []
+        if not files:
+            raise HTTPError(404, f"Game '{game_id}' has not been saved.")
+
+        game = ServerGame(game_id, self.create_session(game_id))
+        await asyncio.to_thread(game.engine.load_save, files[0], directory)
+        state_path: str = os.path.join(directory, GAME_STATE_FILE)
+        if os.path.exists(state_path):
+            with open(state_path, "r") as file:
+                game.restore_state(json.load(file))
+
+        # the story history already starts with the system instructions
+        openai_api.begin_char_creation(game.engine.mainCharacter.name, game.session)
+        update_attr.begin_update_attr(game.session)
+        return game
+
+    async def load(self, game_id: str) -> Dict[str, V]:
+        """Loads a saved game into a new session, replacing the game if it is already hosted.
+
+        :param game_id: The ID of the game.
+        :return: A dictionary containing the ID of the game and the stats of the main character.
+        :raises HTTPError: If the game has never been saved.
+        """
+        game: ServerGame = await self.restore(game_id)
+        self.sessions.remove(game_id)
+        await self.sessions.add(game)
+        return {"game_id": game_id, "stats": game.get_stats()}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handles a single HTTP request, then closes the connection.
+
+        :param reader: The stream the request is read from.
+        :param writer: The stream the response is written to.
+        :return: None
+        """
+        try:
+            method, path, body = await read_request(reader)
+            await self._route(method, path, body, writer)
+        except HTTPError as error:
+            await write_json(writer, error.status, {"error": error.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as error:
+            print(f"Error handling request: {error!r}")
+            await write_json(writer, 500, {"error": "Internal server error."})
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: Dict[str, V], writer: asyncio.StreamWriter) -> None:
+        """Calls the handler of an endpoint and writes its response.
+
+        :param method: The HTTP method of the request.
+        :param path: The path of the request.
+        :param body: The JSON body of the request.
+        :param writer: The stream the response is written to.
+        :return: None
+        :raises HTTPError: If the endpoint doesn't exist.
+        """
+        url = urlsplit(path)
+        parts: List[str] = [part for part in url.path.split("/") if part]
+        query: Dict[str, str] = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if parts == ["games"] and method == "POST":
+            await write_json(writer, 201, await self.create_game(body))
+        elif parts == ["games"] and method == "GET":
+            await write_json(writer, 200, {"game_ids": self.sessions.game_ids})
+        elif parts == ["sessions"] and method == "GET":
+            await write_json(writer, 200, self.sessions.get_stats())
+        elif parts == ["games", "load"] and method == "POST":
+            await write_json(writer, 200, await self.load(str(body.get("game_id", ""))))
+        elif len(parts) == 2 and parts[0] == "games" and method == "GET":
+            game: ServerGame = await self.get_game(parts[1])
+            await write_json(writer, 200, {"game_id": game.game_id, "stats": game.get_stats()})
+        elif len(parts) == 3 and parts[0] == "games" and parts[2] == "unload" and method == "POST":
+            await write_json(writer, 200, await self.unload(parts[1]))
+        elif len(parts) == 3 and parts[0] == "games":
+            game = await self.get_game(parts[1])
+            if parts[2] == "actions" and method == "POST":
+                await self._stream_turn(game, str(body.get("input", "")), writer)
+            elif parts[2] == "save" and method == "POST":
+                async with game.lock:
+                    await write_json(writer, 200, await self.save(game))
+            elif parts[2] == "inventory" and method == "GET":
+                await write_json(writer, 200, self.get_inventory(game))
+            elif parts[2] == "relationships" and method == "GET":
+                await write_json(writer, 200, self.get_relationships(game))
+            elif parts[2] == "timeline" and method == "GET":
+                await write_json(writer, 200, self.get_timeline(game, query))
+            else:
+                raise HTTPError(404, f"'{method} {path}' is not found.")
+        else:
+            raise HTTPError(404, f"'{method} {path}' is not found.")
+
+    async def _stream_turn(self, game: ServerGame, user_input: str, writer: asyncio.StreamWriter) -> None:
+        """Plays a turn and streams its events to the client as Server-Sent Events.
+
+        :param game: The game.
+        :param user_input: The action of the player.
+        :param writer: The stream the events are written to.
+        :return: None
+        :raises HTTPError: If the action is empty or the main character is dead.
+        """
+        if user_input.strip() == "":
+            raise HTTPError(400, "The input is required.")
+        if game.is_dead:
+            raise HTTPError(409, "The story has ended.")
+        if game.lock.locked():
+            raise HTTPError(409, "An action is already being processed.")
+
+        async with game.lock:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                         b"Connection: close\r\n\r\n")
+            try:
+                async for event in self.play_turn(game, user_input):
+                    writer.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8"))
+                    await writer.drain()
+            except ConnectionError:
+                raise
+            except Exception as error:
+                print(f"Error playing turn: {error!r}")
+                writer.write(f"event: error\ndata: {json.dumps({'type': 'error'})}\n\n".encode("utf-8"))
+                await writer.drain()
+        await self.sessions.touch(game)
+
+
+async def read_request(reader: asyncio.StreamReader) -> tuple[str, str, Dict[str, V]]:
+    """Reads an HTTP request.
+
+    :param reader: The stream the request is read from.
+    :return: A tuple containing the method, the path and the JSON body of the request (empty if there's no body).
+    :raises HTTPError: If the request is malformed or the body is too large.
+    """
+    request_line: str = (await reader.readline()).decode("latin-1").strip()
+    if request_line == "":
+        raise ConnectionError("The connection was closed before a request was sent.")
+    try:
+        method, path, _ = request_line.split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line.")
+
+    headers: Dict[str, str] = {}
+    while True:
+        line: str = (await reader.readline()).decode("latin-1").strip()
+        if line == "":
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length: int = int(headers.get("content-length", "0") or 0)
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(413, "The request body is too large.")
+    body: Dict[str, V] = {}
+    if length > 0:
+        try:
+            body = json.loads(await reader.readexactly(length))
+        except json.JSONDecodeError:
+            raise HTTPError(400, "The request body is not valid JSON.")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "The request body must be a JSON object.")
+    return method.upper(), path, body
+
+
+async def write_json(writer: asyncio.StreamWriter, status: int, data: Dict[str, Any]) -> None:
+    """Writes a JSON response.
+
+    :param writer: The stream the response is written to.
+    :param status: The HTTP status code.
+    :param data: The JSON body of the response.
+    :return: None
+    """
+    body: bytes = json.dumps(data).encode("utf-8")
+    writer.write(f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+
+
+async def main() -> None:
+    """Runs the game server until it is interrupted.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Runs the headless game server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--save-directory", default="server_saves")
+    parser.add_argument("--stand-in", action="store_true", help="use the local stand-in instead of ChatGPT")
+    parser.add_argument("--memory-budget", type=int, default=DEFAULT_MEMORY_BUDGET // (1024 * 1024),
+                        help="the memory budget of the resident games in megabytes")
+    parser.add_argument("--dice-seed", type=int, help="the seed of the dice, to make the random events reproducible")
+    parser.add_argument("--checkpoints", action="store_true", help="record a checkpoint of every game after each turn")
+    parser.add_argument("--recall-target", type=float,
+                        help="skip the attribute updates a turn can't trigger, still updating this share of changes")
+    args = parser.parse_args()
+
+    client, async_client = None, None
+    if args.stand_in:
+        from Server.stand_in_llm import StandInLLM, StandInClient, AsyncStandInClient
+        llm = StandInLLM()
+        client, async_client = StandInClient(llm), AsyncStandInClient(llm)
+
+    server = GameServer(client, async_client, args.save_directory, args.memory_budget * 1024 * 1024,
+                        dice_seed=args.dice_seed, checkpoints=args.checkpoints, recall_target=args.recall_target)
+    host, port = await server.start(args.host, args.port)
+    print(f"Game server listening on http://{host}:{port}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+import asyncio
+import json
+from typing import Dict, TypeVar, Any
+
+V = TypeVar("V")
+
+
+async def send_request(host: str, port: int, method: str, path: str, body: Dict[str, V] | None = None) -> \
+        tuple[int, bytes]:
+    """Sends an HTTP request to the game server and reads the whole response.
+
+    :param host: The host of the server.
+    :param port: The port of the server.
+    :param method: The HTTP method.
+    :param path: The path of the endpoint.
+    :param body: The JSON body of the request.
+    :return: A tuple containing the status code and the body of the response.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    data: bytes = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+    await writer.drain()
+
+    status: int = int((await reader.readline()).split()[1])
+    while (await reader.readline()).strip():
+        pass
+    response: bytes = await reader.read()
+    writer.close()
+    return status, response
+
+
+async def request_json(host: str, port: int, method: str, path: str, body: Dict[str, V] | None = None) -> \
+        Dict[str, Any]:
+    """Sends an HTTP request to the game server and decodes its JSON response.
+
+    :param host: The host of the server.
+    :param port: The port of the server.
+    :param method: The HTTP method.
+    :param path: The path of the endpoint.
+    :param body: The JSON body of the request.
+    :return: The JSON response.
+    :raises RuntimeError: If the server didn't respond successfully.
+    """
+    status, response = await send_request(host, port, method, path, body)
+    if status >= 400:
+        raise RuntimeError(f"{method} {path} failed with status {status}: {response.decode('utf-8')}")
+    return json.loads(response)
@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import List, Dict, TypeVar, Any
+
+from Server.http_client import request_json
+
+V = TypeVar("V")
+
+
+async def submit_action(host: str, port: int, game_id: str, user_input: str) -> tuple[List[Dict[str, Any]], float]:
+    """Submits an action to the game server and reads the streamed events of the turn.
+
+    :param host: The host of the server.
+    :param port: The port of the server.
+    :param game_id: The ID of the game.
+    :param user_input: The action of the player.
+    :return: A tuple containing the list of events and the number of seconds until the first narration chunk
+             arrived.
+    :raises RuntimeError: If the server didn't respond successfully.
+    """
+    start: float = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    data: bytes = json.dumps({"input": user_input}).encode("utf-8")
+    writer.write(f"POST /games/{game_id}/actions HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+    await writer.drain()
+
+    status: int = int((await reader.readline()).split()[1])
+    while (await reader.readline()).strip():
+        pass
+    if status >= 400:
+        response: bytes = await reader.read()
+        writer.close()
+        raise RuntimeError(f"Action failed with status {status}: {response.decode('utf-8')}")
+
+    events: List[Dict[str, Any]] = []
+    first_chunk: float = 0.0
+    async for line in reader:
+        if line.startswith(b"data: "):
+            event: Dict[str, Any] = json.loads(line[6:])
+            if event["type"] == "narration" and first_chunk == 0.0:
+                first_chunk = time.perf_counter() - start
+            events.append(event)
+    writer.close()
+    return events, first_chunk
+
+
+def get_percentile(values: List[float], percentile: float) -> float:
+    """Fetches a percentile of a list of values.
+
+    :param values: The values.
+    :param percentile: The percentile between 0 and 100.
+    :return: The value at the percentile, or 0 if there are no values.
+    """
+    if not values:
+        return 0.0
+    ordered: List[float] = sorted(values)
+    index: int = min(len(ordered) - 1, round(percentile / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def run_load_test(host: str, port: int, sessions: int = 20, turns: int = 3, concurrency: int = 10) -> \
+        Dict[str, float]:
+    """Plays many games against the game server at once, measuring its throughput and latency.
+
+    :param host: The host of the server.
+    :param port: The port of the server.
+    :param sessions: The number of games to play.
+    :param turns: The number of actions submitted in each game.
+    :param concurrency: The maximum number of games played at the same time.
+    :return: A dictionary containing the number of sessions completed per second, and the median, 95th percentile
+             and maximum latency of the turns and of the first narration chunk in milliseconds.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    turn_latencies: List[float] = []
+    first_chunk_latencies: List[float] = []
+    errors: List[str] = []
+
+    async def play(index: int) -> None:
+        async with semaphore:
+            try:
+                game: Dict[str, Any] = await request_json(host, port, "POST", "/games",
+                                                          {"name": f"Player{index}", "genre": "Fantasy"})
+                for turn in range(turns):
+                    start: float = time.perf_counter()
+                    events, first_chunk = await submit_action(host, port, game["game_id"],
+                                                              f"Look around the town for clue number {turn}")
+                    turn_latencies.append(time.perf_counter() - start)
+                    first_chunk_latencies.append(first_chunk)
+                    if events and events[-1]["type"] == "done" and events[-1]["stats"]["is_dead"]:
+                        break
+                await request_json(host, port, "GET", f"/games/{game['game_id']}/timeline")
+            except (RuntimeError, ConnectionError) as error:
+                errors.append(str(error))
+
+    start: float = time.perf_counter()
+    await asyncio.gather(*(play(index) for index in range(sessions)))
+    elapsed: float = time.perf_counter() - start
+
+    return {
+        "sessions": sessions,
+        "errors": len(errors),
+        "elapsed_seconds": elapsed,
+        "sessions_per_second": (sessions - len(errors)) / elapsed,
+        "turn_p50_ms": get_percentile(turn_latencies, 50) * 1000,
+        "turn_p95_ms": get_percentile(turn_latencies, 95) * 1000,
+        "turn_max_ms": max(turn_latencies, default=0.0) * 1000,
+        "first_chunk_p50_ms": get_percentile(first_chunk_latencies, 50) * 1000,
+        "first_chunk_p95_ms": get_percentile(first_chunk_latencies, 95) * 1000
+    }
+
+
+async def main() -> None:
+    """Runs the load test against a running server, or against a local server using the stand-in for ChatGPT.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Load tests the headless game server.")
+    parser.add_argument("--host", help="the host of a running server, otherwise a local server is started")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="the latency of each response of the local stand-in in seconds")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="the number of worker processes of the local server, or 0 for a single process")
+    args = parser.parse_args()
+
+    server = None
+    host, port = args.host, args.port
+    if host is None and args.workers > 0:
+        from Server.shard_router import ShardedRuntime
+        server = ShardedRuntime(args.workers, tempfile.mkdtemp(), args.latency)
+        host, port = await server.start("127.0.0.1", 0)
+    elif host is None:
+        from Server.game_server import GameServer
+        from Server.stand_in_llm import StandInLLM, StandInClient, AsyncStandInClient
+        llm = StandInLLM(latency=args.latency, seed=0)
+        server = GameServer(StandInClient(llm), AsyncStandInClient(llm), tempfile.mkdtemp())
+        host, port = await server.start("127.0.0.1", 0)
+
+    results: Dict[str, float] = await run_load_test(host, port, args.sessions, args.turns, args.concurrency)
+    for name, value in results.items():
+        print(f"{name}: {value:.2f}" if isinstance(value, float) else f"{name}: {value}")
+    if server is not None:
+        await server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
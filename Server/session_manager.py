@@ -0,0 +1,207 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from typing import List, Dict, TypeVar, Any, Callable, Awaitable
+
+from Utilities.session import STORY_MESSAGES, UPDATE_ATTR_MESSAGES
+
+V = TypeVar("V")
+
+DEFAULT_MEMORY_BUDGET: int = 256 * 1024 * 1024
+DEFAULT_LATENCY_TARGET: float = 0.05
+
+
+def estimate_size(game) -> int:
+    """Estimates the memory used by a game from the size of its serialised state.
+    This is the size of the Engine objects and every conversation array of the session, which are what grows as
+    the game goes on. A story history that hasn't been decoded from a compact save yet isn't counted.
+
+    :param game: The ServerGame object.
+    :return: The estimated size of the game in bytes.
+    """
+    engine = game.engine
+    state: Dict[str, V] = {
+        "world": engine.world.to_dict() if engine.world else {},
+        "characters": [char.to_dict() for char in engine.characters],
+        "timeline": engine.timeline.to_dict() if engine.timeline else {},
+        "main_character": engine.mainCharacter.to_dict() if engine.mainCharacter else {},
+        "recent_stories": game.recent_stories
+    }
+    size: int = len(json.dumps(state))
+    for name in STORY_MESSAGES + UPDATE_ATTR_MESSAGES:
+        size += len(json.dumps(getattr(game.session, name)))
+    return size
+
+
+class SessionManager:
+    def __init__(self, evict_game: Callable[[Any], Awaitable[int]], restore_game: Callable[[str], Awaitable[Any]],
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET, latency_target: float = DEFAULT_LATENCY_TARGET):
+        """Initialises a SessionManager object, which keeps the games of a server within a memory budget.
+
+        The games are kept in least-recently-used order. Once the estimated size of the resident games goes over
+        the budget, the least recently used games are evicted to their save files, and they are rehydrated the next
+        time they are accessed. Games with an action in progress are never evicted, and neither is the most
+        recently used game.
+
+        :param evict_game: An async function saving a game to disk, returning the size of its save files in bytes.
+        :param restore_game: An async function restoring a game from its save files when given its ID.
+        :param memory_budget: The maximum estimated size of the resident games in bytes.
+        :param latency_target: The maximum number of seconds a rehydration should take. Slower rehydrations are
+                               counted in the stats.
+        """
+        self._evict_game = evict_game
+        self._restore_game = restore_game
+        self.memory_budget = memory_budget
+        self.latency_target = latency_target
+        self.resident: OrderedDict[str, Any] = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self.evicted: Dict[str, int] = {}
+        self._restoring: Dict[str, asyncio.Future] = {}
+        self._evicting: Dict[str, asyncio.Future] = {}
+        self.eviction_count: int = 0
+        # the latency of the most recent rehydrations
+        self.rehydration_times: deque[float] = deque(maxlen=1000)
+        self.rehydration_count: int = 0
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self.resident or game_id in self.evicted or game_id in self._evicting
+
+    @property
+    def game_ids(self) -> List[str]:
+        """Fetches the IDs of every game, whether it is resident or evicted.
+
+        :return: A list of game IDs.
+        """
+        return list(self.resident) + list(self._evicting) + list(self.evicted)
+
+    @property
+    def resident_bytes(self) -> int:
+        """Fetches the estimated size of the resident games.
+
+        :return: The size in bytes.
+        """
+        return sum(self._sizes.values())
+
+    async def get(self, game_id: str):
+        """Fetches a game, rehydrating it if it was evicted, and marks it as the most recently used.
+
+        :param game_id: The ID of the game.
+        :return: The ServerGame object, or None if the game doesn't exist.
+        """
+        if game_id in self.resident:
+            self.resident.move_to_end(game_id)
+            return self.resident[game_id]
+        if game_id in self._restoring:
+            return await asyncio.shield(self._restoring[game_id])
+        if game_id in self._evicting:
+            # wait for the game to be saved before restoring it
+            await asyncio.shield(self._evicting[game_id])
+            return await self.get(game_id)
+        if game_id not in self.evicted:
+            return None
+
+        restoring: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._restoring[game_id] = restoring
+        start: float = time.perf_counter()
+        try:
+            game = await self._restore_game(game_id)
+        except Exception as error:
+            restoring.set_exception(error)
+            # the exception is raised by this call, so it doesn't need to be retrieved from the future
+            restoring.exception()
+            raise
+        finally:
+            del self._restoring[game_id]
+        elapsed: float = time.perf_counter() - start
+        self.rehydration_times.append(elapsed)
+        self.rehydration_count += 1
+        if elapsed > self.latency_target:
+            print(f"Rehydrating game {game_id} took {elapsed * 1000:.1f}ms, over the "
+                  f"{self.latency_target * 1000:.0f}ms target")
+
+        self.evicted.pop(game_id, None)
+        await self.add(game)
+        restoring.set_result(game)
+        return game
+
+    async def add(self, game) -> None:
+        """Adds a game as the most recently used game, evicting other games if the budget is exceeded.
+
+        :param game: The ServerGame object.
+        :return: None
+        """
+        self.evicted.pop(game.game_id, None)
+        self.resident[game.game_id] = game
+        self.resident.move_to_end(game.game_id)
+        self._sizes[game.game_id] = estimate_size(game)
+        await self.enforce_budget()
+
+    async def touch(self, game) -> None:
+        """Updates the estimated size of a game after it changed, and marks it as the most recently used.
+
+        :param game: The ServerGame object.
+        :return: None
+        """
+        if game.game_id in self.resident:
+            await self.add(game)
+
+    def remove(self, game_id: str) -> None:
+        """Stops managing a game, whether it is resident or evicted. Its save files are kept.
+
+        :param game_id: The ID of the game.
+        :return: None
+        """
+        self.resident.pop(game_id, None)
+        self._sizes.pop(game_id, None)
+        self.evicted.pop(game_id, None)
+
+    async def enforce_budget(self) -> None:
+        """Evicts the least recently used games until the resident games fit in the memory budget.
+
+        :return: None
+        """
+        for game_id in list(self.resident)[:-1]:
+            if self.resident_bytes <= self.memory_budget:
+                break
+            game = self.resident.get(game_id)
+            if game is None or game.lock.locked():
+                continue
+
+            # the game stops being resident before it is saved, so it is restored from disk if it's accessed again
+            self.resident.pop(game_id)
+            size: int = self._sizes.pop(game_id)
+            evicting: asyncio.Future = asyncio.get_running_loop().create_future()
+            self._evicting[game_id] = evicting
+            try:
+                async with game.lock:
+                    self.evicted[game_id] = await self._evict_game(game)
+                self.eviction_count += 1
+            except OSError as error:
+                # keep the game resident if it couldn't be saved
+                print(f"Error evicting game {game_id}: {error!r}")
+                self.resident[game_id] = game
+                self.resident.move_to_end(game_id, last=False)
+                self._sizes[game_id] = size
+            finally:
+                del self._evicting[game_id]
+                evicting.set_result(None)
+
+    def get_stats(self) -> Dict[str, V]:
+        """Fetches the number and size of the resident and evicted games, and the rehydration latency.
+
+        :return: A dictionary containing the stats.
+        """
+        times: List[float] = sorted(self.rehydration_times)
+        return {
+            "resident_count": len(self.resident),
+            "resident_bytes": self.resident_bytes,
+            "evicted_count": len(self.evicted),
+            "evicted_bytes": sum(self.evicted.values()),
+            "memory_budget": self.memory_budget,
+            "evictions": self.eviction_count,
+            "rehydrations": self.rehydration_count,
+            "rehydration_p95_ms": times[min(len(times) - 1, round(0.95 * (len(times) - 1)))] * 1000 if times else 0.0,
+            "rehydrations_over_target": sum(1 for elapsed in times if elapsed > self.latency_target),
+            "latency_target_ms": self.latency_target * 1000
+        }
@@ -0,0 +1,439 @@
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import multiprocessing
+import uuid
+from typing import List, Dict, Set, TypeVar, Any
+
+from Server.game_server import HTTPError, read_request, write_json
+from Server.http_client import request_json
+
+V = TypeVar("V")
+
+VIRTUAL_NODES: int = 64
+
+
+def hash_key(key: str) -> int:
+    """Hashes a key onto the hash ring.
+
+    :param key: The key, e.g. a game ID or the name of a virtual node.
+    :return: The position of the key on the ring.
+    """
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    def __init__(self, nodes: List[str] | None = None, virtual_nodes: int = VIRTUAL_NODES):
+        """Initialises a HashRing object, which assigns keys to nodes using consistent hashing.
+
+        Every node is placed on the ring many times (virtual nodes) so the keys are spread evenly. When a node is
+        added or removed, only the keys between it and its neighbours move, so most games stay on their worker.
+
+        :param nodes: The names of the nodes on the ring.
+        :param virtual_nodes: The number of times each node is placed on the ring.
+        """
+        self._virtual_nodes = virtual_nodes
+        self._positions: List[int] = []
+        self._owners: Dict[int, str] = {}
+        for node in nodes or []:
+            self.add_node(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        """Fetches the names of the nodes on the ring.
+
+        :return: A sorted list of node names.
+        """
+        return sorted(set(self._owners.values()))
+
+    def add_node(self, node: str) -> None:
+        """Places a node on the ring.
+
+        :param node: The name of the node.
+        :return: None
+        """
+        for index in range(self._virtual_nodes):
+            position: int = hash_key(f"{node}#{index}")
+            if position not in self._owners:
+                bisect.insort(self._positions, position)
+            self._owners[position] = node
+
+    def remove_node(self, node: str) -> None:
+        """Removes a node from the ring.
+
+        :param node: The name of the node.
+        :return: None
+        """
+        for index in range(self._virtual_nodes):
+            position: int = hash_key(f"{node}#{index}")
+            if self._owners.get(position) == node:
+                del self._owners[position]
+                self._positions.pop(bisect.bisect_left(self._positions, position))
+
+    def copy(self) -> "HashRing":
+        """Copies the ring, so a change can be prepared without affecting the keys owned on this ring.
+
+        :return: The new HashRing object.
+        """
+        ring = HashRing(virtual_nodes=self._virtual_nodes)
+        ring._positions = list(self._positions)
+        ring._owners = dict(self._owners)
+        return ring
+
+    def get_node(self, key: str) -> str:
+        """Fetches the node that owns a key, which is the first node clockwise from the key on the ring.
+
+        :param key: The key, e.g. a game ID.
+        :return: The name of the node.
+        :raises LookupError: If there are no nodes on the ring.
+        """
+        if not self._positions:
+            raise LookupError("There are no nodes on the hash ring.")
+        index: int = bisect.bisect(self._positions, hash_key(key)) % len(self._positions)
+        return self._owners[self._positions[index]]
+
+
+def run_worker(port_queue, save_directory: str, stand_in_latency: float | None) -> None:
+    """Runs a game server in a worker process, reporting the port it listens on through a queue.
+
+    :param port_queue: The queue the port is put in once the server has started.
+    :param save_directory: The directory shared by every worker, used to hand games over between workers.
+    :param stand_in_latency: The latency of the local stand-in for ChatGPT in seconds, or None to use ChatGPT.
+    :return: None
+    """
+    from Server.game_server import GameServer
+
+    async def serve() -> None:
+        client, async_client = None, None
+        if stand_in_latency is not None:
+            from Server.stand_in_llm import StandInLLM, StandInClient, AsyncStandInClient
+            llm = StandInLLM(latency=stand_in_latency)
+            client, async_client = StandInClient(llm), AsyncStandInClient(llm)
+        server = GameServer(client, async_client, save_directory)
+        _, port = await server.start("127.0.0.1", 0)
+        port_queue.put(port)
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+class ShardedRuntime:
+    def __init__(self, workers: int = multiprocessing.cpu_count(), save_directory: str = "server_saves",
+                 stand_in_latency: float | None = None):
+        """Initialises a ShardedRuntime object, which spreads the games across several worker processes.
+
+        Every worker process runs its own game server and owns a subset of the games, so the CPU work of different
+        games (building prompts, parsing updates, saving) runs on different cores. The router in front of them
+        forwards every request to the worker that owns the game, picked by consistent hashing on the game ID.
+        When a worker is added or drained, the games that change owner are saved by their old worker and loaded
+        by their new one, through the save directory shared by the workers. Requests for those games wait until
+        they have moved, and if a handoff fails, the games are moved back and the previous ring is kept.
+
+        :param workers: The number of worker processes.
+        :param save_directory: The directory shared by every worker to save the games.
+        :param stand_in_latency: The latency of the local stand-in for ChatGPT in seconds, or None to use ChatGPT.
+        """
+        self.worker_count = workers
+        self.save_directory = save_directory
+        self.stand_in_latency = stand_in_latency
+        self.ring = HashRing()
+        self.workers: Dict[str, tuple[Any, int]] = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._moving: Dict[str, asyncio.Event] = {}
+        # cleared while the games to move are listed, so no request is routed by a ring that is about to change
+        self._ring_ready = asyncio.Event()
+        self._ring_ready.set()
+        # the requests creating or loading a game, which the ring waits for as the games don't exist yet
+        self._adding_games: Set[asyncio.Task] = set()
+        self._ring_lock = asyncio.Lock()
+        self._next_worker: int = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> tuple[str, int]:
+        """Starts the worker processes and the router.
+
+        :param host: The host the router listens on.
+        :param port: The port the router listens on. If it is 0, a free port is picked.
+        :return: A tuple containing the host and port the router is listening on.
+        """
+        await asyncio.gather(*(self.add_worker(rebalance=False) for _ in range(self.worker_count)))
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self) -> None:
+        """Stops the router and every worker process.
+
+        :return: None
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for name in list(self.workers):
+            self._stop_worker(name)
+
+    async def add_worker(self, rebalance: bool = True) -> str:
+        """Starts a worker process and places it on the hash ring.
+
+        :param rebalance: Whether to move the games that are now owned by the new worker to it.
+        :return: The name of the worker.
+        :raises HTTPError: If the games couldn't be handed over to the worker. The worker is stopped whenever the
+                           games couldn't be handed over.
+        """
+        name: str = f"worker-{self._next_worker}"
+        self._next_worker += 1
+        port_queue = self._context.Queue()
+        process = self._context.Process(target=run_worker,
+                                        args=(port_queue, self.save_directory, self.stand_in_latency), daemon=True)
+        process.start()
+        port: int = await asyncio.to_thread(port_queue.get)
+        self.workers[name] = (process, port)
+        if not rebalance:
+            self.ring.add_node(name)
+            return name
+        ring: HashRing = self.ring.copy()
+        ring.add_node(name)
+        try:
+            await self.change_ring(ring)
+        except Exception:
+            self._stop_worker(name)
+            raise
+        return name
+
+    async def drain_worker(self, name: str) -> int:
+        """Removes a worker from the hash ring, hands its games over to the remaining workers and stops it.
+
+        :param name: The name of the worker.
+        :return: The number of games handed over.
+        :raises HTTPError: If the worker doesn't exist or is the last worker, or if its games couldn't be handed
+                           over, in which case it keeps them.
+        """
+        if name not in self.workers:
+            raise HTTPError(404, f"Worker '{name}' is not found.")
+        if len(self.workers) == 1:
+            raise HTTPError(409, "The last worker can't be drained.")
+        ring: HashRing = self.ring.copy()
+        ring.remove_node(name)
+        moved: int = await self.change_ring(ring)
+        self._stop_worker(name)
+        return moved
+
+    def _stop_worker(self, name: str) -> None:
+        """Stops a worker process.
+
+        :param name: The name of the worker.
+        :return: None
+        """
+        process, _ = self.workers.pop(name)
+        self.ring.remove_node(name)
+        process.terminate()
+        process.join()
+
+    async def rebalance(self) -> int:
+        """Hands every game that isn't on the worker owning it on the hash ring over to its owner.
+
+        :return: The number of games handed over.
+        :raises HTTPError: If a game couldn't be handed over.
+        """
+        return await self.change_ring(self.ring.copy())
+
+    async def _list_handoffs(self, ring: HashRing) -> List[tuple[str, str, str]]:
+        """Lists the games that aren't on the worker owning them on a hash ring.
+
+        :param ring: The hash ring.
+        :return: A list of tuples containing the ID of each game, the worker hosting it and the worker owning it.
+        """
+        handoffs: List[tuple[str, str, str]] = []
+        for name, (_, port) in self.workers.items():
+            hosted: Dict[str, Any] = await request_json("127.0.0.1", port, "GET", "/games")
+            for game_id in hosted["game_ids"]:
+                owner: str = ring.get_node(game_id)
+                if owner != name:
+                    handoffs.append((game_id, name, owner))
+        return handoffs
+
+    async def change_ring(self, ring: HashRing) -> int:
+        """Replaces the hash ring and hands every game over to the worker owning it on the new ring.
+
+        Every game that moves is marked as moving before the ring is replaced, so its requests wait for the handoff
+        instead of reaching a worker that hasn't loaded it. If a handoff fails, the games already moved are moved
+        back and the previous ring is restored.
+
+        :param ring: The new hash ring.
+        :return: The number of games handed over.
+        :raises HTTPError: If a game couldn't be handed over.
+        """
+        async with self._ring_lock:
+            self._ring_ready.clear()
+            try:
+                if self._adding_games:
+                    await asyncio.wait(set(self._adding_games))
+                handoffs: List[tuple[str, str, str]] = await self._list_handoffs(ring)
+                moving: Dict[str, asyncio.Event] = {game_id: asyncio.Event() for game_id, _, _ in handoffs}
+                self._moving.update(moving)
+                previous: HashRing = self.ring
+                self.ring = ring
+            finally:
+                self._ring_ready.set()
+
+            try:
+                results: List[Any] = await asyncio.gather(*(self.handoff(game_id, source, target)
+                                                            for game_id, source, target in handoffs),
+                                                          return_exceptions=True)
+                errors: List[BaseException] = [result for result in results if isinstance(result, BaseException)]
+                if errors:
+                    await self._undo_handoffs(handoffs, results)
+                    self.ring = previous
+                    raise HTTPError(502, f"{len(errors)} games couldn't be handed over: {errors[0]!r}")
+                return len(handoffs)
+            finally:
+                for game_id, moved in moving.items():
+                    del self._moving[game_id]
+                    moved.set()
+
+    async def _undo_handoffs(self, handoffs: List[tuple[str, str, str]], results: List[Any]) -> None:
+        """Moves the games of a failed ring change back to the workers that hosted them.
+        Errors are printed, as the games are still saved in the shared save directory.
+
+        :param handoffs: The handoffs, as returned by ``_list_handoffs``.
+        :param results: The result of each handoff, which is an exception if it failed.
+        :return: None
+        """
+        for (game_id, source, target), result in zip(handoffs, results):
+            try:
+                if not isinstance(result, BaseException):
+                    await self.handoff(game_id, target, source)
+                    continue
+                # the game is still on its worker unless it was unloaded before the handoff failed
+                hosted: Dict[str, Any] = await request_json("127.0.0.1", self.workers[source][1], "GET", "/games")
+                if game_id not in hosted["game_ids"]:
+                    await request_json("127.0.0.1", self.workers[source][1], "POST", "/games/load",
+                                       {"game_id": game_id})
+            except Exception as error:
+                print(f"Error moving game '{game_id}' back to {source}: {error!r}")
+
+    async def handoff(self, game_id: str, source: str, target: str) -> None:
+        """Moves a game between two workers by saving it on one and loading it on the other.
+
+        :param game_id: The ID of the game.
+        :param source: The name of the worker hosting the game.
+        :param target: The name of the worker the game is moved to.
+        :return: None
+        """
+        await request_json("127.0.0.1", self.workers[source][1], "POST", f"/games/{game_id}/unload")
+        await request_json("127.0.0.1", self.workers[target][1], "POST", "/games/load", {"game_id": game_id})
+
+    async def get_status(self) -> Dict[str, V]:
+        """Fetches the workers and the number of games each of them hosts.
+
+        :return: A dictionary mapping each worker name to its port and game count.
+        """
+        status: Dict[str, V] = {}
+        for name, (_, port) in self.workers.items():
+            hosted: Dict[str, Any] = await request_json("127.0.0.1", port, "GET", "/games")
+            status[name] = {"port": port, "games": len(hosted["game_ids"])}
+        return {"workers": status}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handles a single HTTP request, forwarding it to the worker owning the game or answering it directly.
+
+        :param reader: The stream the request is read from.
+        :param writer: The stream the response is written to.
+        :return: None
+        """
+        try:
+            method, path, body = await read_request(reader)
+            parts: List[str] = [part for part in path.split("?")[0].split("/") if part]
+
+            if parts == ["workers"] and method == "GET":
+                await write_json(writer, 200, await self.get_status())
+            elif parts == ["workers"] and method == "POST":
+                await write_json(writer, 201, {"worker": await self.add_worker()})
+            elif len(parts) == 3 and parts[0] == "workers" and parts[2] == "drain" and method == "POST":
+                await write_json(writer, 200, {"moved": await self.drain_worker(parts[1])})
+            elif parts == ["games"] and method == "GET":
+                raise HTTPError(405, "The games are listed by each worker.")
+            elif parts == ["games"] and method == "POST":
+                # the router picks the ID so it knows which worker owns the new game
+                body["game_id"] = uuid.uuid4().hex
+                await self._forward(body["game_id"], method, path, body, writer, adds_game=True)
+            elif parts == ["games", "load"] and method == "POST":
+                await self._forward(str(body.get("game_id", "")), method, path, body, writer, adds_game=True)
+            elif len(parts) >= 2 and parts[0] == "games":
+                await self._forward(parts[1], method, path, body, writer)
+            else:
+                raise HTTPError(404, f"'{method} {path}' is not found.")
+        except HTTPError as error:
+            await write_json(writer, error.status, {"error": error.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as error:
+            print(f"Error routing request: {error!r}")
+            await write_json(writer, 500, {"error": "Internal server error."})
+        finally:
+            writer.close()
+
+    async def _forward(self, game_id: str, method: str, path: str, body: Dict[str, V],
+                       writer: asyncio.StreamWriter, adds_game: bool = False) -> None:
+        """Forwards a request to the worker owning a game, streaming its response back to the client.
+        Requests wait while the hash ring is changing and while the game is moving between workers.
+
+        :param game_id: The ID of the game.
+        :param method: The HTTP method of the request.
+        :param path: The path of the request.
+        :param body: The JSON body of the request.
+        :param writer: The stream the response is written to.
+        :param adds_game: Whether the request creates or loads the game, so a ring change waits for it to finish.
+        :return: None
+        """
+        while True:
+            await self._ring_ready.wait()
+            moved: asyncio.Event | None = self._moving.get(game_id)
+            if moved is None:
+                break
+            await moved.wait()
+        _, port = self.workers[self.ring.get_node(game_id)]
+        if adds_game:
+            task: asyncio.Task = asyncio.current_task()
+            self._adding_games.add(task)
+            task.add_done_callback(self._adding_games.discard)
+
+        worker_reader, worker_writer = await asyncio.open_connection("127.0.0.1", port)
+        data: bytes = json.dumps(body).encode("utf-8") if body else b""
+        worker_writer.write(f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+                            f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+        await worker_writer.drain()
+        try:
+            while chunk := await worker_reader.read(65536):
+                writer.write(chunk)
+                await writer.drain()
+        finally:
+            worker_writer.close()
+
+
+async def main() -> None:
+    """Runs the sharded game server until it is interrupted.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Runs the game server across several worker processes.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--save-directory", default="server_saves")
+    parser.add_argument("--stand-in", action="store_true", help="use the local stand-in instead of ChatGPT")
+    args = parser.parse_args()
+
+    runtime = ShardedRuntime(args.workers, args.save_directory, 0.0 if args.stand_in else None)
+    host, port = await runtime.start(args.host, args.port)
+    print(f"Sharded game server listening on http://{host}:{port} with {args.workers} workers")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runtime.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
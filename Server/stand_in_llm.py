@@ -0,0 +1,216 @@
+import asyncio
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import List, Dict, Any, Iterator, AsyncIterator
+
+# phrases identifying which conversation a request belongs to, matched against the system instructions
+STORY_KEY: str = "The story should feel like a window"
+NPC_CHECK_KEY: str = "ACTUAL NAME of a new character"
+NPC_CREATION_KEY: str = "create NEW Character JSON dictionaries"
+KEY_EVENTS_KEY: str = "key_events is defined"
+TIMELINE_SUMMARY_KEY: str = "merged into one summary"
+LOCATION_ENVIRONMENT_KEY: str = "The environment describes the location"
+CURRENT_LOCATION_KEY: str = "Current_location is defined"
+RULES_KEY: str = "unbreakable rules"
+WORLD_ENVIRONMENT_KEY: str = "one-sentence description of an environment"
+CONDITION_KEY: str = "current physical condition of a character"
+RELATIONSHIP_KEY: str = "represents a relationship the main character has"
+ITEM_KEY: str = "generate a useful item"
+
+PLACES: List[str] = ["old mill", "market square", "abandoned chapel", "harbour gate", "hidden cellar"]
+SENTENCES: List[str] = [
+    "A cold wind carries the smell of rain through the streets.",
+    "Somewhere nearby, a bell rings three times and falls silent.",
+    "The crowd parts as a cart rattles past, its driver muttering to himself.",
+    "Lanterns flicker to life one by one as the light fades.",
+    "A stray cat watches you from a windowsill with unblinking eyes.",
+    "Footsteps echo behind you, but when you turn there is no one there.",
+    "The ground is still damp from the morning's storm."
+]
+
+
+def get_text(message: Dict[str, Any]) -> str:
+    """Fetches the text of a message, whether its content is a string or a list of text parts.
+
+    :param message: A message dictionary containing the role and the content.
+    :return: The text of the message.
+    """
+    content = message["content"]
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content)
+
+
+class StandInLLM:
+    def __init__(self, latency: float = 0.0, seed: int | None = None):
+        """Initialises a StandInLLM object, a local stand-in for ChatGPT.
+
+        The stand-in recognises every conversation used by ``openai_api`` and ``update_attr`` from its system
+        instructions, and returns short responses in the format each of them expects. It is used to run and
+        load-test the game server without sending any requests to OpenAI.
+
+        :param latency: The number of seconds each response takes, spread across the chunks when streaming.
+        :param seed: The seed of the random number generator used to generate the stories.
+        """
+        self.latency = latency
+        self._random = random.Random(seed)
+        self.request_count: int = 0
+
+    def respond(self, messages: List[Dict[str, Any]]) -> str:
+        """Generates a response to a list of messages.
+
+        :param messages: A list of message dictionaries.
+        :return: The response in the format expected by the conversation.
+        """
+        self.request_count += 1
+        system: str = get_text(messages[0]) if messages and messages[0]["role"] == "system" else ""
+        prompt: str = get_text(messages[-1]) if messages else ""
+
+        if STORY_KEY in system:
+            return self._get_story(prompt)
+        if NPC_CHECK_KEY in system:
+            return "False"
+        if NPC_CREATION_KEY in system:
+            return "[]"
+        if KEY_EVENTS_KEY in system:
+            story: str = prompt.split("**Story:**", 1)[-1].strip()
+            return re.split(r"(?<=[.!?])\s", story, 1)[0]
+        if TIMELINE_SUMMARY_KEY in system:
+            events: List[str] = re.findall(r"^- (.*)$", prompt, re.MULTILINE)
+            return " ".join(events[:1] + events[-1:])
+        if LOCATION_ENVIRONMENT_KEY in system:
+            return "Narrow streets wind between crooked houses under a grey sky."
+        if CURRENT_LOCATION_KEY in system:
+            places: List[str] = re.findall(r"You arrive at the ([a-z ]+)\.", prompt)
+            return f"1 = {places[-1]}" if places else "False"
+        if RULES_KEY in system:
+            return "- Actions have consequences.\n- The world follows consistent rules.\n- Nobody is all-powerful."
+        if WORLD_ENVIRONMENT_KEY in system:
+            return "A sprawling town sits between misty hills and a restless sea."
+        if CONDITION_KEY in system:
+            return "Rested"
+        if RELATIONSHIP_KEY in system:
+            return "Trusted companion"
+        if ITEM_KEY in system:
+            return "Lantern"
+        # attribute updates and requeries, where nothing needs to change
+        return "False"
+
+    def _get_story(self, prompt: str) -> str:
+        """Generates a five-sentence story continuing the user's input.
+
+        :param prompt: The prompt sent to the story conversation.
+        :return: The story.
+        """
+        user_input: List[str] = re.findall(r'This is what the user wants to do next: "(.*?)"', prompt)
+        opening: str = f"You decide to {user_input[0].rstrip('.').lower()}." if user_input else \
+            "Your story begins on an ordinary morning."
+        sentences: List[str] = [opening] + self._random.sample(SENTENCES, 3)
+        sentences.append(f"You arrive at the {self._random.choice(PLACES)}.")
+        return " ".join(sentences)
+
+    def chunk(self, response: str) -> List[str]:
+        """Splits a response into the chunks it is streamed in.
+
+        :param response: The response.
+        :return: A list of chunks, each containing one word and the whitespace after it.
+        """
+        return re.findall(r"\S+\s*", response)
+
+
+def create_completion(content: str) -> SimpleNamespace:
+    """Creates an object shaped like a chat completion returned by the OpenAI client.
+
+    :param content: The content of the response.
+    :return: The chat completion.
+    """
+    message = SimpleNamespace(content=content, parsed=None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def create_chunk(content: str) -> SimpleNamespace:
+    """Creates an object shaped like a streamed chat completion chunk returned by the OpenAI client.
+
+    :param content: The content of the chunk.
+    :return: The chat completion chunk.
+    """
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class _Completions:
+    def __init__(self, llm: StandInLLM):
+        self._llm = llm
+
+    def create(self, messages: List[Dict[str, Any]], stream: bool = False, **kwargs) -> \
+            SimpleNamespace | Iterator[SimpleNamespace]:
+        response: str = self._llm.respond(messages)
+        if stream:
+            return self._stream(response)
+        time.sleep(self._llm.latency)
+        return create_completion(response)
+
+    def _stream(self, response: str) -> Iterator[SimpleNamespace]:
+        chunks: List[str] = self._llm.chunk(response)
+        for chunk in chunks:
+            time.sleep(self._llm.latency / len(chunks))
+            yield create_chunk(chunk)
+
+    def parse(self, messages: List[Dict[str, Any]], response_format, **kwargs) -> SimpleNamespace:
+        # the stand-in never detects items being used
+        self._llm.request_count += 1
+        time.sleep(self._llm.latency)
+        completion = create_completion("")
+        completion.choices[0].message.parsed = response_format(used_item=False, items_list=[])
+        return completion
+
+
+class _AsyncCompletions:
+    def __init__(self, llm: StandInLLM):
+        self._llm = llm
+
+    async def create(self, messages: List[Dict[str, Any]], stream: bool = False, **kwargs) -> \
+            SimpleNamespace | AsyncIterator[SimpleNamespace]:
+        response: str = self._llm.respond(messages)
+        if stream:
+            return self._stream(response)
+        await asyncio.sleep(self._llm.latency)
+        return create_completion(response)
+
+    async def _stream(self, response: str) -> AsyncIterator[SimpleNamespace]:
+        chunks: List[str] = self._llm.chunk(response)
+        for chunk in chunks:
+            await asyncio.sleep(self._llm.latency / len(chunks))
+            yield create_chunk(chunk)
+
+    async def parse(self, messages: List[Dict[str, Any]], response_format, **kwargs) -> SimpleNamespace:
+        self._llm.request_count += 1
+        await asyncio.sleep(self._llm.latency)
+        completion = create_completion("")
+        completion.choices[0].message.parsed = response_format(used_item=False, items_list=[])
+        return completion
+
+
+class StandInClient:
+    def __init__(self, llm: StandInLLM | None = None):
+        """Initialises a StandInClient object, which can be used in place of the OpenAI client.
+
+        :param llm: The stand-in used to generate the responses. A new one is created if it isn't provided.
+        """
+        self.llm = llm if llm is not None else StandInLLM()
+        completions = _Completions(self.llm)
+        self.chat = SimpleNamespace(completions=completions)
+        self.beta = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+class AsyncStandInClient:
+    def __init__(self, llm: StandInLLM | None = None):
+        """Initialises an AsyncStandInClient object, which can be used in place of the AsyncOpenAI client.
+
+        :param llm: The stand-in used to generate the responses. A new one is created if it isn't provided.
+        """
+        self.llm = llm if llm is not None else StandInLLM()
+        completions = _AsyncCompletions(self.llm)
+        self.chat = SimpleNamespace(completions=completions)
+        self.beta = SimpleNamespace(chat=SimpleNamespace(completions=completions))
@@ -0,0 +1,56 @@
+import os
+
+from Frontend.asset_store import AssetStore
+
+
+def test_images_are_keyed_by_prompt(tmp_path):
+    store = AssetStore(str(tmp_path / "generated"), assets_directory=str(tmp_path))
+    store.put("NPC", "Josh", "Fantasy", "A knight", b"knight")
+    store.put("NPC", "Josh", "Fantasy", "A wizard", b"wizard")
+
+    # characters with the same name in different games are told apart by their prompt
+    assert open(store.get_path("NPC", "Josh", "Fantasy", "A knight"), "rb").read() == b"knight"
+    assert open(store.get_path("NPC", "Josh", "Fantasy", "A wizard"), "rb").read() == b"wizard"
+    # without a prompt, the most recent image stored for the name is used
+    assert open(store.get_path("NPC", "Josh", "Fantasy"), "rb").read() == b"wizard"
+    assert store.get_path("NPC", "Josh", "Sci-Fi") is None
+    assert store.get_src("NPC", "Josh", "Fantasy").startswith("generated/")
+
+
+def test_identical_images_are_stored_once(tmp_path):
+    store = AssetStore(str(tmp_path))
+    first = store.put("Item", "sword", "", "A sword in a fantasy game", b"sword")
+    second = store.put("Item", "blade", "", "A sword in a medieval game", b"sword")
+    assert first == second
+    assert store.total_size == len(b"sword")
+
+
+def test_index_is_reloaded(tmp_path):
+    store = AssetStore(str(tmp_path))
+    path = store.put("Item", "sword", "", "A sword", b"sword")
+
+    reloaded = AssetStore(str(tmp_path))
+    assert reloaded.get_path("Item", "sword", prompt="A sword") == path
+    assert reloaded.total_size == len(b"sword")
+
+    # files deleted outside the store are dropped from the index
+    os.remove(path)
+    assert not AssetStore(str(tmp_path)).contains("Item", "sword")
+
+
+def test_least_recently_used_images_are_evicted(tmp_path):
+    store = AssetStore(str(tmp_path), quota=25)
+    paths = [store.put("Item", f"item{index}", "", f"item {index}", bytes([index]) * 10) for index in range(2)]
+    # using the first image makes the second one the least recently used
+    assert store.contains("Item", "item0")
+    store.put("Item", "item2", "", "item 2", b"2" * 10)
+
+    assert store.contains("Item", "item0")
+    assert not store.contains("Item", "item1")
+    assert not os.path.exists(paths[1])
+    assert store.total_size == 20
+
+    # the newest image is kept even if it is larger than the quota
+    store.put("Item", "item3", "", "item 3", b"3" * 30)
+    assert store.contains("Item", "item3")
+    assert store.total_size == 30
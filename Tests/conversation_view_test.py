@@ -0,0 +1,67 @@
+from Frontend.conversation_view import ConversationWindow
+
+
+def create_window(window=4, page_size=2, count=0):
+    created = []
+
+    def create_control(sender, text):
+        created.append(text)
+        return f"{sender}: {text}"
+
+    messages = ConversationWindow(create_control, window, page_size)
+    for index in range(count):
+        messages.append("AI", str(index))
+    return messages, created
+
+
+def test_only_the_latest_messages_have_controls():
+    messages, created = create_window(count=10)
+    assert len(messages) == 10
+    assert messages.controls == ["AI: 6", "AI: 7", "AI: 8", "AI: 9"]
+    assert messages.start == 6
+    assert messages.has_older and not messages.has_newer
+    # each message is only rendered once while the player follows the story
+    assert len(created) == 10
+
+
+def test_scrolling_renders_older_messages_again():
+    messages, created = create_window(count=10)
+    assert messages.page_older() == 2
+    assert messages.controls == ["AI: 4", "AI: 5", "AI: 6", "AI: 7"]
+    messages.page_older()
+    messages.page_older()
+    assert messages.controls == ["AI: 0", "AI: 1", "AI: 2", "AI: 3"]
+    assert messages.page_older() == 0
+
+    assert messages.page_newer() == 2
+    assert messages.controls == ["AI: 2", "AI: 3", "AI: 4", "AI: 5"]
+
+    # a new message moves the window back to the end of the story
+    messages.append("User", "10")
+    assert messages.controls == ["AI: 7", "AI: 8", "AI: 9", "User: 10"]
+    assert not messages.has_newer
+
+
+def test_pop_and_truncate():
+    messages, _ = create_window(count=10)
+    messages.append("AI", "Response generating please wait...")
+    assert messages.pop() == ("AI", "Response generating please wait...")
+    assert messages.controls[-1] == "AI: 9"
+
+    messages.truncate(8)
+    assert messages.controls == ["AI: 7"]
+    # when every rendered message is removed, the end of what is left is rendered
+    messages.truncate(5)
+    assert messages.controls == ["AI: 1", "AI: 2", "AI: 3", "AI: 4"]
+    assert len(messages) == 5
+
+
+def test_controls_are_updated_in_place():
+    messages, _ = create_window(count=3)
+    controls = messages.controls
+    for index in range(3, 10):
+        messages.append("AI", str(index))
+    messages.page_older()
+    messages.truncate(2)
+    assert controls is messages.controls
+    assert controls == ["AI: 0", "AI: 1"]
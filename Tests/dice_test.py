@@ -0,0 +1,82 @@
+from Server.stand_in_llm import StandInLLM, StandInClient, AsyncStandInClient
+from Utilities.dice import Dice
+from Utilities.session import Session
+import pytest
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.fixture
+def character():
+    character = {
+        "id": 1,
+        "name": "Bob",
+        "physical_condition": "Healthy",
+        "occupation": "Scientist",
+        "money": 50.0,
+        "relationship": {},
+        "personality": ["Kind", "Hot-blooded"],
+        "inventory": ["Sword"],
+        "stats": {
+            "HP": 100,
+            "LUCK": 10,
+            "CHA": 10
+        },
+        "current_location": "",
+        "appearance": "male, brown hair, green eyes, wears armour"
+    }
+    return character
+
+
+def create_session(seed):
+    llm = StandInLLM(seed=0)
+    return Session(client=StandInClient(llm), async_client=AsyncStandInClient(llm), dice=Dice(seed))
+
+
+def test_seeded_dice_are_reproducible():
+    rolls = [Dice(7).roll() for _ in range(2)]
+    assert rolls[0] == rolls[1]
+    assert all(1 <= value <= 6 for value in rolls[0])
+    assert len(Dice().roll(count=3, sides=20)) == 3
+
+
+def test_sessions_have_their_own_dice():
+    session = Session(dice=Dice(7))
+    other_session = Session(dice=Dice(7))
+    first_roll = session.dice.roll()
+    session.dice.roll()
+    assert other_session.dice.roll() == first_roll
+    assert Session().dice is not Session().dice
+
+
+def test_dice_state_is_restored():
+    dice = Dice(3)
+    dice.roll()
+    state = dice.get_state()
+    expected = [dice.roll() for _ in range(5)]
+
+    restored = Dice()
+    restored.set_state(state)
+    assert [restored.roll() for _ in range(5)] == expected
+
+
+@pytest.mark.asyncio
+async def test_roll_async():
+    assert await Dice(5).roll_async() == Dice(5).roll()
+
+
+def test_random_event_uses_session_dice(character):
+    events = []
+    for _ in range(2):
+        session = create_session(11)
+        session.engine.mainCharacter = character
+        events.append(session.engine.random_event(session.engine.mainCharacter.luck))
+    assert events[0] == events[1]
+    assert events[0][0] != ""
+
+
+def test_random_event_with_rolled_total(character):
+    session = create_session(11)
+    session.engine.mainCharacter = character
+    event = session.engine.random_event(10, dice_total=12)
+    assert event[1] in ["condition", "increase money", "gain item"]
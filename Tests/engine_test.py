@@ -142,3 +142,71 @@ def test_character_deceased(main_engine, character):
     main_engine.mainCharacter = character
     ret_tuple: tuple[bool, str] = main_engine.check_characters_deceased("cyberpunk")
     assert not ret_tuple[0]
+
+
+def test_rewind(main_engine, character, character2):
+    main_engine.mainCharacter = character
+    main_engine.add_world({"rules": [], "genre": "Fantasy", "environment": "", "locations": []})
+    main_engine.add_timeline({"key_events": []})
+    main_engine.checkpoint(turn=0)
+
+    main_engine.mainCharacter.add_inventory("sword")
+    main_engine.mainCharacter.increase_money(10.0)
+    main_engine.timeline.add_event("Bob found a sword.")
+    main_engine.add_character(character2)
+    main_engine.checkpoint(turn=1)
+    assert main_engine.rewindable_turns == 1
+
+    extras = main_engine.rewind(1)
+    assert extras == {"turn": 0}
+    assert main_engine.mainCharacter.inventory == []
+    assert main_engine.mainCharacter.money == 50.0
+    assert main_engine.timeline.get_event == []
+    assert len(main_engine.characters) == 0
+    # can't rewind past the first checkpoint
+    assert main_engine.rewind(1) is None
+
+
+def test_rewind_restores_session(main_engine, character):
+    main_engine.mainCharacter = character
+    session = main_engine.session
+    main_engine.checkpoint(turn=0)
+    rolls = session.dice.roll()
+
+    session.new_char_count += 1
+    session.reset_count += 1
+    session.money_messages.extend([{"role": "user", "content": "story"}, {"role": "assistant", "content": "[]"}])
+    main_engine.checkpoint(turn=1)
+
+    main_engine.rewind(1)
+    assert (session.new_char_count, session.reset_count, session.money_messages) == (1, 0, [])
+    assert session.dice.roll() == rolls
+
+
+def test_rewind_across_chat_reset(main_engine, character):
+    main_engine.mainCharacter = character
+    session = main_engine.session
+    system = {"role": "system", "content": "instructions"}
+    session.money_messages.extend([system, {"role": "user", "content": "turn 1"}])
+    main_engine.checkpoint(turn=1)
+
+    session.reset_chat(3)
+    session.money_messages.extend([{"role": "user", "content": "turn 2"}, {"role": "assistant", "content": "[]"}])
+    main_engine.checkpoint(turn=2)
+    assert session.chat_generation == 1
+
+    # the offset of the first checkpoint points into the old chat, so the new chat is cleared instead of kept
+    main_engine.rewind(1)
+    assert session.money_messages == [system]
+    assert session.chat_generation == 2
+
+
+def test_restore(character):
+    char = Character(**character)
+    inventory = char.inventory
+    char.add_inventory("sword")
+    char.restore({"inventory": [], "money": 10.0})
+    assert inventory is char.inventory and inventory == []
+    assert char.money == 10.0
+    with pytest.raises(KeyError):
+        char.restore({"_money": 5.0})
@@ -0,0 +1,101 @@
+from Server.game_server import GameServer, ServerGame
+from Server.stand_in_llm import StandInLLM, StandInClient, AsyncStandInClient
+from Server import load_test, http_client
+import pytest
+import pytest_asyncio
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest_asyncio.fixture
+async def server(tmp_path):
+    llm = StandInLLM(seed=0)
+    server = GameServer(StandInClient(llm), AsyncStandInClient(llm), str(tmp_path))
+    host, port = await server.start("127.0.0.1", 0)
+    server.address = (host, port)
+    yield server
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_create_game_and_play(server):
+    host, port = server.address
+    game = await http_client.request_json(host, port, "POST", "/games", {"name": "Bob", "genre": "Fantasy"})
+    assert game["story"] != ""
+    assert game["stats"]["hp"] == 100
+
+    events, _ = await load_test.submit_action(host, port, game["game_id"], "Walk to the market")
+    narration = "".join(event["text"] for event in events if event["type"] == "narration")
+    assert narration.startswith("You decide to walk to the market.")
+    assert events[-1]["type"] == "done"
+
+    timeline = await http_client.request_json(host, port, "GET", f"/games/{game['game_id']}/timeline")
+    assert len(timeline["key_events"]) == 2
+    page = await http_client.request_json(host, port, "GET", f"/games/{game['game_id']}/timeline?page=0&page_size=1")
+    assert page["pages"] == 2
+    assert page["entries"][0]["event"] == timeline["key_events"][0]
+    inventory = await http_client.request_json(host, port, "GET", f"/games/{game['game_id']}/inventory")
+    assert inventory["inventory"] == []
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_isolated(server):
+    host, port = server.address
+    game = await http_client.request_json(host, port, "POST", "/games", {"name": "Bob", "genre": "Fantasy"})
+    other_game = await http_client.request_json(host, port, "POST", "/games", {"name": "Alice", "genre": "Sci-Fi"})
+    await load_test.submit_action(host, port, game["game_id"], "Open the door")
+
+    session = server.sessions.resident[game["game_id"]].session
+    other_session = server.sessions.resident[other_game["game_id"]].session
+    assert len(session.story_messages) == 5
+    assert len(other_session.story_messages) == 3
+    assert other_session.engine.mainCharacter.name == "Alice"
+
+
+@pytest.mark.asyncio
+async def test_save_and_load(server):
+    host, port = server.address
+    game = await http_client.request_json(host, port, "POST", "/games", {"name": "Bob", "genre": "Fantasy"})
+    await load_test.submit_action(host, port, game["game_id"], "Open the door")
+    await http_client.request_json(host, port, "POST", f"/games/{game['game_id']}/save")
+    key_events = server.sessions.resident[game["game_id"]].engine.timeline.get_event
+
+    server.sessions.remove(game["game_id"])
+    loaded = await http_client.request_json(host, port, "POST", "/games/load", {"game_id": game["game_id"]})
+    assert loaded["stats"]["hp"] == 100
+    assert server.sessions.resident[game["game_id"]].engine.timeline.get_event == key_events
+
+
+@pytest.mark.asyncio
+async def test_errors(server):
+    host, port = server.address
+    status, _ = await http_client.send_request(host, port, "GET", "/games/missing/inventory")
+    assert status == 404
+    status, _ = await http_client.send_request(host, port, "POST", "/games", {"genre": "Fantasy"})
+    assert status == 400
+
+
+def test_seeded_games_are_reproducible(tmp_path):
+    games = [ServerGame("game", GameServer(save_directory=str(tmp_path), dice_seed=7).create_session("game"))
+             for _ in range(2)]
+    assert games[0].event_count == games[1].event_count
+    assert games[0].session.dice.get_state() == games[1].session.dice.get_state()
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_are_opt_in(server):
+    host, port = server.address
+    game = await http_client.request_json(host, port, "POST", "/games", {"name": "Bob", "genre": "Fantasy"})
+    await load_test.submit_action(host, port, game["game_id"], "Walk to the market")
+    assert (await server.get_game(game["game_id"])).engine.rewindable_turns == 0
+
+    server.checkpoints = True
+    for action in ["Walk to the market", "Look around"]:
+        await load_test.submit_action(host, port, game["game_id"], action)
+    assert (await server.get_game(game["game_id"])).engine.rewindable_turns == 1
+
+
+def test_update_gate_is_opt_in(tmp_path):
+    assert GameServer(save_directory=str(tmp_path)).create_session("game").update_gate is None
+    session = GameServer(save_directory=str(tmp_path), recall_target=0.75).create_session("game")
+    assert session.update_gate is not None
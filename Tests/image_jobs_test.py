@@ -0,0 +1,90 @@
+import os
+import time
+
+from Frontend.image_jobs import ImageJobQueue, StandInImageBackend, HuggingFaceBackend, VISIBLE_PRIORITY, DONE, \
+    RUNNING
+
+
+def test_duplicate_jobs_are_merged(tmp_path):
+    backend = StandInImageBackend(latency=0.1)
+    queue = ImageJobQueue(backend, workers=2, directory=str(tmp_path))
+    jobs = [queue.submit("NPC", "Josh", "A knight", "Fantasy") for _ in range(5)]
+    assert all(job is jobs[0] for job in jobs)
+    assert jobs[0].wait(5)
+    queue.close()
+
+    assert backend.prompts == ["A knight"]
+    assert os.path.isfile(jobs[0].path)
+    assert queue.store.get_path("NPC", "Josh", "Fantasy") == jobs[0].path
+    # the same name in another genre is a different portrait
+    assert not queue.store.contains("NPC", "Josh", "Sci-Fi")
+
+
+def test_visible_jobs_are_generated_first(tmp_path):
+    backend = StandInImageBackend(latency=0.1)
+    queue = ImageJobQueue(backend, workers=1, directory=str(tmp_path))
+    running = queue.submit("Item", "Sword", "sword")
+    while running.status != RUNNING:
+        time.sleep(0.01)
+    queue.submit("Item", "Shield", "shield")
+    queue.submit("Item", "Bow", "bow")
+    queue.submit("Item", "Bow", "bow", priority=VISIBLE_PRIORITY)
+    queue.submit("Item", "Potion", "potion", priority=VISIBLE_PRIORITY)
+    assert queue.wait_idle(5)
+    queue.close()
+
+    assert backend.prompts == ["sword", "bow", "potion", "shield"]
+
+
+def test_existing_images_are_not_generated(tmp_path):
+    backend = StandInImageBackend()
+    queue = ImageJobQueue(backend, directory=str(tmp_path))
+    assert queue.submit("Item", "Sword", "sword").wait(5)
+    queue.close()
+
+    queue = ImageJobQueue(backend, directory=str(tmp_path))
+    job = queue.submit("Item", "Sword", "sword")
+    queue.close()
+    assert job.status == DONE
+    assert backend.prompts == ["sword"]
+
+
+def test_unfinished_jobs_are_resumed(tmp_path):
+    queue = ImageJobQueue(StandInImageBackend(latency=0.2), workers=1, directory=str(tmp_path))
+    jobs = [queue.submit("Item", name, name.lower()) for name in ["Sword", "Shield", "Bow"]]
+    while jobs[0].status != RUNNING:
+        time.sleep(0.01)
+    queue.close()
+
+    backend = StandInImageBackend()
+    queue = ImageJobQueue(backend, directory=str(tmp_path))
+    assert queue.wait_idle(5)
+    queue.close()
+
+    assert sorted(backend.prompts) == ["bow", "shield"]
+    for name in ["Sword", "Shield", "Bow"]:
+        assert os.path.isfile(queue.store.get_path("Item", name))
+
+
+def test_failed_jobs_can_be_retried(tmp_path):
+    class FailingBackend:
+        def generate(self, prompt):
+            raise RuntimeError("The backend is down.")
+
+    queue = ImageJobQueue(FailingBackend(), directory=str(tmp_path))
+    assert not queue.submit("Item", "Sword", "sword").wait(5)
+    queue.close()
+
+    backend = StandInImageBackend()
+    queue = ImageJobQueue(backend, directory=str(tmp_path))
+    assert queue.submit("Item", "Sword", "sword").wait(5)
+    queue.close()
+
+
+def test_jobs_are_refused_without_a_token(tmp_path):
+    queue = ImageJobQueue(HuggingFaceBackend(None), directory=str(tmp_path))
+    job = queue.submit("Item", "Sword", "sword", priority=VISIBLE_PRIORITY)
+    assert job.wait(0) is False
+    assert not queue.has_image("Item", "Sword")
+    assert not os.path.exists(queue.state_path)
+    queue.close()
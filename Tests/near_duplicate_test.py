@@ -0,0 +1,52 @@
+from Classes.Character import Character
+from Utilities.near_duplicate import NearDuplicateIndex, get_shingles, get_jaccard
+
+
+def test_find_near_duplicates():
+    index = NearDuplicateIndex()
+    index.add(0, "You enter the tavern and meet Alice, who offers you a quest to find the lost sword.")
+    index.add(1, "A storm floods the harbour and the ships are trapped.")
+    key, similarity = index.find("You enter the tavern and meet Alice, who offers you a quest to find a lost sword!")
+    assert key == 0 and similarity > 0.8
+    assert index.find("The dragon burns the castle to the ground.") is None
+
+    index.remove(0)
+    assert index.find("You enter the tavern and meet Alice, who offers you a quest to find the lost sword.") is None
+    assert len(index) == 1 and 1 in index
+
+
+def test_threshold_and_stats():
+    assert get_jaccard(get_shingles("Market Square"), get_shingles("the market square.")) > 0.7
+    strict = NearDuplicateIndex(threshold=0.9, shingle_size=1)
+    strict.add("square", "Market Square")
+    assert strict.check("the old market square") is None
+    assert strict.check("market  square!") == "square"
+    assert strict.get_stats() == {"entries": 1, "checks": 2, "suppressed": 1, "suppressed_rate": 0.5}
+    assert list(strict.recent) == [("market  square!", "square", 1.0)]
+
+
+def test_inventory_resolves_item_names():
+    character = Character(inventory=["rusty sword", "health potion"])
+    character.add_inventory("A Rusty Sword")
+    character.add_inventory("Mana Potion")
+    assert character.inventory == ["rusty sword", "health potion", "rusty sword", "mana potion"]
+    character.remove_inventory("the health potion")
+    assert character.inventory == ["rusty sword", "rusty sword", "mana potion"]
+    assert character.item_index.suppressed == 2
+
+
+def test_different_meanings_are_kept():
+    index = NearDuplicateIndex()
+    index.add(0, "You defeated the goblin king in the throne room.")
+    index.add(1, "You paid the innkeeper 10 gold for a room.")
+    index.add(2, "The guard opened the gate for you.")
+    assert index.find("You were defeated by the goblin king in the throne room.") is None
+    assert index.find("You paid the innkeeper 50 gold for a room.") is None
+    assert index.find("The guard did not open the gate for you.") is None
+    assert index.find("The guard never opened the gate for you.") is None
+    assert index.find("You paid the innkeeper 10 gold for the room!")[0] == 1
+
+    character = Character(inventory=["health potion"])
+    character.add_inventory("Mana Potion")
+    character.add_inventory("Health Potion x2")
+    assert character.inventory == ["health potion", "mana potion", "health potion x2"]
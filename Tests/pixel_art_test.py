@@ -0,0 +1,54 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from Benchmarks.pixel_art_benchmark import create_generated_image
+from Frontend import pixel_art
+
+
+def create_art(cells, cell_size, noise=0.0, offset=0):
+    rng = np.random.default_rng(1)
+    palette = rng.integers(0, 256, (6, 3))
+    art = palette[rng.integers(0, 6, (cells + 1, cells + 1))]
+    pixels = np.kron(art, np.ones((cell_size, cell_size, 1), dtype=np.int64))
+    pixels = pixels[offset:offset + cells * cell_size, offset:offset + cells * cell_size]
+    return np.clip(pixels + rng.normal(0, noise, pixels.shape), 0, 255).astype(np.uint8), art
+
+
+def test_detect_grid():
+    pixels, _ = create_art(32, 16)
+    assert pixel_art.detect_grid(pixels) == (16, 0, 0)
+    noisy, _ = create_art(24, 20, noise=8.0)
+    assert pixel_art.detect_grid(noisy)[0] == 20
+
+
+def test_detect_grid_with_offset():
+    pixels, _ = create_art(32, 16, noise=4.0, offset=5)
+    assert pixel_art.detect_grid(pixels) == (16, 11, 11)
+
+
+def test_downsample_recovers_the_art():
+    pixels, art = create_art(16, 8, noise=6.0)
+    small = pixel_art.downsample(pixels, 8)
+    assert small.shape == (16, 16, 3)
+    assert np.abs(small.astype(int) - art[:16, :16]).max() <= 12
+
+
+def test_process_image():
+    data = create_generated_image(cells=32, size=512)
+    processed = pixel_art.process_image(data, colours=8, sizes=(64, 100))
+    assert processed.cell_size == 16
+    assert processed.colours <= 8
+    assert len(processed.data) * 100 < len(data)
+
+    image = Image.open(BytesIO(processed.data))
+    assert image.mode == "P"
+    assert image.size == (32, 32)
+    assert sorted(processed.variants) == [64, 100]
+    assert Image.open(BytesIO(processed.variants[100])).size == (100, 100)
+
+
+def test_get_variant_size():
+    assert pixel_art.get_variant_size([48, 64, 100], 58.5) == 64
+    assert pixel_art.get_variant_size([48, 64, 100], 130) is None
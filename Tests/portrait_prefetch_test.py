@@ -0,0 +1,76 @@
+from Frontend.image_jobs import ImageJobQueue, StandInImageBackend, PREFETCH_PRIORITY
+from Frontend.portrait_prefetch import PortraitPrefetcher
+from Utilities.session import Session, CHARACTER_ADDED
+import pytest
+
+
+def create_character(char_id, name, inventory=None):
+    return {
+        "id": char_id,
+        "name": name,
+        "physical_condition": "Healthy",
+        "occupation": "Doctor",
+        "money": 50.0,
+        "relationship": {},
+        "personality": ["Kind", "Rash"],
+        "inventory": inventory if inventory is not None else [],
+        "stats": {
+            "HP": 100,
+            "LUCK": 10,
+            "CHA": 10
+        },
+        "current_location": "",
+        "appearance": "male, brown hair, green eyes, wears armour"
+    }
+
+
+@pytest.fixture
+def session():
+    session = Session()
+    session.engine.add_world({"rules": [], "genre": "Fantasy", "environment": [], "locations": []})
+    session.engine.mainCharacter = create_character(1, "Bob")
+    return session
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = ImageJobQueue(StandInImageBackend(), workers=1, directory=str(tmp_path))
+    yield queue
+    queue.close()
+
+
+def test_new_characters_and_items_are_prefetched(session, queue):
+    PortraitPrefetcher(queue, session)
+    session.engine.add_character(create_character(2, "Josh"))
+    session.engine.mainCharacter.add_inventory("Lantern")
+    session.engine.characters[0].add_inventory("Rope")
+    assert queue.wait_idle(5)
+
+    assert queue.store.contains("NPC", "Josh", "Fantasy")
+    assert queue.store.contains("Item", "lantern")
+    # only the main character's inventory is shown to the player
+    assert not queue.store.contains("Item", "rope")
+    assert queue.jobs[("NPC", "Josh", "Fantasy")].priority == PREFETCH_PRIORITY
+
+
+def test_prefetch_budget_per_turn(session, queue):
+    prefetcher = PortraitPrefetcher(queue, session, turn_budget=2)
+    for index in range(4):
+        session.engine.add_character(create_character(index + 2, f"Npc{index}"))
+    assert len(queue.jobs) == 2
+
+    session.reset_count += 1
+    session.engine.mainCharacter.add_inventory("Lantern")
+    assert len(queue.jobs) == 3
+    # images that already exist or are already queued don't use the budget
+    assert not prefetcher.prefetch("NPC", "Npc0", "prompt", "Fantasy")
+    assert prefetcher.prefetch("Item", "Rope", "rope")
+
+
+def test_listener_errors_are_not_raised(session):
+    def listener(character):
+        raise ValueError("Broken listener")
+
+    session.subscribe(CHARACTER_ADDED, listener)
+    session.engine.add_character(create_character(2, "Josh"))
+    assert len(session.engine.characters) == 1
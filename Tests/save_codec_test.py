@@ -0,0 +1,77 @@
+from Utilities import save_codec
+import pytest
+import json
+
+
+@pytest.fixture
+def save_data():
+    save_data = {
+        "world": {
+            "rules": ["Magic must be a consistent and integral part of the world."],
+            "genre": "Fantasy",
+            "environment": "A quiet village at the edge of the forest.",
+            "locations": ["village square"]
+        },
+        "characters": [],
+        "timeline": {
+            "key_events": ["You arrived at the village."]
+        },
+        "main_character": {
+            "id": 1,
+            "name": "Bob",
+            "physical_condition": "Healthy",
+            "occupation": "Scientist",
+            "money": 50.0,
+            "relationship": {},
+            "personality": ["Kind", "Hot-blooded"],
+            "inventory": [],
+            "stats": {
+                "HP": 100,
+                "LUCK": 10,
+                "CHA": 10
+            },
+            "current_location": "village square",
+            "appearance": "male, brown hair, green eyes, wears armour"
+        },
+        "history": [
+            {"role": "system", "content": [{"type": "text", "text": "**Remember the following rules:**"}]},
+            {"role": "user", "content": [{"type": "text", "text": "I walk into the village."}]},
+            {"role": "assistant", "content": [{"type": "text", "text": "You walk into the village, “Hello!”"}]}
+        ]
+    }
+    return save_data
+
+
+def test_round_trip(tmp_path, save_data):
+    path = tmp_path / "Bob_save_data.sav"
+    save_codec.write_save(str(path), save_data)
+    reader = save_codec.SaveReader(str(path))
+
+    assert reader.sections == list(save_codec.SECTIONS)
+    assert reader.read_section("world") == save_data["world"]
+    assert reader.read_section("main_character") == save_data["main_character"]
+    assert reader.read_history() == save_data["history"]
+
+
+def test_history_is_lazy(tmp_path, save_data):
+    path = tmp_path / "Bob_save_data.sav"
+    save_codec.write_save(str(path), save_data)
+    reader = save_codec.SaveReader(str(path))
+    loader = reader.history_loader()
+
+    # the history is only decoded once the loader is called
+    assert callable(loader)
+    assert loader() == save_data["history"]
+
+
+def test_smaller_than_json(save_data):
+    save_data["history"] = save_data["history"] * 200
+    json_size = len(json.dumps(save_data, indent=4).encode("utf-8"))
+    assert len(save_codec.encode_save(save_data)) < json_size / 5
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "not_a_save.sav"
+    path.write_bytes(b"{}")
+    with pytest.raises(ValueError):
+        save_codec.SaveReader(str(path))
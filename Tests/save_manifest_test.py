@@ -0,0 +1,52 @@
+from Utilities import save_manifest
+import pytest
+
+
+@pytest.fixture
+def save_data():
+    save_data = {
+        "world": {"rules": [], "genre": "Fantasy", "environment": "", "locations": []},
+        "characters": [],
+        "timeline": {"key_events": ["You arrived at the village.", "You met the blacksmith."]},
+        "main_character": {"name": "Bob", "stats": {"HP": 80, "LUCK": 10, "CHA": 10}},
+        "history": [
+            {"role": "system", "content": [{"type": "text", "text": "rules"}]},
+            {"role": "user", "content": [{"type": "text", "text": "prompt"}]},
+            {"role": "assistant", "content": [{"type": "text", "text": "story"}]},
+            {"role": "user", "content": [{"type": "text", "text": "prompt"}]},
+            {"role": "assistant", "content": [{"type": "text", "text": "story"}]}
+        ]
+    }
+    return save_data
+
+
+def test_create_entry(save_data):
+    entry = save_manifest.create_entry("Bob_save_data.json", save_data, 1024)
+    assert entry["name"] == "Bob"
+    assert entry["genre"] == "Fantasy"
+    assert entry["hp"] == 80
+    assert entry["turn_count"] == 2
+    assert entry["size"] == 1024
+    assert entry["recap"] == "You met the blacksmith."
+
+
+def test_latest_entry_wins(tmp_path, save_data):
+    directory = str(tmp_path)
+    save_manifest.update_manifest(save_manifest.create_entry("Bob_save_data.json", save_data, 10), directory)
+    save_data["main_character"]["stats"]["HP"] = 5
+    save_manifest.update_manifest(save_manifest.create_entry("Bob_save_data.json", save_data, 20), directory)
+
+    entries = save_manifest.list_entries(["Bob_save_data.json", "Old_save_data.json"], directory)
+    assert entries[0]["hp"] == 5
+    assert entries[0]["size"] == 20
+    # saves missing from the manifest are still listed
+    assert entries[1] == {"file": "Old_save_data.json"}
+
+
+def test_manifest_is_compacted(tmp_path, save_data):
+    directory = str(tmp_path)
+    for _ in range(10):
+        save_manifest.update_manifest(save_manifest.create_entry("Bob_save_data.json", save_data, 10), directory)
+
+    with open(save_manifest.get_manifest_path(directory)) as file:
+        assert len(file.readlines()) <= 2
@@ -0,0 +1,87 @@
+from Server.game_server import GameServer
+from Server.session_manager import estimate_size
+from Server.stand_in_llm import StandInLLM, StandInClient, AsyncStandInClient
+from Server import load_test, http_client
+import pytest
+import pytest_asyncio
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest_asyncio.fixture
+async def server(tmp_path):
+    llm = StandInLLM(seed=0)
+    # small enough that only one or two games fit in memory
+    server = GameServer(StandInClient(llm), AsyncStandInClient(llm), str(tmp_path), memory_budget=8000)
+    host, port = await server.start("127.0.0.1", 0)
+    server.address = (host, port)
+    yield server
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_idle_games_are_evicted(server):
+    host, port = server.address
+    game_ids = []
+    for index in range(4):
+        game = await http_client.request_json(host, port, "POST", "/games", {"name": f"Bob{index}", "genre": "Fantasy"})
+        game_ids.append(game["game_id"])
+
+    stats = await http_client.request_json(host, port, "GET", "/sessions")
+    assert stats["evicted_count"] > 0
+    assert stats["resident_bytes"] <= server.sessions.memory_budget or stats["resident_count"] == 1
+    # the most recently used game is never evicted
+    assert game_ids[-1] in server.sessions.resident
+    hosted = await http_client.request_json(host, port, "GET", "/games")
+    assert sorted(hosted["game_ids"]) == sorted(game_ids)
+
+
+@pytest.mark.asyncio
+async def test_evicted_game_is_rehydrated(server):
+    host, port = server.address
+    game = await http_client.request_json(host, port, "POST", "/games", {"name": "Bob", "genre": "Fantasy"})
+    await load_test.submit_action(host, port, game["game_id"], "Open the door")
+    resident_game = server.sessions.resident[game["game_id"]]
+    timeline = await http_client.request_json(host, port, "GET", f"/games/{game['game_id']}/timeline")
+    story_messages = list(resident_game.session.story_messages)
+    recent_stories = list(resident_game.recent_stories)
+    event_count = resident_game.event_count
+
+    for index in range(3):
+        await http_client.request_json(host, port, "POST", "/games", {"name": f"Alice{index}", "genre": "Sci-Fi"})
+    assert game["game_id"] in server.sessions.evicted
+
+    assert await http_client.request_json(host, port, "GET", f"/games/{game['game_id']}/timeline") == timeline
+    rehydrated = server.sessions.resident[game["game_id"]]
+    assert rehydrated is not resident_game
+    assert rehydrated.session.get_history() == story_messages
+    assert rehydrated.recent_stories == recent_stories
+    assert rehydrated.event_count == event_count
+    assert server.sessions.get_stats()["rehydrations"] == 1
+
+    events, _ = await load_test.submit_action(host, port, game["game_id"], "Walk to the market")
+    assert events[-1]["type"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_unload_evicted_game(server):
+    host, port = server.address
+    game = await http_client.request_json(host, port, "POST", "/games", {"name": "Bob", "genre": "Fantasy"})
+    for index in range(3):
+        await http_client.request_json(host, port, "POST", "/games", {"name": f"Alice{index}", "genre": "Sci-Fi"})
+    assert game["game_id"] in server.sessions.evicted
+
+    await http_client.request_json(host, port, "POST", f"/games/{game['game_id']}/unload")
+    assert game["game_id"] not in server.sessions
+    assert server.sessions.get_stats()["rehydrations"] == 0
+    loaded = await http_client.request_json(host, port, "POST", "/games/load", {"game_id": game["game_id"]})
+    assert loaded["stats"]["hp"] == 100
+
+
+@pytest.mark.asyncio
+async def test_estimate_size_grows_with_the_story(server):
+    host, port = server.address
+    game = await http_client.request_json(host, port, "POST", "/games", {"name": "Bob", "genre": "Fantasy"})
+    size = estimate_size(server.sessions.resident[game["game_id"]])
+    await load_test.submit_action(host, port, game["game_id"], "Open the door")
+    assert estimate_size(server.sessions.resident[game["game_id"]]) > size
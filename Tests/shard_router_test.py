@@ -0,0 +1,125 @@
+import asyncio
+
+from Server.game_server import HTTPError
+from Server.shard_router import HashRing, ShardedRuntime
+from Server import http_client
+import pytest
+import pytest_asyncio
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest_asyncio.fixture
+async def runtime(tmp_path):
+    runtime = ShardedRuntime(2, str(tmp_path), stand_in_latency=0.0)
+    host, port = await runtime.start("127.0.0.1", 0)
+    runtime.address = (host, port)
+    yield runtime
+    await runtime.close()
+
+
+def test_hash_ring_spreads_keys():
+    ring = HashRing(["worker-0", "worker-1", "worker-2", "worker-3"])
+    keys = [f"game{index}" for index in range(4000)]
+    owners = [ring.get_node(key) for key in keys]
+
+    for node in ring.nodes:
+        assert 600 < owners.count(node) < 1400
+
+
+def test_hash_ring_only_moves_removed_keys():
+    ring = HashRing(["worker-0", "worker-1", "worker-2"])
+    keys = [f"game{index}" for index in range(1000)]
+    before = {key: ring.get_node(key) for key in keys}
+    ring.remove_node("worker-1")
+
+    for key in keys:
+        if before[key] != "worker-1":
+            assert ring.get_node(key) == before[key]
+        else:
+            assert ring.get_node(key) != "worker-1"
+
+
+def test_empty_hash_ring():
+    with pytest.raises(LookupError):
+        HashRing().get_node("game")
+
+
+@pytest.mark.asyncio
+async def test_drain_hands_games_over(runtime):
+    host, port = runtime.address
+    game_ids = []
+    for index in range(6):
+        game = await http_client.request_json(host, port, "POST", "/games", {"name": f"Bob{index}", "genre": "Fantasy"})
+        game_ids.append(game["game_id"])
+    timelines = [await http_client.request_json(host, port, "GET", f"/games/{game_id}/timeline")
+                 for game_id in game_ids]
+
+    await http_client.request_json(host, port, "POST", "/workers/worker-0/drain")
+    status = await http_client.request_json(host, port, "GET", "/workers")
+    assert list(status["workers"]) == ["worker-1"]
+    assert status["workers"]["worker-1"]["games"] == 6
+
+    for game_id, timeline in zip(game_ids, timelines):
+        assert await http_client.request_json(host, port, "GET", f"/games/{game_id}/timeline") == timeline
+
+
+async def create_games_on(runtime, worker, count):
+    host, port = runtime.address
+    game_ids = []
+    while len(game_ids) < count:
+        game = await http_client.request_json(host, port, "POST", "/games", {"name": "Bob", "genre": "Fantasy"})
+        if runtime.ring.get_node(game["game_id"]) == worker:
+            game_ids.append(game["game_id"])
+    return game_ids
+
+
+@pytest.mark.asyncio
+async def test_requests_wait_while_the_ring_changes(runtime, monkeypatch):
+    host, port = runtime.address
+    game_id = (await create_games_on(runtime, "worker-0", 1))[0]
+    timeline = await http_client.request_json(host, port, "GET", f"/games/{game_id}/timeline")
+
+    listing = asyncio.Event()
+    release = asyncio.Event()
+    list_handoffs = runtime._list_handoffs
+
+    async def slow_list_handoffs(ring):
+        listing.set()
+        await release.wait()
+        return await list_handoffs(ring)
+
+    monkeypatch.setattr(runtime, "_list_handoffs", slow_list_handoffs)
+    drain = asyncio.create_task(runtime.drain_worker("worker-0"))
+    await listing.wait()
+    request = asyncio.create_task(http_client.request_json(host, port, "GET", f"/games/{game_id}/timeline"))
+    await asyncio.sleep(0.1)
+    assert not request.done()
+    release.set()
+    assert await drain >= 1
+    # the request reached the new owner once the game had moved
+    assert await request == timeline
+
+
+@pytest.mark.asyncio
+async def test_failed_handoff_restores_the_ring(runtime, monkeypatch):
+    host, port = runtime.address
+    game_ids = await create_games_on(runtime, "worker-0", 2)
+    before = await runtime.get_status()
+    handoff = runtime.handoff
+    calls = []
+
+    async def failing_handoff(game_id, source, target):
+        calls.append(game_id)
+        if len(calls) == 1:
+            raise ConnectionError("The worker is unreachable.")
+        await handoff(game_id, source, target)
+
+    monkeypatch.setattr(runtime, "handoff", failing_handoff)
+    with pytest.raises(HTTPError):
+        await runtime.drain_worker("worker-0")
+
+    assert runtime.ring.nodes == ["worker-0", "worker-1"]
+    assert await runtime.get_status() == before
+    for game_id in game_ids:
+        assert "key_events" in await http_client.request_json(host, port, "GET", f"/games/{game_id}/timeline")
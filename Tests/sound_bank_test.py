@@ -0,0 +1,90 @@
+from Frontend.sound_bank import SoundBank
+
+
+class FakeSound:
+    def __init__(self, path):
+        if path.endswith("missing.mp3"):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.volume = 1.0
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+
+class FakeChannel:
+    def __init__(self, index):
+        self.index = index
+        self.sound = None
+
+    def get_busy(self):
+        return self.sound is not None
+
+    def play(self, sound, loops=0):
+        self.sound = sound
+
+    def stop(self):
+        self.sound = None
+
+
+class FakeMixer:
+    Sound = FakeSound
+
+    def __init__(self):
+        self.decoded = 0
+        self.reserved = 0
+        self.channels = []
+
+    def set_num_channels(self, count):
+        self.channels = [FakeChannel(index) for index in range(count)]
+
+    def set_reserved(self, count):
+        self.reserved = count
+
+    def Channel(self, index):
+        return self.channels[index]
+
+
+SOUNDS = {"click": ("click.mp3", 1.0), "typing": ("typing.mp3", 0.5), "heal": ("heal.mp3", 1.0)}
+
+
+def test_sounds_are_decoded_once_in_the_background():
+    mixer = FakeMixer()
+    bank = SoundBank(SOUNDS, channels=3, get_mixer=lambda: mixer)
+    # sounds played before they are loaded are skipped instead of decoded on the spot
+    assert bank.play("click") is None
+
+    assert bank.start() is bank.start()
+    assert bank.wait(5)
+    assert bank.is_loaded
+    assert bank.play("typing", loops=-1).sound.volume == 0.5
+    assert mixer.reserved == 1
+
+
+def test_looping_sounds_use_the_reserved_channel():
+    mixer = FakeMixer()
+    bank = SoundBank(SOUNDS, channels=3, get_mixer=lambda: mixer)
+    bank.load()
+    typing = bank.play("typing", loops=-1)
+    assert typing.index == 0
+
+    # one-shot sounds never cut off the looping sound, the oldest one-shot sound is cut off instead
+    channels = [bank.play("click").index, bank.play("heal").index, bank.play("click").index]
+    assert channels == [1, 2, 1]
+    assert typing.sound.path == "typing.mp3"
+
+    # stopping a sound only stops the channel it is playing on
+    bank.stop("typing")
+    assert not typing.get_busy()
+    bank.stop("heal")
+    assert not mixer.channels[2].get_busy()
+    assert mixer.channels[1].get_busy()
+
+
+def test_missing_sounds_are_skipped():
+    mixer = FakeMixer()
+    bank = SoundBank({"click": ("click.mp3", 1.0), "lost": ("missing.mp3", 1.0)}, get_mixer=lambda: mixer)
+    bank.load()
+    assert bank.is_loaded
+    assert bank.play("lost") is None
+    assert bank.play("click") is not None
@@ -0,0 +1,62 @@
+import os
+
+from PIL import Image
+
+from Frontend.sprite_atlas import SpriteAtlas
+
+
+def create_portrait(tmp_path, name, colour, size=4):
+    path = str(tmp_path / f"{name}.png")
+    Image.new("RGB", (size, size), colour).save(path)
+    return path
+
+
+def test_portraits_fill_cells_in_order(tmp_path):
+    atlas = SpriteAtlas("npc", 4, columns=2, directory=str(tmp_path / "atlas"), assets_directory=str(tmp_path))
+    for index, colour in enumerate(["red", "green", "blue"]):
+        assert atlas.add(f"npc{index}", create_portrait(tmp_path, f"npc{index}", colour))
+    assert not atlas.add("npc0", create_portrait(tmp_path, "npc0", "white"))
+
+    assert atlas.coordinates == {"npc0": (0, 0, 4, 4), "npc1": (4, 0, 4, 4), "npc2": (0, 4, 4, 4)}
+    # the atlas doubles its rows when it is full
+    assert (atlas.width, atlas.height) == (8, 8)
+    assert "npc2" in atlas
+
+
+def test_saved_atlas_contains_the_portraits(tmp_path):
+    atlas = SpriteAtlas("item", 4, columns=2, directory=str(tmp_path / "atlas"), assets_directory=str(tmp_path))
+    atlas.add("sword", create_portrait(tmp_path, "sword", (255, 0, 0)))
+    # portraits are scaled to the cell size
+    atlas.add("shield", create_portrait(tmp_path, "shield", (0, 0, 255), size=8))
+    src = atlas.save()
+    assert src.startswith("atlas/item_")
+
+    with Image.open(os.path.join(tmp_path, src)) as image:
+        assert image.size == (8, 4)
+        assert image.convert("RGB").getpixel((1, 1)) == (255, 0, 0)
+        assert image.convert("RGB").getpixel((6, 2)) == (0, 0, 255)
+
+
+def test_each_save_writes_a_new_version(tmp_path):
+    directory = tmp_path / "atlas"
+    atlas = SpriteAtlas("npc", 4, directory=str(directory), assets_directory=str(tmp_path))
+    assert atlas.save() is None
+    atlas.add("josh", create_portrait(tmp_path, "josh", "red"))
+    first = atlas.save()
+    # saving without new portraits keeps the same file
+    assert atlas.save() == first
+
+    atlas.add("amy", create_portrait(tmp_path, "amy", "blue"))
+    second = atlas.save()
+    assert second != first
+    assert os.listdir(directory) == [os.path.basename(second)]
+
+    # atlases left over from a previous game are deleted
+    SpriteAtlas("npc", 4, directory=str(directory), assets_directory=str(tmp_path))
+    assert os.listdir(directory) == []
+
+
+def test_unreadable_portraits_are_skipped(tmp_path):
+    atlas = SpriteAtlas("npc", 4, directory=str(tmp_path / "atlas"), assets_directory=str(tmp_path))
+    assert not atlas.add("ghost", str(tmp_path / "missing.png"))
+    assert "ghost" not in atlas
@@ -0,0 +1,33 @@
+from Benchmarks.startup_profile import parse_import_times, get_package_costs, profile_imports
+from Utilities import openai_api, update_attr
+
+REPORT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   openai._types
+import time:      1000 |       1120 | openai
+import time:       300 |        300 | textwrap
+"""
+
+
+def test_import_report_is_summed_per_package():
+    entries = parse_import_times(REPORT)
+    assert entries == [("openai._types", 120, 120), ("openai", 1000, 1120), ("textwrap", 300, 300)]
+    assert get_package_costs(entries) == {"openai": 1.12, "textwrap": 0.3}
+
+
+def test_game_modules_import_without_the_clients_and_audio():
+    _, costs = profile_imports("Engine.turn_pipeline, Utilities.utils")
+    assert "openai" not in costs
+    assert "pygame" not in costs
+    assert "numpy" not in costs
+
+    _, costs = profile_imports("Frontend.image_jobs, Frontend.pixel_art, Frontend.sprite_atlas")
+    for package in ["requests", "PIL", "numpy"]:
+        assert package not in costs
+
+
+def test_default_clients_are_created_once(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(openai_api, "_client", None)
+    monkeypatch.setattr(update_attr, "_client", None)
+    assert openai_api.get_default_client() is openai_api.get_client()
+    assert update_attr.get_default_client() is update_attr.get_client()
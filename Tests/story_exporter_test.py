@@ -0,0 +1,78 @@
+import os
+import zipfile
+
+import pytest
+
+from Utilities import story_exporter
+from Utilities.story_exporter import split_sentences, export_story, iter_history, create_archive
+
+
+def test_split_sentences():
+    text = 'Mr. Hale paid 2.5 gold. "Run!" she shouted. J. R. Smith came, e.g. with Tom. Then "Go." He left...\nFine'
+    assert list(split_sentences(text)) == [
+        "Mr. Hale paid 2.5 gold.", '"Run!" she shouted.', "J. R. Smith came, e.g. with Tom.", 'Then "Go."',
+        "He left...", "Fine"
+    ]
+    assert list(split_sentences("  \n")) == []
+
+
+def test_story_is_exported_to_every_format(tmp_path):
+    story = ["The knight arrived. Dr. Voss waited.", "Your input: I <draw> my sword", "A *dragon* appeared."]
+    paths = export_story(iter(story), str(tmp_path), "Bob's Story")
+    assert sorted(paths) == sorted(story_exporter.FORMATS)
+
+    with open(paths["txt"], encoding="utf-8") as file:
+        assert file.read() == "The knight arrived.\nDr. Voss waited.\n\nYour input: I <draw> my sword\n\n" \
+                              "A *dragon* appeared.\n\n"
+    with open(paths["md"], encoding="utf-8") as file:
+        markdown = file.read()
+    assert markdown.startswith("# Bob's Story\n")
+    assert "> Your input: I \\<draw\\> my sword" in markdown
+    assert "A \\*dragon\\* appeared." in markdown
+    with open(paths["html"], encoding="utf-8") as file:
+        page = file.read()
+    assert '<p class="input"><em>Your input: I &lt;draw&gt; my sword</em></p>' in page
+    assert page.endswith("</html>\n")
+
+
+def test_epub_is_split_into_chapters(tmp_path):
+    path = str(tmp_path / "story.epub")
+    writer = story_exporter.EpubWriter(path, "Bob & Amy", chapter_size=2)
+    for index in range(5):
+        writer.write(f"Paragraph {index}.")
+    writer.close()
+
+    with zipfile.ZipFile(path) as book:
+        first = book.infolist()[0]
+        assert (first.filename, first.compress_type) == ("mimetype", zipfile.ZIP_STORED)
+        assert sorted(name for name in book.namelist() if "chapter" in name) == [
+            f"OEBPS/chapter_{index}.xhtml" for index in range(1, 4)]
+        assert "Paragraph 4." in book.read("OEBPS/chapter_3.xhtml").decode()
+        package = book.read("OEBPS/content.opf").decode()
+        assert "<dc:title>Bob &amp; Amy</dc:title>" in package
+        assert package.count("<itemref") == 3
+
+
+def test_story_from_history():
+    history = [
+        {"role": "system", "content": [{"type": "text", "text": "Rules"}]},
+        {"role": "user", "content": [{"type": "text", "text": "A long prompt"}]},
+        {"role": "assistant", "content": [{"type": "text", "text": "The story begins."}]},
+        {"role": "assistant", "content": "It continues."},
+    ]
+    assert list(iter_history(history)) == ["The story begins.", "It continues."]
+
+
+def test_archive(tmp_path):
+    directory = tmp_path / "export"
+    export_story(["Once upon a time."], str(directory), "Story", ["txt", "epub"])
+    path = create_archive(str(directory))
+    assert not os.path.exists(directory)
+    with zipfile.ZipFile(path) as archive:
+        assert sorted(archive.namelist()) == ["story.epub", "story.txt"]
+        assert archive.read("story.txt") == b"Once upon a time.\n\n"
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_story([], str(tmp_path), "Story", ["pdf"])
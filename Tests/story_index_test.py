@@ -0,0 +1,84 @@
+from Utilities import story_index
+from Utilities.story_index import StoryIndex
+
+
+def create_message(role, text):
+    return {"role": role, "content": [{"type": "text", "text": text}]}
+
+
+def test_search_ranks_relevant_passages():
+    index = StoryIndex()
+    passages = ["The dragon sleeps under the mountain.", "You buy bread at the market.",
+                "The blacksmith forges a dragon-slaying sword for the dragon hunt."]
+    index.sync("story", passages, lambda passage: [passage])
+    results = index.search("Where is the dragon?")
+    assert [passage_id for passage_id, _ in results] == [2, 0]
+    assert index.search("the dragon mountain")[0][0] == 0
+    assert index.search("castle") == []
+
+
+def test_sync_follows_truncation_and_replacement():
+    index = StoryIndex()
+    events = ["Bob found a sword.", "Bob met Alice."]
+    index.sync("key_events", events, lambda event: [event])
+    events.append("Alice stole the sword.")
+    index.sync("key_events", events, lambda event: [event])
+    assert len(index) == 3
+
+    # a rewind truncates the list in place
+    del events[1:]
+    index.sync("key_events", events, lambda event: [event])
+    assert index.get_context("Alice") == []
+    assert index.get_context("sword") == ["Bob found a sword."]
+
+    index.sync("key_events", ["Alice left."], lambda event: [event])
+    assert index.get_context("sword") == []
+    assert len(index) == 1
+
+
+def test_get_context_keeps_to_budget():
+    index = StoryIndex()
+    passages = [f"The wolf howls, night {night}." for night in range(10)] + ["The wolf " * 200]
+    index.sync("story", passages, lambda passage: [passage])
+    context = index.get_context("wolf", budget=30)
+    assert sum(story_index.estimate_tokens(passage) for passage in context) <= 30
+    assert context == sorted(context, key=passages.index)
+    # passages the prompt already contains aren't sent twice
+    assert "The wolf howls, night 3." not in index.get_context("wolf The wolf howls, night 3.", budget=1000)
+
+
+def test_select_story_messages():
+    history = [create_message("system", "The story should feel like a window"),
+               create_message("user", "**World JSON dictionary:** rules: magic is forbidden")]
+    for turn in range(6):
+        history.append(create_message("assistant", f"You see a lantern {turn}.\n\nA raven {turn} caws."))
+        history.append(create_message("user", f"Turn {turn}: I look around."))
+    history[-1] = create_message("user", "I follow the raven 1.")
+    index = StoryIndex()
+
+    messages = story_index.select_story_messages(history, ["A raven led Bob home."], index, budget=200)
+    # the starting prompt holding the world rules is always sent
+    assert messages[0] is history[0] and messages[1] is history[1]
+    assert messages[-5:] == history[-5:]
+    context = story_index.get_text(messages[2])
+    assert "A raven 1 caws." in context
+    # the recent messages aren't repeated in the context
+    assert "A raven 5 caws." not in context
+    assert len(messages) == 2 + 1 + story_index.RECENT_MESSAGES + 1
+
+    assert story_index.select_story_messages(history, [], index, budget=None) is history
+    assert story_index.select_story_messages(history[:4], [], index) == history[:4]
+
+
+def test_query_is_the_players_action():
+    prompt = ('You are a storyteller. Continue the interactive "Fantasy" story. The Main Character (ID: 1) is "Bob". '
+              'This is what the user wants to do next: "I ask the "old" miller about the mill".\n\n'
+              'Below are the updated Character JSON dictionaries\n{"inventory": ["lantern"], "money": 5}')
+    assert story_index.get_story_query(prompt) == 'I ask the "old" miller about the mill'
+    assert story_index.get_story_query("Regenerate the story.\n" + story_index.CHARACTER_JSON_HEADER + " {}") == \
+        "Regenerate the story.\n"
+
+    index = StoryIndex()
+    index.sync("story", ["The lantern flickers in the inventory of the cart.", "The miller grinds flour at the mill."],
+               lambda passage: [passage])
+    assert index.get_context(story_index.get_story_query(prompt)) == ["The miller grinds flour at the mill."]
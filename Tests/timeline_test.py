@@ -0,0 +1,139 @@
+from Classes.Timeline import Timeline, CHAPTER, ARC
+from Engine import engine
+from Utilities import update_attr
+import pytest
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def test_add_event_ignores_duplicates():
+    timeline = Timeline()
+    timeline.add_event("Bob found a sword.")
+    timeline.add_event("Bob met Alice.")
+    timeline.add_event("Bob found a sword.")
+    assert timeline.get_event == ["Bob found a sword.", "Bob met Alice."]
+    assert [entry["turn"] for entry in timeline.get_page(0)] == [1, 2]
+    timeline.add_event("Alice left.", turn=7)
+    assert timeline.get_entry(2)["turn"] == 7
+    assert timeline.get_entry(2)["timestamp"] != ""
+
+
+def test_old_saves_get_turns():
+    timeline = Timeline(["Bob found a sword.", "Bob met Alice."])
+    assert timeline.to_dict() == {"key_events": ["Bob found a sword.", "Bob met Alice."], "turns": [1, 2],
+                                  "timestamps": ["", ""], "chapters": [], "arcs": []}
+    # the timeline doesn't share its default list with other timelines
+    Timeline().add_event("Bob left.")
+    assert Timeline().get_event == []
+
+
+def test_search():
+    timeline = Timeline()
+    timeline.add_event("Bob found a sword in the cave.")
+    timeline.add_event("Alice sold Bob's sword.")
+    timeline.add_event("The dragon burned the village.")
+    assert [entry["event"] for entry in timeline.search("SWORD")] == ["Alice sold Bob's sword.",
+                                                                     "Bob found a sword in the cave."]
+    assert [entry["position"] for entry in timeline.search("sword cave")] == [0]
+    assert timeline.search("sword", limit=1)[0]["position"] == 1
+    assert timeline.search("castle") == []
+    assert timeline.search("") == []
+
+
+def test_pages():
+    timeline = Timeline()
+    for turn in range(45):
+        timeline.add_event(f"Event {turn}")
+    assert timeline.get_page_count() == 3
+    assert [entry["event"] for entry in timeline.get_page(2)] == [f"Event {turn}" for turn in range(40, 45)]
+    assert len(timeline.get_page(1, page_size=10)) == 10
+    assert timeline.get_page(5) == []
+    assert Timeline().get_page_count() == 1
+
+
+def test_index_follows_rewinds():
+    main_engine = engine.Engine()
+    main_engine.add_world({"rules": [], "genre": "Fantasy", "environment": "", "locations": []})
+    main_engine.add_timeline({"key_events": ["Bob woke up."]})
+    main_engine.checkpoint(turn=0)
+    main_engine.timeline.add_event("Bob found a sword.")
+    main_engine.checkpoint(turn=1)
+
+    main_engine.rewind(1)
+    timeline = main_engine.timeline
+    assert timeline.search("sword") == []
+    assert timeline.to_dict()["turns"] == [1]
+    # the event can be added again once it was rewound
+    timeline.add_event("Bob found a sword.")
+    assert timeline.search("sword")[0]["position"] == 1
+
+    # replacing the events rebuilds the index
+    timeline._key_events = ["Alice found a shield."]
+    assert timeline.search("sword") == []
+    assert timeline.search("shield")[0]["event"] == "Alice found a shield."
+
+
+def test_compaction_levels():
+    timeline = Timeline(chapter_size=2, arc_size=2)
+    for turn in range(5):
+        timeline.add_event(f"Event {turn}")
+    assert timeline.get_pending_summary() == (CHAPTER, ["Event 0", "Event 1"])
+    assert timeline.add_summary(CHAPTER, ["Event 0", "Event 1"], "Chapter 0")
+    # summaries written for an older state of the timeline are ignored
+    assert not timeline.add_summary(CHAPTER, ["Event 0", "Event 1"], "Chapter 0")
+    assert timeline.add_summary(CHAPTER, ["Event 2", "Event 3"], "Chapter 1")
+    assert timeline.get_pending_summary() == (ARC, ["Chapter 0", "Chapter 1"])
+    assert timeline.add_summary(ARC, ["Chapter 0", "Chapter 1"], "Arc 0")
+    assert timeline.get_pending_summary() is None
+
+    prompt = str(timeline)
+    assert "Arc 0" in prompt and "Chapter 0" not in prompt and "Event 3" not in prompt and "Event 4" in prompt
+    assert len(timeline.get_event) == 5
+
+    # rewinding below a chapter drops its summaries
+    del timeline.get_event[3:]
+    assert timeline.to_dict()["chapters"] == ["Chapter 0"]
+    assert timeline.arcs == []
+
+
+@pytest.mark.asyncio
+async def test_engine_compacts_in_background(monkeypatch):
+    async def get_timeline_summary(items, level, session=None):
+        return f"{level}: {items[0]}"
+
+    monkeypatch.setattr(update_attr, "get_timeline_summary", get_timeline_summary)
+    main_engine = engine.Engine()
+    main_engine.add_timeline({"key_events": [f"Event {turn}" for turn in range(9)]})
+    assert main_engine.start_timeline_compaction() is None
+    main_engine.timeline.add_event("Event 9")
+    task = main_engine.start_timeline_compaction()
+    assert await task == 1
+    assert main_engine.timeline.chapters == ["chapter: Event 0"]
+
+
+def test_near_duplicate_events_are_suppressed():
+    timeline = Timeline()
+    assert timeline.add_event("You enter the tavern and meet Alice, who offers you a quest to find the lost sword.")
+    assert not timeline.add_event("You enter the tavern and meet Alice, who offers you a quest to find a lost sword.")
+    assert timeline.add_event("Alice leads you out of the tavern towards the mountains.")
+    assert len(timeline.get_event) == 2
+    assert timeline.near_duplicates.suppressed == 1
+
+
+def test_different_events_are_kept():
+    timeline = Timeline()
+    assert timeline.add_event("You defeated the goblin king in the throne room.")
+    assert timeline.add_event("You were defeated by the goblin king in the throne room.")
+    assert timeline.add_event("You paid the innkeeper 10 gold for a room.")
+    assert timeline.add_event("You paid the innkeeper 50 gold for a room.")
+    assert timeline.near_duplicates.suppressed == 0
+
+
+def test_only_latest_events_are_near_duplicates():
+    timeline = Timeline(duplicate_window=2)
+    timeline.add_event("Alice offers you a quest to find the lost sword.")
+    timeline.add_event("You leave the tavern.")
+    assert not timeline.add_event("Alice offers you a quest to find a lost sword!")
+    timeline.add_event("You cross the bridge.")
+    # the same summary much later is a new event, e.g. a second quest
+    assert timeline.add_event("Alice offers you a quest to find a lost sword!")
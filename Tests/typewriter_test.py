@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from Frontend.typewriter import Typewriter
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_text_is_rendered_once_per_frame():
+    clock = FakeClock()
+    typewriter = Typewriter(characters_per_second=600, frame_time=1 / 60, clock=clock, sleep=clock.sleep)
+    frames = []
+    text = "x" * 1400
+    updates = await typewriter.type(text, frames.append)
+
+    assert frames[-1] == text
+    # 10 characters are revealed each frame instead of updating the UI for every character
+    assert updates == len(frames) == typewriter.last_update_count
+    assert 139 <= updates <= 141
+    assert clock.now == pytest.approx(1400 / 600, abs=1 / 30)
+
+
+@pytest.mark.asyncio
+async def test_slow_frames_catch_up():
+    clock = FakeClock()
+    typewriter = Typewriter(characters_per_second=50, frame_time=0.5, clock=clock, sleep=clock.sleep)
+    frames = []
+    await typewriter.type("x" * 100, frames.append)
+    assert [len(frame) for frame in frames] == [25 * index for index in range(1, 5)]
+
+
+@pytest.mark.asyncio
+async def test_skip_shows_the_rest_of_the_message():
+    clock = FakeClock()
+    typewriter = Typewriter(characters_per_second=60, frame_time=1 / 60, clock=clock, sleep=clock.sleep)
+    frames = []
+    task = asyncio.create_task(typewriter.type("hello world " * 20, frames.append))
+    while len(frames) < 3:
+        await asyncio.sleep(0)
+    assert typewriter.is_typing
+    typewriter.skip()
+    await task
+
+    assert frames[-1] == "hello world " * 20
+    assert len(frames) == 4
+    assert not typewriter.is_typing
+
+    # messages started after the skip are typed normally
+    await typewriter.type("abc", frames.append)
+    assert frames[-3:] == ["a", "ab", "abc"]
+
+
+@pytest.mark.asyncio
+async def test_messages_are_shown_at_once_without_a_speed():
+    typewriter = Typewriter(characters_per_second=0)
+    frames = []
+    assert await typewriter.type("hello", frames.append) == 1
+    assert frames == ["hello"]
+    assert await typewriter.type("", frames.append) == 0
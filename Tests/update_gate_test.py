@@ -0,0 +1,131 @@
+from Benchmarks import update_gate_evaluation
+from Engine import engine, turn_pipeline
+from Utilities import update_gate, update_gate_turns, utils, openai_api
+from Utilities.session import Session
+from Utilities.update_gate import UpdateGate, MONEY, RELATIONSHIP, INVENTORY, CURRENT_LOCATION, HP, ATTRIBUTES
+import pytest
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def test_score_and_skip():
+    gate = UpdateGate()
+    story = "You pay Alice 5 gold coins for a room and she hands you a brass key."
+    assert gate.score(MONEY, story) >= 3
+    assert gate.should_update(INVENTORY, story)
+    assert not gate.should_update(CURRENT_LOCATION, "The bard finishes his song and the crowd cheers.")
+    assert gate.get_stats()[CURRENT_LOCATION] == {"checks": 1, "skipped": 1}
+    assert gate.get_stats()[INVENTORY] == {"checks": 1, "skipped": 0}
+
+
+def test_relationships_need_npcs():
+    gate = UpdateGate()
+    story = "Cedric laughs and thanks you for your help."
+    assert gate.score(RELATIONSHIP, story) == 0
+    assert gate.score(RELATIONSHIP, story, ["Cedric"]) == 3
+    # an NPC being mentioned is enough
+    assert gate.should_update(RELATIONSHIP, "Cedric sits down by the fire.", ["Cedric"])
+
+
+def test_threshold_of_zero_always_updates():
+    gate = UpdateGate({HP: 0})
+    assert gate.should_update(HP, "The stars are bright above the forest.")
+    assert UpdateGate({HP: 5}).get_threshold(MONEY) == update_gate.DEFAULT_THRESHOLD
+
+
+def test_calibrate():
+    gate = UpdateGate({MONEY: 10})
+    examples = [("You find 3 gold coins.", [], [MONEY]), ("You pay 10 gold for a horse.", [], [MONEY]),
+                ("The wind howls.", [], [HP])]
+    thresholds = update_gate.calibrate(gate, examples)
+    assert thresholds[MONEY] == min(gate.score(MONEY, story) for story, _, _ in examples[:2])
+    # the HP change can't be found by its cue words, so HP is always updated
+    assert thresholds[HP] == 0
+    assert thresholds[CURRENT_LOCATION] == update_gate.DEFAULT_THRESHOLD
+
+
+def test_calibration_never_raises_thresholds():
+    examples = [("You pay 10 gold coins for a horse.", [], [MONEY])]
+    assert update_gate.calibrate(UpdateGate(), examples)[MONEY] == update_gate.DEFAULT_THRESHOLD
+    assert update_gate.calibrate(UpdateGate({MONEY: 0}), examples)[MONEY] == 0
+
+
+def test_fail_open():
+    gate = UpdateGate()
+    examples = [("You find 3 gold coins.", [], [MONEY]), ("The guard empties your pockets.", [], [MONEY])]
+    assert update_gate.fail_open(gate, examples, 0.5)[MONEY] == gate.get_threshold(MONEY)
+    # the cue words miss the second change, so money is always updated
+    assert update_gate.fail_open(gate, examples)[MONEY] == 0
+    assert update_gate.fail_open(gate, examples)[HP] == gate.get_threshold(HP)
+
+
+@pytest.mark.parametrize("recall_target", [1.0, 0.75, 0.5])
+def test_gate_meets_recall_target_on_held_out_turns(recall_target):
+    evaluation = update_gate.evaluate(update_gate.create_gate(recall_target), update_gate_turns.HELD_OUT_TURNS)
+    assert all(evaluation[attribute]["recall"] >= recall_target for attribute in ATTRIBUTES)
+    assert Session(recall_target=recall_target).update_gate.thresholds == \
+        update_gate.create_gate(recall_target).thresholds
+
+
+def test_evaluation_uses_held_out_turns():
+    results = update_gate_evaluation.run_benchmark()
+    assert all(0 <= value <= 1 for value in results.values())
+    tuning = {story for story, _, _ in update_gate_turns.TUNING_TURNS}
+    assert not tuning & {story for story, _, _ in update_gate_turns.HELD_OUT_TURNS}
+    # calibration doesn't do worse than the default thresholds
+    assert all(results[f"calibrated_{attribute}_recall"] >= results[f"default_{attribute}_recall"]
+               for attribute in ATTRIBUTES)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_skips_gated_updates(monkeypatch):
+    requested = []
+
+    async def get_updates(attribute, story, char_dicts, id_list, name_list, session=None):
+        requested.append(attribute)
+        return []
+
+    monkeypatch.setattr(utils, "get_updates", get_updates)
+    session = Session()
+    # the gate is off unless a game turns it on
+    assert session.update_gate is None
+    session.update_gate = UpdateGate()
+    main_engine = engine.Engine(session=session)
+    main_engine.mainCharacter = {"id": 1, "name": "Bob", "physical_condition": "Healthy", "occupation": "Knight",
+                                 "money": 50.0, "relationship": {}, "personality": [], "inventory": [],
+                                 "stats": {"HP": 100, "LUCK": 10, "CHA": 10}, "current_location": "",
+                                 "appearance": ""}
+
+    story, updates = await turn_pipeline.validate_money(main_engine, "The wind howls.", ["The wind howls."], session)
+    assert (story, updates, requested) == ("The wind howls.", [], [])
+    await turn_pipeline.validate_money(main_engine, "You buy a map.", ["You buy a map."], session)
+    assert requested == [MONEY]
+
+    session.update_gate = None
+    await turn_pipeline.validate_money(main_engine, "The wind howls.", ["The wind howls."], session)
+    assert requested == [MONEY, MONEY]
+
+
+@pytest.mark.asyncio
+async def test_regenerated_story_is_gated(monkeypatch):
+    requested = []
+
+    async def get_updates(attribute, story, char_dicts, id_list, name_list, session=None):
+        requested.append(story)
+        return [(1, "-", "1000")]
+
+    monkeypatch.setattr(utils, "get_updates", get_updates)
+    monkeypatch.setattr(openai_api, "get_story", lambda prompt, session=None: "The wind howls.")
+    session = Session()
+    session.update_gate = UpdateGate()
+    main_engine = engine.Engine(session=session)
+    main_engine.mainCharacter = {"id": 1, "name": "Bob", "physical_condition": "Healthy", "occupation": "Knight",
+                                 "money": 50.0, "relationship": {}, "personality": [], "inventory": [],
+                                 "stats": {"HP": 100, "LUCK": 10, "CHA": 10}, "current_location": "",
+                                 "appearance": ""}
+    recent_stories = ["You buy a castle."]
+
+    story, updates = await turn_pipeline.validate_money(main_engine, "You buy a castle.", recent_stories, session)
+    # the regenerated story doesn't involve money, so it isn't sent for a money update
+    assert (story, updates, requested, recent_stories) == ("The wind howls.", [], ["You buy a castle."],
+                                                           ["The wind howls."])
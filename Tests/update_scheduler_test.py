@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+
+from Frontend.update_scheduler import UpdateScheduler
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class FakePage:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, *controls):
+        self.updates.append(controls)
+
+
+@pytest.mark.asyncio
+async def test_requests_within_a_frame_are_merged():
+    page = FakePage()
+    scheduler = UpdateScheduler(page.update, asyncio.get_running_loop(), frame_time=0.01)
+    name, error = object(), object()
+    for _ in range(20):
+        scheduler.request(name, error)
+    assert scheduler.pending
+    assert page.updates == []
+
+    await asyncio.sleep(0.03)
+    assert page.updates == [(name, error)]
+    assert (scheduler.requests, scheduler.flushes, scheduler.suppressed) == (20, 1, 19)
+    assert not scheduler.pending
+
+
+@pytest.mark.asyncio
+async def test_whole_page_request_replaces_dirty_controls():
+    page = FakePage()
+    scheduler = UpdateScheduler(page.update, asyncio.get_running_loop(), frame_time=0.01)
+    scheduler.request(object())
+    scheduler.request()
+    scheduler.request(object())
+    await asyncio.sleep(0.03)
+    assert page.updates == [()]
+
+
+@pytest.mark.asyncio
+async def test_updates_are_sent_at_most_once_per_frame():
+    page = FakePage()
+    loop = asyncio.get_running_loop()
+    scheduler = UpdateScheduler(page.update, loop, frame_time=0.05)
+    scheduler.request()
+    await asyncio.sleep(0.01)
+    assert len(page.updates) == 1
+
+    start = loop.time()
+    scheduler.request()
+    while len(page.updates) < 2:
+        await asyncio.sleep(0.005)
+    # the second update waits for the rest of the frame
+    assert loop.time() - start >= 0.03
+
+
+@pytest.mark.asyncio
+async def test_flush_and_requests_from_other_threads():
+    page = FakePage()
+    scheduler = UpdateScheduler(page.update, asyncio.get_running_loop(), frame_time=0.01)
+    scheduler.request()
+    scheduler.flush()
+    assert page.updates == [()]
+    # flushing without dirty controls does nothing
+    scheduler.flush()
+    assert page.updates == [()]
+
+    control = object()
+    thread = threading.Thread(target=scheduler.request, args=(control,))
+    thread.start()
+    thread.join()
+    await asyncio.sleep(0.03)
+    assert page.updates == [(), (control,)]
@@ -1,5 +1,6 @@
 from Utilities import utils
 from Engine import engine
+from Utilities.session import Session
 import pytest
 import json
 
@@ -89,6 +90,20 @@ def test_get_prompt_starting(main_engine, character, character2, world, timeline
     assert "Fantasy" in prompt
 
 
+def test_sessions_are_isolated():
+    session = Session()
+    other_session = Session()
+
+    # a new character is introduced on the first continuation prompt of a session
+    prompt: str = utils.get_prompt("Fantasy", "Bob", 10, False, session=session, user_input="Look around",
+                                   char_str="", new_char=True, random_event=None, char_deceased=None)
+    assert session.new_char_count == 10
+    assert other_session.new_char_count == 1
+    assert session.engine is not other_session.engine
+    assert session.engine.session is session
+    assert "Bob" in prompt
+
+
 def test_json_converter():
     str_to_convert: str = """
     {
@@ -0,0 +1,86 @@
+from Classes.World import World
+from Engine import engine
+from Utilities import update_attr
+import pytest
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def test_locations_are_unique():
+    world = World()
+    world.add_locations("The Tavern")
+    world.add_locations("the  tavern")
+    world.add_locations("Market")
+    assert world.locations == ["The Tavern", "Market"]
+    assert world.has_location("THE TAVERN")
+    assert not world.has_location("Castle")
+    # the default locations aren't shared between worlds
+    assert World().locations == []
+
+
+def test_move_to_reuses_environments():
+    world = World()
+    assert world.move_to("Tavern", "") is None
+    world.set_location_environment("Tavern", "A smoky tavern.")
+    world.move_to("Market", "Tavern")
+    world.move_to("tavern", "Market")
+    assert world.move_to("Market", "Tavern") is None
+    assert world.environment == "A smoky tavern."
+    assert world.environment_reuses == 1
+    assert world.routes == {"tavern": {"market": 2}, "market": {"tavern": 1}}
+    assert world.to_dict()["location_environments"] == {"tavern": "A smoky tavern."}
+
+
+def test_locations_follow_rewinds():
+    main_engine = engine.Engine()
+    main_engine.add_world({"rules": [], "genre": "Fantasy", "environment": "", "locations": ["Tavern"]})
+    main_engine.add_timeline({"key_events": []})
+    main_engine.checkpoint(turn=0)
+    main_engine.world.move_to("Market", "Tavern")
+    main_engine.world.set_location_environment("Market", "A busy market.")
+    main_engine.checkpoint(turn=1)
+
+    main_engine.rewind(1)
+    assert not main_engine.world.has_location("Market")
+    assert main_engine.world.get_location_environment("Market") is None
+    assert main_engine.world.routes == {}
+
+
+@pytest.mark.asyncio
+async def test_revisits_skip_environment_requests(monkeypatch):
+    requests = []
+
+    async def get_environment(story, session=None):
+        requests.append(story)
+        return f"Environment {len(requests)}"
+
+    monkeypatch.setattr(update_attr, "get_environment", get_environment)
+    main_engine = engine.Engine()
+    main_engine.add_world({"rules": [], "genre": "Fantasy", "environment": "", "locations": []})
+    main_engine.mainCharacter = {"id": 1, "name": "Bob", "physical_condition": "Healthy", "occupation": "Knight",
+                                 "money": 50.0, "relationship": {}, "personality": [], "inventory": [],
+                                 "stats": {"HP": 100, "LUCK": 10, "CHA": 10}, "current_location": "",
+                                 "appearance": ""}
+    for location in ["Tavern", "Market", "Tavern"]:
+        await main_engine.update_char_current_location(location, [(1, location)])
+    assert requests == ["Tavern", "Market"]
+    assert main_engine.world.environment == "Environment 1"
+    assert main_engine.world.environment_reuses == 1
+
+
+def test_near_duplicate_locations_are_resolved():
+    world = World(locations=["The Old Mill"])
+    assert world.resolve_location("the old mill.") == "The Old Mill"
+    assert world.resolve_location("Old Mill") == "The Old Mill"
+    assert world.resolve_location("Harbour Gate") == "Harbour Gate"
+    world.set_location_environment("The Old Mill", "A creaking mill.")
+    assert world.move_to("old mill", "Harbour Gate") == "A creaking mill."
+    assert world.locations == ["The Old Mill"]
+    assert world.near_duplicates.suppressed == 3
+
+
+def test_different_locations_are_kept():
+    world = World(locations=["Castle dungeon level 1", "Old Mill"])
+    assert world.resolve_location("Castle dungeon level 2") == "Castle dungeon level 2"
+    assert world.resolve_location("Old Mill Road") == "Old Mill Road"
+    assert world.resolve_location("the castle dungeon, level 1") == "Castle dungeon level 1"
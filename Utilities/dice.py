@@ -0,0 +1,58 @@
+import random
+from typing import List, Any
+
+
+class Dice:
+    def __init__(self, seed: int | str | None = None):
+        """Initialises a Dice object, which rolls dice in-process using its own random number stream.
+
+        Every session owns its own Dice, so rolls in one game never affect the rolls in another game. Games using
+        the same seed roll the same numbers, which makes them reproducible in tests and on the server.
+
+        :param seed: The seed of the random number stream. If it isn't provided, the stream is seeded randomly.
+        """
+        self.seed = seed
+        self._random = random.Random(seed)
+
+    @property
+    def random(self) -> random.Random:
+        """Fetches the random number stream of the dice, used to pick the effects of the roll.
+
+        :return: The Random object.
+        """
+        return self._random
+
+    def roll(self, count: int = 2, sides: int = 6) -> List[int]:
+        """Rolls the dice.
+
+        :param count: The number of dice rolled.
+        :param sides: The number of sides of each dice.
+        :return: A list containing the value of each dice.
+        """
+        return [self._random.randint(1, sides) for _ in range(count)]
+
+    async def roll_async(self, count: int = 2, sides: int = 6) -> List[int]:
+        """Rolls the dice. Backends showing the roll to the player wait for the roll to be shown before returning.
+
+        :param count: The number of dice rolled.
+        :param sides: The number of sides of each dice.
+        :return: A list containing the value of each dice.
+        """
+        return self.roll(count, sides)
+
+    def get_state(self) -> List[Any]:
+        """Fetches the state of the random number stream, so the stream can be continued after a game is reloaded.
+
+        :return: A JSON-serialisable list containing the state.
+        """
+        version, internal_state, gauss_next = self._random.getstate()
+        return [version, list(internal_state), gauss_next]
+
+    def set_state(self, state: List[Any]) -> None:
+        """Restores the state of the random number stream returned by ``get_state``.
+
+        :param state: A list containing the state.
+        :return: None
+        """
+        version, internal_state, gauss_next = state
+        self._random.setstate((version, tuple(internal_state), gauss_next))
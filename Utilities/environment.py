@@ -0,0 +1,18 @@
+import threading
+
+from dotenv import load_dotenv
+
+_loaded: bool = False
+_lock = threading.Lock()
+
+
+def load_environment() -> None:
+    """Loads the environment variables in the .env file, once per process.
+
+    :return: None
+    """
+    global _loaded
+    with _lock:
+        if not _loaded:
+            load_dotenv()
+            _loaded = True
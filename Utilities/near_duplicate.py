@@ -0,0 +1,236 @@
+import re
+import random
+import zlib
+from collections import deque
+from typing import List, Dict, Set, TypeVar, Generic, Hashable, Container, TYPE_CHECKING
+
+# numpy is only imported once the first signature is computed, so importing the game classes doesn't slow down the
+# start of the game
+if TYPE_CHECKING:
+    import numpy as np
+
+K = TypeVar("K", bound=Hashable)
+
+# the Jaccard similarity of the shingles above which two texts are near-duplicates
+DEFAULT_THRESHOLD: float = 0.7
+DEFAULT_PERMUTATIONS: int = 64
+# 16 bands of 4 rows find about 99% of the pairs at the default threshold as candidates
+DEFAULT_BANDS: int = 16
+# the number of words in each shingle: pairs of words keep the order of a sentence, e.g. who defeated whom
+DEFAULT_SHINGLE_SIZE: int = 2
+# the number of suppressed entries kept for the stats
+DEFAULT_HISTORY: int = 50
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+# words left out of the shingles, so "the old mill" and "old mill" are the same
+ARTICLES: frozenset[str] = frozenset({"a", "an", "the"})
+# words that turn a sentence into its opposite, so two texts are only near-duplicates if both or neither contain one
+NEGATIONS: frozenset[str] = frozenset({"not", "no", "never", "nor", "none", "nothing", "nobody", "cannot",
+                                       "without", "failed", "fails", "fail"})
+NUMBER_WORDS: frozenset[str] = frozenset("""
+zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen sixteen seventeen
+eighteen nineteen twenty thirty forty fifty sixty seventy eighty ninety hundred thousand million half dozen
+first second third fourth fifth sixth seventh eighth ninth tenth
+""".split())
+
+
+def get_words(text: str) -> List[str]:
+    """Splits a text into its lowercase words, ignoring punctuation.
+
+    :param text: The text.
+    :return: A list containing the words, in the order they appear.
+    """
+    return _WORD.findall(text.lower().replace("’", "'"))
+
+
+def get_shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> Set[str]:
+    """Splits a text into overlapping word shingles, ignoring case, punctuation and articles.
+
+    :param text: The text.
+    :param size: The number of words in each shingle.
+    :return: A set containing the shingles, or the whole normalised text if it is shorter than a shingle.
+    """
+    words: List[str] = [word for word in get_words(text) if word not in ARTICLES]
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def get_markers(text: str) -> tuple[frozenset[str], bool]:
+    """Fetches the parts of a text that change its meaning however similar the rest of it is: its numbers, e.g.
+    paying 10 or 50 gold, and whether it is negated.
+
+    :param text: The text.
+    :return: A tuple containing the numbers in the text and whether it contains a negation.
+    """
+    words: List[str] = get_words(text)
+    numbers: frozenset[str] = frozenset(word for word in words if word.isdigit() or word in NUMBER_WORDS)
+    return numbers, any(word in NEGATIONS or word.endswith("n't") for word in words)
+
+
+def get_jaccard(shingles: Set[str], other_shingles: Set[str]) -> float:
+    """Measures the Jaccard similarity of two sets of shingles.
+
+    :param shingles: The shingles of a text.
+    :param other_shingles: The shingles of the other text.
+    :return: The size of the intersection divided by the size of the union, from 0 to 1.
+    """
+    if not shingles and not other_shingles:
+        return 1.0
+    return len(shingles & other_shingles) / len(shingles | other_shingles)
+
+
+class NearDuplicateIndex(Generic[K]):
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, permutations: int = DEFAULT_PERMUTATIONS,
+                 bands: int = DEFAULT_BANDS, shingle_size: int = DEFAULT_SHINGLE_SIZE, seed: int = 1,
+                 history: int = DEFAULT_HISTORY):
+        """Initialises a NearDuplicateIndex object, which finds texts that are almost the same as a text in the index.
+
+        Every text is reduced to a MinHash signature, which is split into bands that are stored in hash tables
+        (locality-sensitive hashing), so a check only compares the text to the few entries sharing a band with it,
+        however many entries there are. The candidates are then compared exactly, and are only near-duplicates if
+        they contain the same numbers and are both negated or both not (see ``get_markers``).
+
+        :param threshold: The Jaccard similarity of the shingles above which two texts are near-duplicates.
+        :param permutations: The number of hash permutations in each signature.
+        :param bands: The number of bands the signatures are split into. More bands find more candidates.
+        :param shingle_size: The number of words in each shingle. Single words suit short names, e.g. of items.
+        :param seed: The seed of the hash permutations.
+        :param history: The number of suppressed entries kept for the stats.
+        """
+        if permutations % bands != 0:
+            raise ValueError("The number of permutations must be a multiple of the number of bands.")
+        self.threshold = threshold
+        self.bands = bands
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        # each permutation hashes a shingle hash x to a * x + b modulo 2^32, with an odd multiplier a
+        self._multipliers: List[int] = [rng.randrange(1 << 32) | 1 for _ in range(permutations)]
+        self._increments: List[int] = [rng.randrange(1 << 32) for _ in range(permutations)]
+        # the arrays of a and b, created with the first signature
+        self._a: "np.ndarray | None" = None
+        self._b: "np.ndarray | None" = None
+        self._shingles: Dict[K, Set[str]] = {}
+        self._markers: Dict[K, tuple[frozenset[str], bool]] = {}
+        self._bands: Dict[K, List[bytes]] = {}
+        # one hash table per band, mapping the band of a signature to the keys of the entries sharing it
+        self._buckets: List[Dict[bytes, Set[K]]] = [{} for _ in range(bands)]
+        self.checks: int = 0
+        self.suppressed: int = 0
+        # (text, key of the entry it duplicates, similarity) of the latest suppressed entries
+        self.recent: deque[tuple[str, K, float]] = deque(maxlen=history)
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._shingles
+
+    def get_signature(self, shingles: Set[str]) -> "np.ndarray":
+        """Computes the MinHash signature of a set of shingles.
+
+        :param shingles: The shingles.
+        :return: An array containing the smallest hash of the shingles under each permutation.
+        """
+        import numpy as np
+        if self._a is None:
+            self._a = np.array(self._multipliers, dtype=np.uint32)
+            self._b = np.array(self._increments, dtype=np.uint32)
+        hashes: np.ndarray = np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles), dtype=np.uint32,
+                                         count=len(shingles))
+        # the unsigned arithmetic wraps around, which is the modulo
+        return (self._a[:, None] * hashes[None, :] + self._b[:, None]).min(axis=1)
+
+    def _get_bands(self, shingles: Set[str]) -> List[bytes]:
+        signature: bytes = self.get_signature(shingles).tobytes()
+        size: int = len(signature) // self.bands
+        return [signature[i:i + size] for i in range(0, len(signature), size)]
+
+    def add(self, key: K, text: str) -> None:
+        """Adds a text to the index, replacing the text previously added with the same key.
+
+        :param key: The key of the entry, e.g. the position of an event.
+        :param text: The text.
+        :return: None
+        """
+        self.remove(key)
+        shingles: Set[str] = get_shingles(text, self.shingle_size)
+        self._shingles[key] = shingles
+        self._markers[key] = get_markers(text)
+        self._bands[key] = self._get_bands(shingles)
+        for buckets, band in zip(self._buckets, self._bands[key]):
+            buckets.setdefault(band, set()).add(key)
+
+    def remove(self, key: K) -> None:
+        """Removes an entry from the index, if it is in the index.
+
+        :param key: The key of the entry.
+        :return: None
+        """
+        if key not in self._shingles:
+            return
+        del self._shingles[key]
+        del self._markers[key]
+        for buckets, band in zip(self._buckets, self._bands.pop(key)):
+            keys: Set[K] = buckets[band]
+            keys.discard(key)
+            if not keys:
+                del buckets[band]
+
+    def clear(self) -> None:
+        """Removes every entry from the index, keeping the stats.
+
+        :return: None
+        """
+        self._shingles.clear()
+        self._markers.clear()
+        self._bands.clear()
+        for buckets in self._buckets:
+            buckets.clear()
+
+    def find(self, text: str, keys: Container[K] | None = None) -> tuple[K, float] | None:
+        """Finds the entry most similar to a text, if it is a near-duplicate.
+
+        :param text: The text.
+        :param keys: The keys of the entries the text is compared to, e.g. the positions of the latest events, or None
+                     to compare it to every entry.
+        :return: A tuple containing the key of the entry and its similarity, or None if no entry is similar enough.
+        """
+        if not self._shingles:
+            return None
+        shingles: Set[str] = get_shingles(text, self.shingle_size)
+        markers: tuple[frozenset[str], bool] = get_markers(text)
+        candidates: Set[K] = set()
+        for buckets, band in zip(self._buckets, self._get_bands(shingles)):
+            candidates.update(buckets.get(band, ()))
+        best: tuple[K, float] | None = None
+        for key in candidates:
+            if (keys is not None and key not in keys) or self._markers[key] != markers:
+                continue
+            similarity: float = get_jaccard(shingles, self._shingles[key])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def check(self, text: str, keys: Container[K] | None = None) -> K | None:
+        """Checks whether a text is a near-duplicate of an entry, recording it in the stats if it is.
+
+        :param text: The text.
+        :param keys: The keys of the entries the text is compared to, or None to compare it to every entry.
+        :return: The key of the most similar entry, or None if the text isn't a near-duplicate.
+        """
+        self.checks += 1
+        match: tuple[K, float] | None = self.find(text, keys)
+        if match is None:
+            return None
+        self.suppressed += 1
+        self.recent.append((text, match[0], match[1]))
+        return match[0]
+
+    def get_stats(self) -> Dict[str, int | float]:
+        """Fetches the number of texts checked and found to be near-duplicates.
+
+        :return: A dictionary containing the number of entries, checks and near-duplicates, and the share of the
+                 checks that found a near-duplicate.
+        """
+        return {"entries": len(self), "checks": self.checks, "suppressed": self.suppressed,
+                "suppressed_rate": self.suppressed / self.checks if self.checks else 0.0}
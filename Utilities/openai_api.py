@@ -1,22 +1,27 @@
-from dotenv import load_dotenv
-from openai import OpenAI
 import textwrap
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Callable, Iterator, TYPE_CHECKING
 import ast
 
-load_dotenv()
-client = OpenAI()
+from Utilities.environment import load_environment
+from Utilities.session import Session, get_default_session
+from Utilities.story_index import select_story_messages
 
-story_messages: List[Dict[str, Any]] = []
-char_creation_check_messages: List[Dict[str, Any]] = []
-npc_creation_messages: List[Dict[str, Any]] = []
+if TYPE_CHECKING:
+    from openai import OpenAI
 
+_client: "OpenAI | None" = None
+_client_lock = threading.Lock()
 
-def begin_story() -> None:
-    """Begins the story by appending system instructions into the ``story_messages`` array.
 
+def begin_story(session: Session | None = None) -> None:
+    """Begins the story by appending system instructions into the session's ``story_messages`` array.
+
+    :param session: The session of the game. Defaults to the default session.
     :return: None
     """
+    if session is None:
+        session = get_default_session()
     main_story_system_instructions: str = textwrap.dedent("""
         **Remember the following rules:**
         1. The story should feel like a window into an already existing world. 
@@ -33,7 +38,7 @@ def begin_story() -> None:
         5. If the user attempts an action that violates established "Rules" in the World JSON dictionary, or is impossible given the current state of the world or characters, explain why it can't be done and ask for a different action.
         6. If the Main Character want to buy something in the story, make the merchant start a discussion with them and give them the prices.
     """)
-    story_messages.append(
+    session.story_messages.append(
         {
             "role": "system",
             "content": [
@@ -45,13 +50,16 @@ def begin_story() -> None:
         })
 
 
-def begin_char_creation(main_character: str) -> None:
-    """Appends system instructions to both the NPC creation check and NPC creation arrays.
+def begin_char_creation(main_character: str, session: Session | None = None) -> None:
+    """Appends system instructions to both the NPC creation check and NPC creation arrays of the session.
     Also adds the name of the main character to the system instructions to prevent ChatGPT from creating a dictionary for the main character.
 
     :param main_character: The name of the main character.
+    :param session: The session of the game. Defaults to the default session.
     :return: None
     """
+    if session is None:
+        session = get_default_session()
     char_creation_check_system_instructions: str = textwrap.dedent(f"""
         **Rules:**
         - A Character JSON dictionary is only created once the ACTUAL NAME of a new character is known. If the Main Character DOESN'T know the new character's name, DON'T create a Character JSON dictionary yet.
@@ -64,7 +72,7 @@ def begin_char_creation(main_character: str) -> None:
         3. If a JSON dictionary needs to be created, return "True" and a list of the character names that a Character JSON dictionary needs to be created for (e.g. True [“Jane”, “John”]).
         4. If no new character JSON dictionary needs to be created, return "False".
     """)
-    char_creation_check_messages.append(
+    session.char_creation_check_messages.append(
         {
             "role": "system",
             "content": [
@@ -96,7 +104,7 @@ def begin_char_creation(main_character: str) -> None:
             "appearance": str // The appearance of the character (including their gender)
         }
     """)
-    npc_creation_messages.append(
+    session.npc_creation_messages.append(
         {
             "role": "system",
             "content": [
@@ -109,16 +117,43 @@ def begin_char_creation(main_character: str) -> None:
     )
 
 
-def get_response(messages: List[Dict[str, Any]]) -> str:
+def get_default_client() -> "OpenAI":
+    """Fetches the OpenAI client, creating it on first use. The OpenAI library is only imported here, so
+    importing this module doesn't slow down the start of the game.
+
+    :return: The OpenAI client.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+            load_environment()
+            _client = OpenAI()
+        return _client
+
+
+def get_client(session: Session | None = None) -> "OpenAI":
+    """Fetches the client used to send requests for a session.
+
+    :param session: The session of the game. If it doesn't provide its own client, the OpenAI client is used.
+    :return: The client of the session, or the OpenAI client.
+    """
+    if session is not None and session.client is not None:
+        return session.client
+    return get_default_client()
+
+
+def get_response(messages: List[Dict[str, Any]], session: Session | None = None) -> str:
     """Sends a list of messages to the OpenAI API and retrieves the response.
 
     :param messages: A list of message dictionaries, where each dictionary
                      contains keys like 'role' (e.g., 'system', 'user', 'assistant')
                      and 'content' (the actual message text).
+    :param session: The session of the game, which may provide its own client.
     :return: A string containing the response from the GPT-4o-mini API based on the
              input messages.
     """
-    response = client.chat.completions.create(
+    response = get_client(session).chat.completions.create(
         model="gpt-4o-mini",
         messages=messages,
         temperature=1,
@@ -179,29 +214,82 @@ def append_assistant_msg(message: str, messages_array: List[Dict[str, Any]]) ->
     )
 
 
-def get_story(prompt: str) -> str:
+def get_story_context(session: Session) -> List[Dict[str, Any]]:
+    """Fetches the story messages sent with a story request: the system instructions, the starting prompt, the most
+    recent messages, and the passages of the earlier story and key events most relevant to the player's action,
+    within the session's ``story_context_tokens``.
+
+    :param session: The session of the game, whose history ends with the prompt of the request.
+    :return: A list containing the messages sent.
+    """
+    timeline = session.engine.timeline
+    key_events: List[str] = timeline.get_event if timeline is not None else []
+    return select_story_messages(session.get_history(), key_events, session.story_index,
+                                 session.story_context_tokens)
+
+
+def get_story(prompt: str, session: Session | None = None) -> str:
     """Generates a story when given a prompt by interacting with the OpenAI API. Appends the
-    resulting story to the story array to keep it going.
+    resulting story to the session's story array to keep it going.
 
     :param prompt: A string containing the initial prompt that the user wants to use to generate the story.
+    :param session: The session of the game. Defaults to the default session.
     :return: A string of the generated story. The function uses the prompt to initiate the conversation
             and fetch a response from the API.
     """
+    if session is None:
+        session = get_default_session()
     story: str = ""
+    story_messages: List[Dict[str, Any]] = session.get_history()
     append_user_msg(prompt, story_messages)
-    response: str = get_response(story_messages)
+    response: str = get_response(get_story_context(session), session)
     story += response
     append_assistant_msg(response, story_messages)
     return story
 
 
-def npc_creation_check(story: str, current_char_names: list[str]) -> tuple[bool, List[str]]:
+def stream_story(prompt: str, session: Session | None = None) -> Iterator[str]:
+    """Generates a story when given a prompt, yielding the story in chunks as ChatGPT generates it.
+    Once the whole story has been generated, it is appended to the session's story array like ``get_story``.
+
+    :param prompt: A string containing the prompt used to generate the story.
+    :param session: The session of the game. Defaults to the default session.
+    :return: An iterator of the chunks of the generated story.
+    """
+    if session is None:
+        session = get_default_session()
+    story_messages: List[Dict[str, Any]] = session.get_history()
+    append_user_msg(prompt, story_messages)
+    stream = get_client(session).chat.completions.create(
+        model="gpt-4o-mini",
+        messages=get_story_context(session),
+        temperature=1,
+        max_tokens=1400,
+        top_p=1,
+        frequency_penalty=0,
+        presence_penalty=0,
+        response_format={
+            "type": "text"
+        },
+        stream=True
+    )
+
+    chunks: List[str] = []
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            chunks.append(chunk.choices[0].delta.content)
+            yield chunk.choices[0].delta.content
+    append_assistant_msg("".join(chunks), story_messages)
+
+
+def npc_creation_check(story: str, current_char_names: list[str], session: Session | None = None) -> tuple[bool, List[str]]:
     """Passes a story to ChatGPT and determines whether an NPC should be created.
     Also passes a list of character names so ChatGPT won't create characters that have already been created.
     Appends ChatGPT's response to NPC character check array to keep it going.
 
     :param story: A string of the current story.
     :param current_char_names: A list of character names, used to prevent duplicate characters from being created.
+    :param session: The session of the game. Defaults to the default session.
     :return: A tuple, where the first value determines if new character should be created (True), and the second value
             is a list of characters that needs to be created.
     """
@@ -212,9 +300,11 @@ def npc_creation_check(story: str, current_char_names: list[str]) -> tuple[bool,
         {current_char_names}
     """)
 
-    append_user_msg(prompt, char_creation_check_messages)
-    response: str = get_response(char_creation_check_messages)
-    append_assistant_msg(response, char_creation_check_messages)
+    if session is None:
+        session = get_default_session()
+    append_user_msg(prompt, session.char_creation_check_messages)
+    response: str = get_response(session.char_creation_check_messages, session)
+    append_assistant_msg(response, session.char_creation_check_messages)
 
     response_list: list[str] = response.split(" ", 1)
     boolean_val: bool = response_list[0] == "True"
@@ -229,7 +319,7 @@ def npc_creation_check(story: str, current_char_names: list[str]) -> tuple[bool,
     return boolean_val, character_list
 
 
-def create_npc(char_list: List[str], story: str, genre: str, char_id: int) -> str:
+def create_npc(char_list: List[str], story: str, genre: str, char_id: int, session: Session | None = None) -> str:
     """Generates NPC Character JSON dictionaries for a list of given characters names.
 
         **Note:** It is recommended to call the ``npc_creation_check`` function before using
@@ -242,6 +332,7 @@ def create_npc(char_list: List[str], story: str, genre: str, char_id: int) -> st
                       This helps the system align the characters' attributes with the story's setting.
         :param char_id: An integer representing the starting ID for the characters. Each
                         character will be assigned a unique ID by incrementing this value.
+        :param session: The session of the game. Defaults to the default session.
         :return: A string response containing the generated JSON dictionaries for the characters,
                  tailored to the given story and genre.
     """
@@ -253,16 +344,19 @@ def create_npc(char_list: List[str], story: str, genre: str, char_id: int) -> st
         Create new Character JSON dictionaries for the following characters: {char_tuple_list}. The "{genre}" story where the character first appears is given below:
         {story}
     """)
-    append_user_msg(prompt, npc_creation_messages)
-    response: str = get_response(npc_creation_messages)
-    append_assistant_msg(response, npc_creation_messages)
+    if session is None:
+        session = get_default_session()
+    append_user_msg(prompt, session.npc_creation_messages)
+    response: str = get_response(session.npc_creation_messages, session)
+    append_assistant_msg(response, session.npc_creation_messages)
     return response
 
 
-def get_rules(prompt: str) -> str:
+def get_rules(prompt: str, session: Session | None = None) -> str:
     """Interacts with GPT-4o-mini to get a set of rules about a world when provided with a prompt.
 
     :param prompt: A string to be passed into ChatGPT
+    :param session: The session of the game, which may provide its own client.
     :return: A string containing a list of rules.
     """
     system_instructions: str = textwrap.dedent(
@@ -330,16 +424,17 @@ def get_rules(prompt: str) -> str:
     ]
 
     # Make the API call to OpenAI
-    response: str = get_response(rules_messages)
+    response: str = get_response(rules_messages, session)
 
     # Extract and return the rules from the response
     return response
 
 
-def get_environment(genre: str):
+def get_environment(genre: str, session: Session | None = None):
     """Interacts with GPT-4o-mini to describe the environment about a world when provided with a prompt.
 
     :param genre: The genre of the world.
+    :param session: The session of the game, which may provide its own client.
     :return: A sentence describing the environment of the world.
     """
     system_instructions: str = textwrap.dedent(
@@ -385,19 +480,20 @@ def get_environment(genre: str):
         }
     ]
     # Make the API call to OpenAI
-    response: str = get_response(environment_messages)
+    response: str = get_response(environment_messages, session)
 
     # Extract and return the rules from the response
     return response
 
 
-def check_condition(current_condition: str, status: str) -> str:
+def check_condition(current_condition: str, status: str, session: Session | None = None) -> str:
     """Determines whether a character's current condition is positive or negative, and then returns an updated
     condition. Note that this function does not save the history of ChatGPT's response, it starts a new chat
     every time this function is called.
 
     :param current_condition: A string that represents a character's current condition.
     :param status: A string that determines whether a positive or negative condition should be returned.
+    :param session: The session of the game, which may provide its own client.
     :return: A string of the character's new condition.
             - If the condition is negative, and the status is "positive", the function will return a new
             "positive" condition.
@@ -450,11 +546,11 @@ def check_condition(current_condition: str, status: str) -> str:
         ]
     )
 
-    response: str = get_response(messages)
+    response: str = get_response(messages, session)
     return response
 
 
-def get_new_relationship(relationship: str, status: str) -> str:
+def get_new_relationship(relationship: str, status: str, session: Session | None = None) -> str:
     """Updates the relationship between the main character and another character.
     The ``status`` parameter determines whether the relationship is deepened (positive) or soured (negative) as a result of the event.
     Note that this function does not save the response of ChatGPT, it starts a new chat every time this function is called.
@@ -463,6 +559,7 @@ def get_new_relationship(relationship: str, status: str) -> str:
     :param status: A string that instructs ChatGPT whether to sour or deepen the relationship based on the event.
                    - ``positive``: Deepens the relationship and updates it to something more positive.
                    - ``negative``: Sours the relationship and updates it to something more negative.
+    :param session: The session of the game, which may provide its own client.
     :return: A string representing the updated relationship.
     """
     messages = []
@@ -508,17 +605,18 @@ def get_new_relationship(relationship: str, status: str) -> str:
         ]
     )
 
-    response: str = get_response(messages)
+    response: str = get_response(messages, session)
     return response
 
 
-def get_new_item(world_dict: str) -> str:
+def get_new_item(world_dict: str, session: Session | None = None) -> str:
     """
     Generates a useful item that could exist within the world described by a given JSON dictionary.
     The item is based on the context of the world and is intended to be something useful for the story's progression.
 
     :param world_dict: A JSON string that represents the story's world.
                        This provides the necessary context for generating an item that fits within the world.
+    :param session: The session of the game, which may provide its own client.
 
     :return: A string representing the name of a useful item that exists in the world. Only the name of the item is returned.
     """
@@ -558,25 +656,44 @@ def get_new_item(world_dict: str) -> str:
             }
         ]
     )
-    response: str = get_response(messages)
+    response: str = get_response(messages, session)
     return response
 
 
-def get_history() -> List[Dict[str, Any]]:
-    """Fetches ``story_messages``, which contains the history of the chat with ChatGPT.
+def get_history(session: Session | None = None) -> List[Dict[str, Any]]:
+    """Fetches the session's ``story_messages``, which contains the history of the chat with ChatGPT.
     This function is specifically used for saving the game.
 
+    :param session: The session of the game. Defaults to the default session.
     :return: A list of dictionaries containing the story messages generated by ChatGPT.
     """
-    return story_messages
+    if session is None:
+        session = get_default_session()
+    return session.get_history()
 
 
-def set_history(history: List[Dict[str, Any]]) -> None:
+def set_history(history: List[Dict[str, Any]], session: Session | None = None) -> None:
     """Sets the history of the chat with a new chat.
     This function should only be used when a new save is loaded.
 
     :param history: A new list of dictionaries containing story messages.
+    :param session: The session of the game. Defaults to the default session.
+    :return: None
+    """
+    if session is None:
+        session = get_default_session()
+    session.set_history(history)
+
+
+def set_history_loader(loader: Callable[[], List[Dict[str, Any]]], session: Session | None = None) -> None:
+    """Sets a function that loads the history of the chat, which is only called once the history is first accessed.
+    This function should only be used when a compact save is loaded, so that the history isn't decoded
+    until it is needed.
+
+    :param loader: A function returning a list of dictionaries containing story messages.
+    :param session: The session of the game. Defaults to the default session.
     :return: None
     """
-    global story_messages
-    story_messages = history
+    if session is None:
+        session = get_default_session()
+    session.set_history_loader(loader)
@@ -0,0 +1,213 @@
+import gzip
+import json
+import struct
+from typing import List, Dict, TypeVar, Any, Callable, BinaryIO
+
+V = TypeVar("V")
+
+MAGIC: bytes = b"OFSV"
+VERSION: int = 1
+SECTIONS: tuple[str, ...] = ("world", "characters", "timeline", "main_character", "history")
+
+# magic (4 bytes), version (1 byte), number of sections (2 bytes)
+_HEADER = struct.Struct("<4sBH")
+# section name length (1 byte), followed by the name, offset (8 bytes) and length (8 bytes)
+_NAME_LEN = struct.Struct("<B")
+_OFFSET_ENTRY = struct.Struct("<QQ")
+# every record inside a section is prefixed by its length (4 bytes)
+_RECORD_LEN = struct.Struct("<I")
+
+
+def _pack_records(records: List[bytes]) -> bytes:
+    """Joins a list of records together, prefixing each record with its length.
+
+    :param records: A list of encoded records.
+    :return: The length-prefixed records as a single bytes object.
+    """
+    return b"".join(_RECORD_LEN.pack(len(record)) + record for record in records)
+
+
+def _unpack_records(payload: bytes) -> List[bytes]:
+    """Splits length-prefixed records back into a list of records.
+
+    :param payload: The length-prefixed records as a single bytes object.
+    :return: A list of encoded records.
+    """
+    records: List[bytes] = []
+    position: int = 0
+    while position < len(payload):
+        (length,) = _RECORD_LEN.unpack_from(payload, position)
+        position += _RECORD_LEN.size
+        records.append(payload[position:position + length])
+        position += length
+    return records
+
+
+def _dump(value: V) -> bytes:
+    """Encodes a value as compact JSON (no indentation or extra whitespace).
+
+    :param value: The value to encode.
+    :return: The UTF-8 encoded JSON.
+    """
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def encode_history(history: List[Dict[str, Any]]) -> bytes:
+    """Encodes the chat history as one length-prefixed record per message.
+
+    The nested ``{"role", "content": [{"type": "text", "text": ...}]}`` dictionaries are flattened into
+    ``[role, text]`` pairs, so the repeated keys are not stored for every message.
+
+    :param history: A list of message dictionaries from ``openai_api.get_history``.
+    :return: The encoded chat history.
+    """
+    records: List[bytes] = []
+    for message in history:
+        texts: List[str] = [part["text"] for part in message["content"] if part.get("type") == "text"]
+        records.append(_dump([message["role"], "".join(texts)]))
+    return _pack_records(records)
+
+
+def decode_history(payload: bytes) -> List[Dict[str, Any]]:
+    """Decodes the chat history back into the message dictionaries used by the OpenAI API.
+
+    :param payload: The encoded chat history.
+    :return: A list of message dictionaries.
+    """
+    history: List[Dict[str, Any]] = []
+    for record in _unpack_records(payload):
+        role, text = json.loads(record)
+        history.append(
+            {
+                "role": role,
+                "content": [
+                    {
+                        "type": "text",
+                        "text": text
+                    }
+                ]
+            }
+        )
+    return history
+
+
+def encode_save(data: Dict[str, V]) -> bytes:
+    """Encodes the save data into the compact binary save format.
+
+    The file starts with a header and an offset table listing where each section starts and how long it is,
+    followed by the gzip-compressed sections. Each section can be decoded on its own, which allows the
+    chat history to be skipped until it is needed.
+
+    :param data: A dictionary containing the world, characters, timeline, main_character and history.
+    :return: The encoded save file.
+    """
+    payloads: List[bytes] = []
+    for section in SECTIONS:
+        if section == "history":
+            raw: bytes = encode_history(data.get("history", []))
+        else:
+            raw = _pack_records([_dump(data.get(section, {}))])
+        payloads.append(gzip.compress(raw, compresslevel=6))
+
+    table_size: int = sum(_NAME_LEN.size + len(section.encode("ascii")) + _OFFSET_ENTRY.size
+                          for section in SECTIONS)
+    offset: int = _HEADER.size + table_size
+
+    header: bytes = _HEADER.pack(MAGIC, VERSION, len(SECTIONS))
+    table: bytes = b""
+    for section, payload in zip(SECTIONS, payloads):
+        name: bytes = section.encode("ascii")
+        table += _NAME_LEN.pack(len(name)) + name + _OFFSET_ENTRY.pack(offset, len(payload))
+        offset += len(payload)
+
+    return header + table + b"".join(payloads)
+
+
+class SaveReader:
+    def __init__(self, path: str):
+        """Opens a compact binary save file and reads its header and offset table.
+        The sections themselves are only read and decompressed when requested.
+
+        :param path: The path to the save file.
+        :raises ValueError: If the file is not a compact save file or the version is not supported.
+        """
+        self._path = path
+        with open(path, "rb") as file:
+            self._offsets = self._read_table(file)
+
+    @staticmethod
+    def _read_table(file: BinaryIO) -> Dict[str, tuple[int, int]]:
+        """Reads the header and the offset table.
+
+        :param file: The opened save file.
+        :return: A dictionary mapping each section name to its (offset, length).
+        """
+        header: bytes = file.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise ValueError("Save file is truncated.")
+        magic, version, section_count = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("Not a compact save file.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported save file version: {version}.")
+
+        offsets: Dict[str, tuple[int, int]] = {}
+        for _ in range(section_count):
+            (name_length,) = _NAME_LEN.unpack(file.read(_NAME_LEN.size))
+            name: str = file.read(name_length).decode("ascii")
+            offsets[name] = _OFFSET_ENTRY.unpack(file.read(_OFFSET_ENTRY.size))
+        return offsets
+
+    @property
+    def sections(self) -> List[str]:
+        """Fetches the names of the sections stored in the save file.
+
+        :return: A list of section names.
+        """
+        return list(self._offsets.keys())
+
+    def _read_raw(self, section: str) -> bytes:
+        """Reads and decompresses a single section of the save file.
+
+        :param section: The name of the section.
+        :return: The decompressed section.
+        :raises KeyError: If the section does not exist in the save file.
+        """
+        offset, length = self._offsets[section]
+        with open(self._path, "rb") as file:
+            file.seek(offset)
+            return gzip.decompress(file.read(length))
+
+    def read_section(self, section: str) -> V:
+        """Reads a single non-history section of the save file.
+
+        :param section: The name of the section, e.g. "world", "characters", "timeline" or "main_character".
+        :return: The decoded section.
+        """
+        return json.loads(_unpack_records(self._read_raw(section))[0])
+
+    def read_history(self) -> List[Dict[str, Any]]:
+        """Reads and decodes the chat history.
+
+        :return: A list of message dictionaries.
+        """
+        return decode_history(self._read_raw("history"))
+
+    def history_loader(self) -> Callable[[], List[Dict[str, Any]]]:
+        """Creates a function that decodes the chat history when called.
+        This is used to defer decoding the history until it is first accessed.
+
+        :return: A function returning the decoded chat history.
+        """
+        return self.read_history
+
+
+def write_save(path: str, data: Dict[str, V]) -> None:
+    """Writes the save data to a file in the compact binary save format.
+
+    :param path: The path to write the save file to.
+    :param data: A dictionary containing the world, characters, timeline, main_character and history.
+    :return: None
+    """
+    with open(path, "wb") as file:
+        file.write(encode_save(data))
@@ -0,0 +1,126 @@
+import json
+import os
+from datetime import datetime
+from typing import List, Dict, TypeVar, Any
+
+V = TypeVar("V")
+
+MANIFEST_FILE: str = "manifest.jsonl"
+RECAP_LENGTH: int = 120
+
+
+def get_manifest_path(directory: str = "saved_games") -> str:
+    """Fetches the path of the manifest inside the saved games directory.
+
+    :param directory: The saved games directory.
+    :return: The path of the manifest file.
+    """
+    return os.path.join(directory, MANIFEST_FILE)
+
+
+def create_entry(filename: str, data: Dict[str, V], size: int) -> Dict[str, V]:
+    """Creates a manifest entry summarising a save file.
+
+    :param filename: The name of the save file inside the saved games directory.
+    :param data: The save data (world, characters, timeline, main_character and history).
+    :param size: The size of the save file in bytes.
+    :return: A dictionary containing the character name, genre, HP, turn count, last-played time,
+             file size and a recap line.
+    """
+    main_char: Dict[str, V] = data.get("main_character", {})
+    key_events: List[str] = data.get("timeline", {}).get("key_events", [])
+    recap: str = key_events[-1].replace("\n", " ").strip() if key_events else ""
+    if len(recap) > RECAP_LENGTH:
+        recap = recap[:RECAP_LENGTH - 3].rstrip() + "..."
+
+    # every turn adds one story response from ChatGPT to the history
+    turn_count: int = sum(1 for message in data.get("history", []) if message["role"] == "assistant")
+
+    return {
+        "file": filename,
+        "name": main_char.get("name", ""),
+        "genre": data.get("world", {}).get("genre", ""),
+        "hp": main_char.get("stats", {}).get("HP", 0),
+        "turn_count": turn_count,
+        "last_played": datetime.now().isoformat(timespec="seconds"),
+        "size": size,
+        "recap": recap
+    }
+
+
+def read_manifest(directory: str = "saved_games") -> Dict[str, Dict[str, V]]:
+    """Reads the manifest, keeping only the most recent entry for each save file.
+
+    :param directory: The saved games directory.
+    :return: A dictionary mapping each save file name to its latest manifest entry.
+    """
+    entries: Dict[str, Dict[str, V]] = {}
+    path: str = get_manifest_path(directory)
+    if not os.path.exists(path):
+        return entries
+
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line == "":
+                continue
+            try:
+                entry: Dict[str, V] = json.loads(line)
+            except json.JSONDecodeError:
+                # skip lines that were only partially written
+                continue
+            entries[entry["file"]] = entry
+    return entries
+
+
+def update_manifest(entry: Dict[str, V], directory: str = "saved_games") -> None:
+    """Appends an entry to the manifest.
+
+    New entries are appended instead of rewriting the whole manifest on every save. Once the manifest has
+    more than twice as many lines as save files, it is compacted so only the latest entry of each save is kept.
+
+    :param entry: The manifest entry created by ``create_entry``.
+    :param directory: The saved games directory.
+    :return: None
+    """
+    os.makedirs(directory, exist_ok=True)
+    path: str = get_manifest_path(directory)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    with open(path, "r", encoding="utf-8") as file:
+        line_count: int = sum(1 for _ in file)
+    entries: Dict[str, Dict[str, V]] = read_manifest(directory)
+    if line_count > 2 * len(entries):
+        compact_manifest(entries, directory)
+
+
+def compact_manifest(entries: Dict[str, Dict[str, V]], directory: str = "saved_games") -> None:
+    """Rewrites the manifest so it only contains the given entries.
+
+    :param entries: A dictionary mapping each save file name to its manifest entry.
+    :param directory: The saved games directory.
+    :return: None
+    """
+    path: str = get_manifest_path(directory)
+    temp_path: str = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        for entry in entries.values():
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    os.replace(temp_path, path)
+
+
+def list_entries(files: List[str], directory: str = "saved_games") -> List[Dict[str, Any]]:
+    """Lists the manifest entries of the given save files, most recently played first.
+    Save files that are missing from the manifest (e.g. saves created before the manifest existed) are
+    listed at the end with only their file name.
+
+    :param files: A list of save file names inside the saved games directory.
+    :param directory: The saved games directory.
+    :return: A list of manifest entries.
+    """
+    manifest: Dict[str, Dict[str, V]] = read_manifest(directory)
+    listed: List[Dict[str, Any]] = [manifest[file] for file in files if file in manifest]
+    listed.sort(key=lambda entry: entry["last_played"], reverse=True)
+    listed.extend({"file": file} for file in files if file not in manifest)
+    return listed
@@ -0,0 +1,182 @@
+from typing import List, Dict, TypeVar, Any, Callable
+
+from Utilities.dice import Dice
+from Utilities.story_index import StoryIndex, DEFAULT_CONTEXT_TOKENS
+from Utilities import update_gate
+from Utilities.update_gate import UpdateGate
+
+V = TypeVar("V")
+
+# conversation arrays owned by a session, used when recording checkpoints and resetting the chat
+STORY_MESSAGES: tuple[str, ...] = ("story_messages", "char_creation_check_messages", "npc_creation_messages")
+UPDATE_ATTR_MESSAGES: tuple[str, ...] = ("physical_condition_messages", "money_messages", "relationship_messages",
+                                         "inventory_messages", "hp_messages", "current_location_messages",
+                                         "key_events_messages", "environment_messages")
+
+# events emitted by the Engine of a session
+CHARACTER_ADDED: str = "character_added"
+ITEM_ADDED: str = "item_added"
+
+
+class Session:
+    def __init__(self, engine=None, client=None, async_client=None, dice=None, recall_target: float | None = None):
+        """Initialises a Session object, which owns all the state of a single game.
+
+        This includes the conversation history with ChatGPT for the story and NPC creation, the attribute update
+        conversations, the counters used by the prompts, the dice and the Engine. Each game should have its own session, so
+        that multiple games can run in the same process without sharing any conversations.
+
+        :param engine: The Engine of the game. If it isn't provided, a new Engine is created when first accessed.
+        :param client: The client used for the story, NPC and world requests. If it isn't provided, the OpenAI client
+                       in ``openai_api`` is used.
+        :param async_client: The asynchronous client used for the attribute updates. If it isn't provided, the
+                             AsyncOpenAI client in ``update_attr`` is used.
+        :param dice: The dice rolled for random events. If it isn't provided, randomly seeded in-process dice are used.
+        :param recall_target: The share of the attribute changes from 0 to 1 the update gate must not skip on its
+                              held-out turns. If it is provided, the attribute updates the new story can't trigger are
+                              skipped, otherwise every update is requested.
+        """
+        # openai_api
+        self.story_messages: List[Dict[str, Any]] = []
+        self.char_creation_check_messages: List[Dict[str, Any]] = []
+        self.npc_creation_messages: List[Dict[str, Any]] = []
+        # decodes the story history of a compact save file the first time it is needed
+        self.history_loader: Callable[[], List[Dict[str, Any]]] | None = None
+        # searched for the earlier story sent with each story request, instead of the whole history
+        self.story_index: StoryIndex = StoryIndex()
+        # the most tokens of earlier story sent with each story request, or None to send the whole history
+        self.story_context_tokens: int | None = DEFAULT_CONTEXT_TOKENS
+
+        # update_attr
+        self.physical_condition_messages: List[Dict[str, V]] = []
+        self.money_messages: List[Dict[str, V]] = []
+        self.relationship_messages: List[Dict[str, V]] = []
+        self.inventory_messages: List[Dict[str, V]] = []
+        self.hp_messages: List[Dict[str, V]] = []
+        self.current_location_messages: List[Dict[str, V]] = []
+        self.key_events_messages: List[Dict[str, V]] = []
+        self.environment_messages: List[Dict[str, V]] = []
+        # skips the attribute updates the new story can't trigger, or None to request every update. It is off by
+        # default, as a skipped change is silently lost (see Benchmarks/update_gate_evaluation.py)
+        self.update_gate: UpdateGate | None = update_gate.create_gate(recall_target) \
+            if recall_target is not None else None
+
+        # counters
+        self.new_char_count: int = 1  # determines when a new character should be introduced
+        self.reset_count: int = 0  # the number of times the attribute updates were called
+        self.chat_generation: int = 0  # the number of times the attribute update conversations were cleared
+
+        # clients used to send requests, e.g. a local stand-in for ChatGPT when testing
+        self.client = client
+        self.async_client = async_client
+        self.dice = dice if dice is not None else Dice()
+        # functions called when the game changes, e.g. to prefetch the portrait of a new character
+        self._listeners: Dict[str, List[Callable[..., None]]] = {}
+
+        self._engine = engine
+
+    @property
+    def engine(self):
+        """Fetches the Engine of the game, creating it if it doesn't exist yet.
+
+        :return: The Engine object.
+        """
+        if self._engine is None:
+            # imported here as the engine module imports the modules that use sessions
+            from Engine.engine import Engine
+            self._engine = Engine(session=self)
+        return self._engine
+
+    def subscribe(self, event: str, listener: Callable[..., None]) -> None:
+        """Adds a function that is called every time an event is emitted.
+
+        :param event: The name of the event, e.g. ``CHARACTER_ADDED``.
+        :param listener: The function called with the arguments of the event.
+        :return: None
+        """
+        self._listeners.setdefault(event, []).append(listener)
+
+    def emit(self, event: str, *args) -> None:
+        """Calls every function subscribed to an event.
+        Errors raised by the functions are printed, so they never interrupt the game.
+
+        :param event: The name of the event.
+        :param args: The arguments passed to the functions.
+        :return: None
+        """
+        for listener in self._listeners.get(event, []):
+            try:
+                listener(*args)
+            except Exception as error:
+                print(f"Error handling the {event} event: {error!r}")
+
+    def get_history(self) -> List[Dict[str, Any]]:
+        """Fetches the story messages, decoding the history of a compact save first if needed.
+
+        :return: A list of dictionaries containing the story messages generated by ChatGPT.
+        """
+        self.load_pending_history()
+        return self.story_messages
+
+    def set_history(self, history: List[Dict[str, Any]]) -> None:
+        """Sets the history of the story chat.
+
+        :param history: A new list of dictionaries containing story messages.
+        :return: None
+        """
+        self.story_messages = history
+        self.history_loader = None
+
+    def set_history_loader(self, loader: Callable[[], List[Dict[str, Any]]]) -> None:
+        """Sets a function that loads the history of the story chat once it is first accessed.
+
+        :param loader: A function returning a list of dictionaries containing story messages.
+        :return: None
+        """
+        self.story_messages = []
+        self.history_loader = loader
+
+    def load_pending_history(self) -> None:
+        """Decodes the history set by ``set_history_loader`` if it hasn't been decoded yet.
+        Any messages appended before the history was decoded are kept after the loaded history.
+
+        :return: None
+        """
+        if self.history_loader is not None:
+            loader = self.history_loader
+            self.history_loader = None
+            self.story_messages = loader() + self.story_messages
+
+    def reset_chat(self, count: int) -> None:
+        """Resets the message history of all attribute update conversations, keeping only the system instructions.
+
+        :param count: The number of times the update prompts were called. Nothing is reset until it reaches 3.
+        :return: None
+        """
+        if count >= 3:
+            self.clear_update_chats()
+
+    def clear_update_chats(self) -> None:
+        """Clears the message history of all attribute update conversations, keeping only the system instructions.
+        This starts a new chat generation, so checkpoints recorded before it know their offsets no longer apply.
+
+        :return: None
+        """
+        for name in UPDATE_ATTR_MESSAGES:
+            del getattr(self, name)[1:]
+        self.chat_generation += 1
+
+
+_default_session: Session | None = None
+
+
+def get_default_session() -> Session:
+    """Fetches the session used when no session is passed to the ``openai_api``, ``update_attr`` and ``utils``
+    functions. This keeps single-game callers working without creating a session themselves.
+
+    :return: The default Session object.
+    """
+    global _default_session
+    if _default_session is None:
+        _default_session = Session()
+    return _default_session
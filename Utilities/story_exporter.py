@@ -0,0 +1,317 @@
+import html
+import io
+import os
+import re
+import shutil
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Iterable, Iterator, TextIO
+
+FORMATS: tuple[str, ...] = ("txt", "md", "html", "epub")
+# the prefix of the player's inputs in the story exported by the game
+PLAYER_PREFIX: str = "Your input: "
+# the number of paragraphs in each chapter of the EPUB
+DEFAULT_CHAPTER_SIZE: int = 100
+# words ending with a full stop that don't end a sentence
+ABBREVIATIONS: frozenset[str] = frozenset({
+    "mr", "mrs", "ms", "dr", "st", "jr", "sr", "prof", "sgt", "capt", "lt", "col", "gen", "mt", "ft", "vs", "e.g",
+    "i.e", "approx"
+})
+# sentence-ending punctuation and any closing quotes or brackets, followed by whitespace and the start of a sentence
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'”’)\]]*\s+(?=[\"'“‘(\[]?[A-Z0-9])")
+_MARKDOWN_SPECIAL = re.compile(r"([\\`*_\[\]<>#|])")
+
+
+def split_sentences(text: str) -> Iterator[str]:
+    """Splits a paragraph into sentences.
+    Unlike splitting on every full stop, decimals (3.5), abbreviations (Mr. Smith), initials (J. R. Smith) and
+    punctuation inside quotes are kept in their sentence, and the punctuation of each sentence is kept.
+
+    :param text: The paragraph. Line breaks always end a sentence.
+    :return: An iterator over the sentences.
+    """
+    for line in text.split("\n"):
+        start: int = 0
+        for match in _SENTENCE_END.finditer(line):
+            end: int = match.start()
+            if line[end] == ".":
+                # the word before the full stop, e.g. "Mr" or "e.g"
+                word: str = line[max(start, line.rfind(" ", start, end) + 1):end].lstrip("\"'“‘([").lower()
+                if word in ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+                    continue
+            sentence: str = line[start:match.end()].strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+        sentence = line[start:].strip()
+        if sentence:
+            yield sentence
+
+
+def iter_history(history: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Fetches the story paragraphs from the history of the story chat, which only contains the prompts sent to the
+    model and the story it wrote.
+
+    :param history: The story messages of the session, see ``Session.get_history``.
+    :return: An iterator over the paragraphs written by the model.
+    """
+    for message in history:
+        if message.get("role") != "assistant":
+            continue
+        content = message.get("content")
+        if isinstance(content, str):
+            yield content
+        else:
+            yield "".join(part.get("text", "") for part in content or [] if isinstance(part, dict))
+
+
+class StoryWriter:
+    extension: str = ""
+
+    def __init__(self, path: str, title: str):
+        """Initialises a StoryWriter object, which writes a story to a file one paragraph at a time, so the whole
+        story never has to be held in memory.
+
+        :param path: The path of the file.
+        :param title: The title of the story.
+        """
+        self.path = path
+        self.title = title
+
+    def write(self, paragraph: str) -> None:
+        """Writes a paragraph of the story.
+
+        :param paragraph: The paragraph, or the player's input if it starts with ``PLAYER_PREFIX``.
+        :return: None
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Finishes the file.
+
+        :return: None
+        """
+        raise NotImplementedError
+
+
+class TextWriter(StoryWriter):
+    extension = "txt"
+
+    def __init__(self, path: str, title: str):
+        """Initialises a TextWriter object, which writes each sentence of the story on its own line, with a blank
+        line after each paragraph.
+
+        :param path: The path of the file.
+        :param title: The title of the story.
+        """
+        super().__init__(path, title)
+        self.file: TextIO = open(path, "w", encoding="utf-8")
+
+    def write(self, paragraph: str) -> None:
+        sentences: str = "\n".join(split_sentences(paragraph))
+        self.file.write(sentences + "\n\n" if sentences else "\n")
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def escape_markdown(text: str) -> str:
+    """Escapes the characters Markdown would treat as formatting.
+
+    :param text: The text.
+    :return: The escaped text.
+    """
+    return _MARKDOWN_SPECIAL.sub(r"\\\1", text)
+
+
+class MarkdownWriter(StoryWriter):
+    extension = "md"
+
+    def __init__(self, path: str, title: str):
+        """Initialises a MarkdownWriter object, which writes the story as Markdown paragraphs, with the player's
+        inputs as block quotes.
+
+        :param path: The path of the file.
+        :param title: The title of the story.
+        """
+        super().__init__(path, title)
+        self.file: TextIO = open(path, "w", encoding="utf-8")
+        self.file.write("# " + escape_markdown(title) + "\n\n")
+
+    def write(self, paragraph: str) -> None:
+        is_input: bool = paragraph.startswith(PLAYER_PREFIX)
+        for line in paragraph.split("\n"):
+            line = escape_markdown(line.strip())
+            if line:
+                self.file.write(f"> {line}\n>\n" if is_input else f"{line}\n\n")
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def get_html_paragraphs(paragraph: str) -> Iterator[str]:
+    """Converts a paragraph of the story into HTML paragraphs.
+
+    :param paragraph: The paragraph, or the player's input if it starts with ``PLAYER_PREFIX``.
+    :return: An iterator over the HTML paragraphs, one for each line of the paragraph.
+    """
+    is_input: bool = paragraph.startswith(PLAYER_PREFIX)
+    for line in paragraph.split("\n"):
+        line = html.escape(line.strip())
+        if line:
+            yield f'<p class="input"><em>{line}</em></p>\n' if is_input else f"<p>{line}</p>\n"
+
+
+class HtmlWriter(StoryWriter):
+    extension = "html"
+
+    def __init__(self, path: str, title: str):
+        """Initialises an HtmlWriter object, which writes the story as a single HTML page.
+
+        :param path: The path of the file.
+        :param title: The title of the story.
+        """
+        super().__init__(path, title)
+        self.file: TextIO = open(path, "w", encoding="utf-8")
+        title = html.escape(title)
+        self.file.write(f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{title}</title>\n'
+                        f'<style>.input {{ color: #555; }}</style>\n</head>\n<body>\n<h1>{title}</h1>\n')
+
+    def write(self, paragraph: str) -> None:
+        self.file.writelines(get_html_paragraphs(paragraph))
+
+    def close(self) -> None:
+        self.file.write("</body>\n</html>\n")
+        self.file.close()
+
+
+class EpubWriter(StoryWriter):
+    extension = "epub"
+
+    def __init__(self, path: str, title: str, chapter_size: int = DEFAULT_CHAPTER_SIZE):
+        """Initialises an EpubWriter object, which writes the story as an EPUB 3 book. Each chapter is streamed into
+        the book as it is written, and the table of contents is added once the story ends.
+
+        :param path: The path of the file.
+        :param title: The title of the story.
+        :param chapter_size: The number of paragraphs in each chapter.
+        """
+        super().__init__(path, title)
+        self.chapter_size = max(1, chapter_size)
+        self.chapters: int = 0
+        self._paragraphs: int = 0
+        self._chapter: TextIO | None = None
+        self.book = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        # the mimetype must be the first file in the book, and mustn't be compressed
+        self.book.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        self.book.writestr("META-INF/container.xml",
+                           '<?xml version="1.0" encoding="utf-8"?>\n'
+                           '<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">\n'
+                           '<rootfiles><rootfile full-path="OEBPS/content.opf" '
+                           'media-type="application/oebps-package+xml"/></rootfiles>\n</container>\n')
+
+    def _start_chapter(self) -> None:
+        self.chapters += 1
+        self._chapter = io.TextIOWrapper(self.book.open(f"OEBPS/chapter_{self.chapters}.xhtml", "w"),
+                                         encoding="utf-8")
+        self._chapter.write(f'<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html>\n'
+                            f'<html xmlns="http://www.w3.org/1999/xhtml">\n<head><title>Chapter {self.chapters}'
+                            f'</title></head>\n<body>\n<h2>Chapter {self.chapters}</h2>\n')
+
+    def _end_chapter(self) -> None:
+        if self._chapter is not None:
+            self._chapter.write("</body>\n</html>\n")
+            self._chapter.close()
+            self._chapter = None
+
+    def write(self, paragraph: str) -> None:
+        if self._chapter is None:
+            self._start_chapter()
+        self._chapter.writelines(get_html_paragraphs(paragraph))
+        self._paragraphs += 1
+        if self._paragraphs % self.chapter_size == 0:
+            self._end_chapter()
+
+    def close(self) -> None:
+        self._end_chapter()
+        if self.chapters == 0:
+            self._start_chapter()
+            self._end_chapter()
+        title: str = html.escape(self.title)
+        chapters: range = range(1, self.chapters + 1)
+        modified: str = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.book.writestr("OEBPS/content.opf", "".join([
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="id">\n'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
+            f'<dc:identifier id="id">urn:uuid:{uuid.uuid4()}</dc:identifier>\n<dc:title>{title}</dc:title>\n'
+            f'<dc:language>en</dc:language>\n<meta property="dcterms:modified">{modified}</meta>\n</metadata>\n'
+            '<manifest>\n<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>\n',
+            *[f'<item id="chapter_{index}" href="chapter_{index}.xhtml" media-type="application/xhtml+xml"/>\n'
+              for index in chapters],
+            '</manifest>\n<spine>\n',
+            *[f'<itemref idref="chapter_{index}"/>\n' for index in chapters],
+            '</spine>\n</package>\n'
+        ]))
+        self.book.writestr("OEBPS/nav.xhtml", "".join([
+            '<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html>\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">\n'
+            f'<head><title>{title}</title></head>\n<body>\n<nav epub:type="toc"><h1>{title}</h1><ol>\n',
+            *[f'<li><a href="chapter_{index}.xhtml">Chapter {index}</a></li>\n' for index in chapters],
+            '</ol></nav>\n</body>\n</html>\n'
+        ]))
+        self.book.close()
+
+
+WRITERS: Dict[str, type[StoryWriter]] = {writer.extension: writer
+                                          for writer in [TextWriter, MarkdownWriter, HtmlWriter, EpubWriter]}
+
+
+def export_story(paragraphs: Iterable[str], directory: str, title: str, formats: Iterable[str] = FORMATS,
+                 name: str = "story") -> Dict[str, str]:
+    """Exports a story to several formats in one pass over its paragraphs, so it can be streamed from the history
+    of a session without being copied.
+
+    :param paragraphs: The paragraphs of the story, e.g. ``story_msgs`` or ``iter_history(session.get_history())``.
+    :param directory: The directory the files are written to.
+    :param title: The title of the story.
+    :param formats: The formats written, from "txt", "md", "html" and "epub".
+    :param name: The name of the files, without their extension.
+    :return: A dictionary mapping each format to the path of its file.
+    :raises ValueError: If a format isn't supported.
+    """
+    unknown: List[str] = [extension for extension in formats if extension not in WRITERS]
+    if unknown:
+        raise ValueError(f"Unsupported story formats: {', '.join(unknown)}")
+    os.makedirs(directory, exist_ok=True)
+    writers: List[StoryWriter] = []
+    try:
+        for extension in dict.fromkeys(formats):
+            writers.append(WRITERS[extension](os.path.join(directory, f"{name}.{extension}"), title))
+        for paragraph in paragraphs:
+            for writer in writers:
+                writer.write(paragraph)
+    finally:
+        for writer in writers:
+            writer.close()
+    return {writer.extension: writer.path for writer in writers}
+
+
+def create_archive(directory: str) -> str:
+    """Compresses an exported game into a single ZIP archive next to it and removes the directory.
+    The files are streamed into the archive, so they are never read into memory whole.
+
+    :param directory: The directory of the exported game.
+    :return: The path of the archive.
+    """
+    path: str = directory.rstrip("/\\") + ".zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for root, _, files in os.walk(directory):
+            for file in sorted(files):
+                file_path: str = os.path.join(root, file)
+                # EPUBs are already compressed
+                compression: int = zipfile.ZIP_STORED if file.endswith(".epub") else zipfile.ZIP_DEFLATED
+                archive.write(file_path, os.path.relpath(file_path, directory), compress_type=compression)
+    shutil.rmtree(directory)
+    return path
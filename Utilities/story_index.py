@@ -0,0 +1,243 @@
+import math
+import re
+from typing import List, Dict, Any, Callable, Iterable
+
+# the story passages sent with every story request, on top of the system instructions and the most recent messages
+DEFAULT_CONTEXT_TOKENS: int = 1500
+# the most recent story messages (the last two turns) are always sent, so the story flows on from them
+RECENT_MESSAGES: int = 4
+DEFAULT_PASSAGE_LIMIT: int = 8
+# a rough estimate for English text, as the game doesn't ship a tokenizer
+CHARACTERS_PER_TOKEN: int = 4
+# BM25 parameters
+K1: float = 1.5
+B: float = 0.75
+
+STOP_WORDS: frozenset[str] = frozenset("""
+a an and are as at be but by for from had has have he her him his i if in into is it its me my no not of on or our
+she so than that the their them then there they this to was we were what when which who will with you your
+""".split())
+_WORD = re.compile(r"[a-z0-9']+")
+# the player's action in a continuation prompt (see ``utils.get_prompt``)
+_USER_INPUT = re.compile(r'This is what the user wants to do next: "(.*)"\.')
+# the start of the character JSON that ends every continuation prompt
+CHARACTER_JSON_HEADER: str = "Below are the updated Character JSON dictionaries"
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits a text into the lowercase words it is indexed by, leaving out common words.
+
+    :param text: The text.
+    :return: A list containing the words, in the order they appear.
+    """
+    return [word for word in _WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of tokens a text takes up in a prompt.
+
+    :param text: The text.
+    :return: The estimated number of tokens.
+    """
+    return -(-len(text) // CHARACTERS_PER_TOKEN)
+
+
+def get_text(message: Dict[str, Any]) -> str:
+    """Fetches the text of a message, whether its content is a string or a list of text parts.
+
+    :param message: A message dictionary containing the role and the content.
+    :return: The text of the message.
+    """
+    content = message["content"]
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content)
+
+
+def get_story_passages(message: Dict[str, Any]) -> List[str]:
+    """Splits a story message into the paragraphs that are indexed. Only the story written by ChatGPT is indexed,
+    as the prompts repeat the game state that is sent with every request anyway.
+
+    :param message: A message dictionary.
+    :return: A list containing the paragraphs of the story, or an empty list for other messages.
+    """
+    if message["role"] != "assistant":
+        return []
+    return [paragraph.strip() for paragraph in get_text(message).split("\n\n") if paragraph.strip()]
+
+
+def get_story_query(prompt: str) -> str:
+    """Fetches the text of a story prompt that the earlier story is searched for. The character JSON and the
+    instructions repeated in every continuation prompt would match the same passages every turn, so only the
+    player's action is searched for.
+
+    :param prompt: The prompt of the story request.
+    :return: The player's action, or the prompt without the character JSON if it doesn't contain one, e.g. when
+             the story is regenerated.
+    """
+    match = _USER_INPUT.search(prompt)
+    if match is not None:
+        return match.group(1)
+    return prompt.split(CHARACTER_JSON_HEADER, 1)[0]
+
+
+class StoryIndex:
+    def __init__(self, k1: float = K1, b: float = B):
+        """Initialises a StoryIndex object, a BM25 index over the story and the key events of a game.
+
+        The index is updated incrementally: ``sync`` only indexes the items added since it was last called, and
+        drops the items that were removed, e.g. when a checkpoint was rewound.
+
+        :param k1: How quickly repeating a word stops raising the score of a passage.
+        :param b: How much longer passages are penalised.
+        """
+        self.k1 = k1
+        self.b = b
+        # passage ID -> (source, text, number of words)
+        self._passages: Dict[int, tuple[str, str, int]] = {}
+        # word -> passage ID -> the number of times the word appears in the passage
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._total_words: int = 0
+        self._next_id: int = 0
+        # source -> the items indexed and the IDs of their passages, compared to the items to notice changes
+        self._items: Dict[str, List[Any]] = {}
+        self._item_passages: Dict[str, List[List[int]]] = {}
+        self._sources: Dict[str, List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._passages)
+
+    def _add_passage(self, source: str, text: str) -> int:
+        words: List[str] = tokenize(text)
+        passage_id: int = self._next_id
+        self._next_id += 1
+        self._passages[passage_id] = (source, text, len(words))
+        self._total_words += len(words)
+        for word in words:
+            counts: Dict[int, int] = self._postings.setdefault(word, {})
+            counts[passage_id] = counts.get(passage_id, 0) + 1
+        return passage_id
+
+    def _remove_passage(self, passage_id: int) -> None:
+        _, text, length = self._passages.pop(passage_id)
+        self._total_words -= length
+        for word in set(tokenize(text)):
+            counts: Dict[int, int] = self._postings.get(word, {})
+            counts.pop(passage_id, None)
+            if not counts:
+                self._postings.pop(word, None)
+
+    def sync(self, source: str, items: List[Any], get_passages: Callable[[Any], Iterable[str]],
+             end: int | None = None) -> None:
+        """Brings the passages of a source up to date with a list that is appended to, truncated or replaced.
+
+        :param source: The name of the source, e.g. "story" or "key_events".
+        :param items: The items of the source, e.g. the story messages.
+        :param get_passages: The function splitting an item into the passages indexed.
+        :param end: The number of items indexed, or None to index every item.
+        :return: None
+        """
+        end = len(items) if end is None else min(end, len(items))
+        indexed: List[Any] = self._items.setdefault(source, [])
+        passages: List[List[int]] = self._item_passages.setdefault(source, [])
+        length: int = min(len(indexed), end)
+        if self._sources.get(source) is not items or (length > 0 and indexed[length - 1] is not items[length - 1]):
+            # the items were replaced, so every passage of the source is indexed again
+            length = 0
+            self._sources[source] = items
+        while len(indexed) > length:
+            indexed.pop()
+            for passage_id in passages.pop():
+                self._remove_passage(passage_id)
+        for item in items[length:end]:
+            indexed.append(item)
+            passages.append([self._add_passage(source, passage) for passage in get_passages(item)])
+
+    def search(self, query: str, limit: int = DEFAULT_PASSAGE_LIMIT) -> List[tuple[int, float]]:
+        """Ranks the passages by their BM25 score for a query.
+
+        :param query: The text searched for, e.g. the prompt of the turn.
+        :param limit: The most passages returned.
+        :return: A list of tuples containing the ID and the score of each matching passage, from the best match.
+        """
+        if not self._passages:
+            return []
+        average_length: float = self._total_words / len(self._passages) or 1.0
+        scores: Dict[int, float] = {}
+        for word in set(tokenize(query)):
+            counts: Dict[int, int] = self._postings.get(word)
+            if not counts:
+                continue
+            idf: float = math.log(1 + (len(self._passages) - len(counts) + 0.5) / (len(counts) + 0.5))
+            for passage_id, count in counts.items():
+                length: int = self._passages[passage_id][2]
+                scores[passage_id] = scores.get(passage_id, 0.0) + idf * count * (self.k1 + 1) / (
+                        count + self.k1 * (1 - self.b + self.b * length / average_length))
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:limit]
+
+    def get_context(self, query: str, budget: int = DEFAULT_CONTEXT_TOKENS,
+                    limit: int = DEFAULT_PASSAGE_LIMIT, sent: str = "") -> List[str]:
+        """Fetches the passages most relevant to a query that fit in a token budget. Passages the query or the
+        messages already sent contain, e.g. key events in the timeline of the starting prompt, are left out.
+
+        :param query: The text searched for.
+        :param budget: The most tokens the passages take up.
+        :param limit: The most passages returned.
+        :param sent: The text of the messages sent anyway.
+        :return: A list containing the passages, in the order they were added to the story.
+        """
+        chosen: List[int] = []
+        for passage_id, _ in self.search(query, len(self._passages)):
+            if len(chosen) >= limit:
+                break
+            text: str = self._passages[passage_id][1]
+            tokens: int = estimate_tokens(text)
+            if tokens > budget or text in query or text in sent:
+                continue
+            chosen.append(passage_id)
+            budget -= tokens
+        return [self._passages[passage_id][1] for passage_id in sorted(chosen)]
+
+
+def select_story_messages(history: List[Dict[str, Any]], key_events: List[str], index: StoryIndex,
+                          budget: int | None = DEFAULT_CONTEXT_TOKENS,
+                          recent: int = RECENT_MESSAGES) -> List[Dict[str, Any]]:
+    """Selects the story messages sent with a story request: the system instructions, the starting prompt, the
+    passages of the earlier story and key events most relevant to the player's action, and the most recent messages.
+
+    The starting prompt is always sent, as it holds the rules, genre and opening state of the World that the
+    system instructions refer to, and which the continuation prompts don't repeat.
+
+    :param history: The story messages, ending with the prompt of the request.
+    :param key_events: The key events of the timeline.
+    :param index: The index of the story, which is updated with the history and key events.
+    :param budget: The most tokens the relevant passages take up, or None to send the whole history.
+    :param recent: The number of most recent messages sent before the prompt.
+    :return: A list containing the messages sent.
+    """
+    if budget is None:
+        return history
+    pinned: List[Dict[str, Any]] = [message for message in history[:1] if message["role"] == "system"]
+    if len(history) > len(pinned) + 1 and history[len(pinned)]["role"] == "user":
+        pinned.append(history[len(pinned)])
+    start: int = max(len(pinned), len(history) - 1 - recent)
+    if start == len(pinned):
+        # nothing has been left out yet
+        return history
+
+    # only the story that isn't sent in full is searched
+    index.sync("story", history, get_story_passages, start)
+    index.sync("key_events", key_events, lambda event: [event])
+    prompt: str = get_text(history[-1])
+    passages: List[str] = index.get_context(get_story_query(prompt), budget,
+                                            sent="\n".join([get_text(message) for message in pinned] + [prompt]))
+    context: List[Dict[str, Any]] = []
+    if passages:
+        context.append({
+            "role": "system",
+            "content": [{
+                "type": "text",
+                "text": "Earlier parts of the story relevant to this turn:\n\n" + "\n\n".join(passages)
+            }]
+        })
+    return pinned + context + history[start:]
@@ -1,24 +1,20 @@
 import asyncio
 
-from dotenv import load_dotenv
-from openai import AsyncOpenAI
 import textwrap
+import threading
 from pydantic import BaseModel
-from typing import List, Dict, TypeVar, Any
+from typing import List, Dict, TypeVar, Any, TYPE_CHECKING
 
-load_dotenv()
-client = AsyncOpenAI()
-V = TypeVar("V")
+from Utilities.environment import load_environment
+from Utilities.session import Session, get_default_session
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
-physical_condition_messages: List[Dict[str, V]] = []
-money_messages: List[Dict[str, V]] = []
-relationship_messages: List[Dict[str, V]] = []
-inventory_messages: List[Dict[str, V]] = []
-hp_messages: List[Dict[str, V]] = []
-current_location_messages: List[Dict[str, V]] = []
+_client: "AsyncOpenAI | None" = None
+_client_lock = threading.Lock()
 
-key_events_messages: List[Dict[str, V]] = []
-environment_messages: List[Dict[str, V]] = []
+V = TypeVar("V")
 
 
 class InventoryResponse(BaseModel):
@@ -26,16 +22,43 @@ class InventoryResponse(BaseModel):
     items_list: list[str]
 
 
-async def get_response(messages: List[Dict[str, Any]]) -> str:
+def get_default_client() -> "AsyncOpenAI":
+    """Fetches the AsyncOpenAI client used by sessions without their own client, creating it when the first update
+    is requested.
+
+    :return: The AsyncOpenAI client.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import AsyncOpenAI
+            load_environment()
+            _client = AsyncOpenAI()
+        return _client
+
+
+def get_client(session: Session | None = None) -> "AsyncOpenAI":
+    """Fetches the asynchronous client used to send attribute update requests for a session.
+
+    :param session: The session of the game. If it doesn't provide its own client, the AsyncOpenAI client is used.
+    :return: The asynchronous client of the session, or the AsyncOpenAI client.
+    """
+    if session is not None and session.async_client is not None:
+        return session.async_client
+    return get_default_client()
+
+
+async def get_response(messages: List[Dict[str, Any]], session: Session | None = None) -> str:
     """Sends a list of messages to the OpenAI API and retrieves the response.
 
     :param messages: A list of message dictionaries, where each dictionary
                      contains keys like 'role' (e.g., 'system', 'user', 'assistant')
                      and 'content' (the actual message text).
+    :param session: The session of the game, which may provide its own client.
     :return: A string containing the response from the GPT-4o-mini API based on the
              input messages
     """
-    response = await client.chat.completions.create(
+    response = await get_client(session).chat.completions.create(
         model="gpt-4o-mini",
         messages=messages,
         temperature=1,
@@ -76,11 +99,15 @@ def append_msg(message: str, messages_array: List[Dict[str, Any]], role_type: st
     )
 
 
-def begin_update_attr() -> None:
-    """Begins the attribute updates by appending system instructions to respective message arrays for each attribute.
+def begin_update_attr(session: Session | None = None) -> None:
+    """Begins the attribute updates by appending system instructions to the session's respective message arrays
+    for each attribute.
 
+    :param session: The session of the game. Defaults to the default session.
     :return: None
     """
+    if session is None:
+        session = get_default_session()
     # Physical Condition
     physical_condition_system_instructions: str = textwrap.dedent("""
     Read the given story and update the physical condition of characters based on any events that affect them.
@@ -152,7 +179,7 @@ def begin_update_attr() -> None:
     - Avoid unnecessary updates if the condition remains unchanged.
     - Return either "False" or the schema only, DON'T give any justification. Please follow the output format above.
     """)
-    append_msg(physical_condition_system_instructions, physical_condition_messages, "system")
+    append_msg(physical_condition_system_instructions, session.physical_condition_messages, "system")
 
     # Money
     money_system_instructions: str = textwrap.dedent("""
@@ -213,7 +240,7 @@ def begin_update_attr() -> None:
     - Consider edge cases where multiple transactions are confirmed in the story and ensure each is captured correctly.
     - Return either "False" or the schema only, DON'T give any justification. Please follow the output format above.
     """)
-    append_msg(money_system_instructions, money_messages, "system")
+    append_msg(money_system_instructions, session.money_messages, "system")
 
     # Relationship
     relationship_system_instructions: str = textwrap.dedent("""
@@ -233,7 +260,7 @@ def begin_update_attr() -> None:
     2. <schemas>
        a. <> is a placeholder - REPLACE this according to the steps above.
     """)
-    append_msg(relationship_system_instructions, relationship_messages, "system")
+    append_msg(relationship_system_instructions, session.relationship_messages, "system")
 
     # Inventory
     inventory_system_instructions: str = textwrap.dedent("""
@@ -254,7 +281,7 @@ def begin_update_attr() -> None:
     2. <schemas>
        a. <> is a placeholder - REPLACE this according to the steps above.
     """)
-    append_msg(inventory_system_instructions, inventory_messages, "system")
+    append_msg(inventory_system_instructions, session.inventory_messages, "system")
 
     # HP
     hp_system_instructions: str = textwrap.dedent("""
@@ -325,7 +352,7 @@ def begin_update_attr() -> None:
     - When a character eats or drinks something, consider it as HP gained.
     - Return either "False" or the schema only, DON'T give any justification. Please follow the output format above.
     """)
-    append_msg(hp_system_instructions, hp_messages, "system")
+    append_msg(hp_system_instructions, session.hp_messages, "system")
 
     # Current_location
     current_location_system_instructions: str = textwrap.dedent("""
@@ -345,7 +372,7 @@ def begin_update_attr() -> None:
     2. <schemas>
        a. <> is a placeholder - REPLACE this according to the steps above.
     """)
-    append_msg(current_location_system_instructions, current_location_messages, "system")
+    append_msg(current_location_system_instructions, session.current_location_messages, "system")
 
     # Key_events
     key_events_system_instructions: str = textwrap.dedent("""
@@ -356,7 +383,7 @@ def begin_update_attr() -> None:
     2. Read through the story and return ONLY a summarised version of it.
     3. Keep the summary to around 2 - 3 sentences long.
     """)
-    append_msg(key_events_system_instructions, key_events_messages, "system")
+    append_msg(key_events_system_instructions, session.key_events_messages, "system")
 
     # Environment
     environment_system_instructions: str = textwrap.dedent("""
@@ -366,11 +393,11 @@ def begin_update_attr() -> None:
     2. The main character has moved to a new location and the environment needs updating.
     3. Read through the story and return ONLY the new description of the new environment.
     """)
-    append_msg(environment_system_instructions, environment_messages, "system")
+    append_msg(environment_system_instructions, session.environment_messages, "system")
 
 
 # Physical Condition
-async def get_physical_condition_update(story: str, characters: str) -> str:
+async def get_physical_condition_update(story: str, characters: str, session: Session | None = None) -> str:
     """Retrieves updates required for the characters' physical condition based on the provided story.
 
     This function sends a prompt to ChatGPT to determine whether there are any changes to the characters'
@@ -380,6 +407,7 @@ async def get_physical_condition_update(story: str, characters: str) -> str:
     :param story: A string of the 3 most recent story events.
     :param characters: A JSON string representation of the characters, including their ID, name, and
                        current physical condition.
+    :param session: The session of the game. Defaults to the default session.
     :return: A string detailing the updates needed for characters whose physical condition has changed,
              formatted according to the specified schema.
     """
@@ -393,14 +421,16 @@ async def get_physical_condition_update(story: str, characters: str) -> str:
       - Note: You need to first check if the character in the Character JSON Dictionaries based on their name.
     - If a character becomes healthy or in normal state, the physical_condition should be healthy.
     """)
-    append_msg(prompt, physical_condition_messages, "user")
-    response: str = await get_response(physical_condition_messages)
-    append_msg(response, physical_condition_messages, "assistant")
+    if session is None:
+        session = get_default_session()
+    append_msg(prompt, session.physical_condition_messages, "user")
+    response: str = await get_response(session.physical_condition_messages, session)
+    append_msg(response, session.physical_condition_messages, "assistant")
     return response
 
 
 # Money
-async def get_money_update(story: str, characters: str) -> str:
+async def get_money_update(story: str, characters: str, session: Session | None = None) -> str:
     """Retrieves updates required for the characters' money based on the provided story.
 
     This function sends a prompt to ChatGPT to determine whether there are any changes to the characters'
@@ -409,6 +439,7 @@ async def get_money_update(story: str, characters: str) -> str:
     :param story: A string of the current story.
     :param characters: A JSON string representation of the characters, including their ID, name, and
                        current money amount.
+    :param session: The session of the game. Defaults to the default session.
     :return: A string detailing the updates needed for characters whose money values have changed,
              formatted according to the specified schema.
     """
@@ -419,14 +450,16 @@ async def get_money_update(story: str, characters: str) -> str:
     {characters}
     - If a transaction HASN'T HAPPENED yet (NO CONFIRMATION), DON'T UPDATE any of the dictionaries.
     """)
-    append_msg(prompt, money_messages, "user")
-    response: str = await get_response(money_messages)
-    append_msg(response, money_messages, "assistant")
+    if session is None:
+        session = get_default_session()
+    append_msg(prompt, session.money_messages, "user")
+    response: str = await get_response(session.money_messages, session)
+    append_msg(response, session.money_messages, "assistant")
     return response
 
 
 # Relationship
-async def get_relationship_update(story: str, characters: str) -> str:
+async def get_relationship_update(story: str, characters: str, session: Session | None = None) -> str:
     """Retrieves updates required for the characters' relationships based on the provided story.
 
     This function sends a prompt to ChatGPT to determine whether there are any changes to the characters'
@@ -436,6 +469,7 @@ async def get_relationship_update(story: str, characters: str) -> str:
     :param story: A string of the 3 most recent story events.
     :param characters: A JSON string representation of the characters, including their ID, name, and
                        current relationships.
+    :param session: The session of the game. Defaults to the default session.
     :return: A string detailing the updates needed for characters whose relationships has changed, formatted
             according to the specified schema.
     """
@@ -445,14 +479,16 @@ async def get_relationship_update(story: str, characters: str) -> str:
     **Character JSON Dictionaries:**
     {characters}
     """)
-    append_msg(prompt, relationship_messages, "user")
-    response: str = await get_response(relationship_messages)
-    append_msg(response, relationship_messages, "assistant")
+    if session is None:
+        session = get_default_session()
+    append_msg(prompt, session.relationship_messages, "user")
+    response: str = await get_response(session.relationship_messages, session)
+    append_msg(response, session.relationship_messages, "assistant")
     return response
 
 
 # Inventory
-async def get_inventory_update(story: str, characters: str) -> str:
+async def get_inventory_update(story: str, characters: str, session: Session | None = None) -> str:
     """Retrieves updates required for the characters' inventory based on the provided story.
 
     This function sends a prompt to ChatGPT to determine whether there are any changes to the characters'
@@ -461,6 +497,7 @@ async def get_inventory_update(story: str, characters: str) -> str:
     :param story: A string of the 3 most recent story events.
     :param characters: A JSON string representation of the characters, including their ID, name, and
                        current inventory.
+    :param session: The session of the game. Defaults to the default session.
     :return: A string detailing the updates needed for characters whose inventory has changed, formatted
              according to the specified schema.
     """
@@ -472,14 +509,16 @@ async def get_inventory_update(story: str, characters: str) -> str:
     - If there's NO CONFIRMATION that a character HASN'T obtained or lost an item yet, DON'T UPDATE any of the dictionaries.
     - If the character has purchased some items (transaction confirmed), please remember to add those items to their inventory.
     """)
-    append_msg(prompt, inventory_messages, "user")
-    response: str = await get_response(inventory_messages)
-    append_msg(response, inventory_messages, "assistant")
+    if session is None:
+        session = get_default_session()
+    append_msg(prompt, session.inventory_messages, "user")
+    response: str = await get_response(session.inventory_messages, session)
+    append_msg(response, session.inventory_messages, "assistant")
     return response
 
 
 # HP
-async def get_hp_update(story: str, characters: str) -> str:
+async def get_hp_update(story: str, characters: str, session: Session | None = None) -> str:
     """Retrieves updates required for the characters' HP based on the provided story.
 
     This function sends a prompt to ChatGPT to determine whether there are any changes to the characters'
@@ -488,6 +527,7 @@ async def get_hp_update(story: str, characters: str) -> str:
     :param story: A string of the 3 most recent story events.
     :param characters: A JSON string representation of the characters, including their ID, name,
                        physical_condition, and current HP.
+    :param session: The session of the game. Defaults to the default session.
     :return: A string detailing the updates needed for characters whose HP has changed, formatted according
              to the specified schema.
     """
@@ -497,14 +537,16 @@ async def get_hp_update(story: str, characters: str) -> str:
     **Character JSON Dictionaries:**
     {characters}
     """)
-    append_msg(prompt, hp_messages, "user")
-    response: str = await get_response(hp_messages)
-    append_msg(response, hp_messages, "assistant")
+    if session is None:
+        session = get_default_session()
+    append_msg(prompt, session.hp_messages, "user")
+    response: str = await get_response(session.hp_messages, session)
+    append_msg(response, session.hp_messages, "assistant")
     return response
 
 
 # Current_location
-async def get_current_location_update(story: str, characters: str) -> str:
+async def get_current_location_update(story: str, characters: str, session: Session | None = None) -> str:
     """Retrieves updates required for the characters' current location based on the provided story.
 
     This function sends a prompt to ChatGPT to determine whether there are any changes to the characters'
@@ -513,6 +555,7 @@ async def get_current_location_update(story: str, characters: str) -> str:
     :param story: A string of the 3 most recent story events.
     :param characters: A JSON string representation of the characters, including their ID, name, and
                        current location.
+    :param session: The session of the game. Defaults to the default session.
     :return: A string detailing the updates needed for characters whose current location has changed,
              formatted according to the specified schema.
     """
@@ -522,14 +565,16 @@ async def get_current_location_update(story: str, characters: str) -> str:
     **Character JSON Dictionaries:**
     {characters}
     """)
-    append_msg(prompt, current_location_messages, "user")
-    response: str = await get_response(current_location_messages)
-    append_msg(response, current_location_messages, "assistant")
+    if session is None:
+        session = get_default_session()
+    append_msg(prompt, session.current_location_messages, "user")
+    response: str = await get_response(session.current_location_messages, session)
+    append_msg(response, session.current_location_messages, "assistant")
     return response
 
 
 # Environment
-async def get_environment(story: str) -> str:
+async def get_environment(story: str, session: Session | None = None) -> str:
     """Retrieves an update to the environment based on the provided story.
 
     This function sends a prompt to ChatGPT to determine how the environment changes
@@ -537,39 +582,72 @@ async def get_environment(story: str) -> str:
     new environment the main character finds themselves in.
 
     :param story: A string of the 3 most recent story events.
+    :param session: The session of the game. Defaults to the default session.
     :return: A string describing the updated environment where the main character is located.
     """
     prompt: str = textwrap.dedent(f"""
     **Story:**
     {story}
     """)
-    append_msg(prompt, environment_messages, "user")
-    response: str = await get_response(environment_messages)
-    append_msg(response, environment_messages, "assistant")
+    if session is None:
+        session = get_default_session()
+    append_msg(prompt, session.environment_messages, "user")
+    response: str = await get_response(session.environment_messages, session)
+    append_msg(response, session.environment_messages, "assistant")
     return response
 
 
 # Key_events
-async def get_key_events(story: str) -> str:
+async def get_key_events(story: str, session: Session | None = None) -> str:
     """Retrieves a summary of the key events based on the provided story.
 
     This function sends a prompt to ChatGPT to generate a concise summary of the story,
     highlighting the key events that occurred.
 
     :param story: A string of the current story.
+    :param session: The session of the game. Defaults to the default session.
     :return: A string summarising the key events from the provided story.
     """
     prompt: str = textwrap.dedent(f"""
     **Story:**
     {story}
     """)
-    append_msg(prompt, key_events_messages, "user")
-    response: str = await get_response(key_events_messages)
-    append_msg(response, key_events_messages, "assistant")
+    if session is None:
+        session = get_default_session()
+    append_msg(prompt, session.key_events_messages, "user")
+    response: str = await get_response(session.key_events_messages, session)
+    append_msg(response, session.key_events_messages, "assistant")
     return response
 
 
-async def requery(attribute: str, story: str, char_dicts: str, update_line: str) -> str:
+async def get_timeline_summary(items: List[str], level: str, session: Session | None = None) -> str:
+    """Retrieves a summary of several key events or chapters of the timeline.
+
+    Each summary is requested in a new conversation, as the summaries are written in the background and don't
+    depend on each other.
+
+    :param items: The key events summarised into a chapter, or the chapters summarised into an arc.
+    :param level: The level of the summary, "chapter" or "arc".
+    :param session: The session of the game, which may provide its own client.
+    :return: A string summarising the events.
+    """
+    timeline_summary_system_instructions: str = textwrap.dedent(f"""
+    The events of a story are merged into one summary, called a {level}.
+
+    **Steps:**
+    1. You are given a list of events, in the order they happened.
+    2. Return ONLY a summary of the events, keeping the characters, places and consequences that matter later on.
+    3. Keep the summary to around 3 - 4 sentences long.
+    """)
+    events: str = "\n".join(f"- {item}" for item in items)
+    messages: List[Dict[str, Any]] = []
+    append_msg(timeline_summary_system_instructions, messages, "system")
+    append_msg(f"**Events:**\n{events}", messages, "user")
+    return await get_response(messages, session)
+
+
+async def requery(attribute: str, story: str, char_dicts: str, update_line: str,
+                  session: Session | None = None) -> str:
     """Sends a requery to ChatGPT to correct an improperly formatted update line.
 
     This function requeries a previously incorrect character attribute update line to ChatGPT,
@@ -581,6 +659,7 @@ async def requery(attribute: str, story: str, char_dicts: str, update_line: str)
     :param char_dicts: A JSON string representation of the characters, including their ID, name,
                        and the attribute relevant to the update.
     :param update_line: The incorrectly formatted character attribute update line that needs fixing.
+    :param session: The session of the game, which may provide its own client.
     :return: A string containing the corrected update line in the appropriate format.
     """
     # set the instructions and message for the correct attribute
@@ -609,14 +688,15 @@ async def requery(attribute: str, story: str, char_dicts: str, update_line: str)
     {char_dicts}
     """)
     append_msg(prompt, messages, "user")
-    response: str = await get_response(messages)
+    response: str = await get_response(messages, session)
     return response
 
 
-async def check_char_inventory(user_input: str) -> InventoryResponse:
+async def check_char_inventory(user_input: str, session: Session | None = None) -> InventoryResponse:
     """Prompts ChatGPT to check if any items are being used by the main character based on the user's input.
 
     :param user_input: A string representing the user's input.
+    :param session: The session of the game, which may provide its own client.
     :return: An InventoryResponse object:
              - used_item: bool, determines whether an item was used or not
              - items_list: list[str], a list of items used.
@@ -675,7 +755,7 @@ async def check_char_inventory(user_input: str) -> InventoryResponse:
         {user_input}
         """)
     append_msg(prompt, messages, "user")
-    completion = await client.beta.chat.completions.parse(
+    completion = await get_client(session).beta.chat.completions.parse(
         model="gpt-4o-mini",
         messages=messages,
         response_format=InventoryResponse,
@@ -684,19 +764,13 @@ async def check_char_inventory(user_input: str) -> InventoryResponse:
     return completion.choices[0].message.parsed
 
 
-def reset_chat(count: int) -> None:
+def reset_chat(count: int, session: Session | None = None) -> None:
     """Resets the message history for all attribute message arrays after every 3 update prompt calls.
 
     :param count: The number of times the update prompts were called.
+    :param session: The session of the game. Defaults to the default session.
     :return: None
     """
-    global physical_condition_messages, money_messages, relationship_messages, inventory_messages, hp_messages, current_location_messages, key_events_messages, environment_messages
-    if count >= 3:
-        physical_condition_messages = physical_condition_messages[:1]
-        money_messages = money_messages[:1]
-        relationship_messages = relationship_messages[:1]
-        inventory_messages = inventory_messages[:1]
-        hp_messages = hp_messages[:1]
-        current_location_messages = current_location_messages[:1]
-        key_events_messages = key_events_messages[:1]
-        environment_messages = environment_messages[:1]
+    if session is None:
+        session = get_default_session()
+    session.reset_chat(count)
@@ -0,0 +1,224 @@
+import math
+import re
+from typing import List, Dict, Iterable, Sequence
+
+PHYSICAL_CONDITION: str = "physical_condition"
+MONEY: str = "money"
+RELATIONSHIP: str = "relationship"
+INVENTORY: str = "inventory"
+HP: str = "hp"
+CURRENT_LOCATION: str = "current_location"
+ATTRIBUTES: tuple[str, ...] = (PHYSICAL_CONDITION, MONEY, RELATIONSHIP, INVENTORY, HP, CURRENT_LOCATION)
+
+_INJURY: str = (r"wound\w*|injur\w*|bleed\w*|bled|blood\w*|heal\w*|hurt\w*|pain\w*|poison\w*|burn\w*|bruise\w*|"
+                r"broken|fractur\w*|cut|cuts|scratch\w*|bitten|recover\w*|bandag\w*|potion\w*|die[sd]?|dead|death|"
+                r"kill\w*|unconscious|collaps\w*|faint\w*|trip\w*|scrap(e|es|ed)|sprain\w*|twist\w*")
+_ATTACK: str = (r"hit|hits|damag\w*|attack\w*|strike[s]?|struck|slash\w*|stab\w*|bite[s]?|punch\w*|kick\w*|shot|"
+                r"shoot\w*|arrows?|fall|falls|fell|crash\w*|claw\w*|slam\w*|explo\w*")
+
+# attribute -> (regular expression, weight) of the words suggesting the attribute changed
+DEFAULT_CUES: Dict[str, List[tuple[str, float]]] = {
+    PHYSICAL_CONDITION: [
+        (_INJURY, 1.0),
+        (_ATTACK, 1.0),
+        (r"exhaust\w*|tired|fatigue\w*|sick\w*|ill|fever\w*|weak\w*|rested|asleep|dizz\w*|froz\w*|freez\w*|"
+         r"starv\w*|hungry|thirst\w*|drunk|curse[sd]?|paraly\w*|numb|shiver\w*|limp\w*|feel(s)? better", 1.0),
+    ],
+    MONEY: [
+        (r"coins?|gold|silver|copper|money|pay\w*|paid|buy\w*|bought|sell\w*|sold|price\w*|costs?|reward\w*|"
+         r"purse|wallet|bribe\w*|fees?|wages?|debts?|loan\w*|trad(e|es|ed|ing)|purchas\w*|spen[dt]\w*|dollars?|"
+         r"credits?|crowns?|cash|tips?|charg\w*|rob\w*|steal\w*|stole|stolen|pickpocket\w*|owe[sd]?", 1.0),
+        (r"[$£€¥]\s?\d|\d+\s*(gold|coins?|silver|copper|credits?|crowns?|dollars?)", 2.0),
+    ],
+    RELATIONSHIP: [
+        (r"trust\w*|friend\w*|ally|allies|alliance|betray\w*|thank\w*|grateful|argu\w*|angr\w*|anger\w*|love[sd]?|"
+         r"hate[sd]?|smil\w*|laugh\w*|promis\w*|insult\w*|forgiv\w*|respect\w*|suspic\w*|hug\w*|kiss\w*|threat\w*|"
+         r"rival\w*|companion\w*|join\w*|enem\w*|fond\w*|admir\w*|glar\w*|apolog\w*|shake[s]? hands|shook hands|"
+         r"warm(s|ed)? up to|bond\w*|grudg\w*|distrust\w*|resent\w*|impress\w*|annoy\w*", 1.0),
+    ],
+    INVENTORY: [
+        (r"pick(s|ed|ing)? up|take[sn]?|taking|took|grab\w*|receiv\w*|give[sn]?|gave|giving|hand(s|ed)? (you|over|it)|"
+         r"drop(s|ped)?|lose|loses|lost|loot\w*|find|finds|found|equip\w*|pocket\w*|stash\w*|steal\w*|stole|stolen|"
+         r"buy\w*|bought|sell\w*|sold|throw\w*|threw|thrown|discard\w*|consum\w*|drink\w*|drank|gift\w*|"
+         r"inventory|backpack|satchel|pouch|bag|trade[sd]?|swap\w*|break(s)?|broke|shatter\w*|craft\w*|"
+         r"forg(e|ed|es)|snap\w*|destroy\w*|ruin(s|ed)", 1.0),
+    ],
+    HP: [
+        (_INJURY, 1.0),
+        (_ATTACK, 1.0),
+        (r"restor\w*|mend\w*|wince\w*|gasp\w*", 1.0),
+    ],
+    CURRENT_LOCATION: [
+        (r"arriv\w*|enter\w*|leave[s]?|leaving|left|travel\w*|reach\w*|return\w*|journey\w*|ride|rides|rode|"
+         r"sail\w*|climb\w*|descend\w*|cross\w*|flee[s]?|fled|escap\w*|went|ventur\w*|teleport\w*|march\w*|"
+         r"wander\w*|stride\w*|strode|exit\w*|board\w*|emerge\w*|led|lead(s)? you|follow\w*|outside|inside|"
+         r"towards?|back (at|in|to)|set(s|ting)? (out|off)|"
+         r"(head|walk|step|move|go|run|ran|make your way|hurr(y|ies|ied))\w* (to|into|towards|toward|through|out|"
+         r"back|inside|outside|down|up|across|along|over|onto)", 1.0),
+    ],
+}
+# the score at which an attribute is updated: any cue word, so only turns without any are skipped
+DEFAULT_THRESHOLD: float = 1.0
+
+
+class UpdateGate:
+    def __init__(self, thresholds: Dict[str, float] | None = None,
+                 cues: Dict[str, List[tuple[str, float]]] | None = None):
+        """Initialises an UpdateGate object, a local classifier that skips the attribute updates that can't change.
+
+        Every attribute update is a request to ChatGPT, yet most turns don't involve money, items or travel. The gate
+        scores the new story for each attribute by counting the words suggesting it changed, e.g. currency words for
+        money and movement verbs for the current location, and the names of the characters for relationships. The
+        update is only requested when the score reaches the attribute's threshold.
+
+        :param thresholds: A dictionary mapping each attribute to the score at which it is updated. Attributes that
+                           aren't in it use ``DEFAULT_THRESHOLD``, and a threshold of 0 always updates the attribute.
+        :param cues: A dictionary mapping each attribute to the regular expressions and weights of its cue words.
+                     Defaults to ``DEFAULT_CUES``.
+        """
+        self.thresholds: Dict[str, float] = dict(thresholds) if thresholds is not None else {}
+        self._cues: Dict[str, List[tuple[re.Pattern, float]]] = {
+            attribute: [(re.compile(rf"\b(?:{pattern})\b", re.IGNORECASE), weight) for pattern, weight in patterns]
+            for attribute, patterns in (cues if cues is not None else DEFAULT_CUES).items()
+        }
+        self.checks: Dict[str, int] = {attribute: 0 for attribute in ATTRIBUTES}
+        self.skipped: Dict[str, int] = {attribute: 0 for attribute in ATTRIBUTES}
+
+    def get_threshold(self, attribute: str) -> float:
+        """Fetches the score at which an attribute is updated.
+
+        :param attribute: The attribute, e.g. ``MONEY``.
+        :return: The threshold.
+        """
+        return self.thresholds.get(attribute, DEFAULT_THRESHOLD)
+
+    def score(self, attribute: str, story: str, names: Sequence[str] = ()) -> float:
+        """Scores how likely a story is to change an attribute.
+
+        :param attribute: The attribute, e.g. ``MONEY``.
+        :param story: The new story.
+        :param names: The names of the NPCs. Relationships can only change if there are NPCs, and NPCs mentioned in
+                      the story raise the score of relationships.
+        :return: The weighted number of cue words in the story.
+        """
+        if attribute == RELATIONSHIP and not names:
+            return 0.0
+        score: float = sum(weight * len(pattern.findall(story)) for pattern, weight in self._cues.get(attribute, []))
+        if attribute == RELATIONSHIP:
+            lowered: str = story.lower()
+            score += sum(1.0 for name in names if name and name.lower() in lowered)
+        return score
+
+    def should_update(self, attribute: str, story: str, names: Sequence[str] = ()) -> bool:
+        """Checks whether an attribute update should be requested for a story, recording the decision in the stats.
+
+        :param attribute: The attribute, e.g. ``MONEY``.
+        :param story: The new story.
+        :param names: The names of the NPCs.
+        :return: True if the attribute may have changed, False if the update can be skipped.
+        """
+        threshold: float = self.get_threshold(attribute)
+        update: bool = threshold <= 0 or self.score(attribute, story, names) >= threshold
+        self.checks[attribute] = self.checks.get(attribute, 0) + 1
+        if not update:
+            self.skipped[attribute] = self.skipped.get(attribute, 0) + 1
+        return update
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Fetches the number of updates checked and skipped for each attribute.
+
+        :return: A dictionary mapping each attribute to its number of checks and skipped updates.
+        """
+        return {attribute: {"checks": self.checks.get(attribute, 0), "skipped": self.skipped.get(attribute, 0)}
+                for attribute in ATTRIBUTES}
+
+
+def calibrate(gate: UpdateGate, examples: Iterable[tuple[str, Sequence[str], Iterable[str]]],
+              recall_target: float = 1.0) -> Dict[str, float]:
+    """Finds the highest threshold of each attribute that still updates it on at least ``recall_target`` of the
+    labelled turns where it changed. A threshold is never raised above the gate's own, as a higher threshold only
+    fits the labelled turns and misses changes in other stories.
+
+    :param gate: The gate whose scores are calibrated. Its thresholds aren't changed.
+    :param examples: The labelled turns, as tuples containing the story, the names of the NPCs and the attributes
+                     that changed.
+    :param recall_target: The share of the changes from 0 to 1 that must not be skipped.
+    :return: A dictionary mapping each attribute to its threshold. An attribute whose changes can't be found well
+             enough by its cue words gets a threshold of 0, so it is always updated.
+    """
+    scores: Dict[str, List[float]] = {attribute: [] for attribute in ATTRIBUTES}
+    for story, names, changed in examples:
+        for attribute in changed:
+            scores[attribute].append(gate.score(attribute, story, names))
+
+    thresholds: Dict[str, float] = {}
+    for attribute, positives in scores.items():
+        if not positives:
+            thresholds[attribute] = gate.get_threshold(attribute)
+            continue
+        positives.sort(reverse=True)
+        # the number of changes that must still be updated to reach the target
+        needed: int = min(max(1, math.ceil(recall_target * len(positives) - 1e-9)), len(positives))
+        threshold: float = min(positives[needed - 1], gate.get_threshold(attribute))
+        thresholds[attribute] = threshold if threshold > 0 else 0.0
+    return thresholds
+
+
+def fail_open(gate: UpdateGate, examples: Iterable[tuple[str, Sequence[str], Iterable[str]]],
+              recall_target: float = 1.0) -> Dict[str, float]:
+    """Finds the thresholds of a gate that only skip the attributes it is reliably right about, by always updating
+    every attribute whose recall on held-out labelled turns is below ``recall_target``.
+
+    :param gate: The gate whose thresholds are checked. Its thresholds aren't changed.
+    :param examples: The held-out labelled turns, as tuples containing the story, the names of the NPCs and the
+                     attributes that changed.
+    :param recall_target: The share of the changes from 0 to 1 that must not be skipped.
+    :return: A dictionary mapping each attribute to its threshold, which is 0 if the attribute is always updated.
+    """
+    evaluation: Dict[str, Dict[str, float]] = evaluate(gate, examples)
+    return {attribute: gate.get_threshold(attribute) if evaluation[attribute]["recall"] >= recall_target else 0.0
+            for attribute in ATTRIBUTES}
+
+
+def create_gate(recall_target: float = 1.0) -> UpdateGate:
+    """Creates a gate calibrated on the tuning turns of ``update_gate_turns`` for a recall target, which fails open
+    on its held-out turns: attributes whose held-out recall is below the target are always updated.
+
+    :param recall_target: The share of the changes from 0 to 1 that must not be skipped.
+    :return: The UpdateGate object.
+    """
+    # imported here as the labelled turns use the attribute names of this module
+    from Utilities.update_gate_turns import TUNING_TURNS, HELD_OUT_TURNS
+    calibrated: UpdateGate = UpdateGate(calibrate(UpdateGate(), TUNING_TURNS, recall_target))
+    return UpdateGate(fail_open(calibrated, HELD_OUT_TURNS, recall_target))
+
+
+def evaluate(gate: UpdateGate, examples: Iterable[tuple[str, Sequence[str], Iterable[str]]]) -> \
+        Dict[str, Dict[str, float]]:
+    """Measures how many changes a gate misses and how many updates it skips on labelled turns.
+    The gate's stats aren't changed.
+
+    :param gate: The gate evaluated.
+    :param examples: The labelled turns, as tuples containing the story, the names of the NPCs and the attributes
+                     that changed.
+    :return: A dictionary mapping each attribute to its number of changes, recall (the share of the changes that
+             were updated) and skip rate (the share of the turns whose update was skipped).
+    """
+    counts: Dict[str, Dict[str, int]] = {attribute: {"turns": 0, "changes": 0, "found": 0, "skipped": 0}
+                                         for attribute in ATTRIBUTES}
+    for story, names, changed in examples:
+        changed = set(changed)
+        for attribute in ATTRIBUTES:
+            threshold: float = gate.get_threshold(attribute)
+            update: bool = threshold <= 0 or gate.score(attribute, story, names) >= threshold
+            count: Dict[str, int] = counts[attribute]
+            count["turns"] += 1
+            count["skipped"] += not update
+            if attribute in changed:
+                count["changes"] += 1
+                count["found"] += update
+
+    return {attribute: {"changes": count["changes"],
+                        "recall": count["found"] / count["changes"] if count["changes"] else 1.0,
+                        "skip_rate": count["skipped"] / count["turns"] if count["turns"] else 0.0}
+            for attribute, count in counts.items()}
@@ -0,0 +1,111 @@
+from typing import List
+
+from Utilities.update_gate import PHYSICAL_CONDITION, MONEY, RELATIONSHIP, INVENTORY, HP, CURRENT_LOCATION
+
+# handwritten turns in the style of the story, labelled with the attributes that changed: (story, NPC names,
+# attributes). The cue words in ``update_gate.DEFAULT_CUES`` were written against these turns, so the gate's results
+# on them are training results and say little about other stories
+TUNING_TURNS: List[tuple[str, List[str], List[str]]] = [
+    ("You wake up in a small room above the tavern. Sunlight pours through the shutters and the smell of bread drifts "
+     "up from the kitchen below.", [], []),
+    ("You head down the stairs into the common room, where a bard is tuning his lute by the fire.", [],
+     [CURRENT_LOCATION]),
+    ("Alice, the innkeeper, smiles and slides a bowl of stew across the counter. \"On the house, for the hero of "
+     "the mill,\" she says.", ["Alice"], [RELATIONSHIP]),
+    ("You pay Alice 5 gold coins for a room for the week. She pockets the coins and hands you a brass key.",
+     ["Alice"], [MONEY, INVENTORY]),
+    ("The bard finishes his song about the old kings and the crowd cheers. Outside, rain begins to fall on the "
+     "cobblestones.", ["Alice"], []),
+    ("You stare into the fire for a while, thinking about the map you saw in the elder's study.", ["Alice"], []),
+    ("You leave the tavern and walk to the market square, where merchants are packing up their stalls.", ["Alice"],
+     [CURRENT_LOCATION]),
+    ("A merchant named Brom offers you a rusty sword for 12 silver. You buy it and strap it to your belt.",
+     ["Alice", "Brom"], [MONEY, INVENTORY]),
+    ("Brom tells you that the road north has been quiet, though few travellers have taken it since the snows.",
+     ["Alice", "Brom"], []),
+    ("The clouds part and the square is bathed in the orange light of the setting sun.", ["Alice", "Brom"], []),
+    ("A pickpocket bumps into you in the crowd. When you check your belt, your purse is gone.", ["Alice", "Brom"],
+     [MONEY]),
+    ("You chase the thief through the alleys, but he slips away. You trip on a loose stone and scrape your knee "
+     "badly.", ["Alice", "Brom"], [PHYSICAL_CONDITION, HP]),
+    ("Back at the tavern, Alice cleans your wound and wraps it in a bandage.", ["Alice", "Brom"],
+     [PHYSICAL_CONDITION, CURRENT_LOCATION, RELATIONSHIP]),
+    ("You sleep through the night. The storm rattles the windows, but nothing disturbs you.", ["Alice", "Brom"], []),
+    ("In the morning you set out on the north road, towards the mountains.", ["Alice", "Brom"], [CURRENT_LOCATION]),
+    ("The road winds between fields of barley. Crows circle above the hedges and a cart rumbles by in the distance.",
+     ["Alice", "Brom"], []),
+    ("A wolf leaps from the bushes and bites your arm before you drive it off with your sword.", ["Alice", "Brom"],
+     [PHYSICAL_CONDITION, HP]),
+    ("You drink the health potion from your satchel and feel the pain fade.", ["Alice", "Brom"],
+     [PHYSICAL_CONDITION, HP, INVENTORY]),
+    ("By evening you reach a ruined watchtower on the edge of the forest.", ["Alice", "Brom"], [CURRENT_LOCATION]),
+    ("Inside the watchtower you find an old iron lantern and a coil of rope.", ["Alice", "Brom"], [INVENTORY]),
+    ("The wind howls through the broken stones. Somewhere far off, an owl calls into the dark.", ["Alice", "Brom"],
+     []),
+    ("A ranger named Cedric steps out of the shadows, his bow drawn. After a tense moment he lowers it and shares "
+     "his fire with you.", ["Alice", "Brom", "Cedric"], [RELATIONSHIP]),
+    ("Cedric tells you about the bandits who have been raiding the villages along the river.",
+     ["Alice", "Brom", "Cedric"], []),
+    ("You promise to help Cedric drive the bandits away, and he agrees to travel with you.",
+     ["Alice", "Brom", "Cedric"], [RELATIONSHIP]),
+    ("The stars are bright above the forest canopy, and the embers of the fire glow softly.",
+     ["Alice", "Brom", "Cedric"], []),
+    ("At dawn you and Cedric follow the river down to the bandit camp.", ["Alice", "Brom", "Cedric"],
+     [CURRENT_LOCATION]),
+    ("An arrow strikes your shoulder as you charge the camp. You grit your teeth and keep going.",
+     ["Alice", "Brom", "Cedric"], [PHYSICAL_CONDITION, HP]),
+    ("The bandits flee into the woods, leaving behind a chest full of gold. You take 30 gold coins and a silver "
+     "dagger.", ["Alice", "Brom", "Cedric"], [MONEY, INVENTORY]),
+    ("Cedric laughs and claps you on the back. \"I misjudged you, friend,\" he says.", ["Alice", "Brom", "Cedric"],
+     [RELATIONSHIP]),
+    ("The smoke from the burning tents drifts over the river as the morning mist lifts.",
+     ["Alice", "Brom", "Cedric"], []),
+    ("You give the silver dagger to Cedric as thanks for his help.", ["Alice", "Brom", "Cedric"],
+     [INVENTORY, RELATIONSHIP]),
+    ("The village elder rewards you with 50 gold for driving away the bandits.", ["Alice", "Brom", "Cedric"],
+     [MONEY]),
+    ("You spend the afternoon listening to the villagers' stories of the old war.", ["Alice", "Brom", "Cedric"], []),
+    ("The rope snaps as you climb down the well, and you crash onto the stones below.",
+     ["Alice", "Brom", "Cedric"], [PHYSICAL_CONDITION, HP, INVENTORY]),
+    ("The bottom of the well is dry. Strange symbols are carved into the walls, glowing faintly in the darkness.",
+     ["Alice", "Brom", "Cedric"], []),
+    ("You crawl through a narrow tunnel and emerge in a hidden cellar beneath the chapel.",
+     ["Alice", "Brom", "Cedric"], [CURRENT_LOCATION]),
+]
+
+# handwritten turns that weren't used to write the cue words, from other genres and with plainer phrasings. They
+# decide which attributes the gate may skip: an attribute whose changes in them it misses too often is always updated
+HELD_OUT_TURNS: List[tuple[str, List[str], List[str]]] = [
+    ("You accept the amulet from the priestess and fasten it around your neck.", ["Mira"], [INVENTORY]),
+    ("You find yourself in a dark cave, water dripping from the ceiling.", ["Mira"], [CURRENT_LOCATION]),
+    ("The guard demands a toll before letting you over the bridge, and you hand him three silver pieces.",
+     ["Mira"], [MONEY]),
+    ("The shuttle docks at Orbital Station Nine and the airlock hisses open.", [], [CURRENT_LOCATION]),
+    ("Your suit's oxygen runs low and your vision starts to blur.", [], [PHYSICAL_CONDITION]),
+    ("The vending machine swallows your last credit chip and gives you nothing.", [], [MONEY]),
+    ("Jax tosses you a plasma cutter. \"You'll need this more than me.\"", ["Jax"], [INVENTORY, RELATIONSHIP]),
+    ("The station lights dim for the night cycle while the hull creaks in the cold.", ["Jax"], []),
+    ("Jax turns away from you and refuses to speak for the rest of the shift.", ["Jax"], [RELATIONSHIP]),
+    ("A stray shard of debris slices through your sleeve and draws blood.", ["Jax"], [PHYSICAL_CONDITION, HP]),
+    ("You are now standing on the observation deck, the planet turning slowly below.", ["Jax"],
+     [CURRENT_LOCATION]),
+    ("The detective slides the envelope of cash across the table to you.", ["Detective Hale"], [MONEY]),
+    ("Rain streaks the windows of the diner as the jukebox plays an old song.", ["Detective Hale"], []),
+    ("Hale nods slowly. \"Maybe you're not as crooked as they say.\"", ["Detective Hale"], [RELATIONSHIP]),
+    ("The thug's fist connects with your jaw and you taste copper.", ["Detective Hale"], [PHYSICAL_CONDITION, HP]),
+    ("You pocket the revolver from the drawer.", ["Detective Hale"], [INVENTORY]),
+    ("The cab drops you off outside the warehouse on Pier 12.", ["Detective Hale"], [CURRENT_LOCATION]),
+    ("The radio crackles with news of another robbery uptown.", ["Detective Hale"], []),
+    ("You sit by the window and wait while the clock ticks towards midnight.", ["Detective Hale"], []),
+    ("The herbalist's tea settles your stomach and the fever breaks.", ["Oren"], [PHYSICAL_CONDITION, HP]),
+    ("Oren charges you double for the ferry crossing.", ["Oren"], [MONEY, CURRENT_LOCATION]),
+    ("Your lantern slips from your hand and sinks into the river.", ["Oren"], [INVENTORY]),
+    ("Oren grumbles about the weather and the price of salt.", ["Oren"], []),
+    ("A cold wind sweeps the moor and the heather bends low.", ["Oren"], []),
+    ("Now in the village of Thornbury, you look for an inn.", ["Oren"], [CURRENT_LOCATION]),
+    ("The smith keeps your broken blade as payment and gives you a new axe.", ["Oren"], [INVENTORY]),
+    ("Oren finally calls you by your name and offers you his hand.", ["Oren"], [RELATIONSHIP]),
+    ("The snake's venom spreads up your leg, turning it numb and grey.", ["Oren"], [PHYSICAL_CONDITION, HP]),
+    ("The tax collector takes a tenth of everything you carry.", ["Oren"], [MONEY, INVENTORY]),
+    ("The bells of the abbey ring out over the valley as the sun rises.", ["Oren"], []),
+]
@@ -1,13 +1,21 @@
+import asyncio
 import os
 import json
 import random
 import textwrap
+import threading
+from types import ModuleType
 from typing import Dict, TypeVar, List, Optional
-import pygame
 from Utilities import update_attr
+from Utilities import save_manifest
+from Utilities.session import Session, get_default_session
 
 V = TypeVar("V")
-count = 1
+
+_mixer: ModuleType | None = None
+_mixer_lock = threading.Lock()
+# incremented when the music is stopped, so music that is still loading doesn't start afterwards
+_music_generation: int = 0
 
 
 def get_character_details(char_info) -> Dict[str, V]:
@@ -71,7 +79,8 @@ def get_world_details(world_info) -> Dict[str, V]:
     return world_details
 
 
-def get_prompt(genre: str, character_name: str, character_charisma: int, is_starting_prompt: bool, **details) -> str:
+def get_prompt(genre: str, character_name: str, character_charisma: int, is_starting_prompt: bool,
+               session: Session | None = None, **details) -> str:
     """Fetches the starting or continuation prompt.
 
     This function generates either the starting prompt or a continuation prompt for an interactive story
@@ -85,6 +94,8 @@ def get_prompt(genre: str, character_name: str, character_charisma: int, is_star
                                The charisma is used to determine how often they meet new NPCs.
     :param is_starting_prompt: A boolean flag indicating whether to return the starting prompt (True) or
                                a continuation of the story (False).
+    :param session: The session of the game, which keeps track of when a new character should be introduced.
+                    Defaults to the default session.
     :param details: Additional keyword arguments:
         - json_dict_str (List[str]): A list containing the character, world, and timeline JSON strings.
         - user_input (str): The input from the user that drives the continuation of the story.
@@ -97,8 +108,9 @@ def get_prompt(genre: str, character_name: str, character_charisma: int, is_star
     :return: The generated prompt for the story, formatted according to the provided inputs.
     """
 
-    global count
-    # count is used to determine when a character should be introduced.
+    if session is None:
+        session = get_default_session()
+    # the session's new_char_count is used to determine when a character should be introduced.
     if is_starting_prompt:
         json_dict_str: List[str] = details['json_dict_str']
         characters: str = json_dict_str[0]
@@ -158,18 +170,18 @@ def get_prompt(genre: str, character_name: str, character_charisma: int, is_star
             pass
 
         new_char_check: bool = details['new_char']
-        if count == 1 and new_char_check:
+        if session.new_char_count == 1 and new_char_check:
             prompt += textwrap.dedent(f"""
             Gradually introduce a new character to the story to interact with the Main Character. 
             Make the new character introduce themself with a name or alias.
 
             """)
             # after a new character is introduced, the count is reset
-            count = 21 - character_charisma
+            session.new_char_count = 21 - character_charisma
 
         if new_char_check:
             # count is decremented after every continuation prompt
-            count -= 1
+            session.new_char_count -= 1
 
         prompt += textwrap.dedent(f"""
         Below are the updated Character JSON dictionaries
@@ -299,7 +311,8 @@ def split_function(update: str) -> tuple[List[str], str]:
 
 
 async def requery_updates_relationship(story: str, char_dicts: str, update: str, char_id: str, other_char_id: str,
-                                       id_list: List[int], name_list: List[str]) -> tuple[int, int, bool]:
+                                       id_list: List[int], name_list: List[str],
+                                       session: Session | None = None) -> tuple[int, int, bool]:
     """Fixes the format of the relationship update line by matching character names to their corresponding IDs,
     or requerying until the format is corrected.
 
@@ -314,6 +327,7 @@ async def requery_updates_relationship(story: str, char_dicts: str, update: str,
     :param other_char_id: The ID or name of the other character involved in the relationship.
     :param id_list: A list containing the IDs of all characters.
     :param name_list: A list containing the names of all characters.
+    :param session: The session of the game, which may provide its own client.
     :return: A tuple containing the fixed `char_id` and `other_char_id` as integers and the update_succeed as a boolean.
              - update_succeed is a boolean flag that is True if the update went through successfully and False otherwise.
 
@@ -334,8 +348,8 @@ async def requery_updates_relationship(story: str, char_dicts: str, update: str,
         if char_id in id_list and other_char_id in id_list:
             break
         else:  # requery if format is incorrect
-            separate_list: List[str] = (await update_attr.requery("relationship", story, char_dicts, update)).split(
-                "=")
+            separate_list: List[str] = (await update_attr.requery("relationship", story, char_dicts, update,
+                                                                  session)).split("=")
             char_id: str = fix_format(separate_list[0].strip())
             other_char_id: str = ((separate_list[1].strip()).split(","))[0]
             other_char_id: str = fix_format(other_char_id)
@@ -353,8 +367,8 @@ async def requery_updates_relationship(story: str, char_dicts: str, update: str,
     return char_id, other_char_id, update_succeed
 
 
-async def get_updates(attribute: str, story: str, char_dicts: str, id_list: List[int], name_list: List[str]) -> \
-        List[V]:
+async def get_updates(attribute: str, story: str, char_dicts: str, id_list: List[int], name_list: List[str],
+                      session: Session | None = None) -> List[V]:
     """Retrieves updates for a given attribute based on the most recent story events.
 
     This function sends a request to ChatGPT to retrieve updates for a specific attribute (such as 'physical_condition',
@@ -367,6 +381,7 @@ async def get_updates(attribute: str, story: str, char_dicts: str, id_list: List
     :param char_dicts: A JSON-like string representation, containing each character's ID, name and the provided attribute.
     :param id_list: A list containing the IDs of all characters.
     :param name_list: A list containing the names of all characters.
+    :param session: The session of the game. Defaults to the default session.
     :return: A list of updates for the affected characters. The format of the list depends on the attribute:
              - For 'physical_condition' and 'current_location', the return is List[Tuple[int, str]] where each tuple
                contains (char_id: int, new_value: str).
@@ -378,17 +393,17 @@ async def get_updates(attribute: str, story: str, char_dicts: str, id_list: List
     pending_updates: List[V] = []
     # call the function responsible for sending the update attribute prompt to ChatGPT
     if attribute == "physical_condition":
-        update_check: str = await update_attr.get_physical_condition_update(story, char_dicts)
+        update_check: str = await update_attr.get_physical_condition_update(story, char_dicts, session)
     elif attribute == "money":
-        update_check = await update_attr.get_money_update(story, char_dicts)
+        update_check = await update_attr.get_money_update(story, char_dicts, session)
     elif attribute == "relationship":
-        update_check = await update_attr.get_relationship_update(story, char_dicts)
+        update_check = await update_attr.get_relationship_update(story, char_dicts, session)
     elif attribute == "inventory":
-        update_check = await update_attr.get_inventory_update(story, char_dicts)
+        update_check = await update_attr.get_inventory_update(story, char_dicts, session)
     elif attribute == "hp":
-        update_check = await update_attr.get_hp_update(story, char_dicts)
+        update_check = await update_attr.get_hp_update(story, char_dicts, session)
     else:  # current_location
-        update_check = await update_attr.get_current_location_update(story, char_dicts)
+        update_check = await update_attr.get_current_location_update(story, char_dicts, session)
     update_check = fix_format(update_check)
 
     # if update_check is False, that means there's no updates to be done
@@ -419,7 +434,7 @@ async def get_updates(attribute: str, story: str, char_dicts: str, id_list: List
                 char_id, other_char_id, update_succeed = await requery_updates_relationship(story, char_dicts, update,
                                                                                             char_id,
                                                                                             other_char_id, id_list,
-                                                                                            name_list)
+                                                                                            name_list, session)
                 if update_succeed:
                     new_value: str = ((separate_list[1].strip()).split(","))[1]
                     new_value = fix_format(new_value)
@@ -435,20 +450,21 @@ async def get_updates(attribute: str, story: str, char_dicts: str, id_list: List
                         # requery if format is incorrect
                         if attribute == "physical_condition":
                             separate_list = (
-                                await update_attr.requery("physical_condition", story, char_dicts, update)).split(
-                                "=")
+                                await update_attr.requery("physical_condition", story, char_dicts, update,
+                                                          session)).split("=")
                         elif attribute == "money":
-                            new_update: str = await update_attr.requery("money", story, char_dicts, update)
+                            new_update: str = await update_attr.requery("money", story, char_dicts, update, session)
                             separate_list, symbol = split_function(new_update)
                         elif attribute == "inventory":
-                            new_update = await update_attr.requery("inventory", story, char_dicts, update)
+                            new_update = await update_attr.requery("inventory", story, char_dicts, update, session)
                             separate_list, symbol = split_function(new_update)
                         elif attribute == "hp":
-                            new_update = await update_attr.requery("hp", story, char_dicts, update)
+                            new_update = await update_attr.requery("hp", story, char_dicts, update, session)
                             separate_list, symbol = split_function(new_update)
                         else:  # current_location
                             separate_list = (
-                                await update_attr.requery("current_location", story, char_dicts, update)).split("=")
+                                await update_attr.requery("current_location", story, char_dicts, update,
+                                                          session)).split("=")
 
                         char_id = fix_format(separate_list[0].strip())
                         try:
@@ -545,21 +561,53 @@ async def list_saved_games() -> list[str]:
     directory = "saved_games"
     if not os.path.exists(directory):
         os.makedirs(directory)
-    return os.listdir(directory)
+    return [file for file in os.listdir(directory) if file != save_manifest.MANIFEST_FILE]
+
+
+async def list_saved_game_summaries() -> list[dict[str, V]]:
+    """Returns a summary of each saved game using the saved games manifest, without opening the save files.
+    Saves that aren't in the manifest only contain their file name.
+
+    :return: A list of manifest entries, most recently played first.
+    """
+    return save_manifest.list_entries(await list_saved_games())
+
+
+def get_mixer() -> ModuleType:
+    """Fetches the pygame mixer, importing pygame and initialising the mixer on first use, so the title screen
+    doesn't wait for the audio system.
+
+    :return: The pygame.mixer module.
+    """
+    global _mixer
+    with _mixer_lock:
+        if _mixer is None:
+            import pygame
+            pygame.mixer.init()
+            _mixer = pygame.mixer
+        return _mixer
 
 
 async def play_background_music() -> None:
-    """Plays background music in the title screen."""
+    """Plays background music in the title screen. The mixer is initialised in a thread, so the title screen
+    stays responsive while the audio system starts."""
+    generation: int = _music_generation
     num = random.randint(1, 100)
     if num == 100:
         sound = 'assets/Sounds/title_bg.mp3'
     else:
         sound = 'assets/Sounds/title_bg.WAV'
-    pygame.mixer.music.load(sound)
-    pygame.mixer.music.set_volume(0.5)
-    pygame.mixer.music.play(-1)  # -1 means the music will loop indefinitely
+    mixer: ModuleType = await asyncio.to_thread(get_mixer)
+    if generation != _music_generation:
+        return
+    mixer.music.load(sound)
+    mixer.music.set_volume(0.5)
+    mixer.music.play(-1)  # -1 means the music will loop indefinitely
 
 
 async def stop_background_music() -> None:
     """Stops the background music"""
-    pygame.mixer.music.stop()
+    global _music_generation
+    _music_generation += 1
+    if _mixer is not None:
+        _mixer.music.stop()
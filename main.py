@@ -5,13 +5,20 @@ import threading
 from typing import Dict, List, TypeVar
 import random
 import flet as ft
-import pygame
 from screeninfo import get_monitors
-from Engine import engine
 from Utilities import utils, openai_api, update_attr
-from Frontend import front_end_helpers, character_screen, world_screen
+from Utilities.session import Session
+from Engine import turn_pipeline
+from Frontend import front_end_helpers, character_screen, world_screen, image_jobs, sound_bank
+from Frontend.dice_roll import OverlayDice
+from Frontend.pixel_art import DEFAULT_VARIANT_SIZES, get_variant_size
+from Frontend.sprite_atlas import SpriteAtlas
+from Frontend.typewriter import Typewriter
+from Frontend.conversation_view import ConversationWindow
+from Frontend.update_scheduler import UpdateScheduler
+from Frontend.portrait_prefetch import PortraitPrefetcher, get_npc_prompt, get_item_prompt
 from Frontend.front_end_helpers import generate_image, process__value, create_text_field, create_error_message, \
-    create_stats_text, format_inventory, get_title_image_height, get_title_image_top, get_button_width
+    create_stats_text, format_inventory, get_title_image_height, get_title_image_top, get_button_width, create_sprite
 
 V = TypeVar("V")
 
@@ -23,10 +30,17 @@ class GameApp:
         
         :return: None
         """
-        self.main_engine = engine.Engine()
+        self.session = Session()
+        self.main_engine = self.session.engine
+        self.portrait_prefetcher: PortraitPrefetcher | None = None
+        # the portraits shown in the Characters and Inventory popups, packed into one image per popup
+        self.npc_atlas = SpriteAtlas("npc", 100)
+        self.item_atlas = SpriteAtlas("item", 64)
+        self.typewriter = Typewriter()
+        self.ui_updates: UpdateScheduler | None = None
+        self.sounds = sound_bank.get_default_bank()
         self.story_msgs = []
         self.page = None
-        self.reset_count = 0
         self.event_count = random.randint(1, 10)
         self.recent_stories: List[str] = []
         self.deceased_character_line: str = ""
@@ -48,8 +62,21 @@ class GameApp:
         self.world_rules_value = ""
         self.environment_value = ""
 
-        pygame.mixer.init()
-        self.button_click_sound = pygame.mixer.Sound('assets/Sounds/button_click.mp3')
+    def warm_up(self) -> None:
+        """Decodes the sound effects, creates the OpenAI clients and the image job queue in the background once the
+        title screen is shown, so they are ready by the time the player needs them.
+
+        :return: None
+        """
+        try:
+            self.sounds.load()
+            openai_api.get_default_client()
+            update_attr.get_default_client()
+            queue = image_jobs.get_default_queue()
+            if queue.available:
+                self.portrait_prefetcher = PortraitPrefetcher(queue, self.session)
+        except Exception as error:
+            print(f"Error warming up: {error!r}")
 
     async def main(self, page: ft.Page):
         """Initialises and configures the main application window.
@@ -60,6 +87,9 @@ class GameApp:
         """
         self.page = page
         self.page.title = "OnlyFantasies"
+        # merges the page updates requested within a frame
+        self.ui_updates = UpdateScheduler(page.update, asyncio.get_running_loop())
+        self.session.dice = OverlayDice(page)
         self.page.theme_mode = "dark"
 
         # Get the native screen width and height
@@ -76,6 +106,7 @@ class GameApp:
         self.page.window.maximized = True
 
         await self.show_title_screen()
+        threading.Thread(target=self.warm_up, daemon=True).start()
 
     async def on_text_change(self, e):
         """Handles text input validation and updates for all text fields in real-time.
@@ -102,10 +133,10 @@ class GameApp:
                     else:
                         e.control.value = self.name_value
                         self.name_error_message.value = "Only letters are allowed."
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = ' '.join(self.name_value.split()) + " "
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.physical_condition_field:  # Physical Condition
             try:
@@ -126,11 +157,11 @@ class GameApp:
                     else:
                         e.control.value = self.physical_condition_value
                         self.physical_condition_error_message.value = "Only letters are allowed."
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = self.physical_condition_value
                 self.physical_condition_error_message.value = "Invalid input."
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.occupation_field:  # Occupation
             try:
@@ -149,10 +180,10 @@ class GameApp:
                     else:
                         e.control.value = self.occupation_value
                         self.occupation_error_message.value = "Only letters are allowed."
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = ' '.join(self.occupation_value.split()) + " "
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.appearance_field:  # Appearance
             try:
@@ -175,10 +206,10 @@ class GameApp:
                     else:
                         e.control.value = self.appearance_value
                         self.appearance_error_message.value = "Only letters and commas are allowed."
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = self.appearance_value
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.inventory_field:  # Inventory
             try:
@@ -201,10 +232,10 @@ class GameApp:
                     else:
                         e.control.value = self.inventory_value
                         self.inventory_error_message.value = "Only letters and commas are allowed."
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = self.inventory_value
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.personality_field:  # Personality
             try:
@@ -227,10 +258,10 @@ class GameApp:
                     else:
                         e.control.value = self.personality_value
                         self.personality_error_message.value = "Only letters and commas are allowed."
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = self.personality_value
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.money_field:  # Money
             try:
@@ -256,11 +287,11 @@ class GameApp:
                     else:
                         self.money_value = e.control.value  # Set the valid numerical value
                         self.money_error_message.value = ""  # Clear error when valid
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = self.money_value  # Reset to previous value if invalid
                 self.money_error_message.value = "Enter a number."  # Show type error
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.hp_field:  # Hp
             try:
@@ -285,11 +316,11 @@ class GameApp:
                     else:
                         self.hp_value = e.control.value
                         self.hp_error_message.value = ""
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = self.hp_value
                 self.hp_error_message.value = "Enter a number."
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.luck_field:  # Luck
             try:
@@ -311,11 +342,11 @@ class GameApp:
                     else:
                         self.luck_value = e.control.value
                         self.luck_error_message.value = ""
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = self.luck_value
                 self.luck_error_message.value = "Enter a number."
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.cha_field:  # Cha (Charisma)
             try:
@@ -338,11 +369,11 @@ class GameApp:
                     else:
                         self.cha_value = e.control.value
                         self.cha_error_message.value = ""
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = self.cha_value
                 self.cha_error_message.value = "Enter a number."
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.genre_field:  # Genre
             try:
@@ -361,15 +392,15 @@ class GameApp:
                     else:
                         e.control.value = self.genre_value
                         self.genre_error_message.value = "Only letters are allowed."
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = ' '.join(self.genre_value.split()) + " "
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.world_rules_field:  # World Rules
             if self.rules_dropdown.value == "Default":
                 self.world_rules_error_message.value = ""
-                self.page.update()
+                self.ui_updates.request()
                 return
             try:
                 world_rules_value = e.control.value
@@ -391,15 +422,15 @@ class GameApp:
                     else:
                         e.control.value = self.world_rules_value
                         self.world_rules_error_message.value = "Only letters and commas are allowed."
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = self.world_rules_value
-                self.page.update()
+                self.ui_updates.request()
 
         elif e.control == self.environment_field:  # Environment
             if self.environment_dropdown.value == "Default":
                 self.environment_error_message.value = ""
-                self.page.update()
+                self.ui_updates.request()
                 return
             try:
                 environment_value = e.control.value
@@ -421,10 +452,10 @@ class GameApp:
                     else:
                         e.control.value = self.environment_value
                         self.environment_error_message.value = "Only letters and commas are allowed."
-                self.page.update()
+                self.ui_updates.request()
             except ValueError:
                 e.control.value = self.environment_value
-                self.page.update()
+                self.ui_updates.request()
 
     async def show_title_screen(self):
         """Displays the game's title screen with start and load options.
@@ -434,7 +465,6 @@ class GameApp:
         """
         self.page.controls.clear()
         monitor = get_monitors()[0]
-        await utils.play_background_music()
         background = ft.Image(
             src="Images/background.png",
             width=monitor.width,
@@ -488,6 +518,8 @@ class GameApp:
 
         self.page.add(stack)
         self.page.update()
+        # the music starts once the audio system is ready, the title screen is usable before then
+        await utils.play_background_music()
 
     async def create_button(self, text, left, top, width, height):
         """Creates a styled button with specified text and position.
@@ -534,7 +566,7 @@ class GameApp:
         :param e: The click event containing button information
         :return: None
         """
-        self.button_click_sound.play()
+        self.sounds.play("button_click")
         if e.control.content.controls[1].content.value == "LOAD":
             await self.show_load_popup()
         elif e.control.content.controls[1].content.value == "START":
@@ -545,17 +577,22 @@ class GameApp:
 
     async def show_load_popup(self):
         """Displays a popup dialog for loading saved games.
-        Lists available save files and handles selection.
+        Lists available save files using the saved games manifest and handles selection.
         
         :return: None
         """
-        files = await utils.list_saved_games()
+        saves = await utils.list_saved_game_summaries()
         file_list = ft.ListView(
             controls=[
                 ft.ListTile(
-                    title=ft.Text(file, size=18, color=ft.colors.WHITE),
-                    on_click=self.create_load_game_handler(file)
-                ) for file in files
+                    title=ft.Text(f"{save['name']} ({save['genre']})" if "name" in save else save["file"],
+                                  size=18, color=ft.colors.WHITE),
+                    subtitle=ft.Text(
+                        f"HP: {save['hp']} | Turns: {save['turn_count']} | {save['last_played'].replace('T', ' ')}\n"
+                        f"{save['recap']}",
+                        size=12, color=ft.colors.WHITE70) if "name" in save else None,
+                    on_click=self.create_load_game_handler(save["file"])
+                ) for save in saves
             ],
             expand=True,
             # auto_scroll=True
@@ -617,9 +654,9 @@ class GameApp:
 
         self.main_engine.load_save(file)  # Load the game state
 
-        openai_api.begin_story()
-        openai_api.begin_char_creation(self.main_engine.mainCharacter.name)
-        update_attr.begin_update_attr()
+        openai_api.begin_story(self.session)
+        openai_api.begin_char_creation(self.main_engine.mainCharacter.name, self.session)
+        update_attr.begin_update_attr(self.session)
 
         done_event.set()  # Signal that loading is complete
         await utils.stop_background_music()
@@ -849,7 +886,7 @@ class GameApp:
         print("Luck:", self.luck_field.value)
         print("Cha:", self.cha_field.value)
         print("---")
-        self.button_click_sound.play()
+        self.sounds.play("button_click")
 
         await self.show_world_creation()
 
@@ -873,7 +910,7 @@ class GameApp:
             :param e: The dropdown change event containing the selected value
             :return: None
             """
-            self.button_click_sound.play()
+            self.sounds.play("button_click")
             if self.rules_dropdown.value == "Default":
                 self.world_rules_field.bgcolor = "#3C4A87"  # Changes colour when default
                 self.world_rules_field.disabled = True
@@ -896,7 +933,7 @@ class GameApp:
             :param e: The dropdown change event containing the selected value
             :return: None
             """
-            self.button_click_sound.play()
+            self.sounds.play("button_click")
             if self.environment_dropdown.value == "Default":
                 self.environment_field.bgcolor = "#3C4A87"  # Changes colour when default
                 self.environment_field.disabled = True
@@ -986,7 +1023,7 @@ class GameApp:
         self.page.dialog.open = False  # Exits out of Confirmation popup
         self.page.update()
 
-        self.button_click_sound.play()
+        self.sounds.play("button_click")
 
         def generate_image_thread(prompt, character, done_event):
             """Creates a separate thread for character image generation.
@@ -1059,83 +1096,26 @@ class GameApp:
         if self.main_engine.world.environment == "":
             self.main_engine.update_world_environment(self.genre_value)
 
-        openai_api.begin_story()
-        openai_api.begin_char_creation(self.main_engine.mainCharacter.name)
-        update_attr.begin_update_attr()
+        openai_api.begin_story(self.session)
+        openai_api.begin_char_creation(self.main_engine.mainCharacter.name, self.session)
+        update_attr.begin_update_attr(self.session)
 
         genre: str = self.main_engine.world.genre
 
         current_char_str: list[str] = self.main_engine.get_formatted_string_array()
         continuation_prompt: str = utils.get_prompt(genre, self.main_engine.mainCharacter.name,
                                                     self.main_engine.mainCharacter.cha,
-                                                    True, json_dict_str=current_char_str)
-        self.start_message: str = openai_api.get_story(continuation_prompt)
+                                                    True, json_dict_str=current_char_str, session=self.session)
+        self.start_message: str = openai_api.get_story(continuation_prompt, self.session)
 
         # updates
         self.recent_stories.append(self.start_message)
-        current_char_id_list: List[int] = [char.id for char in self.main_engine.characters]
-        current_char_id_list.insert(0, self.main_engine.mainCharacter.id)
-        current_char_name_list: list[str] = [char.name for char in self.main_engine.characters]
-        current_char_name_list.insert(0, self.main_engine.mainCharacter.name)
 
         # checks if the characters have enough money
-        money_char_dicts: str = self.main_engine.prepare_char_dictionaries("money")
-        current_char_money_list: List[float] = [char.money for char in self.main_engine.characters]
-        current_char_money_list.insert(0, self.main_engine.mainCharacter.money)
-        money_updates: List[tuple[int, str, str]] = await utils.get_updates("money", self.start_message,
-                                                                            money_char_dicts,
-                                                                            current_char_id_list,
-                                                                            current_char_name_list)
-        check_valid_transaction: tuple[bool, List[tuple[int, str]]] = utils.check_money(money_updates,
-                                                                                        current_char_id_list,
-                                                                                        current_char_name_list,
-                                                                                        current_char_money_list)
-
-        while not check_valid_transaction[0]:
-            money_message: str = utils.get_money_message(check_valid_transaction[1])
-
-            # send a prompt to ChatGPT to ask it to regenerate the story
-            self.start_message = openai_api.get_story(money_message)
-
-            self.recent_stories.pop()
-            self.recent_stories.append(self.start_message)
-
-            money_updates = await utils.get_updates("money", self.start_message, money_char_dicts,
-                                                    current_char_id_list, current_char_name_list)
-            check_valid_transaction = utils.check_money(money_updates, current_char_id_list,
-                                                        current_char_name_list, current_char_money_list)
-
-        physical_condition_char_dicts: str = self.main_engine.prepare_char_dictionaries(
-            "physical_condition")
-        relationship_char_dicts: str = self.main_engine.prepare_char_dictionaries("relationship")
-        inventory_char_dicts: str = self.main_engine.prepare_char_dictionaries("inventory")
-        hp_char_dicts: str = self.main_engine.prepare_char_dictionaries("hp")
-        current_location_char_dicts: str = self.main_engine.prepare_char_dictionaries("current_location")
-
-        await asyncio.gather(
-            self.main_engine.update_char_physical_condition(
-                await utils.get_updates("physical_condition", self.start_message, physical_condition_char_dicts,
-                                        current_char_id_list, current_char_name_list)),
-            self.main_engine.update_char_money(money_updates),
-            self.main_engine.update_char_relationship(
-                await utils.get_updates("relationship", self.start_message, relationship_char_dicts,
-                                        current_char_id_list, current_char_name_list)),
-            self.main_engine.update_char_inventory(
-                await utils.get_updates("inventory", self.start_message, inventory_char_dicts, current_char_id_list,
-                                        current_char_name_list)),
-            self.main_engine.update_char_hp(
-                await utils.get_updates("hp", self.start_message, hp_char_dicts, current_char_id_list,
-                                        current_char_name_list)),
-            self.main_engine.update_char_current_location(self.start_message,
-                                                          await utils.get_updates("current_location",
-                                                                                  self.start_message,
-                                                                                  current_location_char_dicts,
-                                                                                  current_char_id_list,
-                                                                                  current_char_name_list)),
-            self.main_engine.update_key_events(self.start_message)
-        )
-        self.reset_count += 1
-        update_attr.reset_chat(self.reset_count)
+        self.start_message, money_updates = await turn_pipeline.validate_money(self.main_engine, self.start_message,
+                                                                               self.recent_stories, self.session)
+        await turn_pipeline.apply_story_updates(self.main_engine, self.start_message, self.start_message,
+                                                money_updates, self.session)
 
         self.main_engine.save_game()
 
@@ -1148,7 +1128,7 @@ class GameApp:
         :param e: The click event
         :return: None
         """
-        self.button_click_sound.play()
+        self.sounds.play("button_click")
         self.genre_field.value = self.genre_field.value.strip()
 
         # Converting to list
@@ -1291,30 +1271,71 @@ class GameApp:
         self.page.window.full_screen = False
         self.page.window.maximized = True
 
-        conversation = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True, auto_scroll=True)
-        typing_sound = pygame.mixer.Sound('assets/Sounds/typing_sound.mp3')
-        typing_sound.set_volume(0.5)
-        effect_sound = pygame.mixer.Sound('assets/Sounds/effect_triggered.mp3')
+        def create_message(sender, message):
+            """Creates the container showing a message in the conversation, styled by its sender.
+
+            :param sender: The sender of the message ("User", "Event", or "AI")
+            :param message: The content of the message to display
+            :return: ft.Container: The message container
+            """
+            return ft.Container(
+                content=create_stats_text(value=message, size=20),
+                width=monitor.width * 0.75,
+                padding=10,
+                bgcolor="#283460" if sender == "User" else ("#562135" if sender == "Event" else ft.colors.BLACK),
+                border=ft.border.all(3, "#EE8067" if sender == "User" else (
+                    "#ffb7c5" if sender == "Event" else ft.colors.TRANSPARENT)),
+                border_radius=5,
+                margin=ft.margin.only(bottom=10),
+                on_click=lambda e: self.typewriter.skip()
+            )
+
+        # only a window of the messages has controls, older ones are rendered again when scrolled back to
+        messages = ConversationWindow(create_message)
+
+        def on_conversation_scroll(e: ft.OnScrollEvent):
+            """Renders the messages before or after the window when the conversation is scrolled to either end.
+
+            :param e: The scroll event of the conversation
+            :return: None
+            """
+            # the message being typed must stay on the page
+            if self.typewriter.is_typing:
+                return
+            if e.pixels <= e.min_scroll_extent + 50 and messages.has_older:
+                conversation.auto_scroll = False
+                messages.page_older()
+                conversation.update()
+            elif e.pixels >= e.max_scroll_extent - 50 and messages.has_newer:
+                messages.page_newer()
+                conversation.auto_scroll = not messages.has_newer
+                conversation.update()
+
+        conversation = ft.Column(controls=messages.controls, scroll=ft.ScrollMode.AUTO, expand=True,
+                                 auto_scroll=True, on_scroll=on_conversation_scroll, on_scroll_interval=100)
         self.hp_sound = False
 
-        async def type_effect(text, display_field, speed=0.02):
+        async def type_effect(text, display_field):
             """Creates a typewriter effect for text display with sound.
-            Displays text character by character with a typing sound effect
-            and automatic scrolling.
+            Displays the text a few characters per frame with a typing sound effect
+            and automatic scrolling. Clicking the message or sending input shows the rest at once.
             
             :param text: The text to display with the typing effect
             :param display_field: The text field to display the characters in
-            :param speed: The delay between each character (default: 0.02 seconds)
-            :return: None
+            :return: int: The number of times the text field was updated
             """
-            display_field.value = ""
-            typing_sound.play(loops=-1)
-            for char in text:
-                display_field.value += char
+
+            def render(value):
+                display_field.value = value
                 display_field.scroll_to_end = True  # Enable autoscroll
                 display_field.update()
-                await asyncio.sleep(speed)
-            typing_sound.stop()
+
+            display_field.value = ""
+            self.sounds.play("typing", loops=-1)
+            try:
+                return await self.typewriter.type(text, render)
+            finally:
+                self.sounds.stop("typing")
 
         async def add_message(sender, message):
             """Adds a new message to the conversation with appropriate styling.
@@ -1325,17 +1346,10 @@ class GameApp:
             :param message: The content of the message to display
             :return: None
             """
-            message_container = ft.Container(
-                content=create_stats_text(value="", size=20),
-                width=monitor.width * 0.75,
-                padding=10,
-                bgcolor="#283460" if sender == "User" else ("#562135" if sender == "Event" else ft.colors.BLACK),
-                border=ft.border.all(3, "#EE8067" if sender == "User" else (
-                    "#ffb7c5" if sender == "Event" else ft.colors.TRANSPARENT)),
-                border_radius=5,
-                margin=ft.margin.only(bottom=10)
-            )
-            conversation.controls.append(message_container)
+            message_container = messages.append(sender, message)
+            # the message is typed out, it is only shown in full when rendered again after scrolling back to it
+            message_container.content.value = ""
+            conversation.auto_scroll = True
             self.page.update()
 
             await type_effect(message, message_container.content)
@@ -1361,6 +1375,8 @@ class GameApp:
             :return: None
             :raises: ValueError: If story generation fails
             """
+            # Finish the message being typed, so the user's message isn't shown next to a half typed one
+            self.typewriter.skip()
             if input_box.value:
                 user_message = input_box.value
                 input_box.value = ""
@@ -1413,13 +1429,13 @@ class GameApp:
 
                     if self.event_count == 1:
                         # random events
-                        effect_sound.play()
+                        self.sounds.play("effect")
+                        dice_total: int = sum(await self.session.dice.roll_async())
                         event: list[str | int | tuple[str, str]] = self.main_engine.random_event(
-                            self.main_engine.mainCharacter.luck)
+                            self.main_engine.mainCharacter.luck, dice_total)
                         name_event_string: str = utils.replace_id_with_name(event[0], current_char_id_list,
                                                                             current_char_name_list)
-                        self.page.window.focused = True
-                        conversation.controls.pop()
+                        messages.pop()
                         await add_message("Event", f"A random event has occurred! {name_event_string}")
                         await add_message("AI", "Response generating please wait...")
                         random_event = event[0]
@@ -1437,97 +1453,29 @@ class GameApp:
                         char_str=current_char_str,
                         new_char=new_char_check,
                         random_event=random_event,
-                        char_deceased=char_deceased
+                        char_deceased=char_deceased,
+                        session=self.session
                     )
                     print(continuation_prompt)
-                    continuation_story: str = openai_api.get_story(continuation_prompt)
+                    continuation_story: str = openai_api.get_story(continuation_prompt, self.session)
                     if len(self.recent_stories) < 3:
                         self.recent_stories.append(continuation_story)
                     else:
                         self.recent_stories.pop(0)
                         self.recent_stories.append(continuation_story)
-                    full_story: str = "\n".join(self.recent_stories)
 
                     # checks if the characters have enough money
-                    money_char_dicts: str = self.main_engine.prepare_char_dictionaries("money")
-                    current_char_money_list: List[float] = [char.money for char in self.main_engine.characters]
-                    current_char_money_list.insert(0, self.main_engine.mainCharacter.money)
-                    money_updates: List[tuple[int, str, str]] = await utils.get_updates("money", continuation_story,
-                                                                                        money_char_dicts,
-                                                                                        current_char_id_list,
-                                                                                        current_char_name_list)
-                    check_valid_transaction: tuple[bool, List[tuple[int, str]]] = utils.check_money(money_updates,
-                                                                                                    current_char_id_list,
-                                                                                                    current_char_name_list,
-                                                                                                    current_char_money_list)
-
-                    while not check_valid_transaction[0]:
-                        money_message: str = utils.get_money_message(check_valid_transaction[1])
-
-                        # send a prompt to ChatGPT to ask it to regenerate the story
-                        continuation_story = openai_api.get_story(money_message)
-
-                        self.recent_stories.pop()
-                        self.recent_stories.append(continuation_story)
-                        full_story = "\n".join(self.recent_stories)
-
-                        money_updates = await utils.get_updates("money", continuation_story, money_char_dicts,
-                                                                current_char_id_list, current_char_name_list)
-                        check_valid_transaction = utils.check_money(money_updates, current_char_id_list,
-                                                                    current_char_name_list, current_char_money_list)
-                    conversation.controls.pop()
+                    continuation_story, money_updates = await turn_pipeline.validate_money(
+                        self.main_engine, continuation_story, self.recent_stories, self.session)
+                    full_story: str = "\n".join(self.recent_stories)
+                    messages.pop()
                     self.page.update()
                     await add_message("AI", continuation_story)
                     self.story_msgs.append(continuation_story)
 
-                    current_char_name_list.pop(0)  # remove the main character's name
-                    npc_bool, new_char_list = openai_api.npc_creation_check(continuation_story, current_char_name_list)
-
-                    if npc_bool:
-                        new_char_id: int = self.main_engine.get_char_id()
-                        print(new_char_id)
-                        char_str: str = openai_api.create_npc(new_char_list, continuation_story, genre, new_char_id)
-                        char_dicts = utils.convert_to_json(char_str)
-                        for char in char_dicts:
-                            self.main_engine.add_character(char)
-
-                    current_char_id_list = [char.id for char in self.main_engine.characters]
-                    current_char_id_list.insert(0, self.main_engine.mainCharacter.id)
-                    current_char_name_list = [char.name for char in self.main_engine.characters]
-                    current_char_name_list.insert(0, self.main_engine.mainCharacter.name)
-
-                    physical_condition_char_dicts: str = self.main_engine.prepare_char_dictionaries(
-                        "physical_condition")
-                    relationship_char_dicts: str = self.main_engine.prepare_char_dictionaries("relationship")
-                    inventory_char_dicts: str = self.main_engine.prepare_char_dictionaries("inventory")
-                    hp_char_dicts: str = self.main_engine.prepare_char_dictionaries("hp")
-                    current_location_char_dicts: str = self.main_engine.prepare_char_dictionaries("current_location")
-
-                    await asyncio.gather(
-                        self.main_engine.update_char_physical_condition(
-                            await utils.get_updates("physical_condition", full_story, physical_condition_char_dicts,
-                                                    current_char_id_list, current_char_name_list)),
-                        self.main_engine.update_char_money(money_updates),
-                        self.main_engine.update_char_relationship(
-                            await utils.get_updates("relationship", full_story, relationship_char_dicts,
-                                                    current_char_id_list, current_char_name_list)),
-                        self.main_engine.update_char_inventory(
-                            await utils.get_updates("inventory", continuation_story, inventory_char_dicts,
-                                                    current_char_id_list,
-                                                    current_char_name_list)),
-                        self.main_engine.update_char_hp(
-                            await utils.get_updates("hp", full_story, hp_char_dicts, current_char_id_list,
-                                                    current_char_name_list)),
-                        self.main_engine.update_char_current_location(full_story,
-                                                                      await utils.get_updates("current_location",
-                                                                                              full_story,
-                                                                                              current_location_char_dicts,
-                                                                                              current_char_id_list,
-                                                                                              current_char_name_list)),
-                        self.main_engine.update_key_events(continuation_story)
-                    )
-                    self.reset_count += 1
-                    update_attr.reset_chat(self.reset_count)
+                    await turn_pipeline.create_npcs(self.main_engine, continuation_story, genre, self.session)
+                    await turn_pipeline.apply_story_updates(self.main_engine, continuation_story, full_story,
+                                                            money_updates, self.session)
 
                     if self.event_count == 1:
                         # make sure the random event don't double update
@@ -1538,7 +1486,7 @@ class GameApp:
                     self.hp_stats.value = self.main_engine.mainCharacter.hp
                     if int(self.hp_stats.value) < 10:
                         if not self.hp_sound:
-                            pygame.mixer.Sound('assets/Sounds/Please_heal.mp3').play()
+                            self.sounds.play("heal")
                             self.hp_sound = True
                             await self.show_low_hp_popup()
                     else:
@@ -1547,6 +1495,8 @@ class GameApp:
                     self.cha_stats.value = self.main_engine.mainCharacter.cha
                     self.money_stats.value = self.main_engine.mainCharacter.money
                     self.physical_condition_stats.value = self.main_engine.mainCharacter.physical_condition
+                    self.ui_updates.request(self.hp_stats, self.luck_stats, self.cha_stats, self.money_stats,
+                                            self.physical_condition_stats)
 
                     # save game
                     self.main_engine.save_game()
@@ -1557,24 +1507,34 @@ class GameApp:
                         story_cont = "end"
                         if self.deceased_character_line != "":
                             # call the continuing story prompt with the new user message to wrap up the story
-                            ending_story: str = openai_api.get_story(self.deceased_character_line)
+                            ending_story: str = openai_api.get_story(self.deceased_character_line, self.session)
                             await add_message("AI", ending_story)
                             self.story_msgs.append(ending_story)
 
+                            current_char_id_list, current_char_name_list = turn_pipeline.get_char_lists(
+                                self.main_engine)
+                            relationship_char_dicts: str = self.main_engine.prepare_char_dictionaries("relationship")
+                            inventory_char_dicts: str = self.main_engine.prepare_char_dictionaries("inventory")
+                            current_location_char_dicts: str = self.main_engine.prepare_char_dictionaries(
+                                "current_location")
+
                             # final updates
                             await asyncio.gather(
                                 self.main_engine.update_char_relationship(
                                     await utils.get_updates("relationship", ending_story, relationship_char_dicts,
-                                                            current_char_id_list, current_char_name_list)),
+                                                            current_char_id_list, current_char_name_list,
+                                                            session=self.session)),
                                 self.main_engine.update_char_inventory(
                                     await utils.get_updates("inventory", ending_story, inventory_char_dicts,
-                                                            current_char_id_list, current_char_name_list)),
+                                                            current_char_id_list, current_char_name_list,
+                                                            session=self.session)),
                                 self.main_engine.update_char_current_location(ending_story,
                                                                               await utils.get_updates(
                                                                                   "current_location", ending_story,
                                                                                   current_location_char_dicts,
                                                                                   current_char_id_list,
-                                                                                  current_char_name_list)),
+                                                                                  current_char_name_list,
+                                                                                  session=self.session)),
                                 self.main_engine.update_key_events(ending_story)
                             )
                         input_box.disabled = True
@@ -1585,11 +1545,64 @@ class GameApp:
                     print()
                     self.event_count -= 1
 
+                    # record the turn so the player can rewind to it
+                    self.main_engine.checkpoint(**get_turn_extras())
+
                 # await add_message("AI", ai_message)
                 await story(user_message)
                 input_box.disabled = self.is_dead
 
-                self.page.update()
+                self.ui_updates.request()
+
+        def get_turn_extras() -> Dict[str, V]:
+            """Fetches the UI state that needs restoring when the game is rewound to the current turn.
+
+            :return: A dictionary of the UI state of the current turn.
+            """
+            return {
+                "story_msgs": len(self.story_msgs),
+                "conversation": len(messages),
+                "recent_stories": list(self.recent_stories),
+                "event_count": self.event_count,
+                "deceased_character_line": self.deceased_character_line,
+                "is_dead": self.is_dead,
+            }
+
+        def refresh_stats():
+            """Updates the stats displayed in the sidebar to match the main character.
+
+            :return: None
+            """
+            self.hp_stats.value = self.main_engine.mainCharacter.hp
+            self.luck_stats.value = self.main_engine.mainCharacter.luck
+            self.cha_stats.value = self.main_engine.mainCharacter.cha
+            self.money_stats.value = self.main_engine.mainCharacter.money
+            self.physical_condition_stats.value = self.main_engine.mainCharacter.physical_condition
+
+        def rewind_action(e):
+            """Rewinds the game by one turn, restoring the characters, world, timeline, conversation
+            histories and the displayed story to the previous turn.
+
+            :param e: The event that triggered the rewind
+            :return: None
+            """
+            # don't rewind while a response is being generated
+            if input_box.disabled and not self.is_dead:
+                return
+            self.sounds.play("button_click")
+            extras = self.main_engine.rewind(1)
+            if extras is None:
+                return
+            del self.story_msgs[extras["story_msgs"]:]
+            messages.truncate(extras["conversation"])
+            self.recent_stories = list(extras["recent_stories"])
+            self.event_count = extras["event_count"]
+            self.deceased_character_line = extras["deceased_character_line"]
+            self.is_dead = extras["is_dead"]
+            input_box.disabled = self.is_dead
+            refresh_stats()
+            self.main_engine.save_game()
+            self.ui_updates.request()
 
         def show_popup(label):
             """Displays a popup window with specific game information.
@@ -1607,20 +1620,25 @@ class GameApp:
                 :return: None
                 """
                 self.page.overlay.remove(popup)
-                self.page.update()
+                self.ui_updates.request()
 
             if label == "Inventory":
                 content = []
+                image_store = image_jobs.get_default_queue().store
+                item_size: int | None = get_variant_size(DEFAULT_VARIANT_SIZES, monitor.width * 0.03)
+                item_prompts: Dict[str, str] = {}
                 for item in self.main_engine.mainCharacter.inventory:
-                    file_path = f"assets/Item_portraits/{item}.png"
-                    if os.path.isfile(file_path):
+                    item_prompts[item] = get_item_prompt(item, genre)
+                    image_path: str | None = image_store.get_path("Item", item, prompt=item_prompts[item],
+                                                                  size=item_size)
+                    if item not in self.item_atlas and image_path is not None:
+                        self.item_atlas.add(item, image_path)
+                self.item_atlas.save()
+                for item in self.main_engine.mainCharacter.inventory:
+                    item_prompt: str = item_prompts[item]
+                    if item in self.item_atlas:
                         item_row = ft.Row([
-                            ft.Image(
-                                src=f"Item_portraits/{item}.png",
-                                width=monitor.width * 0.03,
-                                height=monitor.width * 0.03,
-                                fit=ft.ImageFit.CONTAIN
-                            ),
+                            create_sprite(self.item_atlas, item, monitor.width * 0.03),
                             ft.Text(
                                 item,
                                 width=monitor.width * 0.14,
@@ -1631,19 +1649,9 @@ class GameApp:
                         ])
                         content.append(item_row)
                     else:
-                        # Generate the image in the background
-                        def generate_image_background():
-                            """Generates a pixel art image for a game item in the background.
-                            Creates a 16-bit style pixel art image for an inventory item
-                            that matches the game's genre.
-                            
-                            :return: None
-                            """
-                            generate_image(
-                                f"Generate a 16 bit pixel art image for a game item called {item} that will be used in a game with the genre{genre},",
-                                item, "Item")
-
-                        threading.Thread(target=generate_image_background).start()
+                        # Generate the image in the background, before the images that aren't visible
+                        image_jobs.get_default_queue().submit("Item", item, item_prompt,
+                                                              priority=image_jobs.VISIBLE_PRIORITY)
                         item_row = ft.Row([
                             ft.Text(
                                 f"Generating image for {item}...\n",
@@ -1672,43 +1680,91 @@ class GameApp:
                     selectable=True,
                 )]
             elif label == "Timeline":
-                content = [ft.Text(
-                    "".join([f"- {event}\n\n" for event in self.main_engine.timeline.get_event]),
-                    size=monitor.width * 0.01,
+                timeline = self.main_engine.timeline
+                timeline_events = ft.Column(spacing=monitor.height * 0.01)
+                page_label = ft.Text(size=monitor.width * 0.009, color=ft.colors.WHITE)
+                # the newest events are shown first
+                timeline_page = {"page": timeline.get_page_count() - 1}
+
+                def show_timeline_entries(entries, heading):
+                    """Shows a list of timeline entries in the popup.
+
+                    :param entries: The entries, as returned by the timeline's get_page and search.
+                    :param heading: The text shown next to the page buttons.
+                    :return: None
+                    """
+                    timeline_events.controls = [ft.Text(
+                        f"Turn {entry['turn']}: {entry['event']}",
+                        size=monitor.width * 0.01,
+                        color=ft.colors.WHITE,
+                        selectable=True,
+                    ) for entry in entries]
+                    page_label.value = heading
+                    self.ui_updates.request(timeline_events, page_label)
+
+                def show_timeline_page(page):
+                    """Shows a page of the timeline, clearing the search.
+
+                    :param page: The page number, starting at 0 for the oldest events.
+                    :return: None
+                    """
+                    page_count = timeline.get_page_count()
+                    timeline_page["page"] = min(max(page, 0), page_count - 1)
+                    timeline_search.value = ""
+                    show_timeline_entries(timeline.get_page(timeline_page["page"]),
+                                          f"Page {timeline_page['page'] + 1} / {page_count}")
+                    self.ui_updates.request(timeline_search)
+
+                def on_timeline_search(e):
+                    """Shows the events containing every word typed in the search box.
+
+                    :param e: The event that triggered the search.
+                    :return: None
+                    """
+                    if timeline_search.value.strip() == "":
+                        show_timeline_page(timeline_page["page"])
+                        return
+                    matches = timeline.search(timeline_search.value)
+                    show_timeline_entries(matches, f"{len(matches)} matching events")
+
+                timeline_search = ft.TextField(
+                    hint_text="Search events",
+                    text_size=monitor.width * 0.009,
+                    height=monitor.height * 0.04,
+                    content_padding=ft.padding.symmetric(horizontal=monitor.width * 0.005),
                     color=ft.colors.WHITE,
-                    selectable=True,
-                )]
+                    on_change=on_timeline_search,
+                )
+                show_timeline_page(timeline_page["page"])
+                content = [
+                    timeline_search,
+                    ft.Row([
+                        ft.TextButton("Prev", on_click=lambda e: show_timeline_page(timeline_page["page"] - 1)),
+                        page_label,
+                        ft.TextButton("Next", on_click=lambda e: show_timeline_page(timeline_page["page"] + 1)),
+                    ]),
+                    timeline_events,
+                ]
             elif label == "Characters":
                 content = []
+                image_store = image_jobs.get_default_queue().store
+                npc_prompts: Dict[str, str] = {}
                 for char in self.main_engine.characters:
-                    print(genre)
-                    file_path = f"assets/NPC_portraits/{genre}/{char.name}.png"
-                    if os.path.isfile(file_path):
-                        file_path = f"NPC_portraits/{genre}/{char.name}.png"
-                        content.append(ft.Image(src=file_path, width=100, height=100))
+                    npc_prompts[char.name] = get_npc_prompt(char, genre)
+                    image_path: str | None = image_store.get_path("NPC", char.name, genre, npc_prompts[char.name], 100)
+                    if char.name not in self.npc_atlas and image_path is not None:
+                        self.npc_atlas.add(char.name, image_path)
+                self.npc_atlas.save()
+                for char in self.main_engine.characters:
+                    npc_prompt: str = npc_prompts[char.name]
+                    if char.name in self.npc_atlas:
+                        content.append(create_sprite(self.npc_atlas, char.name, 100))
                     else:
                         content.append(ft.Text(f"Generating image for {char.name}..."))
-
-                        def generate_image_background():
-                            """Generates a pixel art portrait for an NPC character in the background.
-                            Creates a detailed 16x16 pixel character portrait incorporating the NPC's
-                            appearance, occupation, and personality traits.
-                            
-                            :return: None
-                            """
-                            generate_image(
-                                f'''Style: Pixel art.
-                                    Dimensions: 16 x 16 pixels.
-                                    Character: {char.appearance} with the occupation {char.occupation}.
-                                    Personality: {char.personality}.
-                                    Background: Use a white background.
-                                    Lighting: Simulate natural lighting to enhance colours and details.
-                                    Pose: Front-facing portrait, close-up.
-                                    Genre: {genre}''',
-                                char.name, "NPC",genre)
+                        image_jobs.get_default_queue().submit("NPC", char.name, npc_prompt, genre,
+                                                              image_jobs.VISIBLE_PRIORITY)
 
                         file_path = f"images/default.png"
-                        threading.Thread(target=generate_image_background).start()
                         print("Generating image for character...")
                         content.append(ft.Image(src=file_path, width=100, height=100))
                     content.append(ft.Text(
@@ -1754,7 +1810,7 @@ class GameApp:
                 ]),
             )
             self.page.overlay.append(popup)
-            self.page.update()
+            self.ui_updates.request()
 
         def create_button(label, top):
             """Creates a styled button for the game interface sidebar.
@@ -1827,7 +1883,7 @@ class GameApp:
                 :return: None
                 """
                 self.page.dialog.open = False
-                self.page.update()
+                self.ui_updates.request()
 
             def end_game():
                 """Handles the game ending process.
@@ -1904,6 +1960,36 @@ class GameApp:
                 on_click=end_action
             )
 
+        def rewind_button():
+            """Creates the rewind button, which takes the game back by one turn.
+
+            :return: ft.Container: A container with the rewind button
+            """
+            return ft.Container(
+                left=monitor.width * 0.074,
+                top=monitor.height * 0.85,
+                width=monitor.width * 0.08,
+                height=monitor.height * 0.05,
+                bgcolor="#8E9DDA",
+                content=ft.Row(
+                    controls=[
+                        ft.Container(
+                            content=create_stats_text(value="Rewind", size=monitor.width * 0.014),
+                            padding=ft.padding.only(left=monitor.width * 0.0125)
+                        )
+                    ],
+                    expand=True,
+                    alignment="start"
+                ),
+                shadow=ft.BoxShadow(
+                    color=ft.colors.with_opacity(0.25, ft.colors.BLACK),
+                    blur_radius=2,
+                    offset=ft.Offset(3, 3),
+                    spread_radius=3,
+                ),
+                on_click=rewind_action
+            )
+
         input_box = ft.TextField(
             label="What will you do?",
             width=monitor.width * 0.75,
@@ -1941,7 +2027,10 @@ class GameApp:
                     height=monitor.height * 0.1203,
                     border=ft.border.all(5, "#8E9DDA"),
                     content=ft.Image(
-                        src=f"Character_portraits/{self.main_engine.mainCharacter.name}.png",
+                        src=image_jobs.get_default_queue().store.get_src(
+                            "Character", self.main_engine.mainCharacter.name,
+                            size=get_variant_size(DEFAULT_VARIANT_SIZES, monitor.width * 0.0677)
+                        ) or "images/default.png",
                         fit=ft.ImageFit.COVER
                     )
                 ),
@@ -2015,6 +2104,7 @@ class GameApp:
                 ),
                 *buttons,
                 end_button(),
+                rewind_button(),
                 ft.Container(
                     left=monitor.width * 0.23,
                     top=monitor.height * 0.14,
@@ -2040,6 +2130,9 @@ class GameApp:
         input_box.disabled = False
         self.page.update()
 
+        # the first checkpoint is the start of the story, the player can't rewind past it
+        self.main_engine.checkpoint(**get_turn_extras())
+
 
 if __name__ == '__main__':
     app = GameApp()